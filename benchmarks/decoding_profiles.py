@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""
+Genauigkeit gegen Latenz der Decoding-Profile
+Transkribiert jede Aufnahme einmal pro Profil (instant, balanced, accurate)
+mit dem lokalen Modell und vergleicht mit einer Referenz aus der
+gleichnamigen .txt-Datei neben der WAV-Datei (aufnahme.wav -> aufnahme.txt).
+
+Ausgabe ist ein JSON-Bericht mit Wortfehlerrate (WER), Latenz-Perzentilen
+und Echtzeitfaktor pro Profil - Grundlage für DECODING_PROFILE und
+DECODING_TARGET_LATENCY.
+
+Verwendung:
+    python benchmarks/decoding_profiles.py aufnahme.wav [...] --model small
+        [--profiles instant,balanced,accurate] [--repeat 1] [--output ergebnis.json]
+"""
+
+import argparse
+import importlib.util
+import json
+import logging
+import os
+import platform
+import re
+import sys
+import time
+from pathlib import Path
+from typing import List, Tuple
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from src.audio_utils import read_wav_float32  # noqa: E402
+from src.config import config  # noqa: E402
+from src.decoding_profiles import PROFILES  # noqa: E402
+from src.latency_trace import percentile  # noqa: E402
+
+
+def normalize_words(text: str) -> List[str]:
+    """Kleinschreibung, Satzzeichen entfernen - Umlaute und Zahlen bleiben"""
+    return re.sub(r"[^\w\s]", " ", (text or "").lower()).split()
+
+
+def word_errors(reference: List[str], hypothesis: List[str]) -> int:
+    """Levenshtein-Distanz auf Wortebene (Ersetzungen, Auslassungen, Einfügungen)"""
+    previous = list(range(len(hypothesis) + 1))
+    for i, ref_word in enumerate(reference, 1):
+        current = [i]
+        for j, hyp_word in enumerate(hypothesis, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1,
+                               previous[j - 1] + (ref_word != hyp_word)))
+        previous = current
+    return previous[-1]
+
+
+def load_inputs(paths: List[str]) -> List[Tuple[str, "object", List[str]]]:
+    inputs = []
+    for path in paths:
+        reference = Path(path).with_suffix(".txt")
+        if not reference.exists():
+            raise SystemExit(f"{path}: Referenz {reference.name} fehlt")
+        inputs.append((Path(path).name, read_wav_float32(path),
+                       normalize_words(reference.read_text(encoding="utf-8"))))
+    return inputs
+
+
+def run_profile(service, profile: str, inputs, repeat: int) -> dict:
+    latencies, files = [], []
+    errors = reference_words = 0
+    audio_seconds = decode_seconds = 0.0
+
+    for name, audio, reference in inputs:
+        for _ in range(repeat):
+            start_time = time.perf_counter()
+            text = service.transcribe_array(audio, profile=profile)
+            elapsed = time.perf_counter() - start_time
+            latencies.append(elapsed)
+            audio_seconds += len(audio) / config.SAMPLE_RATE
+            decode_seconds += elapsed
+        # Dekodierung ist deterministisch genug - WER aus dem letzten Durchlauf
+        file_errors = word_errors(reference, normalize_words(text))
+        errors += file_errors
+        reference_words += len(reference)
+        files.append({"input": name, "wer": round(file_errors / max(1, len(reference)), 4), "text": text})
+
+    return {
+        "profile": profile,
+        "wer": round(errors / max(1, reference_words), 4),
+        "latency_p50": round(percentile(latencies, 50), 3),
+        "latency_p95": round(percentile(latencies, 95), 3),
+        "realtime_factor": round(decode_seconds / audio_seconds, 3) if audio_seconds else None,
+        "files": files,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="WER gegen Latenz der Decoding-Profile")
+    parser.add_argument("wav", nargs="+", help="16-bit Mono-WAVs mit Referenz-.txt daneben")
+    parser.add_argument("--model", default="small", help="Modellgröße")
+    parser.add_argument("--profiles", default=",".join(PROFILES), help="Kommagetrennte Profile")
+    parser.add_argument("--repeat", type=int, default=1, help="Durchläufe pro Aufnahme und Profil")
+    parser.add_argument("--output", type=Path, help="JSON-Bericht (Standard: stdout)")
+    parser.add_argument("--verbose", action="store_true", help="Logs der Anwendung anzeigen")
+    args = parser.parse_args()
+
+    logging.getLogger().setLevel(logging.INFO if args.verbose else logging.WARNING)
+    if importlib.util.find_spec("faster_whisper") is None:
+        raise SystemExit("Benötigt faster-whisper (pip install faster-whisper)")
+    from src.local_transcription import LocalTranscriptionService
+
+    config.WHISPER_MODEL_SIZE = args.model
+    service = LocalTranscriptionService()
+    if not service.is_available():
+        raise SystemExit(f"Whisper-Modell '{args.model}' nicht verfügbar")
+    service.warmup()
+    inputs = load_inputs(args.wav)
+
+    results = []
+    for profile in args.profiles.split(","):
+        if profile not in PROFILES:
+            raise SystemExit(f"Unbekanntes Profil '{profile}' (verfügbar: {', '.join(PROFILES)})")
+        result = run_profile(service, profile, inputs, args.repeat)
+        results.append(result)
+        print(f"{profile:9s}: WER {result['wer'] * 100:5.1f}%, p50 {result['latency_p50']:.2f}s, "
+              f"p95 {result['latency_p95']:.2f}s, RTF {result['realtime_factor']}", file=sys.stderr)
+
+    report = {
+        "benchmark": "decoding_profiles",
+        "timestamp": round(time.time(), 3),
+        "environment": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+        },
+        "parameters": {key: (str(value) if isinstance(value, Path) else value) for key, value in vars(args).items()},
+        "results": results,
+    }
+
+    text = json.dumps(report, indent=2, ensure_ascii=False)
+    if args.output:
+        args.output.write_text(text + "\n", encoding="utf-8")
+        print(f"Bericht gespeichert: {args.output}", file=sys.stderr)
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""
+Lokaler Ersatz für die OpenAI-Endpunkte (Transkription und Chat) in Benchmarks
+Antwortet nach einstellbarer Latenz mit Jitter und meldet die simulierte
+Verarbeitungszeit wie die echte API im Header openai-processing-ms. Optional
+wird eine begrenzte Upload-Bandbreite simuliert.
+
+Verwendung (eigenständig):
+    python benchmarks/fake_openai_server.py --port 8765 --latency 0.3 --jitter 0.1
+    OPENAI_BASE_URL=http://127.0.0.1:8765/v1 OPENAI_API_KEY=sk-bench python -m src
+"""
+
+import argparse
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Optional
+
+DEFAULT_TRANSCRIPT = "Das ist ein Benchmark-Transkript für die Latenzmessung."
+
+
+class FakeOpenAIServer:
+    """HTTP-Server in einem Hintergrund-Thread; base_url zeigt auf /v1"""
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0,
+                 transcription_latency: float = 0.3, chat_latency: float = 0.5, jitter: float = 0.0,
+                 upload_bytes_per_second: Optional[float] = None, transcript: str = DEFAULT_TRANSCRIPT,
+                 seed: Optional[int] = None):
+        self.transcription_latency = transcription_latency
+        self.chat_latency = chat_latency
+        self.jitter = jitter
+        self.upload_bytes_per_second = upload_bytes_per_second
+        self.transcript = transcript
+        self.requests = {"transcriptions": 0, "chat": 0}
+        self._random = random.Random(seed)
+        self._random_lock = threading.Lock()
+
+        self._httpd = ThreadingHTTPServer((host, port), self._make_handler())
+        self._httpd.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+    def _latency(self, base: float) -> float:
+        with self._random_lock:
+            return max(0.0, base + self._random.uniform(-self.jitter, self.jitter))
+
+    def _make_handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, format, *args):
+                pass
+
+            def _send(self, body: bytes, content_type: str, processing_seconds: float = 0.0):
+                self.send_response(200)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(body)))
+                self.send_header("openai-processing-ms", str(int(processing_seconds * 1000)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_HEAD(self):
+                # Verbindungs-Prewarm der Anwendung
+                self.send_response(200)
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length", 0))
+                start = time.perf_counter()
+                body = self.rfile.read(length)
+                if server.upload_bytes_per_second:
+                    remaining = len(body) / server.upload_bytes_per_second - (time.perf_counter() - start)
+                    if remaining > 0:
+                        time.sleep(remaining)
+
+                if self.path.endswith("/audio/transcriptions"):
+                    server.requests["transcriptions"] += 1
+                    processing = server._latency(server.transcription_latency)
+                    time.sleep(processing)
+                    if b'name="response_format"\r\n\r\ntext' in body:
+                        self._send(server.transcript.encode("utf-8"), "text/plain; charset=utf-8", processing)
+                    else:
+                        self._send(json.dumps({"text": server.transcript}).encode("utf-8"),
+                                   "application/json", processing)
+                elif self.path.endswith("/chat/completions"):
+                    server.requests["chat"] += 1
+                    processing = server._latency(server.chat_latency)
+                    time.sleep(processing)
+                    self._send(json.dumps(_chat_completion(server.transcript)).encode("utf-8"),
+                               "application/json", processing)
+                else:
+                    self.send_error(404)
+
+        return Handler
+
+    def start(self) -> "FakeOpenAIServer":
+        self._thread = threading.Thread(target=self._httpd.serve_forever, name="FakeOpenAIServer", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+def _chat_completion(text: str) -> dict:
+    return {
+        "id": "chatcmpl-benchmark",
+        "object": "chat.completion",
+        "created": int(time.time()),
+        "model": "gpt-4",
+        "choices": [{
+            "index": 0,
+            "message": {"role": "assistant", "content": text},
+            "finish_reason": "stop",
+        }],
+        "usage": {"prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0},
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Lokaler Ersatz für OpenAI-Transkription und -Chat")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.3, help="Verarbeitungszeit Transkription (s)")
+    parser.add_argument("--chat-latency", type=float, default=0.5, help="Verarbeitungszeit Chat (s)")
+    parser.add_argument("--jitter", type=float, default=0.0, help="Gleichverteilter Jitter +/- (s)")
+    parser.add_argument("--bandwidth", type=float, default=None, help="Upload-Bandbreite in KB/s")
+    args = parser.parse_args()
+
+    server = FakeOpenAIServer(port=args.port, transcription_latency=args.latency,
+                              chat_latency=args.chat_latency, jitter=args.jitter,
+                              upload_bytes_per_second=args.bandwidth * 1024 if args.bandwidth else None)
+    print(f"Fake-OpenAI-Server: {server.base_url} (Strg+C beendet)")
+    try:
+        server._httpd.serve_forever()
+    except KeyboardInterrupt:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+"""
+Fake-PyAudio für Benchmarks - liefert Audio aus WAV-Dateien statt vom Mikrofon
+install() registriert ein Modul "pyaudio" in sys.modules, bevor
+src.audio_recorder importiert wird. Der Stream liefert im Takt der
+Sample-Rate (optional beschleunigt) Frames aus dem FakeMicrophone;
+spielt gerade nichts, kommt Stille wie von einem offenen Mikrofon.
+"""
+
+import sys
+import threading
+import time
+import types
+from typing import Optional
+
+import numpy as np
+
+paInt16 = 8
+paContinue = 0
+paComplete = 1
+
+
+class FakeMicrophone:
+    """Gemeinsame Audioquelle für alle Streams (eine Aufnahme zur Zeit)"""
+
+    def __init__(self, speed: float = 1.0):
+        self.speed = speed
+        self._samples = np.zeros(0, dtype=np.int16)
+        self._position = 0
+        self._lock = threading.Lock()
+        self.finished = threading.Event()
+        self.finished.set()
+
+    def play(self, samples: np.ndarray):
+        """Spielt die Samples ab; finished wird gesetzt, sobald alles gelesen wurde"""
+        with self._lock:
+            self._samples = samples.astype(np.int16)
+            self._position = 0
+            self.finished.clear()
+
+    def read(self, frame_count: int) -> bytes:
+        with self._lock:
+            chunk = self._samples[self._position:self._position + frame_count]
+            self._position += len(chunk)
+            if self._position >= len(self._samples):
+                self.finished.set()
+        if len(chunk) < frame_count:
+            chunk = np.concatenate([chunk, np.zeros(frame_count - len(chunk), dtype=np.int16)])
+        return chunk.tobytes()
+
+
+microphone = FakeMicrophone()
+
+
+class FakeStream:
+    """Eingangs-Stream mit Callback-Thread (wie PortAudio) oder blockierendem read()"""
+
+    def __init__(self, rate: int, frames_per_buffer: int, stream_callback=None):
+        self.rate = rate
+        self.frames_per_buffer = frames_per_buffer
+        self.stream_callback = stream_callback
+        self._active = False
+        self._thread: Optional[threading.Thread] = None
+        self.start_stream()
+
+    def _frame_interval(self) -> float:
+        return self.frames_per_buffer / self.rate / microphone.speed
+
+    def _run(self):
+        next_time = time.perf_counter()
+        while self._active:
+            next_time += self._frame_interval()
+            delay = next_time - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            data = microphone.read(self.frames_per_buffer)
+            _, flag = self.stream_callback(data, self.frames_per_buffer, {}, 0)
+            if flag == paComplete:
+                self._active = False
+
+    def start_stream(self):
+        self._active = True
+        if self.stream_callback is not None:
+            self._thread = threading.Thread(target=self._run, name="FakePortAudio", daemon=True)
+            self._thread.start()
+
+    def read(self, num_frames: int, exception_on_overflow: bool = True) -> bytes:
+        time.sleep(num_frames / self.rate / microphone.speed)
+        return microphone.read(num_frames)
+
+    def is_active(self) -> bool:
+        return self._active
+
+    def stop_stream(self):
+        self._active = False
+        if self._thread and self._thread is not threading.current_thread():
+            self._thread.join(timeout=1.0)
+
+    def close(self):
+        self.stop_stream()
+
+
+class FakePyAudio:
+    def open(self, format=paInt16, channels=1, rate=16000, input=True, input_device_index=None,
+             frames_per_buffer=1024, stream_callback=None):
+        return FakeStream(rate, frames_per_buffer, stream_callback)
+
+    def get_sample_size(self, format) -> int:
+        return 2
+
+    def get_device_count(self) -> int:
+        return 1
+
+    def get_device_info_by_index(self, index: int) -> dict:
+        return {"index": 0, "name": "Benchmark-Mikrofon", "maxInputChannels": 1, "defaultSampleRate": 16000}
+
+    def get_default_input_device_info(self) -> dict:
+        return self.get_device_info_by_index(0)
+
+    def terminate(self):
+        pass
+
+
+def install(speed: float = 1.0) -> FakeMicrophone:
+    """Registriert das Fake-Modul als "pyaudio" (vor dem Import von src.audio_recorder aufrufen)"""
+    microphone.speed = speed
+    module = types.ModuleType("pyaudio")
+    module.paInt16 = paInt16
+    module.paContinue = paContinue
+    module.paComplete = paComplete
+    module.PyAudio = FakePyAudio
+    module.Stream = FakeStream
+    sys.modules["pyaudio"] = module
+    return microphone
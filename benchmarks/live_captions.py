@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+"""
+Benchmark der Live-Untertitel: Echtzeitfaktor und Caption-Lag
+Spielt WAV-Dateien (oder ein synthetisches Signal) im Takt des Streams in
+einen LiveCaptioner ein - wie der WebSocket-Server, aber ohne Netzwerk.
+Dekodiert wird mit einem lokalen faster-whisper-Modell oder mit einem
+simulierten Decoder, dessen Rechenzeit proportional zur Fensterlänge ist.
+
+Ausgabe ist ein JSON-Bericht mit Echtzeitfaktor, Lag-Perzentilen, Zeit bis
+zum ersten Zwischenstand und allen Ereignissen.
+
+Verwendung:
+    python benchmarks/live_captions.py [aufnahme.wav ...] [--speed 1] [--step 1.0]
+        [--local --model tiny | --decode-rtf 0.2] [--output ergebnis.json]
+"""
+
+import argparse
+import importlib.util
+import json
+import logging
+import os
+import platform
+import sys
+import threading
+import time
+import wave
+from pathlib import Path
+from typing import List, Tuple
+
+import numpy as np
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from src.config import config  # noqa: E402
+from src.live_captions import LiveCaptioner  # noqa: E402
+from tools.benchmark_encoders import synthetic_speech  # noqa: E402
+
+# Frame-Größe wie bei einem Browser- oder Mikrofon-Client (100 ms)
+FRAME_SECONDS = 0.1
+
+
+class SimulatedDecoder:
+    """Ersetzt das Modell: Rechenzeit = decode_rtf * Fensterlänge"""
+
+    def __init__(self, decode_rtf: float, sample_rate: int):
+        self.decode_rtf = decode_rtf
+        self.sample_rate = sample_rate
+
+    def transcribe_array(self, audio, initial_prompt=None, profile=None):
+        seconds = len(audio) / self.sample_rate
+        time.sleep(self.decode_rtf * seconds)
+        return f"Fenster mit {seconds:.1f} Sekunden"
+
+
+def load_inputs(paths: List[str], seconds: float) -> List[Tuple[str, np.ndarray]]:
+    if not paths:
+        return [(f"synthetic_{seconds:g}s", synthetic_speech(seconds))]
+
+    inputs = []
+    for path in paths:
+        with wave.open(path, "rb") as wf:
+            if wf.getnchannels() != 1 or wf.getsampwidth() != 2 or wf.getframerate() != config.SAMPLE_RATE:
+                raise SystemExit(f"{path}: benötigt 16-bit Mono mit {config.SAMPLE_RATE} Hz")
+            inputs.append((Path(path).name, np.frombuffer(wf.readframes(wf.getnframes()), dtype=np.int16)))
+    return inputs
+
+
+def run_stream(local_service, samples: np.ndarray, speed: float, step: float, max_window: float) -> dict:
+    """Ein Stream: Frames im Takt einspeisen, Ereignisse mit Zeitstempel sammeln"""
+    events = []
+    lock = threading.Lock()
+    start = time.perf_counter()
+
+    def on_event(event: dict):
+        with lock:
+            events.append({**event, "at": round(time.perf_counter() - start, 3)})
+
+    captioner = LiveCaptioner(local_service, on_event, sample_rate=config.SAMPLE_RATE,
+                              step_seconds=step, max_window_seconds=max_window)
+    frame_samples = int(FRAME_SECONDS * config.SAMPLE_RATE)
+    next_time = start
+    for offset in range(0, len(samples), frame_samples):
+        next_time += FRAME_SECONDS / speed
+        delay = next_time - time.perf_counter()
+        if delay > 0:
+            time.sleep(delay)
+        captioner.feed(samples[offset:offset + frame_samples].tobytes())
+
+    stream_end = time.perf_counter() - start
+    stats = captioner.finish(timeout=120)
+    partials = [e for e in events if e["type"] == "partial"]
+    return {
+        **stats,
+        "stream_seconds": round(stream_end, 3),
+        # Wie lange nach Stream-Ende der letzte Text kam
+        "tail_seconds": round(max((e["at"] for e in events), default=stream_end) - stream_end, 3),
+        "first_partial_seconds": partials[0]["at"] if partials else None,
+        "events": events,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Echtzeitfaktor und Caption-Lag der Live-Untertitel")
+    parser.add_argument("wav", nargs="*", help="16-bit Mono-WAVs (Standard: synthetisches Signal)")
+    parser.add_argument("--seconds", type=float, default=20.0, help="Länge des synthetischen Signals")
+    parser.add_argument("--speed", type=float, default=1.0, help="Abspielgeschwindigkeit (1 = Echtzeit)")
+    parser.add_argument("--step", type=float, default=None, help="Abstand der Zwischenstände (s)")
+    parser.add_argument("--max-window", type=float, default=None, help="Maximale Fensterlänge (s)")
+    parser.add_argument("--local", action="store_true", help="Lokales Whisper-Modell statt Simulation")
+    parser.add_argument("--model", default="tiny", help="Modellgröße für --local")
+    parser.add_argument("--decode-rtf", type=float, default=0.2,
+                        help="Simulierte Rechenzeit pro Sekunde Fenster (ohne --local)")
+    parser.add_argument("--output", type=Path, help="JSON-Bericht (Standard: stdout)")
+    parser.add_argument("--verbose", action="store_true", help="Logs der Anwendung anzeigen")
+    args = parser.parse_args()
+
+    logging.getLogger().setLevel(logging.INFO if args.verbose else logging.WARNING)
+    step = args.step if args.step is not None else config.CAPTIONS_STEP_SECONDS
+    max_window = args.max_window if args.max_window is not None else config.CAPTIONS_MAX_WINDOW_SECONDS
+
+    if args.local:
+        if importlib.util.find_spec("faster_whisper") is None:
+            raise SystemExit("--local benötigt faster-whisper (pip install faster-whisper)")
+        from src.live_captions import get_local_service
+
+        config.WHISPER_MODEL_SIZE = args.model
+        local_service = get_local_service()
+        if local_service is None:
+            raise SystemExit(f"Whisper-Modell '{args.model}' nicht verfügbar")
+    else:
+        local_service = SimulatedDecoder(args.decode_rtf, config.SAMPLE_RATE)
+
+    streams = []
+    for name, samples in load_inputs(args.wav, args.seconds):
+        result = run_stream(local_service, samples, args.speed, step, max_window)
+        result["input"] = name
+        streams.append(result)
+        print(f"{name}: Echtzeitfaktor {result['realtime_factor']}, Lag p50 {result['lag_p50']}s, "
+              f"p95 {result['lag_p95']}s, {result['partials']} Zwischenstände, {result['finals']} final",
+              file=sys.stderr)
+
+    report = {
+        "benchmark": "live_captions",
+        "timestamp": round(time.time(), 3),
+        "environment": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+        },
+        "parameters": {
+            **{key: (str(value) if isinstance(value, Path) else value) for key, value in vars(args).items()},
+            "step": step,
+            "max_window": max_window,
+            "silence_seconds": config.STREAMING_SILENCE_SECONDS,
+        },
+        "streams": streams,
+    }
+
+    text = json.dumps(report, indent=2, ensure_ascii=False)
+    if args.output:
+        args.output.write_text(text + "\n", encoding="utf-8")
+        print(f"Bericht gespeichert: {args.output}", file=sys.stderr)
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+"""
+Durchsatz und Latenz des lokalen Modells bei gleichzeitigen Anfragen
+Schickt N Anfragen mit C gleichzeitigen Aufrufern an LocalTranscriptionService
+- einmal pro Kombination aus LOCAL_INFERENCE_MODE und Batch-Fenster. Für
+jede Einstellung wird das Modell neu geladen (num_workers/cpu_threads hängen
+vom Modus ab).
+
+Ausgabe ist ein JSON-Bericht mit Audiosekunden pro Sekunde (gesamt und pro
+Kern), Latenz-Perzentilen und den Statistiken des Schedulers.
+
+Verwendung:
+    python benchmarks/local_inference.py [aufnahme.wav ...] --model tiny
+        [--modes off,parallel,batched] [--windows 0,30,100] [--workers 2]
+        [--requests 32] [--concurrency 8] [--output ergebnis.json]
+"""
+
+import argparse
+import importlib.util
+import json
+import logging
+import os
+import platform
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import List
+
+import numpy as np
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+import src.local_transcription as local_transcription  # noqa: E402
+from src.audio_utils import read_wav_float32  # noqa: E402
+from src.config import config  # noqa: E402
+from src.latency_trace import percentile  # noqa: E402
+from tools.benchmark_encoders import synthetic_speech  # noqa: E402
+
+
+def load_inputs(paths: List[str], seconds: float) -> List[np.ndarray]:
+    if not paths:
+        return [synthetic_speech(seconds).astype(np.float32) / 32768.0]
+    return [read_wav_float32(path) for path in paths]
+
+
+def fresh_service():
+    """Neues Modell mit der aktuellen Konfiguration (Singleton zurücksetzen)"""
+    previous = local_transcription._instance
+    if previous is not None and previous.scheduler:
+        previous.scheduler.shutdown()
+    local_transcription._instance = None
+    service = local_transcription.LocalTranscriptionService()
+    if not service.is_available():
+        raise SystemExit(f"Whisper-Modell '{config.WHISPER_MODEL_SIZE}' nicht verfügbar")
+    service.warmup()
+    return service
+
+
+def run_setting(service, inputs: List[np.ndarray], requests: int, concurrency: int) -> dict:
+    latencies = []
+
+    def one(index: int):
+        start_time = time.perf_counter()
+        service.transcribe_array(inputs[index % len(inputs)])
+        latencies.append(time.perf_counter() - start_time)
+
+    cpu_start = time.process_time()
+    wall_start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(one, range(requests)))
+    wall_seconds = time.perf_counter() - wall_start
+    cpu_seconds = time.process_time() - cpu_start
+
+    audio_seconds = sum(len(inputs[i % len(inputs)]) for i in range(requests)) / config.SAMPLE_RATE
+    return {
+        "wall_seconds": round(wall_seconds, 3),
+        "cpu_seconds": round(cpu_seconds, 3),
+        "audio_seconds_per_second": round(audio_seconds / wall_seconds, 2),
+        # Durchsatz pro belegtem Kern - unabhängig davon, wie viele Threads CTranslate2 nutzt
+        "audio_seconds_per_cpu_second": round(audio_seconds / cpu_seconds, 2) if cpu_seconds else None,
+        "latency_p50": round(percentile(latencies, 50), 3),
+        "latency_p95": round(percentile(latencies, 95), 3),
+        "scheduler": service.scheduler.get_stats() if service.scheduler else None,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Durchsatz/Latenz des lokalen Modells bei gleichzeitigen Anfragen")
+    parser.add_argument("wav", nargs="*", help="16-bit Mono-WAVs (Standard: synthetisches Signal)")
+    parser.add_argument("--seconds", type=float, default=5.0, help="Länge des synthetischen Signals")
+    parser.add_argument("--model", default="tiny", help="Modellgröße")
+    parser.add_argument("--modes", default="off,parallel,batched", help="Kommagetrennte Modi")
+    parser.add_argument("--windows", default="0,30,100", help="Batch-Fenster in ms (kommagetrennt)")
+    parser.add_argument("--workers", type=int, default=2, help="CTranslate2-Worker im Modus parallel")
+    parser.add_argument("--max-batch", type=int, default=8, help="Maximale Batch-Größe")
+    parser.add_argument("--requests", type=int, default=32, help="Anfragen pro Einstellung")
+    parser.add_argument("--concurrency", type=int, default=8, help="Gleichzeitige Aufrufer")
+    parser.add_argument("--output", type=Path, help="JSON-Bericht (Standard: stdout)")
+    parser.add_argument("--verbose", action="store_true", help="Logs der Anwendung anzeigen")
+    args = parser.parse_args()
+
+    logging.getLogger().setLevel(logging.INFO if args.verbose else logging.WARNING)
+    if importlib.util.find_spec("faster_whisper") is None:
+        raise SystemExit("Benötigt faster-whisper (pip install faster-whisper)")
+
+    config.WHISPER_MODEL_SIZE = args.model
+    config.LOCAL_INFERENCE_WORKERS = args.workers
+    config.LOCAL_MAX_BATCH = args.max_batch
+    inputs = load_inputs(args.wav, args.seconds)
+
+    results = []
+    for mode in args.modes.split(","):
+        # Ohne Scheduler gibt es kein Fenster
+        windows = [0.0] if mode == "off" else [float(value) for value in args.windows.split(",")]
+        config.LOCAL_INFERENCE_MODE = mode
+        for window in windows:
+            config.LOCAL_BATCH_WINDOW_MS = window
+            service = fresh_service()
+            result = {"mode": mode, "window_ms": window,
+                      **run_setting(service, inputs, args.requests, args.concurrency)}
+            results.append(result)
+            print(f"{mode:8s} {window:5.0f}ms: {result['audio_seconds_per_second']:6.2f} s Audio/s, "
+                  f"p50 {result['latency_p50']:.2f}s, p95 {result['latency_p95']:.2f}s", file=sys.stderr)
+
+    report = {
+        "benchmark": "local_inference",
+        "timestamp": round(time.time(), 3),
+        "environment": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+        },
+        "parameters": {key: (str(value) if isinstance(value, Path) else value) for key, value in vars(args).items()},
+        "results": results,
+    }
+
+    text = json.dumps(report, indent=2, ensure_ascii=False)
+    if args.output:
+        args.output.write_text(text + "\n", encoding="utf-8")
+        print(f"Bericht gespeichert: {args.output}", file=sys.stderr)
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,296 @@
+#!/usr/bin/env python3
+"""
+End-to-End-Benchmark der Diktier-Pipeline
+Spielt WAV-Dateien (oder ein synthetisches Signal) über ein Fake-PyAudio
+ab und durchläuft dieselben Schritte wie VoiceTranscriberApp._perform_recording:
+Aufnahme, VAD, Kodierung, Transkription und GPT-Korrektur. Die API wird
+durch einen lokalen Fake-Server mit einstellbarer Latenz und Jitter ersetzt;
+optional transkribiert ein kleines lokales Whisper-Modell.
+
+Ausgabe ist ein JSON-Bericht mit Latenz-Perzentilen pro Stufe, CPU-Zeit und
+maximalem RSS - geeignet zum Vergleich zwischen Commits.
+
+Verwendung:
+    python benchmarks/run_pipeline.py [aufnahme.wav ...] [--runs 10] [--speed 4]
+        [--latency 0.3] [--jitter 0.1] [--chat-latency 0.5] [--bandwidth 500]
+        [--local --model tiny] [--no-correction] [--output ergebnis.json]
+"""
+
+import argparse
+import importlib.util
+import json
+import logging
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import wave
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+import fake_pyaudio  # noqa: E402
+from fake_openai_server import FakeOpenAIServer  # noqa: E402
+
+# Das Fake-Modul muss vor src.audio_recorder registriert sein
+microphone = fake_pyaudio.install()
+
+from src.audio_encoder import file_extension, is_native_format  # noqa: E402
+from src.audio_recorder import PYDUB_AVAILABLE, AudioRecorder  # noqa: E402
+from src.audio_utils import read_wav_float32  # noqa: E402
+from src.config import config  # noqa: E402
+from src.latency_trace import LatencyTracker, summarize  # noqa: E402
+from src.text_processor import TextProcessor  # noqa: E402
+from src.transcription import TranscriptionService  # noqa: E402
+from tools.benchmark_encoders import synthetic_speech  # noqa: E402
+
+logger = logging.getLogger("benchmark")
+
+
+def load_inputs(paths: List[str], seconds: float) -> List[Tuple[str, np.ndarray]]:
+    """16-bit Mono-WAVs mit der konfigurierten Sample-Rate (Standard: synthetisches Signal)"""
+    if not paths:
+        return [(f"synthetic_{seconds:g}s", synthetic_speech(seconds))]
+
+    inputs = []
+    for path in paths:
+        with wave.open(path, "rb") as wf:
+            if wf.getnchannels() != 1 or wf.getsampwidth() != 2 or wf.getframerate() != config.SAMPLE_RATE:
+                raise SystemExit(f"{path}: benötigt 16-bit Mono mit {config.SAMPLE_RATE} Hz")
+            inputs.append((Path(path).name, np.frombuffer(wf.readframes(wf.getnframes()), dtype=np.int16)))
+    return inputs
+
+
+def encode_upload(recorder: AudioRecorder, service: TranscriptionService, wav_path: str,
+                  output_format: str, duration: float) -> Tuple[bytes, str]:
+    """Wie VoiceTranscriberApp._load_audio_file: komprimieren, sonst WAV hochladen"""
+    if (output_format != "wav" and config.AUDIO_COMPRESSION_ENABLED
+            and (PYDUB_AVAILABLE or is_native_format(output_format))):
+        start_time = time.time()
+        data = recorder.compress_audio(wav_path, output_format=output_format)
+        if data:
+            service.record_encode(output_format, duration, time.time() - start_time, len(data))
+            return data, f"audio.{file_extension(output_format)}"
+
+    with open(wav_path, "rb") as f:
+        return f.read(), "audio.wav"
+
+
+def run_session(recorder: AudioRecorder, service: TranscriptionService, text_processor: Optional[TextProcessor],
+                tracker: LatencyTracker, samples: np.ndarray, speed: float) -> dict:
+    """Eine Diktierung: Hotkey-Druck beim Start, Loslassen wenn die Datei abgespielt ist"""
+    trace = tracker.start()
+    cpu_start = time.process_time()
+    outcome = "error"
+    wav_path = None
+
+    def first_frame(data):
+        trace.mark_once("first_frame")
+
+    recorder.add_frame_listener(first_frame)
+    try:
+        upload_format = (config.AUDIO_COMPRESSION_FORMAT if config.USE_LOCAL_TRANSCRIPTION
+                         else service.choose_upload_format())
+        recorder.upload_format = upload_format
+
+        microphone.play(samples)
+        if not recorder.start_recording():
+            raise RuntimeError("Aufnahme konnte nicht gestartet werden")
+        trace.mark("stream_open")
+
+        microphone.finished.wait(timeout=len(samples) / config.SAMPLE_RATE / speed + 10)
+        trace.mark("release")
+
+        in_memory = service.can_transcribe_in_memory()
+        if in_memory:
+            pcm = recorder.stop_recording_in_memory()
+        else:
+            wav_path = recorder.stop_recording()
+        trace.mark("stop")
+        if "vad" in recorder.last_timings:
+            trace.add_span("vad", recorder.last_timings["vad"])
+        if "encoder_flush" in recorder.last_timings:
+            trace.add_span("encode", recorder.last_timings["encoder_flush"])
+
+        duration = recorder.last_recording_duration
+        trace.set("audio_seconds", round(duration, 2))
+        if duration < 0.3:
+            outcome = "too_short"
+            return trace.finish(outcome)
+
+        if in_memory:
+            with trace.span("transcribe"):
+                raw_text = service.transcribe_pcm(pcm)
+        elif not config.USE_LOCAL_TRANSCRIPTION and service.should_chunk_audio(duration):
+            with trace.span("transcribe"):
+                raw_text = service.transcribe_pcm(read_wav_float32(wav_path))
+        else:
+            with trace.span("encode"):
+                audio_data, filename = encode_upload(recorder, service, wav_path, upload_format, duration)
+            with trace.span("transcribe"):
+                raw_text = service.transcribe_audio_data(audio_data, filename, audio_duration=duration)
+            trace.set("upload_format", filename.rsplit(".", 1)[-1])
+            trace.set("upload_bytes", len(audio_data))
+        trace.set("backend", service.last_backend)
+
+        if not raw_text:
+            outcome = "no_text"
+        else:
+            if text_processor:
+                with trace.span("correction"):
+                    text_processor.process_text(raw_text)
+            outcome = "ok"
+    finally:
+        recorder.remove_frame_listener(first_frame)
+        if wav_path and os.path.exists(wav_path):
+            os.remove(wav_path)
+        trace.set("cpu_seconds", round(time.process_time() - cpu_start, 4))
+
+    return trace.finish(outcome)
+
+
+def peak_rss_mb() -> Optional[float]:
+    """Maximaler Arbeitsspeicher des Prozesses (resource unter Unix, psutil unter Windows)"""
+    try:
+        import resource
+
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+    except ImportError:
+        pass
+    try:
+        import psutil
+
+        return round(psutil.Process().memory_info().peak_wset / (1024 * 1024), 1)
+    except Exception:
+        return None
+
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except Exception:
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="End-to-End-Latenz der Diktier-Pipeline")
+    parser.add_argument("wav", nargs="*", help="16-bit Mono-WAVs (Standard: synthetisches Signal)")
+    parser.add_argument("--seconds", type=float, default=5.0, help="Länge des synthetischen Signals")
+    parser.add_argument("--runs", type=int, default=10, help="Gemessene Durchläufe pro Eingabe")
+    parser.add_argument("--warmup", type=int, default=1, help="Nicht gewertete Durchläufe vorab")
+    parser.add_argument("--speed", type=float, default=1.0,
+                        help="Abspielgeschwindigkeit des Fake-Mikrofons (1 = Echtzeit)")
+    parser.add_argument("--latency", type=float, default=0.3, help="Verarbeitungszeit Transkription (s)")
+    parser.add_argument("--chat-latency", type=float, default=0.5, help="Verarbeitungszeit GPT-Korrektur (s)")
+    parser.add_argument("--jitter", type=float, default=0.1, help="Jitter +/- der Server-Latenz (s)")
+    parser.add_argument("--bandwidth", type=float, default=None, help="Simulierte Upload-Bandbreite in KB/s")
+    parser.add_argument("--format", default=None, help="Upload-Format (Standard: AUDIO_COMPRESSION_FORMAT)")
+    parser.add_argument("--local", action="store_true", help="Lokales Whisper-Modell statt API")
+    parser.add_argument("--model", default="tiny", help="Modellgröße für --local")
+    parser.add_argument("--preroll", action="store_true", help="Eingangs-Stream offen halten (Pre-Roll)")
+    parser.add_argument("--no-correction", action="store_true", help="GPT-Korrektur überspringen")
+    parser.add_argument("--seed", type=int, default=0, help="Startwert für den Jitter")
+    parser.add_argument("--output", type=Path, help="JSON-Bericht (Standard: stdout)")
+    parser.add_argument("--verbose", action="store_true", help="Logs der Anwendung anzeigen")
+    args = parser.parse_args()
+
+    logging.getLogger().setLevel(logging.INFO if args.verbose else logging.WARNING)
+
+    if args.local and importlib.util.find_spec("faster_whisper") is None:
+        raise SystemExit("--local benötigt faster-whisper (pip install faster-whisper)")
+
+    microphone.speed = args.speed
+    inputs = load_inputs(args.wav, args.seconds)
+
+    server = FakeOpenAIServer(transcription_latency=args.latency, chat_latency=args.chat_latency,
+                              jitter=args.jitter, seed=args.seed,
+                              upload_bytes_per_second=args.bandwidth * 1024 if args.bandwidth else None)
+    server.start()
+
+    # Anwendung auf den Fake-Server umlenken; Cache aus, sonst wäre ab dem zweiten Lauf alles ein Treffer
+    config.OPENAI_BASE_URL = server.base_url
+    config.OPENAI_API_KEY = "sk-benchmark"
+    config.TRANSCRIPT_CACHE_ENABLED = False
+    config.USE_LOCAL_TRANSCRIPTION = args.local
+    config.WHISPER_MODEL_SIZE = args.model
+    if args.format:
+        config.AUDIO_COMPRESSION_FORMAT = args.format
+
+    recorder = AudioRecorder()
+    service = TranscriptionService()
+    text_processor = None if args.no_correction else TextProcessor()
+    if args.preroll:
+        recorder.start_monitoring()
+
+    runs = []
+    with tempfile.TemporaryDirectory() as temp_dir:
+        tracker = LatencyTracker(history=max(1, args.runs) * len(inputs), trace_file=Path(temp_dir) / "traces.jsonl")
+        wall_start = time.perf_counter()
+        cpu_start = time.process_time()
+
+        for name, samples in inputs:
+            for index in range(args.warmup + args.runs):
+                record = run_session(recorder, service, text_processor, tracker, samples, args.speed)
+                if index >= args.warmup:
+                    record.update({"input": name, "run": index - args.warmup})
+                    runs.append(record)
+                print(f"{name} #{index + 1}: {record['outcome']}, "
+                      f"Release bis Ergebnis {record.get('release_to_inject', 0):.0f} ms", file=sys.stderr)
+
+        wall_seconds = time.perf_counter() - wall_start
+        cpu_seconds = time.process_time() - cpu_start
+
+    recorder.cleanup()
+    service.shutdown()
+    server.stop()
+
+    cpu_per_run = [record["cpu_seconds"] for record in runs]
+    report = {
+        "benchmark": "pipeline",
+        "timestamp": round(time.time(), 3),
+        "git_commit": git_commit(),
+        "environment": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+        },
+        "parameters": {
+            **{key: (str(value) if isinstance(value, Path) else value) for key, value in vars(args).items()},
+            "configured_format": config.AUDIO_COMPRESSION_FORMAT,
+            "compression": config.AUDIO_COMPRESSION_ENABLED,
+            "vad_trim": config.VAD_TRIM_ENABLED,
+            "streaming_encoder": config.STREAMING_ENCODER_ENABLED,
+            "callback_capture": recorder.use_callback_capture,
+        },
+        "server_requests": server.requests,
+        "summary_ms": summarize(runs),
+        "outcomes": {outcome: sum(1 for r in runs if r["outcome"] == outcome)
+                     for outcome in sorted({r["outcome"] for r in runs})},
+        "cpu_seconds": {
+            "total": round(cpu_seconds, 3),
+            "per_run_median": round(statistics.median(cpu_per_run), 4) if cpu_per_run else None,
+        },
+        "wall_seconds": round(wall_seconds, 3),
+        "peak_rss_mb": peak_rss_mb(),
+        "runs": runs,
+    }
+
+    text = json.dumps(report, indent=2, ensure_ascii=False, default=str)
+    if args.output:
+        args.output.write_text(text + "\n", encoding="utf-8")
+        print(f"Bericht gespeichert: {args.output}", file=sys.stderr)
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,13 +1,58 @@
 """
 Entry point für direkte Modul-Ausführung: python -m src
+Unterbefehle ohne GUI:
+    python -m src stats [--last N] [--json]
+    python -m src batch <Dateien/Verzeichnisse/Globs> [--output ergebnis.jsonl] [--resume]
+    python -m src watch <Verzeichnis> [--workers N] [--poll]
+    python -m src serve [--port N | --socket PFAD] [--local | --api]
+    python -m src captions [--port N] [--model GRÖSSE]
 """
 
-try:
-    # Versuche relative Imports (für python -m src)
-    from .main import main
-except ImportError:
-    # Fallback für direkte Ausführung oder PyInstaller
-    from main import main
+import sys
+
+COMMANDS = ("stats", "batch", "watch", "serve", "captions")
+
+
+def run_command(argv) -> int:
+    """Führt einen Unterbefehl aus (ohne Tray, Hotkeys und Audio zu laden)"""
+    if argv[0] == "batch":
+        try:
+            from .batch import cli
+        except ImportError:
+            from batch import cli
+    elif argv[0] == "watch":
+        try:
+            from .watch_daemon import cli
+        except ImportError:
+            from watch_daemon import cli
+    elif argv[0] == "serve":
+        try:
+            from .transcription_server import cli
+        except ImportError:
+            from transcription_server import cli
+    elif argv[0] == "captions":
+        try:
+            from .live_captions import cli
+        except ImportError:
+            from live_captions import cli
+    else:
+        try:
+            from .latency_trace import cli
+        except ImportError:
+            from latency_trace import cli
+
+    return cli(argv[1:])
+
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    if len(sys.argv) > 1 and sys.argv[1] in COMMANDS:
+        sys.exit(run_command(sys.argv[1:]))
+
+    try:
+        # Versuche relative Imports (für python -m src)
+        from .main import main
+    except ImportError:
+        # Fallback für direkte Ausführung oder PyInstaller
+        from main import main
+
+    main()
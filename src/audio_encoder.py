@@ -0,0 +1,137 @@
+"""
+Audio Encoder - In-Process-Kodierung ohne ffmpeg-Subprozess
+FLAC und Ogg/Opus werden über soundfile (libsndfile) direkt aus dem
+PCM-Puffer im Speicher kodiert - auf Wunsch schon während der Aufnahme.
+pydub startet dagegen pro Aufnahme einen ffmpeg-Prozess und liest die
+WAV-Datei erneut von der Platte.
+"""
+
+import io
+import logging
+import queue
+import threading
+from typing import Optional, Union
+
+from src.audio_utils import NUMPY_AVAILABLE
+
+if NUMPY_AVAILABLE:
+    import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Optional: soundfile für FLAC/Opus im Prozess (pip install soundfile)
+SOUNDFILE_AVAILABLE = False
+try:
+    import soundfile as sf
+
+    SOUNDFILE_AVAILABLE = NUMPY_AVAILABLE
+except Exception as e:
+    logger.debug(f"soundfile nicht verfügbar ({e}) - Komprimierung nur über pydub/ffmpeg")
+
+# AUDIO_COMPRESSION_FORMAT -> (Container, Codec, Dateiendung für die API)
+NATIVE_FORMATS = {
+    'flac': ('FLAC', 'PCM_16', 'flac'),
+    'opus': ('OGG', 'OPUS', 'ogg'),
+    'ogg': ('OGG', 'VORBIS', 'ogg'),
+}
+
+
+def is_native_format(output_format: str) -> bool:
+    """Format kann im Prozess kodiert werden (soundfile installiert und Codec in libsndfile vorhanden)"""
+    entry = NATIVE_FORMATS.get((output_format or '').lower())
+    if not SOUNDFILE_AVAILABLE or entry is None:
+        return False
+    container, subtype, _ = entry
+    return sf.check_format(container, subtype)
+
+
+def file_extension(output_format: str) -> str:
+    """Dateiendung für den Upload (Whisper erkennt das Format am Dateinamen)"""
+    entry = NATIVE_FORMATS.get((output_format or '').lower())
+    return entry[2] if entry else output_format
+
+
+def encode_pcm(pcm: Union[bytes, "np.ndarray"], sample_rate: int, channels: int, output_format: str) -> bytes:
+    """Kodiert 16-bit PCM (bytes oder int16-Array) im Speicher als FLAC/Ogg"""
+    container, subtype, _ = NATIVE_FORMATS[output_format.lower()]
+
+    samples = pcm if isinstance(pcm, np.ndarray) else np.frombuffer(pcm, dtype=np.int16)
+    if channels > 1:
+        samples = samples.reshape(-1, channels)
+
+    buffer = io.BytesIO()
+    sf.write(buffer, samples, sample_rate, format=container, subtype=subtype)
+    return buffer.getvalue()
+
+
+def read_wav_int16(wav_path: str) -> "np.ndarray":
+    """Liest eine WAV-Datei als int16-Array (Kanäle verschachtelt)"""
+    samples, _ = sf.read(wav_path, dtype='int16')
+    return samples.reshape(-1)
+
+
+class StreamingEncoder:
+    """Kodiert Frames schon während der Aufnahme in einem Worker-Thread (begrenzte Queue).
+
+    Nach dem Stoppen bleibt nur das Leeren der Queue und das Schließen des Containers.
+    """
+
+    def __init__(self, sample_rate: int, channels: int, output_format: str, queue_size: int = 256):
+        container, subtype, _ = NATIVE_FORMATS[output_format.lower()]
+        self.output_format = output_format
+        self.channels = channels
+        self.samples_written = 0
+        self.overflowed = False
+        self.error: Optional[Exception] = None
+
+        self._queue: "queue.Queue[Optional[bytes]]" = queue.Queue(maxsize=queue_size)
+        self._buffer = io.BytesIO()
+        self._file = sf.SoundFile(self._buffer, mode='w', samplerate=sample_rate, channels=channels,
+                                  format=container, subtype=subtype)
+        self._thread = threading.Thread(target=self._run, name="StreamingEncoder", daemon=True)
+        self._thread.start()
+
+    def feed(self, data: bytes):
+        """Nimmt einen Frame entgegen - blockiert nie (läuft im Audio-Callback)"""
+        if self.overflowed:
+            return
+        try:
+            self._queue.put_nowait(data)
+        except queue.Full:
+            # Encoder kommt nicht hinterher - Ergebnis verwerfen statt die Aufnahme zu bremsen
+            self.overflowed = True
+            logger.warning("Encoder-Queue voll - Audio wird nach der Aufnahme kodiert")
+
+    def _run(self):
+        while True:
+            data = self._queue.get()
+            if data is None:
+                break
+            if self.overflowed or self.error is not None:
+                continue
+            try:
+                samples = np.frombuffer(data, dtype=np.int16)
+                self._file.write(samples.reshape(-1, self.channels) if self.channels > 1 else samples)
+                self.samples_written += len(samples)
+            except Exception as e:
+                self.error = e
+
+    def finish(self, timeout: Optional[float] = None) -> Optional[bytes]:
+        """Kodiert den Rest der Queue und liefert die Bytes (None bei Überlauf oder Fehler)"""
+        self._queue.put(None)
+        self._thread.join(timeout)
+        if self._thread.is_alive():
+            logger.warning("Inkrementeller Encoder nicht rechtzeitig fertig - verworfen")
+            return None
+
+        try:
+            self._file.close()
+        except Exception as e:
+            self.error = self.error or e
+
+        if self.error is not None:
+            logger.warning(f"Inkrementelle Kodierung fehlgeschlagen: {self.error}")
+            return None
+        if self.overflowed:
+            return None
+        return self._buffer.getvalue()
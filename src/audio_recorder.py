@@ -9,11 +9,18 @@ import threading
 import time
 import wave
 from pathlib import Path
-from typing import Optional
+from typing import Dict, Optional
 
 import pyaudio
 
+from src.audio_encoder import StreamingEncoder, encode_pcm, is_native_format, read_wav_int16
+from src.audio_utils import NUMPY_AVAILABLE, pcm16_to_float32
 from src.config import config
+from src.ring_buffer import PcmRingBuffer
+from src.vad import has_speech, trim_silence
+
+if NUMPY_AVAILABLE:
+    import numpy as np
 
 # Optional: pydub für Audio-Komprimierung
 PYDUB_AVAILABLE = False
@@ -41,6 +48,25 @@ class AudioRecorder:
         self.recording_thread: Optional[threading.Thread] = None
         self.temp_file: Optional[Path] = None
         self.last_recording_duration = 0.0  # Dauer der letzten Aufnahme in Sekunden
+        self._frame_listeners = []  # Callbacks, die jeden Frame während der Aufnahme erhalten
+
+        # Callback-Aufnahme in vorallokierten Ringpuffer (ohne numpy: Polling-Loop mit Frame-Liste)
+        self.use_callback_capture = NUMPY_AVAILABLE and config.AUDIO_CALLBACK_CAPTURE
+        self._ring_buffer: Optional[PcmRingBuffer] = None
+        self._max_samples = 0
+        self._trimmed_pcm: Optional["np.ndarray"] = None  # Aufnahme nach VAD (None = ungekürzt)
+        self.last_timings: Dict[str, float] = {}  # Dauer der Schritte nach dem Stoppen (Sekunden)
+
+        # Inkrementelle Kodierung während der Aufnahme
+        self.upload_format: Optional[str] = None  # Vom Aufrufer gewähltes Format (sonst AUDIO_COMPRESSION_FORMAT)
+        self._stream_encoder: Optional[StreamingEncoder] = None
+        self._stream_encoded: Optional[bytes] = None
+        self._stream_encoded_format = ""
+
+        # Pre-Roll: Stream bleibt dauerhaft offen und puffert die letzten AUDIO_PREROLL_MS
+        self._monitoring = False
+        self._preroll: Optional[PcmRingBuffer] = None
+        self._capture_lock = threading.Lock()
 
         self._init_audio()
 
@@ -70,53 +96,126 @@ class AudioRecorder:
             logger.warning("Aufnahme läuft bereits")
             return None
 
+        self._start_stream_encoder()
+
+        if self._monitoring and self.stream is not None and self.stream.is_active():
+            return self._start_from_preroll()
+
         try:
             # Stelle sicher, dass vorheriger Stream geschlossen ist
             self._cleanup_stream()
 
-            # Stream öffnen
-            # Input Device auswählen
-            input_device_index = None
-            
-            # 1. Versuche über Namen zu finden (zuverlässiger bei USB-Geräten)
-            if config.AUDIO_DEVICE_NAME and config.AUDIO_DEVICE_NAME != "Standard (automatisch)":
-                input_device_index = self._get_device_index_by_name(config.AUDIO_DEVICE_NAME)
-                if input_device_index is not None:
-                     logger.info(f"Verwende Audio-Gerät nach Name: {config.AUDIO_DEVICE_NAME} (Index: {input_device_index})")
-            
-            # 2. Fallback auf Index (Legacy)
-            if input_device_index is None and config.AUDIO_DEVICE_INDEX >= 0:
-                input_device_index = config.AUDIO_DEVICE_INDEX
-                logger.info(f"Verwende Audio-Gerät nach Index: {input_device_index}")
-
-            self.stream = self.audio.open(  # type: ignore
-                format=pyaudio.paInt16,
-                channels=config.CHANNELS,
-                rate=config.SAMPLE_RATE,
-                input=True,
-                input_device_index=input_device_index,
-                frames_per_buffer=1024
-            )
-
             self.frames = []
+            if self.use_callback_capture:
+                self._prepare_ring_buffer()
+
             self.is_recording = True
 
             # Temporäre Datei vorbereiten
             self.temp_file = config.get_temp_dir() / f"recording_{int(time.time())}.wav"
 
-            # Aufnahme in separatem Thread starten
-            self.recording_thread = threading.Thread(target=self._record_audio)
-            self.recording_thread.daemon = True
-            self.recording_thread.start()
+            self.stream = self._open_stream(self._audio_callback if self.use_callback_capture else None)
+
+            if not self.use_callback_capture:
+                # Aufnahme in separatem Thread starten
+                self.recording_thread = threading.Thread(target=self._record_audio)
+                self.recording_thread.daemon = True
+                self.recording_thread.start()
 
             logger.info("Audio-Aufnahme gestartet")
             return str(self.temp_file)
 
         except Exception as e:
             logger.error(f"Fehler beim Starten der Aufnahme: {e}")
+            self.is_recording = False
             self._cleanup_stream()
+            self._finish_stream_encoder()
             return None
 
+    def _open_stream(self, stream_callback=None):
+        """Öffnet den Eingangs-Stream auf dem konfigurierten Gerät"""
+        # Input Device auswählen
+        input_device_index = None
+        
+        # 1. Versuche über Namen zu finden (zuverlässiger bei USB-Geräten)
+        if config.AUDIO_DEVICE_NAME and config.AUDIO_DEVICE_NAME != "Standard (automatisch)":
+            input_device_index = self._get_device_index_by_name(config.AUDIO_DEVICE_NAME)
+            if input_device_index is not None:
+                 logger.info(f"Verwende Audio-Gerät nach Name: {config.AUDIO_DEVICE_NAME} (Index: {input_device_index})")
+        
+        # 2. Fallback auf Index (Legacy)
+        if input_device_index is None and config.AUDIO_DEVICE_INDEX >= 0:
+            input_device_index = config.AUDIO_DEVICE_INDEX
+            logger.info(f"Verwende Audio-Gerät nach Index: {input_device_index}")
+
+        return self.audio.open(  # type: ignore
+            format=pyaudio.paInt16,
+            channels=config.CHANNELS,
+            rate=config.SAMPLE_RATE,
+            input=True,
+            input_device_index=input_device_index,
+            frames_per_buffer=1024,
+            stream_callback=stream_callback
+        )
+
+    def start_monitoring(self) -> bool:
+        """Hält den Eingangs-Stream offen und puffert laufend die letzten AUDIO_PREROLL_MS (Pre-Roll).
+
+        Beim Start einer Aufnahme entfällt das Öffnen des Streams, und der gepufferte
+        Anfang wird vorangestellt, sodass die erste Silbe nicht abgeschnitten wird.
+        """
+        if self._monitoring:
+            return True
+        if not self.use_callback_capture:
+            logger.warning("Pre-Roll benötigt Callback-Aufnahme (numpy) - deaktiviert")
+            return False
+        if self.is_recording:
+            logger.warning("Pre-Roll kann nicht während einer Aufnahme gestartet werden")
+            return False
+
+        try:
+            self._cleanup_stream()
+            preroll_samples = int(config.AUDIO_PREROLL_MS * config.SAMPLE_RATE * config.CHANNELS / 1000)
+            self._preroll = PcmRingBuffer(max(1, preroll_samples))
+            self._monitoring = True
+            self.stream = self._open_stream(self._audio_callback)
+            logger.info(f"Pre-Roll aktiv ({config.AUDIO_PREROLL_MS} ms) - Eingangs-Stream bleibt geöffnet")
+            return True
+        except Exception as e:
+            logger.error(f"Fehler beim Starten des Pre-Roll-Streams: {e}")
+            self._monitoring = False
+            self._cleanup_stream()
+            return False
+
+    def stop_monitoring(self):
+        """Beendet den Pre-Roll-Modus und schließt den Stream (sofern keine Aufnahme läuft)"""
+        if not self._monitoring:
+            return
+        self._monitoring = False
+        if not self.is_recording:
+            self._cleanup_stream()
+        logger.info("Pre-Roll beendet")
+
+    def is_monitoring(self) -> bool:
+        return self._monitoring
+
+    def _start_from_preroll(self) -> str:
+        """Startet die Aufnahme auf dem offenen Stream und übernimmt den Pre-Roll-Puffer"""
+        self.frames = []
+        self.temp_file = config.get_temp_dir() / f"recording_{int(time.time())}.wav"
+
+        with self._capture_lock:
+            self._prepare_ring_buffer()
+            preroll = self._preroll.read_all().tobytes()  # type: ignore
+            self._preroll.clear()  # type: ignore
+            if preroll:
+                self._ring_buffer.write(preroll)  # type: ignore
+                self._notify_frame_listeners(preroll)
+            self.is_recording = True
+
+        logger.info(f"Audio-Aufnahme gestartet (Pre-Roll: {len(preroll) / 2 / (config.SAMPLE_RATE * config.CHANNELS) * 1000:.0f} ms)")
+        return str(self.temp_file)
+
     def stop_recording(self) -> Optional[str]:
         """Stoppt die Aufnahme und speichert die Datei"""
         if not self.is_recording:
@@ -124,22 +223,14 @@ class AudioRecorder:
             return None
 
         try:
-            self.is_recording = False
-
-            # Warte auf Thread-Ende
-            if self.recording_thread and self.recording_thread.is_alive():
-                self.recording_thread.join(timeout=1.0)
-
-            # Stream schließen
-            self._cleanup_stream()
+            self._finish_capture()
+            if not self._trim_silence():
+                return None
 
             # WAV-Datei speichern
-            if self.frames and self.temp_file:
+            if self._has_audio() and self.temp_file:
                 self._save_wav_file()
 
-                # Berechne Aufnahmedauer
-                self.last_recording_duration = len(self.frames) * 1024 / config.SAMPLE_RATE
-
                 logger.info(f"Audio gespeichert: {self.temp_file}")
                 return str(self.temp_file)
             else:
@@ -150,6 +241,195 @@ class AudioRecorder:
             logger.error(f"Fehler beim Stoppen der Aufnahme: {e}")
             return None
 
+    def stop_recording_in_memory(self) -> Optional["np.ndarray"]:
+        """Stoppt die Aufnahme und liefert float32-PCM direkt aus dem Speicher (ohne WAV-Datei)"""
+        if not self.is_recording:
+            logger.warning("Keine Aufnahme läuft")
+            return None
+
+        try:
+            self._finish_capture()
+            if not self._trim_silence():
+                return None
+
+            if not self._has_audio():
+                logger.error("Keine Audio-Frames aufgenommen")
+                return None
+
+            audio = pcm16_to_float32(self._captured_pcm())
+            logger.info(f"Aufnahme im Speicher übernommen ({len(audio)} Samples, "
+                        f"{self.last_recording_duration:.2f}s)")
+            return audio
+
+        except Exception as e:
+            logger.error(f"Fehler beim Stoppen der Aufnahme: {e}")
+            return None
+
+    def _finish_capture(self):
+        """Beendet Aufnahme-Thread und Stream und berechnet die Aufnahmedauer"""
+        self._trimmed_pcm = None
+        self.last_timings = {}
+        if self._monitoring:
+            # Stream bleibt offen; das Lock wartet auf einen laufenden Callback
+            with self._capture_lock:
+                self.is_recording = False
+        else:
+            self.is_recording = False
+
+            # Warte auf Thread-Ende (nur Polling-Modus; im Callback-Modus wartet stop_stream)
+            if self.recording_thread and self.recording_thread.is_alive():
+                self.recording_thread.join(timeout=1.0)
+
+            # Stream schließen
+            self._cleanup_stream()
+
+        # Nur der Rest der Encoder-Queue liegt noch auf dem kritischen Pfad
+        self._finish_stream_encoder()
+
+        # Berechne Aufnahmedauer
+        self.last_recording_duration = self._captured_sample_count() / (config.SAMPLE_RATE * config.CHANNELS)
+
+    def _start_stream_encoder(self):
+        """Startet die Kodierung parallel zur Aufnahme, sofern später komprimiert hochgeladen wird"""
+        # Encoder einer nie gestoppten Aufnahme (z.B. nach Maximaldauer) beenden
+        self._finish_stream_encoder()
+        self._stream_encoded = None
+        output_format = self.upload_format or config.AUDIO_COMPRESSION_FORMAT
+        if not (config.STREAMING_ENCODER_ENABLED and config.AUDIO_COMPRESSION_ENABLED
+                and not config.USE_LOCAL_TRANSCRIPTION and is_native_format(output_format)):
+            return
+
+        try:
+            self._stream_encoder = StreamingEncoder(config.SAMPLE_RATE, config.CHANNELS, output_format,
+                                                    queue_size=config.STREAMING_ENCODER_QUEUE_SIZE)
+            self.add_frame_listener(self._stream_encoder.feed)
+        except Exception as e:
+            logger.warning(f"Inkrementeller Encoder konnte nicht gestartet werden: {e}")
+            self._stream_encoder = None
+
+    def _finish_stream_encoder(self):
+        """Trennt den Encoder von der Aufnahme und übernimmt die kodierten Bytes"""
+        encoder = self._stream_encoder
+        if encoder is None:
+            return
+        self._stream_encoder = None
+        self.remove_frame_listener(encoder.feed)
+
+        start_time = time.time()
+        self._stream_encoded = encoder.finish(timeout=5.0)
+        self._stream_encoded_format = encoder.output_format
+        self.last_timings["encoder_flush"] = time.time() - start_time
+        if self._stream_encoded is not None:
+            logger.debug(f"Inkrementelle Kodierung abgeschlossen ({len(self._stream_encoded)} bytes, "
+                         f"Flush {(time.time() - start_time) * 1000:.0f} ms)")
+
+    def _take_stream_encoded(self, wav_path: str, output_format: str) -> Optional[bytes]:
+        """Liefert das während der Aufnahme kodierte Audio, falls es zur angefragten Datei passt"""
+        if self._stream_encoded is None or output_format != self._stream_encoded_format:
+            return None
+        if not self.temp_file or str(self.temp_file) != str(wav_path):
+            return None
+
+        # Hat die VAD gekürzt, passt das kodierte Audio nicht mehr zur Aufnahme - neu kodieren
+        if self._trimmed_pcm is not None:
+            return None
+
+        return self._stream_encoded
+
+    def _trim_silence(self) -> bool:
+        """VAD: verwirft reine Stille und entfernt (mit VAD_TRIM_ENABLED) Stille am Rand
+        und lange Pausen, bevor kodiert oder hochgeladen wird.
+
+        Gibt False zurück, wenn die Aufnahme nur Stille enthält (Dauer wird dann 0).
+        """
+        if not NUMPY_AVAILABLE or config.CHANNELS != 1:
+            return True
+        if not self._has_audio():
+            return True
+
+        start_time = time.time()
+        pcm = self._captured_pcm()
+        samples = pcm if isinstance(pcm, np.ndarray) else np.frombuffer(pcm, dtype=np.int16)
+        if not has_speech(samples, config.SAMPLE_RATE, config.VAD_SILENCE_THRESHOLD,
+                          config.VAD_MIN_SPEECH_SECONDS):
+            self.last_timings["vad"] = time.time() - start_time
+            logger.info(f"Keine Sprache erkannt ({self.last_recording_duration:.2f}s Stille) - verworfen")
+            self.last_recording_duration = 0.0
+            return False
+        if not config.VAD_TRIM_ENABLED:
+            self.last_timings["vad"] = time.time() - start_time
+            return True
+
+        trimmed = trim_silence(
+            samples, config.SAMPLE_RATE,
+            threshold=config.VAD_SILENCE_THRESHOLD,
+            padding_seconds=config.VAD_PADDING_SECONDS,
+            max_pause_seconds=config.VAD_MAX_PAUSE_SECONDS,
+            min_speech_seconds=config.VAD_MIN_SPEECH_SECONDS,
+            min_keep_seconds=config.VAD_MIN_KEEP_SECONDS
+        )
+        self.last_timings["vad"] = time.time() - start_time
+
+        if len(trimmed) == 0:
+            logger.info(f"Keine Sprache erkannt ({self.last_recording_duration:.2f}s Stille) - verworfen")
+            self.last_recording_duration = 0.0
+            return False
+
+        if len(trimmed) < len(samples):
+            self._trimmed_pcm = trimmed
+            self.last_recording_duration = len(trimmed) / config.SAMPLE_RATE
+            logger.debug(f"VAD: {len(samples) / config.SAMPLE_RATE:.2f}s -> "
+                         f"{self.last_recording_duration:.2f}s")
+        return True
+
+    def _prepare_ring_buffer(self):
+        """Legt den Ringpuffer einmalig an (neu nur bei geänderter Maximaldauer/Sample-Rate)"""
+        self._max_samples = int(config.MAX_RECORDING_DURATION * config.SAMPLE_RATE * config.CHANNELS)
+        if self._ring_buffer is None or self._ring_buffer.capacity != self._max_samples:
+            self._ring_buffer = PcmRingBuffer(self._max_samples)
+        else:
+            self._ring_buffer.clear()
+
+    def _audio_callback(self, in_data, frame_count, time_info, status):
+        """PyAudio-Callback: schreibt den Block in den Ringpuffer (läuft im PortAudio-Thread)"""
+        with self._capture_lock:
+            if not self.is_recording:
+                if not self._monitoring:
+                    return (None, pyaudio.paComplete)
+                # Zwischen den Aufnahmen nur die letzten Millisekunden vorhalten
+                self._preroll.write(in_data)  # type: ignore
+                return (None, pyaudio.paContinue)
+
+            self._ring_buffer.write(in_data)  # type: ignore
+            self._notify_frame_listeners(in_data)
+
+            if self._ring_buffer.total_written >= self._max_samples:  # type: ignore
+                logger.info(f"Maximale Aufnahmedauer ({config.MAX_RECORDING_DURATION}s) erreicht")
+                self.is_recording = False
+                # Im Pre-Roll-Modus läuft der Stream weiter
+                return (None, pyaudio.paContinue if self._monitoring else pyaudio.paComplete)
+
+        return (None, pyaudio.paContinue)
+
+    def _has_audio(self) -> bool:
+        return self._captured_sample_count() > 0
+
+    def _captured_sample_count(self) -> int:
+        """Anzahl aufgenommener Samples (alle Kanäle)"""
+        if self._trimmed_pcm is not None:
+            return len(self._trimmed_pcm)
+        if self.use_callback_capture and self._ring_buffer is not None:
+            return len(self._ring_buffer)
+        return sum(len(frame) for frame in self.frames) // 2
+
+    def _captured_pcm(self):
+        """Aufgenommenes 16-bit PCM: int16-Array aus dem Ringpuffer oder bytes aus der Frame-Liste"""
+        if self._trimmed_pcm is not None:
+            return self._trimmed_pcm
+        if self.use_callback_capture and self._ring_buffer is not None:
+            return self._ring_buffer.read_all()
+        return b''.join(self.frames)
+
     def record_audio(self) -> Optional[str]:
         """Führt komplette Audio-Aufnahme durch (start + stop)"""
         wav_path = self.start_recording()
@@ -180,6 +460,7 @@ class AudioRecorder:
                 try:
                     data = self.stream.read(1024, exception_on_overflow=False)  # type: ignore
                     self.frames.append(data)
+                    self._notify_frame_listeners(data)
                 except Exception as e:
                     logger.error(f"Fehler beim Lesen von Audio-Frame: {e}")
                     break
@@ -189,6 +470,24 @@ class AudioRecorder:
         finally:
             logger.info("Aufnahme-Thread beendet")
 
+    def add_frame_listener(self, callback):
+        """Registriert einen Callback, der jeden aufgenommenen Frame (bytes) erhält"""
+        if callback not in self._frame_listeners:
+            self._frame_listeners.append(callback)
+
+    def remove_frame_listener(self, callback):
+        """Entfernt einen zuvor registrierten Frame-Callback"""
+        if callback in self._frame_listeners:
+            self._frame_listeners.remove(callback)
+
+    def _notify_frame_listeners(self, data: bytes):
+        """Reicht einen Frame an alle Listener weiter (Fehler brechen die Aufnahme nicht ab)"""
+        for callback in list(self._frame_listeners):
+            try:
+                callback(data)
+            except Exception as e:
+                logger.warning(f"Fehler in Frame-Listener: {e}")
+
     def _save_wav_file(self):
         """Speichert die aufgezeichneten Frames als WAV-Datei"""
         try:
@@ -196,9 +495,9 @@ class AudioRecorder:
                 wf.setnchannels(config.CHANNELS)
                 wf.setsampwidth(self.audio.get_sample_size(pyaudio.paInt16))  # type: ignore
                 wf.setframerate(config.SAMPLE_RATE)
-                wf.writeframes(b''.join(self.frames))
+                wf.writeframes(self._captured_pcm())
 
-            logger.info(f"WAV-Datei gespeichert: {self.temp_file} ({len(self.frames)} Frames)")
+            logger.info(f"WAV-Datei gespeichert: {self.temp_file} ({self.last_recording_duration:.2f}s)")
 
         except Exception as e:
             logger.error(f"Fehler beim Speichern der WAV-Datei: {e}")
@@ -207,16 +506,28 @@ class AudioRecorder:
     def compress_audio(self, wav_path: str, output_format: Optional[str] = None,
                       bitrate: Optional[str] = None) -> bytes:
         """Komprimiert WAV-Datei in effizienteres Format"""
-        if not PYDUB_AVAILABLE:
-            logger.warning("pydub nicht verfügbar - verwende Original-WAV")
-            with open(wav_path, 'rb') as f:
-                return f.read()
-
         if output_format is None:
             output_format = config.AUDIO_COMPRESSION_FORMAT
         if bitrate is None:
             bitrate = config.AUDIO_COMPRESSION_BITRATE
 
+        # Bereits während der Aufnahme kodiert
+        compressed_data = self._take_stream_encoded(wav_path, output_format)
+        if compressed_data:
+            logger.info(f"Audio während der Aufnahme komprimiert ({output_format}): {len(compressed_data)} bytes")
+            return compressed_data
+
+        # FLAC/Opus im Prozess - kein ffmpeg-Subprozess
+        if is_native_format(output_format):
+            compressed_data = self._encode_native(wav_path, output_format)
+            if compressed_data:
+                return compressed_data
+
+        if not PYDUB_AVAILABLE:
+            logger.warning("pydub nicht verfügbar - verwende Original-WAV")
+            with open(wav_path, 'rb') as f:
+                return f.read()
+
         try:
             # Audio laden
             audio = AudioSegment.from_wav(wav_path)
@@ -240,6 +551,53 @@ class AudioRecorder:
             with open(wav_path, 'rb') as f:
                 return f.read()
 
+    def _encode_native(self, wav_path: str, output_format: str) -> Optional[bytes]:
+        """Kodiert direkt aus dem Aufnahmepuffer (bzw. der WAV-Datei, falls nicht die letzte Aufnahme)"""
+        start_time = time.time()
+        try:
+            if self.temp_file and str(self.temp_file) == str(wav_path) and self._has_audio():
+                pcm = self._captured_pcm()
+            else:
+                pcm = read_wav_int16(wav_path)
+
+            compressed_data = encode_pcm(pcm, config.SAMPLE_RATE, config.CHANNELS, output_format)
+
+            original_size = pcm.nbytes if isinstance(pcm, np.ndarray) else len(pcm)
+            logger.info(f"Audio komprimiert ({output_format}, im Prozess): {original_size} → "
+                        f"{len(compressed_data)} bytes in {(time.time() - start_time) * 1000:.0f} ms")
+            return compressed_data
+
+        except Exception as e:
+            logger.warning(f"In-Process-Kodierung ({output_format}) fehlgeschlagen: {e} - Fallback auf pydub")
+            return None
+
+    def warmup_encoder(self) -> bool:
+        """Lädt den Encoder vor, indem 100 ms Stille komprimiert werden"""
+        if not config.AUDIO_COMPRESSION_ENABLED:
+            return False
+
+        if is_native_format(config.AUDIO_COMPRESSION_FORMAT):
+            try:
+                encode_pcm(bytes(config.SAMPLE_RATE // 10 * 2 * config.CHANNELS), config.SAMPLE_RATE,
+                           config.CHANNELS, config.AUDIO_COMPRESSION_FORMAT)
+                return True
+            except Exception as e:
+                logger.debug(f"Encoder-Warm-up fehlgeschlagen: {e}")
+                return False
+
+        if not PYDUB_AVAILABLE:
+            return False
+
+        try:
+            buffer = io.BytesIO()
+            AudioSegment.silent(duration=100, frame_rate=config.SAMPLE_RATE).export(
+                buffer, format=config.AUDIO_COMPRESSION_FORMAT, bitrate=config.AUDIO_COMPRESSION_BITRATE
+            )
+            return True
+        except Exception as e:
+            logger.debug(f"Encoder-Warm-up fehlgeschlagen: {e}")
+            return False
+
     def record_and_compress(self) -> Optional[bytes]:
         """Vollständiger Workflow: Aufnahme + Komprimierung (wartet auf Hotkey-Release)"""
         if not config.AUDIO_COMPRESSION_ENABLED:
@@ -268,7 +626,7 @@ class AudioRecorder:
                 return None
 
             # Prüfe Mindestdauer (0.5 Sekunden für zuverlässige Transkription)
-            audio_duration = len(self.frames) * 1024 / config.SAMPLE_RATE
+            audio_duration = self.last_recording_duration
             if audio_duration < 0.5:
                 logger.warning(f"Aufnahme zu kurz ({audio_duration:.2f}s) - mindestens 0.5s erforderlich")
                 # Cleanup
@@ -353,8 +711,10 @@ class AudioRecorder:
         if self.is_recording:
             self.stop_recording()
 
-        # Stream schließen
+        # Stream schließen (auch im Pre-Roll-Modus)
+        self._monitoring = False
         self._cleanup_stream()
+        self._finish_stream_encoder()
 
         # PyAudio schließen
         try:
@@ -0,0 +1,71 @@
+"""
+Audio Utilities - PCM-Hilfsfunktionen
+Konvertiert rohe 16-bit PCM-Daten in das Format, das faster-whisper direkt verarbeitet.
+"""
+
+import io
+import logging
+import wave
+from typing import Iterable, Union
+
+logger = logging.getLogger(__name__)
+
+# Optional: numpy (Teil der AI-Extras, wird für In-Memory-Audio benötigt)
+NUMPY_AVAILABLE = False
+try:
+    import numpy as np
+
+    NUMPY_AVAILABLE = True
+except ImportError:
+    np = None  # type: ignore
+    logger.debug("numpy nicht verfügbar - In-Memory-Audio deaktiviert")
+
+# Sample-Rate, mit der Whisper-Modelle arbeiten
+WHISPER_SAMPLE_RATE = 16000
+
+
+def pcm16_to_float32(data: Union[bytes, Iterable[bytes], "np.ndarray"]) -> "np.ndarray":
+    """Konvertiert 16-bit PCM (bytes, Frame-Liste oder int16-Array) zu float32 im Bereich [-1, 1]"""
+    if isinstance(data, np.ndarray):
+        samples = data
+    else:
+        if not isinstance(data, (bytes, bytearray, memoryview)):
+            data = b''.join(data)
+        samples = np.frombuffer(data, dtype=np.int16)
+    return samples.astype(np.float32) / 32768.0
+
+
+def rms_int16(data: bytes) -> float:
+    """Berechnet den RMS-Pegel eines 16-bit PCM-Blocks"""
+    samples = np.frombuffer(data, dtype=np.int16)
+    if samples.size == 0:
+        return 0.0
+    return float(np.sqrt(np.mean(samples.astype(np.float32) ** 2)))
+
+
+def float32_to_pcm16(audio: "np.ndarray") -> bytes:
+    """Konvertiert float32-Audio im Bereich [-1, 1] zurück zu 16-bit PCM"""
+    clipped = np.clip(audio, -1.0, 1.0)
+    return (clipped * 32767).astype(np.int16).tobytes()
+
+
+def pcm16_to_wav_bytes(pcm: bytes, sample_rate: int = WHISPER_SAMPLE_RATE, channels: int = 1) -> bytes:
+    """Verpackt 16-bit PCM als WAV im Speicher (ohne Temp-Datei)"""
+    buffer = io.BytesIO()
+    with wave.open(buffer, 'wb') as wf:
+        wf.setnchannels(channels)
+        wf.setsampwidth(2)
+        wf.setframerate(sample_rate)
+        wf.writeframes(pcm)
+    return buffer.getvalue()
+
+
+def is_whisper_compatible(sample_rate: int, channels: int) -> bool:
+    """Prüft, ob PCM ohne Resampling direkt an faster-whisper gegeben werden kann"""
+    return NUMPY_AVAILABLE and sample_rate == WHISPER_SAMPLE_RATE and channels == 1
+
+
+def read_wav_float32(path) -> "np.ndarray":
+    """Liest eine 16-bit WAV-Datei als float32-Array"""
+    with wave.open(str(path), 'rb') as wf:
+        return pcm16_to_float32(wf.readframes(wf.getnframes()))
@@ -0,0 +1,153 @@
+"""
+Backend Router - Adaptive Wahl zwischen lokaler und API-Transkription
+Misst pro Backend Latenz (pro Sekunde Audio), Fehlerquote und Verfügbarkeit
+in einem gleitenden Fenster und wählt pro Anfrage das voraussichtlich
+schnellste Backend. Deaktivierte Backends werden periodisch erneut geprüft.
+"""
+
+import logging
+import statistics
+import threading
+import time
+from collections import deque
+from typing import Dict, List, Optional
+
+from src.config import config
+
+logger = logging.getLogger(__name__)
+
+LOCAL = "local"
+API = "api"
+
+
+class BackendStats:
+    """Gleitendes Fenster der letzten Anfragen eines Backends"""
+
+    def __init__(self, window_size: int):
+        self.samples: deque = deque(maxlen=window_size)  # (erfolgreich, Latenz, Audio-Sekunden)
+        self.disabled_until = 0.0
+        self.disable_count = 0  # Aufeinanderfolgende Deaktivierungen (für Backoff)
+
+    def record(self, success: bool, latency: float = 0.0, audio_seconds: Optional[float] = None):
+        self.samples.append((success, latency, audio_seconds))
+
+    @property
+    def error_rate(self) -> float:
+        if not self.samples:
+            return 0.0
+        return sum(1 for success, _, _ in self.samples if not success) / len(self.samples)
+
+    def latencies(self) -> List[float]:
+        """Absolute Laufzeiten erfolgreicher Anfragen"""
+        return [latency for success, latency, _ in self.samples if success]
+
+    def seconds_per_audio_second(self) -> Optional[float]:
+        """Median der Laufzeit pro Sekunde Audio (None ohne Messwerte)"""
+        ratios = [latency / audio_seconds for success, latency, audio_seconds in self.samples
+                  if success and audio_seconds]
+        return statistics.median(ratios) if ratios else None
+
+
+class BackendRouter:
+    """Wählt das voraussichtlich schnellste verfügbare Backend pro Anfrage"""
+
+    def __init__(self, window_size: Optional[int] = None,
+                 reprobe_seconds: Optional[float] = None,
+                 max_error_rate: Optional[float] = None,
+                 min_samples: Optional[int] = None):
+        self.window_size = window_size if window_size is not None else config.ROUTER_WINDOW_SIZE
+        self.reprobe_seconds = reprobe_seconds if reprobe_seconds is not None else config.ROUTER_REPROBE_SECONDS
+        self.max_error_rate = max_error_rate if max_error_rate is not None else config.ROUTER_MAX_ERROR_RATE
+        self.min_samples = min_samples if min_samples is not None else config.ROUTER_MIN_SAMPLES
+
+        self._stats: Dict[str, BackendStats] = {
+            LOCAL: BackendStats(self.window_size),
+            API: BackendStats(self.window_size),
+        }
+        self._lock = threading.Lock()
+
+    def is_enabled(self, backend: str) -> bool:
+        """Backend ist aktiv oder seine Sperrzeit ist abgelaufen (erneute Probe erlaubt)"""
+        with self._lock:
+            return time.time() >= self._stats[backend].disabled_until
+
+    def record_success(self, backend: str, latency: float, audio_seconds: Optional[float] = None):
+        """Erfolgreiche Anfrage - ein zuvor deaktiviertes Backend ist wieder voll aktiv"""
+        with self._lock:
+            stats = self._stats[backend]
+            stats.record(True, latency, audio_seconds)
+            if stats.disable_count:
+                logger.info(f"Backend '{backend}' wieder verfügbar")
+            stats.disabled_until = 0.0
+            stats.disable_count = 0
+
+    def record_failure(self, backend: str):
+        """Fehlgeschlagene Anfrage - bei zu hoher Fehlerquote wird das Backend gesperrt"""
+        with self._lock:
+            stats = self._stats[backend]
+            stats.record(False)
+            if len(stats.samples) >= self.min_samples and stats.error_rate > self.max_error_rate:
+                self._disable_locked(backend, f"Fehlerquote {stats.error_rate:.0%}")
+
+    def mark_unavailable(self, backend: str, reason: str = "nicht verfügbar"):
+        """Sperrt ein Backend bis zur nächsten Probe (z.B. Modell konnte nicht geladen werden)"""
+        with self._lock:
+            self._disable_locked(backend, reason)
+
+    def _disable_locked(self, backend: str, reason: str):
+        stats = self._stats[backend]
+        if time.time() < stats.disabled_until:
+            return
+
+        # Wiederholte Fehlschläge verlängern die Sperre (max. 8x Grundintervall)
+        delay = self.reprobe_seconds * min(2 ** stats.disable_count, 8)
+        stats.disable_count += 1
+        stats.disabled_until = time.time() + delay
+        # Fehlerfenster zurücksetzen, damit die Probe nicht sofort wieder sperrt
+        stats.samples = deque((sample for sample in stats.samples if sample[0]), maxlen=self.window_size)
+        logger.warning(f"Backend '{backend}' deaktiviert ({reason}) - erneute Prüfung in {delay:.0f}s")
+
+    def expected_latency(self, backend: str, audio_seconds: Optional[float]) -> Optional[float]:
+        """Erwartete Laufzeit inkl. Aufschlag für Fehlversuche (None ohne ausreichende Messwerte)"""
+        with self._lock:
+            stats = self._stats[backend]
+            ratio = stats.seconds_per_audio_second()
+            if ratio is None or len(stats.latencies()) < self.min_samples:
+                return None
+            estimate = ratio * audio_seconds if audio_seconds else statistics.median(stats.latencies())
+            # Fehlgeschlagene Versuche kosten zusätzlich Zeit für den Fallback
+            return estimate / max(1.0 - stats.error_rate, 0.1)
+
+    def order(self, candidates: List[str], audio_seconds: Optional[float] = None) -> List[str]:
+        """Sortiert die Kandidaten nach erwarteter Laufzeit; gesperrte Backends nur als letzte Option.
+
+        Die Reihenfolge von candidates ist die Präferenz, solange Messwerte fehlen.
+        """
+        enabled = [backend for backend in candidates if self.is_enabled(backend)]
+        disabled = [backend for backend in candidates if backend not in enabled]
+
+        estimates = {backend: self.expected_latency(backend, audio_seconds) for backend in enabled}
+        if len(enabled) > 1 and all(estimate is not None for estimate in estimates.values()):
+            enabled.sort(key=lambda backend: estimates[backend])
+
+        return enabled + disabled
+
+    def latencies(self, backend: str) -> List[float]:
+        """Absolute Laufzeiten der letzten erfolgreichen Anfragen eines Backends"""
+        with self._lock:
+            return self._stats[backend].latencies()
+
+    def get_stats(self) -> dict:
+        """Statistik pro Backend für Logging und Tray"""
+        now = time.time()
+        with self._lock:
+            return {
+                backend: {
+                    "samples": len(stats.samples),
+                    "error_rate": stats.error_rate,
+                    "seconds_per_audio_second": stats.seconds_per_audio_second(),
+                    "enabled": now >= stats.disabled_until,
+                    "reprobe_in": max(0.0, stats.disabled_until - now),
+                }
+                for backend, stats in self._stats.items()
+            }
@@ -0,0 +1,277 @@
+"""
+Batch-Transkription ohne GUI: python -m src batch
+Transkribiert Verzeichnisse oder Glob-Muster von Audio-Dateien, etwa um
+Besprechungsaufnahmen auf einem Linux-Build-Server nachzuerfassen.
+Lokal arbeitet ein Prozess-Pool, in dem jeder Prozess ein eigenes
+Whisper-Modell hält; über die API läuft eine begrenzte Zahl paralleler
+Anfragen. Ergebnisse werden zeilenweise als JSONL geschrieben; mit --resume
+werden bereits erfolgreich transkribierte Dateien übersprungen.
+"""
+
+import argparse
+import contextlib
+import glob
+import json
+import logging
+import os
+import sys
+import time
+import wave
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Set, TextIO
+
+from src.config import config
+
+logger = logging.getLogger(__name__)
+
+AUDIO_EXTENSIONS = ('.wav', '.mp3', '.m4a', '.flac', '.ogg', '.opus', '.webm', '.mp4')
+
+# Lokales Modell pro Worker-Prozess (wird im Initializer geladen)
+_worker_service = None
+
+
+def collect_files(patterns: Iterable[str], extensions: Iterable[str] = AUDIO_EXTENSIONS) -> List[Path]:
+    """Verzeichnisse (rekursiv), Glob-Muster und einzelne Dateien - sortiert und ohne Duplikate"""
+    extensions = tuple(ext.lower() for ext in extensions)
+    files: Dict[str, Path] = {}
+    for pattern in patterns:
+        path = Path(pattern)
+        if path.is_dir():
+            candidates = (p for p in path.rglob('*') if p.suffix.lower() in extensions)
+        elif path.is_file():
+            candidates = [path]
+        else:
+            candidates = (Path(p) for p in glob.glob(pattern, recursive=True)
+                          if Path(p).is_file() and Path(p).suffix.lower() in extensions)
+        for candidate in candidates:
+            files.setdefault(str(candidate.resolve()), candidate.resolve())
+    return [files[key] for key in sorted(files)]
+
+
+def load_completed(output: Path) -> Set[str]:
+    """Pfade, die laut bestehender JSONL-Datei schon erfolgreich transkribiert wurden (gleiche Größe)"""
+    completed = set()
+    try:
+        with open(output, encoding='utf-8') as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    continue
+                if entry.get("status") == "ok":
+                    completed.add(f"{entry.get('path')}|{entry.get('size')}")
+    except OSError:
+        pass
+    return completed
+
+
+def _resume_key(path: Path) -> str:
+    return f"{path}|{path.stat().st_size}"
+
+
+def audio_seconds(path: Path) -> Optional[float]:
+    """Dauer der Datei (soundfile für alle Formate, sonst nur WAV)"""
+    try:
+        from src.audio_encoder import SOUNDFILE_AVAILABLE
+
+        if SOUNDFILE_AVAILABLE:
+            import soundfile as sf
+
+            return round(sf.info(str(path)).duration, 2)
+    except Exception:
+        pass
+    try:
+        with wave.open(str(path), 'rb') as wf:
+            return round(wf.getnframes() / wf.getframerate(), 2)
+    except Exception:
+        return None
+
+
+def _init_local_worker(model_size: str, cpu_threads: int):
+    """Initializer der Worker-Prozesse: Threads begrenzen und ein eigenes Modell laden"""
+    global _worker_service
+
+    # model_threading() gibt LOCAL_CPU_THREADS an WhisperModel weiter - sonst konkurrieren N Prozesse um alle Kerne
+    config.LOCAL_CPU_THREADS = cpu_threads
+    config.USE_LOCAL_TRANSCRIPTION = True
+    config.WHISPER_MODEL_SIZE = model_size
+
+    from src.local_transcription import LocalTranscriptionService
+
+    _worker_service = LocalTranscriptionService()
+
+
+def _transcribe_local(path: str) -> dict:
+    """Läuft im Worker-Prozess"""
+    start_time = time.time()
+    text = _worker_service.transcribe(path) if _worker_service else None
+    return {"text": text, "seconds": round(time.time() - start_time, 3), "backend": "local"}
+
+
+def transcribe_file(service, path: str, duration: Optional[float]) -> Optional[str]:
+    """Transkribiert eine Datei mit dem TranscriptionService (lange WAVs in Chunks)"""
+    if (duration and not config.USE_LOCAL_TRANSCRIPTION and Path(path).suffix.lower() == '.wav'
+            and service.should_chunk_audio(duration) and _is_pipeline_wav(path)):
+        # Lange Besprechungen: parallele Chunks statt eines zu großen Uploads
+        from src.audio_utils import read_wav_float32
+
+        return service.transcribe_pcm(read_wav_float32(path))
+    return service.transcribe(path)
+
+
+def _transcribe_api(service, path: str, duration: Optional[float]) -> dict:
+    """Läuft in einem Thread des begrenzten API-Pools"""
+    start_time = time.time()
+    text = transcribe_file(service, path, duration)
+    return {"text": text, "seconds": round(time.time() - start_time, 3), "backend": "api"}
+
+
+def _is_pipeline_wav(path: str) -> bool:
+    """16-bit Mono-WAV mit der Sample-Rate der Pipeline (Voraussetzung für die Chunk-Transkription)"""
+    try:
+        with wave.open(path, 'rb') as wf:
+            return (wf.getnchannels() == 1 and wf.getsampwidth() == 2
+                    and wf.getframerate() == config.SAMPLE_RATE)
+    except Exception:
+        return False
+
+
+class BatchRunner:
+    """Verteilt Dateien auf Worker und schreibt Ergebnisse in der Reihenfolge ihrer Fertigstellung"""
+
+    def __init__(self, local: bool, workers: int, model_size: str, output: TextIO, progress: TextIO = sys.stderr):
+        self.local = local
+        self.workers = max(1, workers)
+        self.model_size = model_size
+        self.output = output
+        self.progress = progress
+        self.stats = {"ok": 0, "empty": 0, "error": 0, "audio_seconds": 0.0}
+
+    def _create_executor(self):
+        if self.local:
+            cpu_threads = max(1, (os.cpu_count() or 1) // self.workers)
+            return ProcessPoolExecutor(max_workers=self.workers, initializer=_init_local_worker,
+                                       initargs=(self.model_size, cpu_threads))
+        return ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="BatchApi")
+
+    def run(self, files: List[Path]) -> dict:
+        start_time = time.time()
+        service = None
+        if not self.local:
+            from src.transcription import TranscriptionService
+
+            config.USE_LOCAL_TRANSCRIPTION = False
+            service = TranscriptionService()
+
+        durations = {str(path): audio_seconds(path) for path in files}
+        with self._create_executor() as executor:
+            futures: Dict[Future, Path] = {}
+            for path in files:
+                if self.local:
+                    future = executor.submit(_transcribe_local, str(path))
+                else:
+                    future = executor.submit(_transcribe_api, service, str(path), durations[str(path)])
+                futures[future] = path
+
+            for done, future in enumerate(as_completed(futures), start=1):
+                path = futures[future]
+                self._write_result(path, durations[str(path)], future)
+                self._report_progress(done, len(files), path, start_time)
+
+        if service:
+            service.shutdown()
+        return self.summary(time.time() - start_time)
+
+    def _write_result(self, path: Path, duration: Optional[float], future: Future):
+        entry = {"path": str(path), "size": path.stat().st_size, "audio_seconds": duration}
+        try:
+            result = future.result()
+            entry.update(result)
+            entry["status"] = "ok" if result.get("text") else "empty"
+        except Exception as e:
+            entry.update({"status": "error", "error": f"{e.__class__.__name__}: {e}"})
+
+        self.stats[entry["status"]] += 1
+        if entry["status"] == "ok" and duration:
+            self.stats["audio_seconds"] += duration
+        self.output.write(json.dumps(entry, ensure_ascii=False) + "\n")
+        self.output.flush()
+
+    def _report_progress(self, done: int, total: int, path: Path, start_time: float):
+        elapsed = time.time() - start_time
+        remaining = elapsed / done * (total - done)
+        print(f"[{done}/{total}] {path.name} - {elapsed:.0f}s, noch ~{remaining:.0f}s", file=self.progress)
+
+    def summary(self, wall_seconds: float) -> dict:
+        files = self.stats["ok"] + self.stats["empty"] + self.stats["error"]
+        audio = self.stats["audio_seconds"]
+        return {
+            **self.stats,
+            "audio_seconds": round(audio, 1),
+            "files": files,
+            "wall_seconds": round(wall_seconds, 1),
+            "files_per_minute": round(files / wall_seconds * 60, 1) if wall_seconds > 0 else None,
+            # Audiosekunden pro Sekunde Laufzeit (> 1 = schneller als Echtzeit)
+            "realtime_factor": round(audio / wall_seconds, 2) if wall_seconds > 0 else None,
+        }
+
+
+def cli(argv: Optional[List[str]] = None) -> int:
+    """python -m src batch - transkribiert Dateien ohne Tray-Anwendung"""
+    parser = argparse.ArgumentParser(prog="python -m src batch",
+                                     description="Transkribiert Audio-Dateien im Stapel (JSONL-Ausgabe)")
+    parser.add_argument('paths', nargs='+', help='Dateien, Verzeichnisse oder Glob-Muster ("meetings/**/*.m4a")')
+    parser.add_argument('--output', '-o', type=Path, help='JSONL-Datei (Standard: stdout)')
+    parser.add_argument('--resume', action='store_true', help='Erfolgreich transkribierte Dateien überspringen')
+    backend = parser.add_mutually_exclusive_group()
+    backend.add_argument('--local', dest='local', action='store_true', default=None,
+                         help='Lokales Whisper-Modell (Standard: USE_LOCAL_TRANSCRIPTION)')
+    backend.add_argument('--api', dest='local', action='store_false', help='OpenAI-API')
+    parser.add_argument('--workers', '-j', type=int, default=None,
+                        help='Worker-Prozesse (lokal) bzw. parallele API-Anfragen')
+    parser.add_argument('--model', default=None, help='Modellgröße (Standard: WHISPER_MODEL_SIZE)')
+    parser.add_argument('--download', action='store_true', help='Fehlendes Modell vorher herunterladen')
+    args = parser.parse_args(argv)
+
+    local = config.USE_LOCAL_TRANSCRIPTION if args.local is None else args.local
+    model_size = args.model or config.WHISPER_MODEL_SIZE
+    workers = args.workers or (max(1, (os.cpu_count() or 2) // 2) if local else 4)
+
+    if args.resume and not args.output:
+        parser.error("--resume benötigt --output")
+
+    files = collect_files(args.paths)
+    if args.resume:
+        completed = load_completed(args.output)
+        skipped = [path for path in files if _resume_key(path) in completed]
+        files = [path for path in files if _resume_key(path) not in completed]
+        if skipped:
+            print(f"{len(skipped)} Dateien bereits transkribiert - übersprungen", file=sys.stderr)
+
+    if not files:
+        print("Keine Audio-Dateien zu transkribieren", file=sys.stderr)
+        return 0
+
+    if local:
+        from src.model_manager import download_whisper_model, get_model_path
+
+        if not get_model_path(model_size) and not (args.download and download_whisper_model(model_size)):
+            print(f"Whisper-Modell '{model_size}' nicht gefunden (--download lädt es herunter)", file=sys.stderr)
+            return 2
+    elif not config.OPENAI_API_KEY:
+        print("OPENAI_API_KEY fehlt für die API-Transkription", file=sys.stderr)
+        return 2
+
+    mode = f"lokal ({model_size}, {workers} Prozesse)" if local else f"API ({workers} parallele Anfragen)"
+    print(f"Transkribiere {len(files)} Dateien - {mode}", file=sys.stderr)
+
+    with contextlib.ExitStack() as stack:
+        output = stack.enter_context(open(args.output, 'a', encoding='utf-8')) if args.output else sys.stdout
+        summary = BatchRunner(local, workers, model_size, output).run(files)
+
+    print(f"Fertig: {summary['ok']} ok, {summary['empty']} leer, {summary['error']} Fehler in "
+          f"{summary['wall_seconds']:.0f}s ({summary['files_per_minute']} Dateien/min, "
+          f"{summary['audio_seconds'] / 3600:.2f} h Audio, Echtzeitfaktor {summary['realtime_factor']})",
+          file=sys.stderr)
+    return 1 if summary["error"] else 0
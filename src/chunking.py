@@ -0,0 +1,50 @@
+"""
+Chunking - Aufteilen langer Aufnahmen und Zusammenfügen der Teil-Transkripte
+Lange Aufnahmen werden an Pausen in überlappende Chunks geteilt, parallel
+transkribiert und anschließend ohne doppelte Wörter zusammengesetzt.
+"""
+
+import re
+from typing import List, Tuple
+
+# Anzahl Wörter, die beim Zusammenfügen maximal als Überlappung geprüft werden
+MAX_OVERLAP_WORDS = 8
+
+
+def plan_chunks(total_samples: int, split_points: List[int], overlap_samples: int) -> List[Tuple[int, int]]:
+    """Erzeugt (start, ende) pro Chunk; jeder Chunk beginnt overlap_samples vor dem Schnittpunkt"""
+    boundaries = [0] + list(split_points) + [total_samples]
+    chunks = []
+    for index in range(len(boundaries) - 1):
+        start = boundaries[index]
+        if index > 0:
+            start = max(0, start - overlap_samples)
+        chunks.append((start, boundaries[index + 1]))
+    return chunks
+
+
+def _normalize(word: str) -> str:
+    return re.sub(r'[^\w]', '', word.lower())
+
+
+def stitch_transcripts(texts: List[str], max_overlap_words: int = MAX_OVERLAP_WORDS) -> str:
+    """Fügt Teil-Transkripte zusammen und entfernt Wörter, die durch die Überlappung doppelt sind"""
+    result: List[str] = []
+    for text in texts:
+        words = (text or "").split()
+        if not words:
+            continue
+
+        # Längste Übereinstimmung zwischen Ende des bisherigen Texts und Anfang des Chunks
+        overlap = 0
+        for size in range(min(max_overlap_words, len(result), len(words)), 0, -1):
+            tail = [_normalize(word) for word in result[-size:]]
+            head = [_normalize(word) for word in words[:size]]
+            if tail == head and any(tail):
+                overlap = size
+                break
+
+        result.extend(words[overlap:])
+
+    return " ".join(result)
+
@@ -103,6 +103,43 @@ class Config:
         self.AUDIO_COMPRESSION_ENABLED: bool = os.getenv('AUDIO_COMPRESSION_ENABLED', 'true').lower() == 'true'
         self.AUDIO_COMPRESSION_FORMAT: str = os.getenv('AUDIO_COMPRESSION_FORMAT', 'mp3')
         self.AUDIO_COMPRESSION_BITRATE: str = os.getenv('AUDIO_COMPRESSION_BITRATE', '64k')
+        # FLAC/Opus schon während der Aufnahme kodieren (benötigt soundfile)
+        self.STREAMING_ENCODER_ENABLED: bool = os.getenv('STREAMING_ENCODER_ENABLED', 'true').lower() == 'true'
+        self.STREAMING_ENCODER_QUEUE_SIZE: int = int(os.getenv('STREAMING_ENCODER_QUEUE_SIZE', '256'))  # Frames à 1024 Samples
+        # Upload-Format (WAV/FLAC/Opus) nach gemessenem Durchsatz und Kodierzeit wählen
+        self.UPLOAD_FORMAT_ADAPTIVE: bool = os.getenv('UPLOAD_FORMAT_ADAPTIVE', 'true').lower() == 'true'
+        self.UPLOAD_STATS_SMOOTHING: float = float(os.getenv('UPLOAD_STATS_SMOOTHING', '0.3'))
+
+        # Latenz-Trace pro Diktierung (JSONL im AppData-Verzeichnis, Perzentile im Tray-Menü)
+        self.LATENCY_TRACE_ENABLED: bool = os.getenv('LATENCY_TRACE_ENABLED', 'true').lower() == 'true'
+        self.LATENCY_TRACE_HISTORY: int = int(os.getenv('LATENCY_TRACE_HISTORY', '500'))
+
+        # Metrik-Export für das Monitoring (Prometheus-Textfile oder JSON im AppData-Verzeichnis)
+        self.METRICS_EXPORT_ENABLED: bool = os.getenv('METRICS_EXPORT_ENABLED', 'false').lower() == 'true'
+        self.METRICS_EXPORT_FORMAT: str = os.getenv('METRICS_EXPORT_FORMAT', 'prometheus')  # prometheus oder json
+        self.METRICS_EXPORT_INTERVAL: float = float(os.getenv('METRICS_EXPORT_INTERVAL', '15'))
+        self.METRICS_EXPORT_FILE: str = os.getenv('METRICS_EXPORT_FILE', '')  # leer = AppData/metrics.prom
+
+        # Watch-Folder-Daemon (python -m src watch)
+        self.WATCH_SETTLE_SECONDS: float = float(os.getenv('WATCH_SETTLE_SECONDS', '2.0'))  # Datei unverändert = fertig
+        self.WATCH_POLL_INTERVAL: float = float(os.getenv('WATCH_POLL_INTERVAL', '1.0'))
+        self.WATCH_WORKERS: int = int(os.getenv('WATCH_WORKERS', '2'))
+        self.WATCH_QUEUE_SIZE: int = int(os.getenv('WATCH_QUEUE_SIZE', '32'))
+
+        # Lokaler Transkriptions-Server (python -m src serve) - ein Modell für alle Tools
+        self.SERVER_HOST: str = os.getenv('SERVER_HOST', '127.0.0.1')
+        self.SERVER_PORT: int = int(os.getenv('SERVER_PORT', '8770'))
+        self.SERVER_SOCKET: str = os.getenv('SERVER_SOCKET', '')  # Unix-Socket statt TCP (nur Linux/macOS)
+        self.SERVER_QUEUE_SIZE: int = int(os.getenv('SERVER_QUEUE_SIZE', '16'))  # Darüber: HTTP 429
+        self.SERVER_WORKERS: int = int(os.getenv('SERVER_WORKERS', '0'))  # 0 = lokal nach LOCAL_INFERENCE_MODE, API 4
+        self.SERVER_MAX_UPLOAD_MB: float = float(os.getenv('SERVER_MAX_UPLOAD_MB', '25'))
+        self.SERVER_REQUEST_TIMEOUT: float = float(os.getenv('SERVER_REQUEST_TIMEOUT', '300'))
+
+        # Live-Untertitel per WebSocket (python -m src captions, benötigt websockets)
+        self.CAPTIONS_HOST: str = os.getenv('CAPTIONS_HOST', '127.0.0.1')
+        self.CAPTIONS_PORT: int = int(os.getenv('CAPTIONS_PORT', '8771'))
+        self.CAPTIONS_STEP_SECONDS: float = float(os.getenv('CAPTIONS_STEP_SECONDS', '1.0'))  # Abstand der Zwischenstände
+        self.CAPTIONS_MAX_WINDOW_SECONDS: float = float(os.getenv('CAPTIONS_MAX_WINDOW_SECONDS', '15.0'))
 
         # Audio Device (benutzerspezifisch konfigurierbar)
         self.AUDIO_DEVICE_INDEX: int = int(os.getenv('AUDIO_DEVICE_INDEX', '-1'))  # -1 = default
@@ -111,6 +148,94 @@ class Config:
         self.USE_LOCAL_TRANSCRIPTION: bool = user_config.get('transcription.use_local', False) if self.user_config_loaded else os.getenv('USE_LOCAL_TRANSCRIPTION', 'false').lower() == 'true'
         self.WHISPER_MODEL_SIZE: str = user_config.get('transcription.whisper_model_size', 'base') if self.user_config_loaded else os.getenv('WHISPER_MODEL_SIZE', 'base')
 
+        # Modell beim Start im Hintergrund laden und aufwärmen (erste Diktierung ohne Kaltstart)
+        self.WHISPER_PRELOAD: bool = os.getenv('WHISPER_PRELOAD', 'true').lower() == 'true'
+
+        # Aufnahme per PyAudio-Callback in vorallokierten Ringpuffer (benötigt numpy)
+        self.AUDIO_CALLBACK_CAPTURE: bool = os.getenv('AUDIO_CALLBACK_CAPTURE', 'true').lower() == 'true'
+
+        # Pre-Roll: Eingangs-Stream bleibt offen, die letzten Millisekunden vor dem Hotkey werden vorangestellt
+        self.AUDIO_PREROLL_ENABLED: bool = os.getenv('AUDIO_PREROLL_ENABLED', 'false').lower() == 'true'
+        self.AUDIO_PREROLL_MS: int = int(os.getenv('AUDIO_PREROLL_MS', '400'))
+
+        # Lokale Transkription in separatem Worker-Prozess (Modell bleibt resident, Abstürze isoliert)
+        self.LOCAL_TRANSCRIPTION_WORKER_PROCESS: bool = os.getenv('LOCAL_TRANSCRIPTION_WORKER_PROCESS', 'false').lower() == 'true'
+        self.WORKER_REQUEST_TIMEOUT: float = float(os.getenv('WORKER_REQUEST_TIMEOUT', '60'))
+        self.WORKER_STARTUP_TIMEOUT: float = float(os.getenv('WORKER_STARTUP_TIMEOUT', '120'))
+
+        # Scheduler vor dem lokalen Modell für gleichzeitige Anfragen (Server, Live-Untertitel, Threads)
+        # off = direkt, parallel = CTranslate2-Worker, batched = BatchedInferencePipeline
+        self.LOCAL_INFERENCE_MODE: str = os.getenv('LOCAL_INFERENCE_MODE', 'off').lower()
+        self.LOCAL_INFERENCE_WORKERS: int = int(os.getenv('LOCAL_INFERENCE_WORKERS', '2'))
+        self.LOCAL_CPU_THREADS: int = int(os.getenv('LOCAL_CPU_THREADS', '0'))  # 0 = Kerne / Worker
+        self.LOCAL_BATCH_WINDOW_MS: float = float(os.getenv('LOCAL_BATCH_WINDOW_MS', '30'))
+        self.LOCAL_MAX_BATCH: int = int(os.getenv('LOCAL_MAX_BATCH', '8'))
+
+        # Decoding-Profil der lokalen Transkription: instant, balanced, accurate (bisheriges Verhalten) oder auto
+        self.DECODING_PROFILE: str = os.getenv('DECODING_PROFILE', 'accurate').lower()
+        self.DECODING_TARGET_LATENCY: float = float(os.getenv('DECODING_TARGET_LATENCY', '1.5'))  # auto: max. Sekunden
+
+        # Gemeinsamer HTTP-Client für OpenAI (Keep-Alive-Pool, optional HTTP/2 und eigene Basis-URL)
+        self.OPENAI_BASE_URL: str = os.getenv('OPENAI_BASE_URL', '')
+        self.HTTP2_ENABLED: bool = os.getenv('HTTP2_ENABLED', 'true').lower() == 'true'
+        self.HTTP_TIMEOUT: float = float(os.getenv('HTTP_TIMEOUT', '60'))
+        self.HTTP_CONNECT_TIMEOUT: float = float(os.getenv('HTTP_CONNECT_TIMEOUT', '5'))
+        self.HTTP_KEEPALIVE_EXPIRY: float = float(os.getenv('HTTP_KEEPALIVE_EXPIRY', '120'))
+        self.HTTP_MAX_CONNECTIONS: int = int(os.getenv('HTTP_MAX_CONNECTIONS', '8'))
+        self.HTTP_PREWARM_ENABLED: bool = os.getenv('HTTP_PREWARM_ENABLED', 'true').lower() == 'true'
+
+        # Vorwärmen von Verbindung, Modell und Encoder beim Hotkey-Druck (parallel zur Aufnahme)
+        self.PRESS_PREWARM_ENABLED: bool = os.getenv('PRESS_PREWARM_ENABLED', 'true').lower() == 'true'
+        self.PREWARM_COOLDOWN_SECONDS: float = float(os.getenv('PREWARM_COOLDOWN_SECONDS', '120'))
+
+        # Backend-Router: gleitendes Fenster für Latenz/Fehlerquote, Sperrzeit vor erneuter Probe
+        self.ROUTER_WINDOW_SIZE: int = int(os.getenv('ROUTER_WINDOW_SIZE', '20'))
+        self.ROUTER_REPROBE_SECONDS: float = float(os.getenv('ROUTER_REPROBE_SECONDS', '300'))
+        self.ROUTER_MAX_ERROR_RATE: float = float(os.getenv('ROUTER_MAX_ERROR_RATE', '0.5'))
+        self.ROUTER_MIN_SAMPLES: int = int(os.getenv('ROUTER_MIN_SAMPLES', '3'))
+
+        # Lange Aufnahmen für die API an Pausen in Chunks teilen und parallel transkribieren
+        self.API_CHUNKING_ENABLED: bool = os.getenv('API_CHUNKING_ENABLED', 'true').lower() == 'true'
+        self.API_CHUNKING_MIN_SECONDS: float = float(os.getenv('API_CHUNKING_MIN_SECONDS', '30'))
+        self.API_CHUNK_TARGET_SECONDS: float = float(os.getenv('API_CHUNK_TARGET_SECONDS', '15'))
+        self.API_CHUNK_MAX_SECONDS: float = float(os.getenv('API_CHUNK_MAX_SECONDS', '25'))
+        self.API_CHUNK_OVERLAP_SECONDS: float = float(os.getenv('API_CHUNK_OVERLAP_SECONDS', '1.0'))
+        self.API_CHUNK_CONCURRENCY: int = int(os.getenv('API_CHUNK_CONCURRENCY', '4'))
+
+        # Energie-basierte Stille-Erkennung (VAD)
+        self.VAD_SILENCE_THRESHOLD: float = float(os.getenv('VAD_SILENCE_THRESHOLD', '300'))  # RMS (int16)
+        self.VAD_MIN_SILENCE_SECONDS: float = float(os.getenv('VAD_MIN_SILENCE_SECONDS', '0.3'))
+        # Opt-in: Stille vor Upload/Dekodierung entfernen und lange Pausen kürzen. Eine gekürzte
+        # Aufnahme wird neu kodiert statt das während der Aufnahme kodierte Audio hochzuladen
+        self.VAD_TRIM_ENABLED: bool = os.getenv('VAD_TRIM_ENABLED', 'false').lower() == 'true'
+        self.VAD_PADDING_SECONDS: float = float(os.getenv('VAD_PADDING_SECONDS', '0.5'))
+        self.VAD_MIN_KEEP_SECONDS: float = float(os.getenv('VAD_MIN_KEEP_SECONDS', '1.0'))  # Kürzer: nicht trimmen
+        self.VAD_MAX_PAUSE_SECONDS: float = float(os.getenv('VAD_MAX_PAUSE_SECONDS', '1.0'))
+        # Aufnahmen mit weniger Sprache werden auch ohne Trimmen verworfen (0 = aus)
+        self.VAD_MIN_SPEECH_SECONDS: float = float(os.getenv('VAD_MIN_SPEECH_SECONDS', '0.1'))
+
+        # Hedged Requests: API-Anfrage parallel starten, wenn die lokale Transkription zu lange dauert
+        self.TRANSCRIPTION_HEDGING_ENABLED: bool = os.getenv('TRANSCRIPTION_HEDGING_ENABLED', 'false').lower() == 'true'
+        self.HEDGE_INITIAL_DELAY: float = float(os.getenv('HEDGE_INITIAL_DELAY', '2.0'))  # Ohne Messwerte
+        self.HEDGE_MIN_DELAY: float = float(os.getenv('HEDGE_MIN_DELAY', '0.5'))
+        self.HEDGE_LATENCY_PERCENTILE: float = float(os.getenv('HEDGE_LATENCY_PERCENTILE', '0.9'))
+
+        # Transkript-Cache (Schlüssel: Audio-Hash + Modell, Sprache, Vokabular, Backend)
+        self.TRANSCRIPT_CACHE_ENABLED: bool = os.getenv('TRANSCRIPT_CACHE_ENABLED', 'true').lower() == 'true'
+        # Opt-in: Transkripte im Klartext unter AppData/cache/transcripts ablegen (sonst nur im Speicher)
+        self.TRANSCRIPT_CACHE_PERSIST: bool = os.getenv('TRANSCRIPT_CACHE_PERSIST', 'false').lower() == 'true'
+        self.TRANSCRIPT_CACHE_MAX_ENTRIES: int = int(os.getenv('TRANSCRIPT_CACHE_MAX_ENTRIES', '500'))
+        self.TRANSCRIPT_CACHE_MAX_MB: float = float(os.getenv('TRANSCRIPT_CACHE_MAX_MB', '5'))
+        self.TRANSCRIPT_CACHE_MAX_AGE_DAYS: float = float(os.getenv('TRANSCRIPT_CACHE_MAX_AGE_DAYS', '7'))
+        self.TRANSCRIPT_CACHE_MEMORY_ENTRIES: int = int(os.getenv('TRANSCRIPT_CACHE_MEMORY_ENTRIES', '64'))
+
+        # Streaming-Transkription: Segmente werden bereits während der Aufnahme lokal dekodiert
+        self.STREAMING_TRANSCRIPTION_ENABLED: bool = os.getenv('STREAMING_TRANSCRIPTION_ENABLED', 'false').lower() == 'true'
+        self.STREAMING_SILENCE_THRESHOLD: float = float(os.getenv('STREAMING_SILENCE_THRESHOLD', '300'))  # RMS (int16)
+        self.STREAMING_SILENCE_SECONDS: float = float(os.getenv('STREAMING_SILENCE_SECONDS', '0.4'))
+        self.STREAMING_MIN_SEGMENT_SECONDS: float = float(os.getenv('STREAMING_MIN_SEGMENT_SECONDS', '3.0'))
+        self.STREAMING_MAX_SEGMENT_SECONDS: float = float(os.getenv('STREAMING_MAX_SEGMENT_SECONDS', '12.0'))
+
         # Audio Device Name (für bessere Persistenz als Index)
         self.AUDIO_DEVICE_NAME: str = user_config.get('audio.device_name', '') if self.user_config_loaded else os.getenv('AUDIO_DEVICE_NAME', '')
 
@@ -166,8 +291,11 @@ class Config:
             logging.warning("OPENAI_API_KEY ist nicht gesetzt oder ist Platzhalter - API-Funktionen deaktiviert")
             # return False  # Temporär deaktiviert für GUI-Test
 
-        if self.MAX_RECORDING_DURATION <= 0 or self.MAX_RECORDING_DURATION > 60:
-            logging.error(f"MAX_RECORDING_DURATION muss zwischen 1-60 Sekunden sein: {self.MAX_RECORDING_DURATION}")
+        # Mit API-Chunking sind auch lange Diktate praktikabel (parallele Teil-Uploads);
+        # der lokale Pfad teilt nicht auf und behält das bisherige Limit
+        max_duration = 600 if self.API_CHUNKING_ENABLED and not self.USE_LOCAL_TRANSCRIPTION else 60
+        if self.MAX_RECORDING_DURATION <= 0 or self.MAX_RECORDING_DURATION > max_duration:
+            logging.error(f"MAX_RECORDING_DURATION muss zwischen 1-{max_duration} Sekunden sein: {self.MAX_RECORDING_DURATION}")
             return False
 
         # Validierung der lokalen Transkription
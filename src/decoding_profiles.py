@@ -0,0 +1,123 @@
+"""
+Decoding-Profile für die lokale Transkription
+Benannte Parametersätze für faster-whisper - von greedy ("instant") bis Beam
+Search mit Temperatur-Fallback ("accurate", das bisherige Verhalten und der
+Standard). Im Modus "auto" (opt-in) wählt der ProfileSelector pro Aufnahme das genaueste Profil,
+dessen geschätzte Dauer (Aufnahmelänge x gemessener Echtzeitfaktor) unter
+DECODING_TARGET_LATENCY bleibt. Echtzeitfaktoren werden pro Profil als
+gleitender Mittelwert gemessen; für noch nicht genutzte Profile wird aus
+einem gemessenen Profil über die relativen Kosten geschätzt.
+
+Die CPU-Threads sind ein Parameter beim Laden des Modells (CTranslate2) und
+gelten daher für alle Profile gemeinsam (LOCAL_CPU_THREADS).
+"""
+
+import logging
+import threading
+from typing import Dict, Optional
+
+from src.config import config
+from src.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+# Vom schnellsten zum genauesten
+PROFILES: Dict[str, dict] = {
+    "instant": {
+        "beam_size": 1,
+        "best_of": 1,
+        "temperature": 0.0,  # Kein Fallback - ein Durchlauf
+        "condition_on_previous_text": False,
+        "without_timestamps": True,
+    },
+    "balanced": {
+        "beam_size": 3,
+        "best_of": 3,
+        "temperature": (0.0, 0.4, 0.8),
+        "condition_on_previous_text": False,
+        "without_timestamps": True,
+    },
+    "accurate": {
+        "beam_size": 5,
+        "patience": 1.0,
+        "temperature": (0.0, 0.2, 0.4, 0.6, 0.8, 1.0),
+        "condition_on_previous_text": True,
+        "without_timestamps": False,
+    },
+}
+AUTO = "auto"
+DEFAULT_PROFILE = "accurate"
+
+# Grobe Rechenzeit relativ zu "instant" (Schätzung, solange ein Profil nicht gemessen ist)
+RELATIVE_COST = {"instant": 1.0, "balanced": 1.8, "accurate": 3.0}
+
+# Kürzere Aufnahmen verzerren den Echtzeitfaktor (fester Anteil pro 30s-Fenster)
+MIN_MEASURE_SECONDS = 2.0
+# Gewicht neuer Messungen im gleitenden Mittelwert
+EMA_ALPHA = 0.3
+
+VAD_PARAMETERS = dict(threshold=0.5, min_speech_duration_ms=250)
+
+
+def decoding_options(profile: str) -> dict:
+    """Parameter für WhisperModel.transcribe (unbekannte Namen -> accurate)"""
+    return dict(PROFILES.get(profile, PROFILES[DEFAULT_PROFILE]))
+
+
+def configured_profile() -> str:
+    profile = config.DECODING_PROFILE
+    if profile != AUTO and profile not in PROFILES:
+        logger.warning(f"Unbekanntes DECODING_PROFILE '{profile}' - verwende {DEFAULT_PROFILE}")
+        return DEFAULT_PROFILE
+    return profile
+
+
+class ProfileSelector:
+    """Wählt pro Aufnahme ein Profil anhand von Länge und gemessenem Echtzeitfaktor"""
+
+    def __init__(self, target_latency: Optional[float] = None):
+        self.target_latency = target_latency
+        self._rtf: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def record(self, profile: str, audio_seconds: float, decode_seconds: float):
+        """Übernimmt die Laufzeit einer Dekodierung in den Mittelwert des Profils"""
+        metrics.decoding_profiles.inc(profile=profile)
+        if audio_seconds < MIN_MEASURE_SECONDS:
+            return
+        rtf = decode_seconds / audio_seconds
+        with self._lock:
+            previous = self._rtf.get(profile)
+            self._rtf[profile] = rtf if previous is None else (1 - EMA_ALPHA) * previous + EMA_ALPHA * rtf
+
+    def estimate_rtf(self, profile: str) -> Optional[float]:
+        """Gemessener Echtzeitfaktor oder Schätzung aus einem anderen gemessenen Profil"""
+        with self._lock:
+            if profile in self._rtf:
+                return self._rtf[profile]
+            for measured, rtf in self._rtf.items():
+                return rtf / RELATIVE_COST[measured] * RELATIVE_COST[profile]
+        return None
+
+    def choose(self, audio_seconds: float) -> str:
+        profile = configured_profile()
+        if profile != AUTO:
+            return profile
+
+        target = self.target_latency if self.target_latency is not None else config.DECODING_TARGET_LATENCY
+        for candidate in ("accurate", "balanced"):
+            rtf = self.estimate_rtf(candidate)
+            if rtf is None:
+                # Noch keine Messung: Mittelweg, bis der erste Wert vorliegt
+                return "balanced"
+            if audio_seconds * rtf <= target:
+                return candidate
+        return "instant"
+
+    def get_stats(self) -> dict:
+        with self._lock:
+            return {name: round(rtf, 3) for name, rtf in self._rtf.items()}
+
+
+# Globale Instanz für das lokale Modell
+profile_selector = ProfileSelector()
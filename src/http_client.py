@@ -0,0 +1,201 @@
+"""
+HTTP Client - Gemeinsamer, vorgewärmter Verbindungspool für OpenAI
+Transkription und Text-Korrektur teilen sich einen OpenAI-Client mit
+Keep-Alive-Pool (HTTP/2, falls h2 installiert ist). Die TLS-Verbindung wird
+im Hintergrund aufgebaut, damit die erste Anfrage nach einer Pause nicht
+auf DNS, TCP und TLS warten muss.
+"""
+
+import logging
+import threading
+import time
+from typing import Optional
+from urllib.parse import urlparse
+
+from openai import OpenAI
+
+from src.config import config
+
+logger = logging.getLogger(__name__)
+
+# httpx ist eine Abhängigkeit des openai-Pakets
+HTTPX_AVAILABLE = False
+try:
+    import httpx
+
+    HTTPX_AVAILABLE = True
+except ImportError:
+    httpx = None  # type: ignore
+    logger.debug("httpx nicht verfügbar - OpenAI verwendet eigenen Verbindungspool")
+
+# Optional: h2 für HTTP/2 (pip install httpx[http2])
+H2_AVAILABLE = False
+try:
+    import h2  # noqa: F401
+
+    H2_AVAILABLE = True
+except ImportError:
+    logger.debug("h2 nicht verfügbar - verwende HTTP/1.1 mit Keep-Alive")
+
+DEFAULT_BASE_URL = "https://api.openai.com/v1"
+
+# Serverzeit der letzten Anfrage pro Thread (Header openai-processing-ms)
+_request_timing = threading.local()
+
+
+class PooledHttpClient:
+    """httpx-Client mit Keep-Alive-Pool und Hintergrund-Vorwärmung"""
+
+    def __init__(self, base_url: Optional[str] = None,
+                 http2: Optional[bool] = None,
+                 timeout: Optional[float] = None,
+                 connect_timeout: Optional[float] = None,
+                 keepalive_expiry: Optional[float] = None,
+                 max_connections: Optional[int] = None):
+        self.base_url = base_url or config.OPENAI_BASE_URL or DEFAULT_BASE_URL
+        self.http2 = (http2 if http2 is not None else config.HTTP2_ENABLED) and H2_AVAILABLE
+        self.timeout = timeout if timeout is not None else config.HTTP_TIMEOUT
+        self.connect_timeout = connect_timeout if connect_timeout is not None else config.HTTP_CONNECT_TIMEOUT
+        self.keepalive_expiry = keepalive_expiry if keepalive_expiry is not None else config.HTTP_KEEPALIVE_EXPIRY
+        max_connections = max_connections if max_connections is not None else config.HTTP_MAX_CONNECTIONS
+
+        self.client = httpx.Client(
+            http2=self.http2,
+            timeout=httpx.Timeout(self.timeout, connect=self.connect_timeout),
+            limits=httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=max_connections,
+                keepalive_expiry=self.keepalive_expiry
+            ),
+            event_hooks={'request': [self._on_request], 'response': [self._on_response]}
+        )
+
+        self.last_activity = 0.0
+        self.prewarm_count = 0
+        self._prewarm_thread: Optional[threading.Thread] = None
+        self._prewarm_lock = threading.Lock()
+
+    def _on_request(self, request):
+        """Jede Anfrage hält die Verbindung im Pool warm"""
+        self.last_activity = time.time()
+        _request_timing.server_seconds = None
+
+    def _on_response(self, response):
+        """Merkt sich die vom Server gemeldete Verarbeitungszeit (trennt Upload- von Serverzeit)"""
+        value = response.headers.get('openai-processing-ms')
+        if value:
+            try:
+                _request_timing.server_seconds = float(value) / 1000
+            except ValueError:
+                pass
+
+    def is_warm(self) -> bool:
+        """Eine Verbindung ist vermutlich noch offen (Keep-Alive nicht abgelaufen)"""
+        return time.time() - self.last_activity < self.keepalive_expiry * 0.8
+
+    def prewarm(self, force: bool = False, wait: bool = False) -> bool:
+        """Baut DNS/TCP/TLS im Hintergrund auf; gibt True zurück, wenn vorgewärmt wird"""
+        if not force and self.is_warm():
+            return False
+
+        with self._prewarm_lock:
+            if self._prewarm_thread and self._prewarm_thread.is_alive():
+                thread = self._prewarm_thread
+            else:
+                thread = threading.Thread(target=self._prewarm_connection, name="HttpPrewarm", daemon=True)
+                self._prewarm_thread = thread
+                thread.start()
+
+        if wait:
+            thread.join(timeout=self.connect_timeout + self.timeout)
+        return True
+
+    def _prewarm_connection(self):
+        """HEAD auf die Basis-URL - die Antwort ist egal, die Verbindung bleibt im Pool"""
+        start_time = time.time()
+        try:
+            self.client.request("HEAD", self.base_url, timeout=httpx.Timeout(self.connect_timeout * 2))
+            self.prewarm_count += 1
+            logger.info(f"HTTP-Verbindung zu {urlparse(self.base_url).netloc} vorgewärmt in "
+                        f"{time.time() - start_time:.2f}s (HTTP/{'2' if self.http2 else '1.1'})")
+        except Exception as e:
+            logger.debug(f"Vorwärmen der HTTP-Verbindung fehlgeschlagen: {e}")
+
+    def close(self):
+        self.client.close()
+
+
+# Gemeinsame Instanzen für alle Services
+_shared_http_client: Optional[PooledHttpClient] = None
+_shared_openai_client: Optional[OpenAI] = None
+_shared_client_settings: Optional[tuple] = None
+_shared_lock = threading.Lock()
+# Unterbricht Backoff-Wartezeiten beim Beenden der Anwendung
+_shutdown_event = threading.Event()
+
+
+def get_http_client() -> Optional[PooledHttpClient]:
+    """Gemeinsamer Verbindungspool (None ohne httpx)"""
+    global _shared_http_client
+
+    if not HTTPX_AVAILABLE:
+        return None
+
+    with _shared_lock:
+        if _shared_http_client is None:
+            _shared_http_client = PooledHttpClient()
+            _shutdown_event.clear()
+        return _shared_http_client
+
+
+def get_openai_client() -> OpenAI:
+    """Gemeinsamer OpenAI-Client; wird bei geändertem API-Key oder Basis-URL neu erstellt"""
+    global _shared_openai_client, _shared_client_settings
+
+    settings = (config.OPENAI_API_KEY, config.OPENAI_BASE_URL)
+    http_client = get_http_client()
+
+    with _shared_lock:
+        if _shared_openai_client is None or _shared_client_settings != settings:
+            client_args = {}
+            if http_client is not None:
+                client_args["http_client"] = http_client.client
+                client_args["timeout"] = http_client.timeout
+            if config.OPENAI_BASE_URL:
+                client_args["base_url"] = config.OPENAI_BASE_URL
+
+            _shared_openai_client = OpenAI(api_key=config.OPENAI_API_KEY, **client_args)
+            _shared_client_settings = settings
+        return _shared_openai_client
+
+
+def last_server_seconds() -> Optional[float]:
+    """Serverseitige Verarbeitungszeit der letzten Anfrage dieses Threads (None ohne Header)"""
+    return getattr(_request_timing, 'server_seconds', None)
+
+
+def prewarm_connection(force: bool = False) -> bool:
+    """Wärmt die Verbindung zur API im Hintergrund vor (nur mit API-Key)"""
+    if not config.HTTP_PREWARM_ENABLED or not config.OPENAI_API_KEY:
+        return False
+
+    http_client = get_http_client()
+    return bool(http_client and http_client.prewarm(force=force))
+
+
+def backoff_wait(delay: float) -> bool:
+    """Wartet vor einem erneuten Versuch; gibt True zurück, wenn die Anwendung beendet wird"""
+    return _shutdown_event.wait(delay)
+
+
+def close_shared_clients():
+    """Schließt den Verbindungspool und bricht laufende Backoff-Wartezeiten ab"""
+    global _shared_http_client, _shared_openai_client, _shared_client_settings
+
+    _shutdown_event.set()
+    with _shared_lock:
+        if _shared_http_client is not None:
+            _shared_http_client.close()
+        _shared_http_client = None
+        _shared_openai_client = None
+        _shared_client_settings = None
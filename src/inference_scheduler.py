@@ -0,0 +1,268 @@
+"""
+Inference Scheduler - bündelt gleichzeitige Anfragen an das lokale Whisper-Modell
+Ohne Scheduler laufen Anfragen aus Server, Live-Untertiteln und parallelen
+Threads nacheinander durch eine Modell-Instanz. Der Scheduler sammelt
+Anfragen, die innerhalb von LOCAL_BATCH_WINDOW_MS eintreffen, und führt sie
+gemeinsam aus:
+
+- parallel: Das Modell wird mit num_workers=LOCAL_INFERENCE_WORKERS geladen;
+  CTranslate2 rechnet so viele Anfragen gleichzeitig (je LOCAL_CPU_THREADS
+  Threads). Kommen weitere Anfragen, während alle Worker belegt sind, warten
+  sie im nächsten Batch.
+- batched: Die Audios eines Batches werden hintereinandergelegt und mit
+  faster-whispers BatchedInferencePipeline in einem Durchlauf dekodiert
+  (ein Clip pro Anfrage über clip_timestamps in Sekunden). Benötigt
+  faster-whisper >= 1.2 - ältere Versionen lesen clip_timestamps als
+  Sample-Indizes; sonst Rückfall auf parallel.
+
+Ein größeres Fenster erhöht den Durchsatz pro Kern und kostet bis zu
+LOCAL_BATCH_WINDOW_MS zusätzliche Latenz pro Anfrage.
+"""
+
+import itertools
+import logging
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import TYPE_CHECKING, Callable, Dict, List, Optional
+
+if TYPE_CHECKING:
+    import numpy as np
+
+from src.audio_utils import WHISPER_SAMPLE_RATE
+from src.config import config
+from src.latency_trace import percentile
+from src.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+MODES = ("off", "parallel", "batched")
+
+# Ab dieser Version liest die BatchedInferencePipeline clip_timestamps in Sekunden
+BATCHED_MIN_VERSION = (1, 2)
+
+# Längere Clips zerlegt die BatchedInferencePipeline nicht selbst (30s-Fenster von Whisper)
+MAX_CLIP_SECONDS = 30.0
+
+# Wartezeiten der letzten Anfragen für die Perzentile in get_stats()
+WAIT_HISTORY = 200
+
+
+def inference_mode() -> str:
+    """Konfigurierter Modus; unbekannte Werte schalten den Scheduler ab"""
+    mode = config.LOCAL_INFERENCE_MODE
+    if mode not in MODES:
+        logger.warning(f"Unbekannter LOCAL_INFERENCE_MODE '{mode}' - Scheduler deaktiviert")
+        return "off"
+    return mode
+
+
+def supports_batched_clips(version: str) -> bool:
+    """Ob die installierte faster-whisper-Version clip_timestamps in Sekunden erwartet"""
+    parts = []
+    for part in (version or "").split(".")[:2]:
+        digits = "".join(itertools.takewhile(str.isdigit, part))
+        if not digits:
+            break
+        parts.append(int(digits))
+    return tuple(parts) >= BATCHED_MIN_VERSION
+
+
+def useful_concurrency() -> int:
+    """Wie viele gleichzeitige Aufrufer das lokale Modell sinnvoll auslasten"""
+    mode = inference_mode()
+    if mode == "batched":
+        return max(1, config.LOCAL_MAX_BATCH)
+    if mode == "parallel":
+        return max(1, config.LOCAL_INFERENCE_WORKERS)
+    return 1
+
+
+def model_threading() -> Dict[str, int]:
+    """num_workers/cpu_threads für WhisperModel, passend zum Modus"""
+    parallel = inference_mode() == "parallel"
+    workers = max(1, config.LOCAL_INFERENCE_WORKERS) if parallel else 1
+    # 0 = Standard von CTranslate2; parallel teilen sich die Worker die Kerne
+    cpu_threads = config.LOCAL_CPU_THREADS or (max(1, (os.cpu_count() or 1) // workers) if parallel else 0)
+    return {"num_workers": workers, "cpu_threads": cpu_threads}
+
+
+class InferenceRequest:
+    """Eine Anfrage mit Ergebnis-Future"""
+
+    def __init__(self, audio, initial_prompt: Optional[str], profile: Optional[str] = None):
+        self.audio = audio
+        self.initial_prompt = initial_prompt
+        self.profile = profile
+        self.future: Future = Future()
+        self.created = time.monotonic()
+
+
+class InferenceScheduler:
+    """Sammelt Anfragen im Batch-Fenster und führt sie parallel oder als ein Batch aus"""
+
+    def __init__(self, decode: Callable[..., Optional[str]], mode: str = "parallel",
+                 batched_decode: Optional[Callable[..., List[Optional[str]]]] = None,
+                 workers: Optional[int] = None, window_ms: Optional[float] = None,
+                 max_batch: Optional[int] = None):
+        self.decode = decode
+        self.batched_decode = batched_decode
+        self.mode = "batched" if mode == "batched" and batched_decode else "parallel"
+        self.workers = max(1, workers or config.LOCAL_INFERENCE_WORKERS)
+        self.window = (window_ms if window_ms is not None else config.LOCAL_BATCH_WINDOW_MS) / 1000
+        self.max_batch = max(1, max_batch or config.LOCAL_MAX_BATCH)
+
+        self._queue: "queue.Queue[Optional[InferenceRequest]]" = queue.Queue()
+        # parallel: höchstens so viele Anfragen gleichzeitig im Modell wie CTranslate2-Worker
+        self._slots = threading.Semaphore(self.workers)
+        self._pool = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="LocalInference")
+        self._lock = threading.Lock()
+        self._waits: List[float] = []
+        self.stats = {"requests": 0, "batches": 0, "batched_requests": 0, "decode_seconds": 0.0}
+
+        self._thread = threading.Thread(target=self._run, name="InferenceScheduler", daemon=True)
+        self._thread.start()
+        logger.info(f"Inference-Scheduler aktiv ({self.mode}, {self.workers} Worker, "
+                    f"Fenster {self.window * 1000:.0f}ms, Batch bis {self.max_batch})")
+
+    def submit(self, audio, initial_prompt: Optional[str] = None, profile: Optional[str] = None) -> Future:
+        request = InferenceRequest(audio, initial_prompt, profile)
+        self._queue.put(request)
+        return request.future
+
+    def transcribe(self, audio, initial_prompt: Optional[str] = None, profile: Optional[str] = None) -> Optional[str]:
+        """Blockierender Aufruf für die Transkriptions-Methoden des Services"""
+        return self.submit(audio, initial_prompt, profile).result()
+
+    # --- Scheduler-Thread ---
+
+    def _collect(self, first: InferenceRequest) -> List[InferenceRequest]:
+        batch = [first]
+        deadline = time.monotonic() + self.window
+        while len(batch) < self.max_batch:
+            remaining = deadline - time.monotonic()
+            try:
+                request = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if request is None:
+                self._queue.put(None)
+                break
+            batch.append(request)
+        return batch
+
+    def _run(self):
+        while True:
+            request = self._queue.get()
+            if request is None:
+                break
+            batch = self._collect(request)
+            self._record_batch(batch)
+            try:
+                if self.mode == "batched" and len(batch) > 1:
+                    self._run_batched(batch)
+                else:
+                    self._run_parallel(batch)
+            except Exception as e:
+                logger.error(f"Fehler im Inference-Scheduler: {e}", exc_info=True)
+                for item in batch:
+                    if not item.future.done():
+                        item.future.set_exception(e)
+
+    def _record_batch(self, batch: List[InferenceRequest]):
+        now = time.monotonic()
+        with self._lock:
+            self.stats["requests"] += len(batch)
+            self.stats["batches"] += 1
+            if len(batch) > 1:
+                self.stats["batched_requests"] += len(batch)
+            for item in batch:
+                self._waits.append(now - item.created)
+                metrics.stage_latency.observe(now - item.created, stage="local_queue")
+            del self._waits[:-WAIT_HISTORY]
+        metrics.local_batch_size.observe(len(batch))
+
+    def _run_parallel(self, batch: List[InferenceRequest]):
+        for item in batch:
+            # Blockiert, solange alle Worker rechnen - neue Anfragen sammeln sich für den nächsten Batch
+            self._slots.acquire()
+            self._pool.submit(self._decode_one, item)
+
+    def _decode_one(self, item: InferenceRequest):
+        start_time = time.monotonic()
+        try:
+            item.future.set_result(self.decode(item.audio, initial_prompt=item.initial_prompt, profile=item.profile))
+        except Exception as e:
+            item.future.set_exception(e)
+        finally:
+            self._add_decode_time(time.monotonic() - start_time)
+            self._slots.release()
+
+    def _run_batched(self, batch: List[InferenceRequest]):
+        # Ein Prompt und Profil pro Durchlauf - abweichende Anfragen bilden eigene Gruppen
+        groups: Dict[tuple, List[InferenceRequest]] = {}
+        for item in batch:
+            groups.setdefault((item.initial_prompt, item.profile), []).append(item)
+
+        for (prompt, profile), items in groups.items():
+            start_time = time.monotonic()
+            texts = self.batched_decode([item.audio for item in items], prompt, profile=profile)
+            self._add_decode_time(time.monotonic() - start_time)
+            for item, text in zip(items, texts):
+                item.future.set_result(text)
+
+    def _add_decode_time(self, seconds: float):
+        with self._lock:
+            self.stats["decode_seconds"] += seconds
+
+    # --- Steuerung ---
+
+    def get_stats(self) -> dict:
+        with self._lock:
+            stats = dict(self.stats)
+            waits = list(self._waits)
+        stats.update({
+            "mode": self.mode,
+            "decode_seconds": round(stats["decode_seconds"], 3),
+            "mean_batch_size": round(stats["requests"] / stats["batches"], 2) if stats["batches"] else 0.0,
+            "queue_wait_p50_ms": round(percentile(waits, 50) * 1000, 1) if waits else None,
+            "queue_wait_p95_ms": round(percentile(waits, 95) * 1000, 1) if waits else None,
+        })
+        return stats
+
+    def shutdown(self, timeout: float = 10.0):
+        self._queue.put(None)
+        self._thread.join(timeout=timeout)
+        self._pool.shutdown(wait=True)
+
+
+def concatenate_clips(audios: List["np.ndarray"], sample_rate: int = WHISPER_SAMPLE_RATE):
+    """Legt die Audios hintereinander; liefert Gesamtaudio, Clips (<= 30s) und Grenzen pro Anfrage"""
+    import numpy as np
+
+    clips, bounds = [], []
+    offset = 0.0
+    for audio in audios:
+        duration = len(audio) / sample_rate
+        bounds.append((offset, offset + duration))
+        start = 0.0
+        while start < duration:
+            end = min(duration, start + MAX_CLIP_SECONDS)
+            clips.append({"start": round(offset + start, 3), "end": round(offset + end, 3)})
+            start = end
+        offset += duration
+    return np.concatenate(audios).astype(np.float32), clips, bounds
+
+
+def assign_segments(segments, bounds) -> List[Optional[str]]:
+    """Ordnet Segmente über ihre Mitte den Anfragen zu"""
+    texts: List[List[str]] = [[] for _ in bounds]
+    for segment in segments:
+        middle = (segment.start + segment.end) / 2
+        for index, (start, end) in enumerate(bounds):
+            if start <= middle < end:
+                texts[index].append(segment.text.strip())
+                break
+    return [" ".join(parts).strip() or None for parts in texts]
@@ -0,0 +1,278 @@
+"""
+Latency Trace - Zeitmessung pro Stufe der Diktier-Pipeline
+Jede Diktierung bekommt einen Trace mit monotonen Zeitstempeln vom
+Hotkey-Druck bis zur Text-Einfügung. Abgeschlossene Sessions werden als
+eine JSON-Zeile geloggt und in eine JSONL-Datei geschrieben. Perzentile
+(p50/p95/p99) stehen im Speicher für das Tray-Menü bereit; die CLI
+(python -m src stats) wertet die Datei aus.
+"""
+
+import argparse
+import json
+import logging
+import math
+import threading
+import time
+import uuid
+from collections import deque
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Deque, Dict, Iterable, List, Optional
+
+from src.config import config
+
+logger = logging.getLogger(__name__)
+
+# Zeitpunkte relativ zum Hotkey-Druck
+MARKS = ("stream_open", "first_frame", "release", "stop")
+# Dauer einzelner Verarbeitungsschritte
+SPANS = ("vad", "encode", "transcribe", "correction", "inject")
+# Zusammengefasste Kennzahlen
+TOTALS = ("release_to_inject", "total")
+
+PERCENTILES = (50, 95, 99)
+
+# Ab dieser Größe wird die Trace-Datei auf die letzten Einträge gekürzt
+MAX_TRACE_FILE_BYTES = 1024 * 1024
+
+
+def percentile(values: List[float], q: float) -> float:
+    """Perzentil nach Nearest-Rank (values muss nicht sortiert sein)"""
+    ordered = sorted(values)
+    rank = max(1, math.ceil(q / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+
+def default_trace_file() -> Path:
+    from src.user_config import user_config
+
+    return user_config.get_appdata_dir() / 'latency_traces.jsonl'
+
+
+class LatencyTrace:
+    """Zeitstempel einer Diktier-Session (time.perf_counter, relativ zum Hotkey-Druck)"""
+
+    def __init__(self, tracker: Optional["LatencyTracker"] = None):
+        self.tracker = tracker
+        self.session_id = uuid.uuid4().hex[:12]
+        self.started_at = time.time()
+        self._start = time.perf_counter()
+        self.marks: Dict[str, float] = {}
+        self.spans: Dict[str, float] = {}
+        self.attributes: Dict[str, object] = {}
+        self._finished = False
+        self._lock = threading.Lock()
+
+    def _elapsed_ms(self) -> float:
+        return (time.perf_counter() - self._start) * 1000
+
+    def mark(self, event: str):
+        """Setzt den Zeitpunkt eines Ereignisses (ms seit Hotkey-Druck)"""
+        with self._lock:
+            self.marks[event] = round(self._elapsed_ms(), 1)
+
+    def mark_once(self, event: str):
+        """Wie mark, aber nur beim ersten Aufruf (z.B. erster Audio-Frame)"""
+        if event not in self.marks:
+            self.mark(event)
+
+    def add_span(self, stage: str, seconds: float):
+        """Addiert die Dauer eines Schritts (mehrfache Aufrufe werden summiert)"""
+        with self._lock:
+            self.spans[stage] = round(self.spans.get(stage, 0.0) + seconds * 1000, 1)
+
+    @contextmanager
+    def span(self, stage: str):
+        """Misst die Dauer des with-Blocks als Schritt"""
+        start = time.perf_counter()
+        try:
+            yield self
+        finally:
+            self.add_span(stage, time.perf_counter() - start)
+
+    def set(self, key: str, value):
+        """Zusätzliche Angaben wie Backend, Audiodauer oder Upload-Format"""
+        self.attributes[key] = value
+
+    def to_record(self) -> dict:
+        total = self._elapsed_ms()
+        record = {
+            "session": self.session_id,
+            "started_at": round(self.started_at, 3),
+            "marks": dict(self.marks),
+            "spans": dict(self.spans),
+            "total": round(total, 1),
+        }
+        if "release" in self.marks:
+            record["release_to_inject"] = round(total - self.marks["release"], 1)
+        record.update(self.attributes)
+        return record
+
+    def finish(self, outcome: str = "ok") -> Optional[dict]:
+        """Schließt die Session ab und gibt sie an den Tracker (nur einmal)"""
+        with self._lock:
+            if self._finished:
+                return None
+            self._finished = True
+        self.attributes["outcome"] = outcome
+        record = self.to_record()
+        if self.tracker:
+            self.tracker.record(record)
+        return record
+
+
+class LatencyTracker:
+    """Sammelt abgeschlossene Sessions und berechnet Perzentile pro Stufe"""
+
+    def __init__(self, history: Optional[int] = None, trace_file: Optional[Path] = None):
+        self.history = history if history is not None else config.LATENCY_TRACE_HISTORY
+        self._trace_file = trace_file
+        self._records: Deque[dict] = deque(maxlen=self.history)
+        self._loaded = False
+        self._lock = threading.Lock()
+
+    @property
+    def trace_file(self) -> Path:
+        if self._trace_file is None:
+            self._trace_file = default_trace_file()
+        return self._trace_file
+
+    def start(self) -> LatencyTrace:
+        """Beginnt eine neue Session (Zeitpunkt 0 = Hotkey-Druck)"""
+        return LatencyTrace(self)
+
+    def _load_history(self):
+        """Übernimmt beim ersten Zugriff die letzten Sessions aus der Trace-Datei"""
+        if self._loaded:
+            return
+        self._loaded = True
+        for record in read_trace_file(self.trace_file, self.history):
+            self._records.append(record)
+
+    def record(self, record: dict):
+        """Speichert eine Session, loggt sie als eine Zeile und hängt sie an die Datei an"""
+        line = json.dumps(record, ensure_ascii=False, default=str)
+        logger.info(f"Latenz-Trace: {line}")
+
+        with self._lock:
+            self._load_history()
+            self._records.append(record)
+            try:
+                self.trace_file.parent.mkdir(parents=True, exist_ok=True)
+                with open(self.trace_file, 'a', encoding='utf-8') as f:
+                    f.write(line + "\n")
+                if self.trace_file.stat().st_size > MAX_TRACE_FILE_BYTES:
+                    self._truncate_file()
+            except OSError as e:
+                logger.debug(f"Latenz-Trace konnte nicht gespeichert werden: {e}")
+
+    def _truncate_file(self):
+        """Behält nur die Sessions, die auch im Speicher liegen"""
+        temp_path = self.trace_file.with_suffix('.tmp')
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            for record in self._records:
+                f.write(json.dumps(record, ensure_ascii=False, default=str) + "\n")
+        temp_path.replace(self.trace_file)
+
+    def records(self) -> List[dict]:
+        with self._lock:
+            self._load_history()
+            return list(self._records)
+
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        with self._lock:
+            self._load_history()
+            return summarize(self._records)
+
+    def format_summary(self, compact: bool = False) -> str:
+        return format_summary(self.summary(), compact=compact)
+
+
+def _metric_values(records: Iterable[dict]) -> Dict[str, List[float]]:
+    values: Dict[str, List[float]] = {}
+    for record in records:
+        for name, value in record.get("marks", {}).items():
+            values.setdefault(name, []).append(value)
+        for name, value in record.get("spans", {}).items():
+            values.setdefault(name, []).append(value)
+        for name in TOTALS:
+            if name in record:
+                values.setdefault(name, []).append(record[name])
+    return values
+
+
+def summarize(records: Iterable[dict]) -> Dict[str, Dict[str, float]]:
+    """p50/p95/p99 und Anzahl pro Stufe (Werte in ms)"""
+    summary = {}
+    for name, values in _metric_values(records).items():
+        summary[name] = {"count": len(values)}
+        for q in PERCENTILES:
+            summary[name][f"p{q}"] = percentile(values, q)
+    return summary
+
+
+def format_summary(summary: Dict[str, Dict[str, float]], compact: bool = False) -> str:
+    """Textdarstellung für Tray-Benachrichtigung (compact) oder Konsole"""
+    if not summary:
+        return "Noch keine Latenz-Daten"
+
+    order = [name for name in MARKS + SPANS + TOTALS if name in summary]
+    order += sorted(name for name in summary if name not in order)
+
+    if compact:
+        parts = []
+        for name in ("release_to_inject", "transcribe", "correction"):
+            if name in summary:
+                stats = summary[name]
+                parts.append(f"{name}: p50 {stats['p50'] / 1000:.2f}s, p95 {stats['p95'] / 1000:.2f}s")
+        count = summary.get("total", {}).get("count", 0)
+        return "\n".join(parts + [f"{count} Diktierungen"])
+
+    lines = [f"{'Stufe':<20} {'Anzahl':>6} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}"]
+    for name in order:
+        stats = summary[name]
+        lines.append(f"{name:<20} {stats['count']:>6} {stats['p50']:>9.1f} {stats['p95']:>9.1f} {stats['p99']:>9.1f}")
+    return "\n".join(lines)
+
+
+def read_trace_file(path: Path, limit: Optional[int] = None) -> List[dict]:
+    """Liest die letzten Sessions aus einer JSONL-Datei (defekte Zeilen werden übersprungen)"""
+    records: Deque[dict] = deque(maxlen=limit)
+    try:
+        with open(path, encoding='utf-8') as f:
+            for line in f:
+                try:
+                    records.append(json.loads(line))
+                except ValueError:
+                    continue
+    except OSError:
+        pass
+    return list(records)
+
+
+# Globale Instanz für die Anwendung
+latency_tracker = LatencyTracker()
+
+
+def cli(argv: Optional[List[str]] = None) -> int:
+    """python -m src stats - Perzentile pro Stufe aus der Trace-Datei"""
+    parser = argparse.ArgumentParser(prog="python -m src stats",
+                                     description="Zeigt Latenz-Perzentile der letzten Diktierungen")
+    parser.add_argument('--file', type=Path, help='JSONL-Datei (Standard: Trace-Datei im AppData-Verzeichnis)')
+    parser.add_argument('--last', type=int, default=None, help='Nur die letzten N Sessions auswerten')
+    parser.add_argument('--json', action='store_true', help='Ausgabe als JSON')
+    args = parser.parse_args(argv)
+
+    path = args.file or default_trace_file()
+    records = read_trace_file(path, args.last)
+    if not records:
+        print(f"Keine Latenz-Daten in {path}")
+        return 1
+
+    summary = summarize(records)
+    if args.json:
+        print(json.dumps(summary, indent=2))
+    else:
+        print(f"{len(records)} Sessions aus {path}\n")
+        print(format_summary(summary))
+    return 0
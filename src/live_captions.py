@@ -0,0 +1,297 @@
+"""
+Live-Untertitel: python -m src captions
+Nimmt einen fortlaufenden PCM-Stream (16-bit, 16 kHz Mono) per WebSocket
+entgegen und liefert Text, während noch gesprochen wird. Der LiveCaptioner
+dekodiert mit dem residenten faster-whisper-Modell ein gleitendes Fenster ab
+dem letzten festgeschriebenen Punkt. Daraus entstehen "partial"-Hypothesen,
+die sich noch ändern können. An Sprechpausen oder bei Erreichen der maximalen
+Fensterlänge wird das Fenster als "final" festgeschrieben. Ist die Dekodierung
+langsamer als der Stream, werden Zwischenstände übersprungen statt
+aufgestaut - der Rückstand (Caption-Lag) bleibt begrenzt.
+
+Protokoll (ws://127.0.0.1:8771):
+    Client -> Server: Binär-Nachrichten mit PCM16, Text "end" beendet den Stream
+    Server -> Client: {"type": "partial"|"final", "text", "start", "end", "lag"}
+                      zum Schluss {"type": "stats", ...}
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import threading
+import time
+from typing import Callable, List, Optional
+
+from src.audio_utils import WHISPER_SAMPLE_RATE, pcm16_to_float32, rms_int16
+from src.config import config
+from src.decoding_profiles import AUTO, configured_profile
+from src.latency_trace import percentile
+
+logger = logging.getLogger(__name__)
+
+# Optional: websockets für den Server (pip install websockets)
+WEBSOCKETS_AVAILABLE = False
+try:
+    import websockets
+
+    WEBSOCKETS_AVAILABLE = True
+except ImportError:
+    logger.debug("websockets nicht installiert - Live-Untertitel-Server nicht verfügbar")
+
+
+class LiveCaptioner:
+    """Gleitendes Dekodierfenster über einem PCM-Stream mit partial- und final-Ereignissen"""
+
+    def __init__(self, local_service, on_event: Callable[[dict], None],
+                 sample_rate: int = WHISPER_SAMPLE_RATE,
+                 step_seconds: Optional[float] = None, max_window_seconds: Optional[float] = None,
+                 silence_threshold: Optional[float] = None, silence_seconds: Optional[float] = None):
+        self.local_service = local_service
+        self.on_event = on_event
+        self.sample_rate = sample_rate
+        self.step_samples = int((step_seconds if step_seconds is not None else config.CAPTIONS_STEP_SECONDS)
+                                * sample_rate)
+        self.max_window_samples = int((max_window_seconds if max_window_seconds is not None
+                                       else config.CAPTIONS_MAX_WINDOW_SECONDS) * sample_rate)
+        self.silence_threshold = silence_threshold if silence_threshold is not None else config.STREAMING_SILENCE_THRESHOLD
+        self.silence_samples = int((silence_seconds if silence_seconds is not None
+                                    else config.STREAMING_SILENCE_SECONDS) * sample_rate)
+
+        # PCM16 ab _committed_sample (Festgeschriebenes wird verworfen)
+        self._audio = bytearray()
+        self._committed_sample = 0
+        self._total_samples = 0
+        self._decoded_until = 0
+        self._trailing_silence = 0
+        self._has_speech = False
+        self._last_feed_time = 0.0
+        self._finished = False
+        self._cond = threading.Condition()
+
+        self._last_final = ""
+        self._last_partial = ""
+        self.lags: List[float] = []
+        self.stats = {"partials": 0, "finals": 0, "decodes": 0, "decode_seconds": 0.0}
+
+        self._worker = threading.Thread(target=self._run, name="LiveCaptioner", daemon=True)
+        self._worker.start()
+
+    # --- Eingang (WebSocket- bzw. Aufnahme-Thread) ---
+
+    def feed(self, pcm: bytes):
+        """Hängt PCM16 an (nicht blockierend)"""
+        if not pcm:
+            return
+        samples = len(pcm) // 2
+        with self._cond:
+            self._audio.extend(pcm[:samples * 2])
+            self._total_samples += samples
+            self._last_feed_time = time.monotonic()
+            if rms_int16(pcm) < self.silence_threshold:
+                self._trailing_silence += samples
+            else:
+                self._trailing_silence = 0
+                self._has_speech = True
+            self._cond.notify()
+
+    def finish(self, timeout: Optional[float] = None) -> dict:
+        """Schreibt den Rest fest, beendet den Worker und liefert die Statistik"""
+        with self._cond:
+            self._finished = True
+            self._cond.notify()
+        self._worker.join(timeout=timeout)
+        return self.get_stats()
+
+    # --- Dekodierung (Worker-Thread) ---
+
+    def _ready(self) -> bool:
+        """Genug neues Audio für einen Zwischenstand oder eine Pause zum Festschreiben"""
+        new_samples = self._total_samples - self._decoded_until
+        return self._finished or new_samples >= self.step_samples or (
+            self._has_speech and new_samples > 0 and self._trailing_silence >= self.silence_samples)
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._ready():
+                    self._cond.wait()
+                start = self._committed_sample
+                # Nach einem Rückstau (z.B. Netzwerk-Burst) höchstens ein Fenster auf einmal
+                end = min(self._total_samples, start + self.max_window_samples)
+                finished = self._finished and end == self._total_samples
+                audio = bytes(self._audio[:(end - start) * 2])
+                has_speech = self._has_speech
+                pause = (has_speech and end == self._total_samples
+                         and self._trailing_silence >= self.silence_samples)
+                fed_at = self._last_feed_time
+                self._decoded_until = end
+
+            try:
+                if not has_speech:
+                    # Nur Stille seit dem letzten Festschreiben - nicht dekodieren (Whisper halluziniert sonst)
+                    if end - start >= self.silence_samples:
+                        self._commit(end)
+                elif finished or pause or end - start >= self.max_window_samples:
+                    text = self._decode(audio, final=True)
+                    self._emit("final", text, start, end, fed_at)
+                    self._commit(end)
+                else:
+                    text = self._decode(audio)
+                    if text != self._last_partial:
+                        self._emit("partial", text, start, end, fed_at)
+            except Exception as e:
+                logger.error(f"Fehler bei Live-Dekodierung: {e}")
+                self._emit("error", str(e), start, end, fed_at)
+
+            if finished:
+                return
+
+    def _decode(self, pcm: bytes, final: bool = False) -> str:
+        # Vokabular und letzter festgeschriebener Satz als Kontext - wie StreamingTranscriber
+        prompt = " ".join(part for part in (config.get_vocabulary(), self._last_final) if part)
+        # Zwischenstände werden gleich wieder ersetzt: im Modus auto greedy, final nach Auswahl
+        profile = "instant" if not final and configured_profile() == AUTO else None
+        start_time = time.monotonic()
+        text = self.local_service.transcribe_array(pcm16_to_float32(pcm), initial_prompt=prompt, profile=profile)
+        self.stats["decodes"] += 1
+        self.stats["decode_seconds"] += time.monotonic() - start_time
+        return (text or "").strip()
+
+    def _commit(self, end: int):
+        with self._cond:
+            del self._audio[:(end - self._committed_sample) * 2]
+            self._committed_sample = end
+            # Sprache nach dem Schnappschuss gehört schon zum nächsten Fenster
+            self._has_speech = self._trailing_silence < self._total_samples - end
+        self._last_partial = ""
+
+    def _emit(self, event_type: str, text: str, start: int, end: int, fed_at: float):
+        if event_type == "final":
+            if not text:
+                return
+            self._last_final = text
+            self.stats["finals"] += 1
+        elif event_type == "partial":
+            self._last_partial = text
+            self.stats["partials"] += 1
+
+        # Lag: vom Eintreffen des letzten dekodierten Samples bis zum Versand
+        lag = time.monotonic() - fed_at
+        self.lags.append(lag)
+        try:
+            self.on_event({
+                "type": event_type,
+                "text": text,
+                "start": round(start / self.sample_rate, 2),
+                "end": round(end / self.sample_rate, 2),
+                "lag": round(lag, 3),
+            })
+        except Exception as e:
+            logger.warning(f"Untertitel konnte nicht gesendet werden: {e}")
+
+    def get_stats(self) -> dict:
+        audio_seconds = self._total_samples / self.sample_rate
+        return {
+            **self.stats,
+            "decode_seconds": round(self.stats["decode_seconds"], 3),
+            "audio_seconds": round(audio_seconds, 2),
+            # Rechenzeit pro Sekunde Audio (< 1 = hält mit dem Stream mit)
+            "realtime_factor": round(self.stats["decode_seconds"] / audio_seconds, 3) if audio_seconds else None,
+            "lag_p50": round(percentile(self.lags, 50), 3) if self.lags else None,
+            "lag_p95": round(percentile(self.lags, 95), 3) if self.lags else None,
+        }
+
+
+def get_local_service():
+    """Residentes, aufgewärmtes Modell (Singleton) oder None, wenn es fehlt"""
+    from src.local_transcription import LocalTranscriptionService
+
+    local_service = LocalTranscriptionService()
+    if not local_service.is_available():
+        return None
+    local_service.warmup()
+    return local_service
+
+
+class CaptionServer:
+    """WebSocket-Server - eine LiveCaptioner-Session pro Verbindung, ein Modell für alle"""
+
+    def __init__(self, local_service, host: Optional[str] = None, port: Optional[int] = None):
+        if not WEBSOCKETS_AVAILABLE:
+            raise RuntimeError("websockets ist nicht installiert (pip install websockets)")
+        self.local_service = local_service
+        self.host = host or config.CAPTIONS_HOST
+        self.port = port if port is not None else config.CAPTIONS_PORT
+
+    async def handle(self, websocket, path=None):
+        loop = asyncio.get_running_loop()
+
+        def send(event: dict):
+            # Aus dem Dekodier-Thread in die Event-Loop der Verbindung
+            asyncio.run_coroutine_threadsafe(websocket.send(json.dumps(event, ensure_ascii=False)), loop)
+
+        captioner = LiveCaptioner(self.local_service, send, sample_rate=config.SAMPLE_RATE)
+        logger.info("Live-Untertitel: neue Verbindung")
+        try:
+            async for message in websocket:
+                if isinstance(message, bytes):
+                    captioner.feed(message)
+                elif message.strip().lower() == "end":
+                    break
+        except websockets.ConnectionClosed:
+            pass
+        finally:
+            stats = await loop.run_in_executor(None, captioner.finish)
+            logger.info(f"Live-Untertitel beendet: {stats['audio_seconds']:.1f}s Audio, "
+                        f"Echtzeitfaktor {stats['realtime_factor']}, Lag p95 {stats['lag_p95']}s")
+            try:
+                await websocket.send(json.dumps({"type": "stats", **stats}))
+            except websockets.ConnectionClosed:
+                pass
+
+    async def serve(self, stop: asyncio.Event):
+        async with websockets.serve(self.handle, self.host, self.port, max_size=2 ** 20):
+            logger.info(f"Live-Untertitel auf ws://{self.host}:{self.port}")
+            await stop.wait()
+
+
+def cli(argv: Optional[List[str]] = None) -> int:
+    """python -m src captions - WebSocket-Server für Live-Untertitel"""
+    parser = argparse.ArgumentParser(prog="python -m src captions",
+                                     description="Live-Untertitel aus einem PCM-Stream per WebSocket")
+    parser.add_argument('--host', default=None, help='Adresse (Standard: CAPTIONS_HOST)')
+    parser.add_argument('--port', type=int, default=None, help='Port (Standard: CAPTIONS_PORT)')
+    parser.add_argument('--model', default=None, help='Modellgröße (Standard: WHISPER_MODEL_SIZE)')
+    args = parser.parse_args(argv)
+
+    if not WEBSOCKETS_AVAILABLE:
+        logger.error("websockets ist nicht installiert (pip install websockets)")
+        return 2
+    if config.SAMPLE_RATE != WHISPER_SAMPLE_RATE:
+        logger.error(f"Live-Untertitel benötigen SAMPLE_RATE={WHISPER_SAMPLE_RATE}")
+        return 2
+    if args.model:
+        config.WHISPER_MODEL_SIZE = args.model
+
+    local_service = get_local_service()
+    if local_service is None:
+        logger.error(f"Whisper-Modell '{config.WHISPER_MODEL_SIZE}' nicht verfügbar (python -m src batch --download)")
+        return 2
+
+    async def main():
+        stop = asyncio.Event()
+        loop = asyncio.get_running_loop()
+        try:
+            import signal
+
+            loop.add_signal_handler(signal.SIGTERM, stop.set)
+        except (NotImplementedError, RuntimeError):
+            pass  # Windows: nur Strg+C
+        await CaptionServer(local_service, args.host, args.port).serve(stop)
+
+    try:
+        asyncio.run(main())
+    except KeyboardInterrupt:
+        pass
+    return 0
@@ -10,13 +10,26 @@ from typing import Optional, TYPE_CHECKING
 
 # Lazy imports - nur laden wenn tatsächlich verwendet
 if TYPE_CHECKING:
+    import numpy as np
     import torch
     from faster_whisper import WhisperModel
 
 from src.config import config
+from src.decoding_profiles import VAD_PARAMETERS, decoding_options, profile_selector
+from src.inference_scheduler import (InferenceScheduler, assign_segments, concatenate_clips, inference_mode,
+                                     model_threading, supports_batched_clips)
+from src.metrics import metrics
 
 logger = logging.getLogger(__name__)
 
+# Länge der Stille für die Warm-up-Inferenz
+WARMUP_SECONDS = 1
+
+# Obergrenze für Audio aus Dateien und dem Speicher (wie bei der API)
+MAX_AUDIO_MB = 25
+# Container, die der Decoder aus dem Speicher liest (Dateiname ist der einzige Formathinweis)
+AUDIO_DATA_EXTENSIONS = ('.wav', '.mp3', '.m4a', '.flac', '.ogg', '.opus', '.webm', '.mp4')
+
 # Globales Singleton für das lokale Transkriptionsservice
 _instance: Optional['LocalTranscriptionService'] = None
 _instance_model_size: Optional[str] = None
@@ -50,6 +63,8 @@ class LocalTranscriptionService:
 
         self.model: Optional[WhisperModel] = None
         self.model_size = config.WHISPER_MODEL_SIZE
+        self.scheduler: Optional[InferenceScheduler] = None
+        self._batched_pipeline = None
         self._initialized = True
         self._load_model()
 
@@ -57,7 +72,6 @@ class LocalTranscriptionService:
         """Lädt das Whisper-Modell"""
         try:
             # Lazy imports - nur hier laden wenn tatsächlich benötigt
-            import torch
             from faster_whisper import WhisperModel
             from src.model_manager import get_model_path, get_models_dir
             
@@ -73,10 +87,11 @@ class LocalTranscriptionService:
                 return
 
             # Prüfe GPU-Verfügbarkeit
-            device = "cuda" if torch.cuda.is_available() else "cpu"
-            compute_type = "float16" if device == "cuda" else "int8"
+            device, compute_type = _detect_device()
 
-            logger.info(f"Verwende Device: {device}, Compute Type: {compute_type} (Pfad: {model_path})")
+            threading_options = model_threading()
+            logger.info(f"Verwende Device: {device}, Compute Type: {compute_type} (Pfad: {model_path}, "
+                        f"{threading_options['num_workers']} Worker x {threading_options['cpu_threads'] or 'Standard'} Threads)")
 
             # Unterdrücke huggingface_hub Warnungen über fehlende hf_xet
             import warnings
@@ -84,12 +99,17 @@ class LocalTranscriptionService:
                 warnings.filterwarnings("ignore", message=".*Xet Storage is enabled.*", category=UserWarning)
 
                 # Nutze den Pfad vom Model-Manager
+                load_start = time.time()
                 self.model = WhisperModel(
                     str(model_path), # Expliziter Pfad zum lokalen Modell
                     device=device,
                     compute_type=compute_type,
-                    local_files_only=True # Erzwinge lokale Dateien
+                    local_files_only=True, # Erzwinge lokale Dateien
+                    **threading_options
                 )
+                metrics.model_load_seconds.observe(time.time() - load_start, model=self.model_size)
+
+            self._start_scheduler()
 
             logger.info(f"✓ Whisper-Modell '{self.model_size}' erfolgreich geladen (Device: {device}, App v{config.APP_VERSION})")
 
@@ -99,46 +119,119 @@ class LocalTranscriptionService:
             # Wir werfen hier keinen Fehler mehr, damit die App nicht abstürzt wenn Modelle fehlen
             # raise RuntimeError(f"Whisper-Modell konnte nicht geladen werden: {e}")
 
+    def _start_scheduler(self):
+        """Scheduler für gleichzeitige Anfragen (LOCAL_INFERENCE_MODE)"""
+        mode = inference_mode()
+        if mode == "off" or self.scheduler is not None:
+            return
+
+        batched_decode = None
+        if mode == "batched":
+            import faster_whisper
+
+            version = getattr(faster_whisper, "__version__", "")
+            if supports_batched_clips(version) and hasattr(faster_whisper, "BatchedInferencePipeline"):
+                self._batched_pipeline = faster_whisper.BatchedInferencePipeline(model=self.model)
+                batched_decode = self._decode_batch
+            else:
+                logger.warning(f"Batched-Modus benötigt faster-whisper >= 1.2 (installiert: {version or '?'}) "
+                               "- verwende parallel")
+
+        self.scheduler = InferenceScheduler(self._decode, mode=mode, batched_decode=batched_decode)
+
+    def warmup(self) -> bool:
+        """Führt eine kurze Dummy-Inferenz auf Stille aus, damit die erste echte Anfrage ein heißes Modell vorfindet"""
+        if not self._ensure_model_loaded():
+            return False
+
+        try:
+            import numpy as np
+
+            start_time = time.time()
+            # VAD aus, sonst würde Stille komplett übersprungen und der Decoder nie ausgeführt
+            segments, _ = self.model.transcribe(
+                np.zeros(WARMUP_SECONDS * 16000, dtype=np.float32),
+                language="de",
+                beam_size=1,
+                vad_filter=False,
+                without_timestamps=True
+            )
+            list(segments)  # Generator konsumieren - erst dann läuft die Inferenz
+
+            logger.info(f"Whisper-Modell aufgewärmt in {time.time() - start_time:.2f}s")
+            return True
+
+        except Exception as e:
+            logger.warning(f"Warm-up des Whisper-Modells fehlgeschlagen: {e}")
+            return False
+
+    def touch(self) -> bool:
+        """Hotkey-Druck bei bereitem Modell: keine Inferenz - sie würde mit Streaming und Dekodierung konkurrieren"""
+        return self.model is not None
+
     def transcribe(self, audio_path: str) -> Optional[str]:
         """Transkribiert Audio-Datei zu Text"""
         if not self._validate_audio_file(audio_path):
             return None
 
+        if not self._ensure_model_loaded():
+            return None
+
+        return self._run_transcription(audio_path)
+
+    def transcribe_array(self, audio: "np.ndarray", initial_prompt: Optional[str] = None,
+                         profile: Optional[str] = None) -> Optional[str]:
+        """Transkribiert float32-PCM (16 kHz, Mono) direkt aus dem Speicher (profile: Decoding-Profil erzwingen)"""
+        if audio is None or len(audio) == 0:
+            logger.warning("Leeres Audio-Array - überspringe Transkription")
+            return None
+
+        if not self._ensure_model_loaded():
+            return None
+
+        return self._run_transcription(audio, initial_prompt=initial_prompt, profile=profile)
+
+    def _ensure_model_loaded(self) -> bool:
+        """Stellt sicher, dass das Modell geladen ist (inkl. Re-Initialisierung)"""
+        if self.model:
+            return True
+
+        logger.info("Modell nicht geladen - versuche Re-Inizialisierung...")
+        self._load_model()
+
         if not self.model:
-            logger.info("Modell nicht geladen - versuche Re-Inizialisierung...")
-            self._load_model()
-            
-            if not self.model:
-                logger.error("Lokale Transkription nicht möglich: Whisper-Modell nicht geladen.")
-                from src.notification import notification_service
-                notification_service.show_notification(
-                    "Lokale Transkription", 
-                    f"Das Modell '{self.model_size}' muss erst heruntergeladen werden.",
-                    duration=5
-                )
-                return None
+            logger.error("Lokale Transkription nicht möglich: Whisper-Modell nicht geladen.")
+            from src.notification import notification_service
+            notification_service.show_notification(
+                "Lokale Transkription",
+                f"Das Modell '{self.model_size}' muss erst heruntergeladen werden.",
+                duration=5
+            )
+            return False
+
+        return True
 
+    def _run_transcription(self, audio, initial_prompt: Optional[str] = None,
+                           profile: Optional[str] = None) -> Optional[str]:
+        """Führt die Whisper-Inferenz auf Dateipfad oder Audio-Array aus"""
         try:
             logger.info(f"Starte lokale Transkription mit Modell '{self.model_size}'")
 
             start_time = time.time()
 
-            # Vokabular (Prompt) laden
-            vocabulary = config.get_vocabulary()
-
-            # Transkription durchführen
-            segments, info = self.model.transcribe(
-                audio_path,
-                language="de",  # Deutsche Sprache priorisieren
-                beam_size=5,
-                patience=1.0,
-                initial_prompt=vocabulary if vocabulary else None,
-                vad_filter=True,  # Voice Activity Detection
-                vad_parameters=dict(threshold=0.5, min_speech_duration_ms=250)
-            )
+            # Vokabular (Prompt) laden, falls kein eigener Prompt übergeben wurde
+            if initial_prompt is None:
+                initial_prompt = config.get_vocabulary()
 
-            # Segmente zu Text kombinieren
-            transcript = " ".join([segment.text for segment in segments])
+            if self.scheduler:
+                if self.scheduler.mode == "batched" and not hasattr(audio, "dtype"):
+                    # Batches brauchen dekodiertes PCM (Datei oder BytesIO)
+                    from faster_whisper import decode_audio
+
+                    audio = decode_audio(audio, sampling_rate=16000)
+                transcript = self.scheduler.transcribe(audio, initial_prompt, profile)
+            else:
+                transcript = self._decode(audio, initial_prompt, profile=profile)
 
             duration = time.time() - start_time
             logger.info(f"Transkription abgeschlossen in {duration:.2f}s")
@@ -154,29 +247,93 @@ class LocalTranscriptionService:
             logger.error(f"Fehler bei lokaler Transkription: {e}")
             return None
 
+    def _decode(self, audio, initial_prompt: Optional[str] = None, profile: Optional[str] = None) -> str:
+        """Eine Inferenz auf dem Modell (direkt oder aus einem Scheduler-Worker)"""
+        if not hasattr(audio, "dtype"):
+            # Datei/BytesIO vorab dekodieren (macht transcribe sonst intern) - die Länge bestimmt das Profil
+            from faster_whisper import decode_audio
+
+            audio = decode_audio(audio, sampling_rate=16000)
+        audio_seconds = len(audio) / 16000
+        profile = profile or profile_selector.choose(audio_seconds)
+
+        start_time = time.time()
+        segments, info = self.model.transcribe(
+            audio,
+            language="de",  # Deutsche Sprache priorisieren
+            initial_prompt=initial_prompt if initial_prompt else None,
+            vad_filter=True,  # Voice Activity Detection
+            vad_parameters=VAD_PARAMETERS,
+            **decoding_options(profile)
+        )
+
+        # Segmente zu Text kombinieren (erst hier läuft die Inferenz)
+        transcript = " ".join([segment.text for segment in segments])
+        profile_selector.record(profile, audio_seconds, time.time() - start_time)
+        logger.debug(f"Decoding-Profil '{profile}' für {audio_seconds:.1f}s Audio")
+        return transcript
+
+    def _decode_batch(self, audios: list, initial_prompt: Optional[str] = None, profile: Optional[str] = None) -> list:
+        """Mehrere Anfragen in einem Durchlauf der BatchedInferencePipeline"""
+        audio, clips, bounds = concatenate_clips(audios)
+        # Profil nach der längsten Anfrage - sie bestimmt die Dauer des Batches
+        profile = profile or profile_selector.choose(max(end - start for start, end in bounds))
+        options = decoding_options(profile)
+        # Clips werden unabhängig dekodiert; Zeitstempel braucht nur die Zuordnung der Segmente nicht
+        options.pop("condition_on_previous_text", None)
+        options["without_timestamps"] = True
+
+        start_time = time.time()
+        segments, info = self._batched_pipeline.transcribe(
+            audio,
+            language="de",
+            initial_prompt=initial_prompt if initial_prompt else None,
+            vad_filter=False,  # Clip-Grenzen kommen aus den Anfragen
+            clip_timestamps=clips,
+            batch_size=min(len(clips), config.LOCAL_MAX_BATCH),
+            **options
+        )
+        texts = [text or "" for text in assign_segments(segments, bounds)]
+        profile_selector.record(profile, len(audio) / 16000, time.time() - start_time)
+        return texts
+
     def transcribe_audio_data(self, audio_data: bytes, filename: str = "audio.mp3") -> Optional[str]:
         """Transkribiert komprimierte Audio-Daten zu Text"""
         import io
-        import tempfile
+
+        if not audio_data:
+            logger.warning("Leere Audio-Daten - überspringe Transkription")
+            return None
+
+        if not self._validate_audio_data(audio_data, filename):
+            return None
+
+        if not self._ensure_model_loaded():
+            return None
 
         try:
-            # Temporäre Datei erstellen
-            with tempfile.NamedTemporaryFile(suffix=Path(filename).suffix, delete=False) as temp_file:
-                temp_file.write(audio_data)
-                temp_path = temp_file.name
-
-            try:
-                # Transkribiere temporäre Datei
-                result = self.transcribe(temp_path)
-                return result
-            finally:
-                # Temporäre Datei löschen
-                Path(temp_path).unlink(missing_ok=True)
+            # faster-whisper dekodiert file-like Objekte direkt - keine Temp-Datei nötig
+            audio_file = io.BytesIO(audio_data)
+            audio_file.name = filename
+            return self._run_transcription(audio_file)
 
         except Exception as e:
             logger.error(f"Fehler bei Transkription von Audio-Daten: {e}")
             return None
 
+    def _validate_audio_data(self, audio_data: bytes, filename: str) -> bool:
+        """Validiert Audio-Daten aus dem Speicher (gleiche Größengrenze wie für Dateien)"""
+        size_mb = len(audio_data) / (1024 * 1024)
+        if size_mb > MAX_AUDIO_MB:
+            logger.error(f"Audio-Daten zu groß: {size_mb:.1f}MB (max {MAX_AUDIO_MB}MB)")
+            return False
+
+        suffix = Path(filename).suffix.lower()
+        if suffix not in AUDIO_DATA_EXTENSIONS:
+            logger.error(f"Nicht unterstütztes Audio-Format: '{filename}'")
+            return False
+        return True
+
     def _validate_audio_file(self, audio_path: str) -> bool:
         """Validiert die Audio-Datei"""
         try:
@@ -192,8 +349,8 @@ class LocalTranscriptionService:
 
             # Prüfe Dateigröße (max 25MB wie bei API)
             size_mb = path.stat().st_size / (1024 * 1024)
-            if size_mb > 25:
-                logger.error(f"Audio-Datei zu groß: {size_mb:.1f}MB (max 25MB)")
+            if size_mb > MAX_AUDIO_MB:
+                logger.error(f"Audio-Datei zu groß: {size_mb:.1f}MB (max {MAX_AUDIO_MB}MB)")
                 return False
 
             # Prüfe Dateiendung
@@ -230,16 +387,34 @@ class LocalTranscriptionService:
             return {"available": False}
 
         try:
-            import torch
-            device = "cuda" if torch.cuda.is_available() else "cpu"
-            compute_type = "float16" if device == "cuda" else "int8"
+            device, compute_type = _detect_device()
         except ImportError:
             device = "unknown"
             compute_type = "unknown"
 
-        return {
+        info = {
             "available": True,
             "model_size": self.model_size,
             "device": device,
             "compute_type": compute_type
-        }
\ No newline at end of file
+        }
+        if self.scheduler:
+            info["scheduler"] = self.scheduler.get_stats()
+        info["decoding_profile"] = config.DECODING_PROFILE
+        info["profile_rtf"] = profile_selector.get_stats()
+        return info
+
+
+def _detect_device() -> tuple:
+    """Ermittelt Device und Compute Type (ohne torch zu importieren, falls möglich)"""
+    try:
+        # ctranslate2 ist ohnehin Abhängigkeit von faster-whisper und deutlich schneller importiert als torch
+        import ctranslate2
+        has_cuda = ctranslate2.get_cuda_device_count() > 0
+    except ImportError:
+        import torch
+        has_cuda = torch.cuda.is_available()
+
+    device = "cuda" if has_cuda else "cpu"
+    compute_type = "float16" if device == "cuda" else "int8"
+    return device, compute_type
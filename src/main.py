@@ -10,6 +10,7 @@ import threading
 import time
 import warnings
 import winsound
+from contextlib import nullcontext
 from pathlib import Path
 from typing import Optional
 
@@ -34,8 +35,12 @@ try:
         CRITICAL_EXCEPTIONS
     )
     from .hotkey_listener import HotkeyListener
+    from .http_client import close_shared_clients, prewarm_connection
+    from .latency_trace import latency_tracker
+    from .metrics import MetricsExporter, error_type, metrics
     from .mouse_integration import MouseWheelIntegration
     from .notification import notification_service
+    from .prewarm import PipelinePrewarmer
     from .settings_gui import SettingsGUI
     from .text_processor import TextProcessor
     from .transcription import TranscriptionService
@@ -56,8 +61,12 @@ except ImportError:
         CRITICAL_EXCEPTIONS
     )
     from hotkey_listener import HotkeyListener
+    from http_client import close_shared_clients, prewarm_connection
+    from latency_trace import latency_tracker
+    from metrics import MetricsExporter, error_type, metrics
     from mouse_integration import MouseWheelIntegration
     from notification import notification_service
+    from prewarm import PipelinePrewarmer
     from settings_gui import SettingsGUI
     from text_processor import TextProcessor
     from transcription import TranscriptionService
@@ -120,6 +129,11 @@ class VoiceTranscriberApp:
 
         # Singleton-Instanz des TranscriptionService
         self._transcription_service_instance = None
+        self.prewarmer = None
+
+        # Latenz-Trace der laufenden Diktierung (Zeitpunkt 0 = Hotkey-Druck)
+        self._latency_trace = None
+        self.metrics_exporter = None
 
     def initialize_components(self):
         """Initialisiert alle Anwendungskomponenten"""
@@ -130,11 +144,24 @@ class VoiceTranscriberApp:
             self.hotkey_listener = HotkeyListener()
             self.mouse_integration = MouseWheelIntegration()
             self.audio_recorder = AudioRecorder()
+            # Stream dauerhaft offen halten, damit der Sprechbeginn nicht abgeschnitten wird
+            if config.AUDIO_PREROLL_ENABLED:
+                self.audio_recorder.start_monitoring()
             # TranscriptionService als Singleton initialisieren
             self._transcription_service_instance = TranscriptionService()
             logger.info("TranscriptionService Singleton initialisiert")
+            # Lokales Modell im Hintergrund vorladen, damit die erste Diktierung nicht wartet
+            if config.WHISPER_PRELOAD:
+                self._transcription_service_instance.start_warmup()
             self.text_processor = TextProcessor()
             self.clipboard_injector = ClipboardInjector()
+            # TLS-Verbindung zur API im Hintergrund aufbauen
+            prewarm_connection()
+            self.prewarmer = PipelinePrewarmer(self._transcription_service_instance, self.audio_recorder)
+            # Metriken periodisch für node_exporter bzw. Log-Shipper exportieren
+            if config.METRICS_EXPORT_ENABLED:
+                self.metrics_exporter = MetricsExporter(metrics)
+                self.metrics_exporter.start()
 
             # Debug-Datei initialisieren
             self._init_debug_file()
@@ -176,6 +203,9 @@ class VoiceTranscriberApp:
             def on_settings(icon, item):
                 self.show_settings()
 
+            def on_latency_stats(icon, item):
+                self.show_latency_stats()
+
             def on_quit(icon, item):
                 self.quit_application()
 
@@ -183,6 +213,7 @@ class VoiceTranscriberApp:
                 pystray.MenuItem("Status: Bereit", lambda icon, item: None, enabled=False),
                 pystray.Menu.SEPARATOR,
                 pystray.MenuItem("Einstellungen", on_settings),
+                pystray.MenuItem("Latenz-Statistik", on_latency_stats),
                 pystray.Menu.SEPARATOR,
                 pystray.MenuItem("Beenden", on_quit)
             )
@@ -215,12 +246,20 @@ class VoiceTranscriberApp:
             return
 
         logger.info("Hotkey gedrückt - Starte Aufnahme")
+        self._latency_trace = latency_tracker.start() if config.LATENCY_TRACE_ENABLED else None
         self.is_recording = True
         self.recording_stop_event.clear()  # Event zurücksetzen
         self.last_recording_start_time = current_time
 
-        # Akustisches Feedback
-        self.play_beep(config.BEEP_FREQUENCY_START)
+        # Verbindung, Modell und Encoder aufwärmen, während gesprochen wird
+        if self.prewarmer:
+            self.prewarmer.on_hotkey_press()
+
+        # Akustisches Feedback (mit Pre-Roll nicht blockierend - die Aufnahme läuft bereits)
+        if self.audio_recorder and self.audio_recorder.is_monitoring():
+            threading.Thread(target=self.play_beep, args=(config.BEEP_FREQUENCY_START,), daemon=True).start()
+        else:
+            self.play_beep(config.BEEP_FREQUENCY_START)
 
         # Starte Aufnahme in separatem Thread
         self.recording_thread = threading.Thread(target=self._perform_recording)
@@ -235,6 +274,8 @@ class VoiceTranscriberApp:
              return
              
         logger.info("Hotkey losgelassen - Signalisiere Stop")
+        if self._latency_trace:
+            self._latency_trace.mark("release")
         self.recording_stop_event.set()
 
         # Akustisches Feedback (kurz)
@@ -243,11 +284,25 @@ class VoiceTranscriberApp:
     def _perform_recording(self):
         """Führt die komplette Aufnahme- und Verarbeitung durch"""
         final_wav_path = None
+        streaming_session = None
+        trace = self._latency_trace
+        outcome = "error"
+        first_frame_listener = (lambda data: trace.mark_once("first_frame")) if trace else None
         
         try:
-            # 1. Aufnahme starten
+            # 1. Streaming-Session vorbereiten (optional) und Aufnahme starten
+            streaming_session = self._start_streaming_session()
+
+            # Upload-Format vor dem Start wählen, damit schon während der Aufnahme kodiert werden kann
+            upload_format = self._choose_upload_format()
+            self.audio_recorder.upload_format = upload_format
+
+            if first_frame_listener:
+                self.audio_recorder.add_frame_listener(first_frame_listener)
             if not self.audio_recorder.start_recording():
                 raise AudioRecordingError("Konnte Aufnahme nicht starten")
+            if trace:
+                trace.mark("stream_open")
 
             # 2. Warten bis Hotkey losgelassen wird (oder Timeout)
             # wait gibt True zurück wenn Event gesetzt wurde, False bei Timeout
@@ -258,96 +313,239 @@ class VoiceTranscriberApp:
                  self.play_beep(config.BEEP_FREQUENCY_STOP)
 
             # 3. Aufnahme stoppen
-            final_wav_path = self.audio_recorder.stop_recording()
+            # Lokal + 16 kHz Mono: PCM bleibt im Speicher (keine WAV-Datei, kein Encode/Decode)
+            in_memory = self._use_in_memory_audio()
+            pcm_audio = None
+            if in_memory:
+                pcm_audio = self.audio_recorder.stop_recording_in_memory()
+            else:
+                final_wav_path = self.audio_recorder.stop_recording()
+            if trace:
+                trace.mark("stop")
+                self._trace_recorder_timings(trace)
             
             # Reset Status so früh wie möglich, damit neue Aufnahmen möglich sind
             self.is_recording = False
-            
-            if not final_wav_path or not os.path.exists(final_wav_path):
-                 raise AudioRecordingError("Keine Audio-Datei erzeugt")
 
-            # 4. Validierung der Dauer
+            # Streaming: Nur das letzte Teilsegment muss nach dem Release noch dekodiert werden
+            streamed_text = self._finish_streaming_session(streaming_session)
+            streaming_session = None
+
+            # 4. Validierung der Dauer (vor der Datei-Prüfung: reine Stille liefert 0s und keine Datei)
             duration = self.audio_recorder.last_recording_duration
+            if trace:
+                trace.set("audio_seconds", round(duration, 2))
             if duration < 0.3: # Etwas toleranter sein
                 logger.info(f"Aufnahme zu kurz ({duration:.2f}s) - ignoriere")
+                outcome = "too_short"
                 return
+            metrics.recording_seconds.observe(duration)
+            
+            if in_memory:
+                if pcm_audio is None:
+                    raise AudioRecordingError("Keine Audio-Daten aufgenommen")
+            elif not final_wav_path or not os.path.exists(final_wav_path):
+                 raise AudioRecordingError("Keine Audio-Datei erzeugt")
 
-            # 5. Daten laden / Komprimieren
-            compressed_data = None
-            try:
-                # Prüfe ob pydub verfügbar
-                try:
-                    from .audio_recorder import PYDUB_AVAILABLE
-                except ImportError:
-                    from audio_recorder import PYDUB_AVAILABLE
-
-                if PYDUB_AVAILABLE and config.AUDIO_COMPRESSION_ENABLED:
-                    logger.info("Komprimiere Audio...")
-                    compressed_data = self.audio_recorder.compress_audio(final_wav_path)
-                    
-                    if not compressed_data:
-                        logger.warning("Komprimierung lieferte leere Daten - Fallback auf WAV")
-                        compressed_data = None
-                
-                # Fallback: WAV lesen wenn keine Komprimierung oder fehlgeschlagen
-                if compressed_data is None:
-                    with open(final_wav_path, 'rb') as f:
-                        compressed_data = f.read()
+            if streamed_text:
+                logger.info(f"Erkannt (Streaming): {streamed_text[:50]}...")
+                if trace:
+                    trace.set("backend", "streaming")
+                self._process_and_inject_text(streamed_text, trace)
+                outcome = "ok"
+                return
 
-            except Exception as e:
-                logger.error(f"Fehler bei Audio-Verarbeitung: {e}")
-                # Versuch WAV direkt zu lesen als letzter Rettungsanker
-                try:
-                    with open(final_wav_path, 'rb') as f:
-                        compressed_data = f.read()
-                except:
-                    raise AudioRecordingError("Konnte Audio-Datei nicht lesen")
-
-            # 6. Transkription
+            # 5. + 6. Transkription
             if not self._transcription_service_instance:
                 raise TranscriptionError("TranscriptionService nicht bereit")
 
-            logger.info(f"Sende Audio zur Transkription ({len(compressed_data)} bytes)...")
-            
-            # Bestimme Dateinamen für API (wichtig für Whisper Verarbeitungshinweise)
-            filename = "audio.mp3" if (PYDUB_AVAILABLE and config.AUDIO_COMPRESSION_ENABLED) else "audio.wav"
-            
-            raw_text = self._transcription_service_instance.transcribe_audio_data(
-                compressed_data, filename
-            )
+            if in_memory:
+                logger.info(f"Sende PCM direkt an lokales Modell ({duration:.2f}s)...")
+                with self._trace_span(trace, "transcribe"):
+                    raw_text = self._transcription_service_instance.transcribe_pcm(pcm_audio)
+            elif not config.USE_LOCAL_TRANSCRIPTION and self._transcription_service_instance.should_chunk_audio(duration):
+                # Lange Aufnahme: in Chunks parallel an die API statt eines großen Uploads
+                logger.info(f"Lange Aufnahme ({duration:.2f}s) - parallele Chunk-Transkription...")
+                with self._trace_span(trace, "transcribe"):
+                    raw_text = self._transcription_service_instance.transcribe_pcm(self._load_audio_pcm(final_wav_path))
+            else:
+                with self._trace_span(trace, "encode"):
+                    audio_data, filename = self._load_audio_file(final_wav_path, upload_format, duration)
+                logger.info(f"Sende Audio zur Transkription ({len(audio_data)} bytes)...")
+                with self._trace_span(trace, "transcribe"):
+                    raw_text = self._transcription_service_instance.transcribe_audio_data(
+                        audio_data, filename, audio_duration=duration
+                    )
+                if trace:
+                    trace.set("upload_format", filename.rsplit(".", 1)[-1])
+            if trace:
+                trace.set("backend", self._transcription_service_instance.last_backend)
 
             if not raw_text:
                 logger.info("Kein Text erkannt")
+                outcome = "no_text"
                 return
 
             logger.info(f"Erkannt: {raw_text[:50]}...")
             
             # 7. Text verarbeiten & Einfügen
-            self._process_and_inject_text(raw_text)
+            self._process_and_inject_text(raw_text, trace)
+            outcome = "ok"
 
         except AudioRecordingError as e:
             logger.error(f"Aufnahme-Fehler: {e}")
+            metrics.errors.inc(type=error_type(e))
             notification_service.notify_warning(str(e), title="Aufnahme")
         except TranscriptionError as e:
             logger.error(f"Transkriptions-Fehler: {e}")
+            metrics.errors.inc(type=error_type(e))
             notification_service.notify_error(str(e), title="Transkription")
         except Exception as e:
             logger.error(f"Unerwarteter Fehler: {e}", exc_info=True)
+            metrics.errors.inc(type=error_type(e))
             notification_service.notify_error("Systemfehler aufgetreten", title="Fehler")
         finally:
             # Aufräumen
             self.is_recording = False
             self.recording_stop_event.clear()
+            if streaming_session:
+                self._finish_streaming_session(streaming_session)
+            if first_frame_listener:
+                self.audio_recorder.remove_frame_listener(first_frame_listener)
+            metrics.recordings.inc(outcome=outcome)
+            if trace:
+                metrics.observe_session(trace.finish(outcome))
             
             # Temp File löschen? Das macht der AudioRecorder beim nächsten Start oder Cleanup
+
+    @staticmethod
+    def _trace_span(trace, stage: str):
+        """Misst einen Schritt im Latenz-Trace (ohne Trace ein leerer Kontext)"""
+        return trace.span(stage) if trace else nullcontext()
+
+    def _trace_recorder_timings(self, trace):
+        """Übernimmt die im Recorder gemessenen Schritte (VAD, Encoder-Flush) in den Trace"""
+        timings = getattr(self.audio_recorder, "last_timings", None)
+        if not isinstance(timings, dict):
+            return
+        if "vad" in timings:
+            trace.add_span("vad", timings["vad"])
+        if "encoder_flush" in timings:
+            trace.add_span("encode", timings["encoder_flush"])
+
+    def _use_in_memory_audio(self) -> bool:
+        """Prüft, ob die Aufnahme ohne Datei direkt an das lokale Modell gehen kann"""
+        if not self._transcription_service_instance:
+            return False
+
+        try:
+            return self._transcription_service_instance.can_transcribe_in_memory()
+        except Exception as e:
+            logger.warning(f"In-Memory-Prüfung fehlgeschlagen: {e}")
+            return False
+
+    def _load_audio_pcm(self, wav_path: str):
+        """Lädt die WAV-Datei als float32-PCM (für Chunk-Transkription)"""
+        try:
+            from .audio_utils import read_wav_float32
+        except ImportError:
+            from audio_utils import read_wav_float32
+
+        return read_wav_float32(wav_path)
+
+    def _choose_upload_format(self) -> str:
+        """Upload-Format für die nächste Aufnahme (nach gemessenem Durchsatz, falls verfügbar)"""
+        if config.USE_LOCAL_TRANSCRIPTION or not self._transcription_service_instance:
+            return config.AUDIO_COMPRESSION_FORMAT
+
+        try:
+            return self._transcription_service_instance.choose_upload_format()
+        except Exception as e:
+            logger.warning(f"Upload-Format konnte nicht gewählt werden: {e}")
+            return config.AUDIO_COMPRESSION_FORMAT
+
+    def _load_audio_file(self, wav_path: str, output_format: Optional[str] = None, audio_duration: float = 0.0):
+        """Lädt die WAV-Datei und komprimiert sie bei Bedarf für den Upload"""
+        # Prüfe ob pydub verfügbar
+        try:
+            from .audio_encoder import file_extension, is_native_format
+            from .audio_recorder import PYDUB_AVAILABLE
+        except ImportError:
+            from audio_encoder import file_extension, is_native_format
+            from audio_recorder import PYDUB_AVAILABLE
+
+        output_format = output_format or config.AUDIO_COMPRESSION_FORMAT
+
+        # Komprimierung lohnt sich nur für den Upload - lokal würde sie nur Zeit kosten
+        # ("wav" = bei schneller Verbindung bewusst unkomprimiert)
+        encoder_available = PYDUB_AVAILABLE or is_native_format(output_format)
+        compress = (encoder_available and config.AUDIO_COMPRESSION_ENABLED and
+                    not config.USE_LOCAL_TRANSCRIPTION and output_format != "wav")
+
+        try:
+            if compress:
+                logger.info(f"Komprimiere Audio ({output_format})...")
+                start_time = time.time()
+                compressed_data = self.audio_recorder.compress_audio(wav_path, output_format=output_format)
+
+                if compressed_data:
+                    # Kodierzeit und Größe fließen in die nächste Formatwahl ein
+                    if self._transcription_service_instance:
+                        self._transcription_service_instance.record_encode(
+                            output_format, audio_duration, time.time() - start_time, len(compressed_data)
+                        )
+                    # Dateiname ist wichtig für Whisper Verarbeitungshinweise
+                    return compressed_data, f"audio.{file_extension(output_format)}"
+                logger.warning("Komprimierung lieferte leere Daten - Fallback auf WAV")
+
+            # Fallback: WAV lesen wenn keine Komprimierung oder fehlgeschlagen
+            with open(wav_path, 'rb') as f:
+                return f.read(), "audio.wav"
+
+        except Exception as e:
+            logger.error(f"Fehler bei Audio-Verarbeitung: {e}")
+            # Versuch WAV direkt zu lesen als letzter Rettungsanker
+            try:
+                with open(wav_path, 'rb') as f:
+                    return f.read(), "audio.wav"
+            except Exception:
+                raise AudioRecordingError("Konnte Audio-Datei nicht lesen")
+
+    def _start_streaming_session(self):
+        """Startet inkrementelle Transkription und verbindet sie mit dem Recorder"""
+        if not self._transcription_service_instance:
+            return None
+
+        try:
+            session = self._transcription_service_instance.create_streaming_session()
+            if session:
+                self.audio_recorder.add_frame_listener(session.feed)
+                logger.info("Streaming-Transkription aktiv")
+            return session
+        except Exception as e:
+            logger.warning(f"Streaming-Transkription konnte nicht gestartet werden: {e}")
+            return None
+
+    def _finish_streaming_session(self, session) -> Optional[str]:
+        """Trennt die Session vom Recorder und liefert den gestreamten Text"""
+        if not session:
+            return None
+
+        self.audio_recorder.remove_frame_listener(session.feed)
+        try:
+            return session.finish(timeout=config.MAX_RECORDING_DURATION)
+        except Exception as e:
+            logger.warning(f"Streaming-Transkription fehlgeschlagen: {e}")
+            return None
             
-    def _process_and_inject_text(self, raw_text):
+    def _process_and_inject_text(self, raw_text, trace=None):
         """Hilfsmethode für Textverarbeitung und Injection"""
         try:
             # Text korrigieren
             corrected_text = raw_text
             try:
-                processed = self.text_processor.process_text(raw_text)
+                with self._trace_span(trace, "correction"):
+                    processed = self.text_processor.process_text(raw_text)
                 if processed:
                     corrected_text = processed
             except Exception as e:
@@ -356,7 +554,8 @@ class VoiceTranscriberApp:
             self._write_debug_entry(f"Transkript: {corrected_text}")
 
             # Text einfügen
-            success = self.clipboard_injector.inject_text(corrected_text)
+            with self._trace_span(trace, "inject"):
+                success = self.clipboard_injector.inject_text(corrected_text)
             if success:
                 logger.info("Text eingefügt")
                 notification_service.notify_success("Eingefügt", title="Info")
@@ -377,6 +576,11 @@ class VoiceTranscriberApp:
         except Exception as e:
             logger.warning(f"Beep konnte nicht abgespielt werden: {e}")
 
+    def show_latency_stats(self, icon=None, item=None):
+        """Zeigt die Latenz-Perzentile der letzten Diktierungen"""
+        logger.info(f"Latenz-Statistik (ms):\n{latency_tracker.format_summary()}")
+        notification_service.notify_info(latency_tracker.format_summary(compact=True), title="Latenz")
+
     def show_settings(self, icon=None, item=None):
         """Zeigt Einstellungen"""
         try:
@@ -477,10 +681,15 @@ class VoiceTranscriberApp:
         logger.info("Führe Cleanup durch...")
         if self.audio_recorder:
             self.audio_recorder.cleanup()
+        if self._transcription_service_instance:
+            self._transcription_service_instance.shutdown()
+        close_shared_clients()
         if self.hotkey_listener:
             self.hotkey_listener.cleanup()
         if self.mouse_integration:
             self.mouse_integration.stop()
+        if self.metrics_exporter:
+            self.metrics_exporter.stop()
 
     def run(self):
         """Startet die Anwendung"""
@@ -502,6 +711,10 @@ class VoiceTranscriberApp:
 
 def main():
     """Haupteinstiegspunkt"""
+    # Nötig für den Transkriptions-Worker-Prozess in der PyInstaller-EXE
+    import multiprocessing
+    multiprocessing.freeze_support()
+
     # Unterdrücke bekannte Warnungen
     warnings.filterwarnings("ignore", message=".*pkg_resources.*", category=UserWarning)
 
@@ -0,0 +1,340 @@
+"""
+Metrics - Zähler und Histogramme für das Monitoring vieler Arbeitsplätze
+Die Registry sammelt Aufnahmen, Upload-Volumen, Backends, Cache-Treffer,
+Wiederholungen, Latenzen pro Stufe, Modell-Ladezeiten und Fehler nach
+Klasse (src/exceptions.py). Der MetricsExporter schreibt sie periodisch
+atomar als Prometheus-Textfile (node_exporter textfile collector) oder
+JSON-Snapshot ins AppData-Verzeichnis.
+"""
+
+import json
+import logging
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from src.config import config
+from src.exceptions import APIError, NetworkError, VoiceTranscriberError
+
+logger = logging.getLogger(__name__)
+
+PREFIX = "voice_transcriber_"
+
+# Sekunden - vom schnellen Cache-Treffer bis zur langen API-Anfrage
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.0, 5.0, 10.0, 30.0)
+AUDIO_BUCKETS = (1.0, 2.0, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0)
+MODEL_LOAD_BUCKETS = (0.5, 1.0, 2.0, 5.0, 10.0, 30.0, 60.0)
+BATCH_SIZE_BUCKETS = (1, 2, 4, 8, 16, 32)
+
+LabelKey = Tuple[str, ...]
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+
+
+def _format_labels(names: Iterable[str], values: Iterable[str], extra: str = "") -> str:
+    parts = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _format_value(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+class _Metric:
+    metric_type = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Tuple[str, ...] = ()):
+        self.name = PREFIX + name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, str]) -> LabelKey:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name}: Labels {sorted(labels)} statt {list(self.labelnames)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def _header(self) -> List[str]:
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.metric_type}"]
+
+
+class Counter(_Metric):
+    """Monoton steigender Zähler"""
+
+    metric_type = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Tuple[str, ...] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[LabelKey, float] = {}
+
+    def inc(self, amount: float = 1.0, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels) -> float:
+        with self._lock:
+            return self._values.get(self._key(labels), 0.0)
+
+    def to_prometheus(self) -> List[str]:
+        with self._lock:
+            items = sorted(self._values.items())
+        lines = self._header()
+        for key, value in items:
+            lines.append(f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}")
+        return lines
+
+    def to_dict(self) -> dict:
+        with self._lock:
+            items = sorted(self._values.items())
+        return {
+            "type": self.metric_type,
+            "help": self.documentation,
+            "samples": [{"labels": dict(zip(self.labelnames, key)), "value": value} for key, value in items],
+        }
+
+
+class Gauge(Counter):
+    """Aktueller Messwert (z.B. gemessener Upload-Durchsatz)"""
+
+    metric_type = "gauge"
+
+    def set(self, value: float, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+
+class Histogram(_Metric):
+    """Verteilung mit festen Buckets (kumulativ wie bei Prometheus)"""
+
+    metric_type = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Tuple[str, ...] = (),
+                 buckets: Tuple[float, ...] = LATENCY_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # Pro Label-Kombination: Zähler je Bucket (+Inf zuletzt), Summe
+        self._counts: Dict[LabelKey, List[int]] = {}
+        self._sums: Dict[LabelKey, float] = {}
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        with self._lock:
+            counts = self._counts.setdefault(key, [0] * (len(self.buckets) + 1))
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    counts[i] += 1
+                    break
+            else:
+                counts[-1] += 1
+            self._sums[key] = self._sums.get(key, 0.0) + value
+
+    def count(self, **labels) -> int:
+        with self._lock:
+            return sum(self._counts.get(self._key(labels), []))
+
+    def _snapshot(self):
+        with self._lock:
+            return [(key, list(counts), self._sums[key]) for key, counts in sorted(self._counts.items())]
+
+    def to_prometheus(self) -> List[str]:
+        lines = self._header()
+        for key, counts, total in self._snapshot():
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                le = "+Inf" if bound == float("inf") else _format_value(bound)
+                labels = _format_labels(self.labelnames, key, f'le="{le}"')
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            labels = _format_labels(self.labelnames, key)
+            lines.append(f"{self.name}_sum{labels} {_format_value(round(total, 6))}")
+            lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
+
+    def to_dict(self) -> dict:
+        samples = []
+        for key, counts, total in self._snapshot():
+            cumulative, buckets = 0, {}
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                buckets["+Inf" if bound == float("inf") else _format_value(bound)] = cumulative
+            samples.append({"labels": dict(zip(self.labelnames, key)), "count": cumulative,
+                            "sum": round(total, 6), "buckets": buckets})
+        return {"type": self.metric_type, "help": self.documentation, "samples": samples}
+
+
+class MetricsRegistry:
+    """Sammlung aller Metriken mit Ausgabe als Prometheus-Text oder JSON"""
+
+    def __init__(self):
+        self._metrics: List[_Metric] = []
+
+    def _register(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Tuple[str, ...] = ()) -> Counter:
+        return self._register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name: str, documentation: str, labelnames: Tuple[str, ...] = ()) -> Gauge:
+        return self._register(Gauge(name, documentation, labelnames))
+
+    def histogram(self, name: str, documentation: str, labelnames: Tuple[str, ...] = (),
+                  buckets: Tuple[float, ...] = LATENCY_BUCKETS) -> Histogram:
+        return self._register(Histogram(name, documentation, labelnames, buckets))
+
+    def to_prometheus(self) -> str:
+        lines = []
+        for metric in self._metrics:
+            lines.extend(metric.to_prometheus())
+        return "\n".join(lines) + "\n"
+
+    def to_dict(self) -> dict:
+        return {
+            "timestamp": round(time.time(), 3),
+            "app_version": config.APP_VERSION,
+            "metrics": {metric.name: metric.to_dict() for metric in self._metrics},
+        }
+
+    def write(self, path: Path, output_format: str = "prometheus"):
+        """Schreibt atomar (temporäre Datei + Umbenennen), damit kein Leser eine halbe Datei sieht"""
+        content = (json.dumps(self.to_dict(), indent=2) if output_format == "json"
+                   else self.to_prometheus())
+        path.parent.mkdir(parents=True, exist_ok=True)
+        temp_path = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+        with open(temp_path, "w", encoding="utf-8", newline="\n") as f:
+            f.write(content)
+        os.replace(temp_path, path)
+
+
+class AppMetrics(MetricsRegistry):
+    """Die Metriken der Anwendung"""
+
+    def __init__(self):
+        super().__init__()
+        self.recordings = self.counter(
+            "recordings_total", "Abgeschlossene Diktierungen nach Ergebnis", ("outcome",))
+        self.recording_seconds = self.histogram(
+            "recording_audio_seconds", "Audiodauer der Diktierungen nach VAD", buckets=AUDIO_BUCKETS)
+        self.upload_bytes = self.counter(
+            "upload_bytes_total", "An die API hochgeladene Audio-Bytes (inkl. Wiederholungen)", ("format",))
+        self.upload_throughput = self.gauge(
+            "upload_throughput_bytes_per_second", "Gemessener Upload-Durchsatz (gleitender Mittelwert)")
+        self.transcriptions = self.counter(
+            "transcriptions_total", "Erfolgreiche Transkriptionen nach Backend", ("backend",))
+        self.backend_failures = self.counter(
+            "backend_failures_total", "Fehlgeschlagene Transkriptionen nach Backend", ("backend",))
+        self.cache_requests = self.counter(
+            "cache_requests_total", "Abfragen des Transkript-Caches", ("result",))
+        self.retries = self.counter(
+            "retries_total", "Wiederholte API-Anfragen", ("operation",))
+        self.errors = self.counter(
+            "errors_total", "Fehler nach Klasse aus src/exceptions.py", ("type",))
+        self.stage_latency = self.histogram(
+            "stage_latency_seconds", "Dauer pro Stufe der Diktier-Pipeline", ("stage",))
+        self.model_load_seconds = self.histogram(
+            "model_load_seconds", "Ladezeit des lokalen Whisper-Modells", ("model",),
+            buckets=MODEL_LOAD_BUCKETS)
+        self.watch_queue_depth = self.gauge(
+            "watch_queue_depth", "Wartende Dateien im Watch-Folder-Daemon")
+        self.watch_files = self.counter(
+            "watch_files_total", "Vom Watch-Folder-Daemon verarbeitete Dateien nach Status", ("status",))
+        self.decoding_profiles = self.counter(
+            "decoding_profile_total", "Lokale Dekodierungen nach Decoding-Profil", ("profile",))
+        self.local_batch_size = self.histogram(
+            "local_batch_size", "Anfragen pro Batch im Inference-Scheduler des lokalen Modells",
+            buckets=BATCH_SIZE_BUCKETS)
+        self.server_requests = self.counter(
+            "server_requests_total", "Anfragen an den Transkriptions-Server nach HTTP-Status", ("status",))
+        self.server_queue_depth = self.gauge(
+            "server_queue_depth", "Wartende Anfragen im Transkriptions-Server")
+
+    def observe_session(self, record: Optional[dict]):
+        """Übernimmt Schritte und Gesamtzeiten eines Latenz-Traces (Werte in ms)"""
+        if not record:
+            return
+        for stage, value in record.get("spans", {}).items():
+            self.stage_latency.observe(value / 1000, stage=stage)
+        for stage in ("release_to_inject", "total"):
+            if stage in record:
+                self.stage_latency.observe(record[stage] / 1000, stage=stage)
+
+
+def error_type(error: BaseException) -> str:
+    """Ordnet eine Exception einer Klasse aus src/exceptions.py zu (begrenzte Label-Menge)"""
+    if isinstance(error, VoiceTranscriberError):
+        return error.__class__.__name__
+    if isinstance(error, (ConnectionError, TimeoutError)):
+        return NetworkError.__name__
+
+    try:
+        import httpx
+        import openai
+
+        if isinstance(error, (openai.APIConnectionError, httpx.TransportError)):
+            return NetworkError.__name__
+        if isinstance(error, openai.OpenAIError):
+            return APIError.__name__
+    except ImportError:
+        pass
+    return VoiceTranscriberError.__name__
+
+
+def default_metrics_file(output_format: str) -> Path:
+    from src.user_config import user_config
+
+    suffix = "json" if output_format == "json" else "prom"
+    return user_config.get_appdata_dir() / f"metrics.{suffix}"
+
+
+class MetricsExporter:
+    """Schreibt die Registry periodisch in eine Datei (Hintergrund-Thread)"""
+
+    def __init__(self, registry: MetricsRegistry, path: Optional[Path] = None,
+                 output_format: Optional[str] = None, interval: Optional[float] = None):
+        self.registry = registry
+        self.output_format = (output_format or config.METRICS_EXPORT_FORMAT).lower()
+        self.path = path or (Path(config.METRICS_EXPORT_FILE) if config.METRICS_EXPORT_FILE
+                             else default_metrics_file(self.output_format))
+        self.interval = interval if interval is not None else config.METRICS_EXPORT_INTERVAL
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def flush(self) -> bool:
+        try:
+            self.registry.write(self.path, self.output_format)
+            return True
+        except OSError as e:
+            logger.warning(f"Metriken konnten nicht geschrieben werden ({self.path}): {e}")
+            return False
+
+    def _run(self):
+        while not self._stop_event.wait(self.interval):
+            self.flush()
+
+    def start(self):
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name="MetricsExporter", daemon=True)
+        self._thread.start()
+        logger.info(f"Metrik-Export aktiv: {self.path} (alle {self.interval:.0f}s)")
+
+    def stop(self):
+        """Beendet den Thread und schreibt einen letzten Stand"""
+        self._stop_event.set()
+        if self._thread:
+            self._thread.join(timeout=2.0)
+            self._thread = None
+        self.flush()
+
+
+# Globale Instanz für die Anwendung
+metrics = AppMetrics()
@@ -0,0 +1,82 @@
+"""
+Prewarm - Spekulatives Vorwärmen der Pipeline beim Hotkey-Druck
+Während gesprochen wird, werden API-Verbindung, lokales Modell und Encoder
+parallel zur Aufnahme aufgewärmt, damit nach dem Loslassen kein Kaltstart
+anfällt.
+"""
+
+import logging
+import threading
+import time
+from typing import Callable, Dict, List, Optional
+
+from src.config import config
+from src.http_client import prewarm_connection
+
+logger = logging.getLogger(__name__)
+
+
+class PipelinePrewarmer:
+    """Startet Vorwärm-Aufgaben beim Hotkey-Druck (mit Cooldown pro Aufgabe)"""
+
+    def __init__(self, transcription_service, audio_recorder, cooldown_seconds: Optional[float] = None):
+        self.transcription_service = transcription_service
+        self.audio_recorder = audio_recorder
+        self.cooldown_seconds = cooldown_seconds if cooldown_seconds is not None else config.PREWARM_COOLDOWN_SECONDS
+
+        self._last_run: Dict[str, float] = {}
+        self._running: Dict[str, threading.Thread] = {}
+        self._lock = threading.Lock()
+
+    def on_hotkey_press(self) -> List[str]:
+        """Startet alle fälligen Vorwärm-Aufgaben im Hintergrund; gibt deren Namen zurück"""
+        if not config.PRESS_PREWARM_ENABLED:
+            return []
+
+        started = []
+
+        # API-Verbindung (TLS/Keep-Alive) - prüft selbst, ob die Verbindung noch warm ist
+        if prewarm_connection():
+            started.append("http")
+
+        if config.USE_LOCAL_TRANSCRIPTION and self.transcription_service:
+            # Modellgewichte zurück in den Speicher holen (nach längerer Pause ausgelagert)
+            if self._start("model", self.transcription_service.touch_local_model):
+                started.append("model")
+        elif self.audio_recorder:
+            # pydub/ffmpeg für die Komprimierung vor dem Upload
+            if self._start("encoder", self.audio_recorder.warmup_encoder):
+                started.append("encoder")
+
+        if started:
+            logger.debug(f"Vorwärmen beim Hotkey-Druck gestartet: {', '.join(started)}")
+        return started
+
+    def _start(self, name: str, task: Callable) -> bool:
+        """Startet eine Aufgabe, sofern sie nicht läuft und ihr Cooldown abgelaufen ist"""
+        now = time.time()
+        with self._lock:
+            running = self._running.get(name)
+            if running and running.is_alive():
+                return False
+            if now - self._last_run.get(name, 0.0) < self.cooldown_seconds:
+                return False
+
+            self._last_run[name] = now
+            thread = threading.Thread(target=self._run_task, args=(name, task), name=f"Prewarm-{name}", daemon=True)
+            self._running[name] = thread
+            thread.start()
+            return True
+
+    def _run_task(self, name: str, task: Callable):
+        start_time = time.time()
+        try:
+            task()
+            logger.debug(f"Vorwärmen '{name}' abgeschlossen in {time.time() - start_time:.2f}s")
+        except Exception as e:
+            logger.warning(f"Vorwärmen '{name}' fehlgeschlagen: {e}")
+
+    def wait(self, timeout: Optional[float] = None):
+        """Wartet auf laufende Vorwärm-Aufgaben (für Tests und Benchmarks)"""
+        for thread in list(self._running.values()):
+            thread.join(timeout=timeout)
@@ -0,0 +1,67 @@
+"""
+Ring Buffer - Vorallokierter PCM-Puffer für die Aufnahme
+Der PyAudio-Callback schreibt jeden Block direkt in ein einmal angelegtes
+int16-Array: keine Allokation pro Block, keine Liste von bytes und kein
+b''.join beim Stoppen.
+"""
+
+import threading
+
+from src.audio_utils import NUMPY_AVAILABLE
+
+if NUMPY_AVAILABLE:
+    import numpy as np
+
+
+class PcmRingBuffer:
+    """Ringpuffer für 16-bit PCM; bei Überlauf werden die ältesten Samples überschrieben"""
+
+    def __init__(self, capacity_samples: int):
+        self.capacity = int(capacity_samples)
+        self._buffer = np.zeros(self.capacity, dtype=np.int16)
+        self._write_pos = 0
+        self._total_written = 0
+        self._lock = threading.Lock()
+
+    def write(self, data: bytes) -> int:
+        """Kopiert einen PCM-Block in den Puffer (nur Kopie, keine neue Allokation)"""
+        samples = np.frombuffer(data, dtype=np.int16)
+        count = len(samples)
+        if count == 0:
+            return 0
+
+        with self._lock:
+            if count >= self.capacity:
+                # Block größer als der Puffer - nur das Ende behalten
+                self._buffer[:] = samples[-self.capacity:]
+                self._write_pos = 0
+            else:
+                first = min(count, self.capacity - self._write_pos)
+                self._buffer[self._write_pos:self._write_pos + first] = samples[:first]
+                if first < count:
+                    self._buffer[:count - first] = samples[first:]
+                self._write_pos = (self._write_pos + count) % self.capacity
+            self._total_written += count
+        return count
+
+    def __len__(self) -> int:
+        """Anzahl gültiger Samples im Puffer"""
+        return min(self._total_written, self.capacity)
+
+    @property
+    def total_written(self) -> int:
+        """Alle jemals geschriebenen Samples (auch überschriebene)"""
+        return self._total_written
+
+    def read_all(self) -> "np.ndarray":
+        """Liefert den Pufferinhalt in zeitlicher Reihenfolge (Kopie)"""
+        with self._lock:
+            if self._total_written < self.capacity:
+                return self._buffer[:self._total_written].copy()
+            return np.concatenate((self._buffer[self._write_pos:], self._buffer[:self._write_pos]))
+
+    def clear(self):
+        """Setzt den Puffer zurück, ohne Speicher freizugeben"""
+        with self._lock:
+            self._write_pos = 0
+            self._total_written = 0
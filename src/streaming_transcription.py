@@ -0,0 +1,137 @@
+"""
+Streaming Transcription - Inkrementelle lokale Transkription
+Zerlegt die laufende Aufnahme an Sprechpausen in Segmente und dekodiert
+abgeschlossene Segmente bereits, während der Hotkey noch gedrückt ist.
+"""
+
+import logging
+import queue
+import threading
+import time
+from typing import List, Optional
+
+from src.audio_utils import WHISPER_SAMPLE_RATE, is_whisper_compatible, pcm16_to_float32, rms_int16
+from src.config import config
+
+logger = logging.getLogger(__name__)
+
+# Sentinel für das Ende der Aufnahme
+_END_OF_STREAM = object()
+
+
+class StreamingTranscriber:
+    """Segmentiert Audio-Frames an Pausen und dekodiert sie im Hintergrund"""
+
+    def __init__(self, local_service, sample_rate: int = WHISPER_SAMPLE_RATE,
+                 silence_threshold: Optional[float] = None,
+                 silence_seconds: Optional[float] = None,
+                 min_segment_seconds: Optional[float] = None,
+                 max_segment_seconds: Optional[float] = None):
+        self.local_service = local_service
+        self.sample_rate = sample_rate
+        self.silence_threshold = silence_threshold if silence_threshold is not None else config.STREAMING_SILENCE_THRESHOLD
+        self.silence_seconds = silence_seconds if silence_seconds is not None else config.STREAMING_SILENCE_SECONDS
+        self.min_segment_seconds = min_segment_seconds if min_segment_seconds is not None else config.STREAMING_MIN_SEGMENT_SECONDS
+        self.max_segment_seconds = max_segment_seconds if max_segment_seconds is not None else config.STREAMING_MAX_SEGMENT_SECONDS
+
+        self._frames: "queue.Queue" = queue.Queue()
+        self._segment: List[bytes] = []  # Frames des aktuellen Segments
+        self._segment_samples = 0
+        self._trailing_silence_samples = 0
+        self._has_speech = False
+
+        self._texts: List[str] = []
+        self._failed = False
+        self.segments_decoded = 0
+
+        self._worker = threading.Thread(target=self._run, name="StreamingTranscriber", daemon=True)
+        self._worker.start()
+
+    def feed(self, frame: bytes):
+        """Nimmt einen Frame aus dem Aufnahme-Thread entgegen (nicht blockierend)"""
+        self._frames.put(frame)
+
+    def finish(self, timeout: Optional[float] = None) -> Optional[str]:
+        """Beendet den Stream, dekodiert das letzte Teilsegment und liefert den Gesamttext"""
+        start_time = time.time()
+        self._frames.put(_END_OF_STREAM)
+        self._worker.join(timeout=timeout)
+
+        if self._worker.is_alive():
+            logger.warning("Streaming-Transkription nicht rechtzeitig abgeschlossen")
+            return None
+
+        if self._failed:
+            logger.warning("Streaming-Transkription fehlgeschlagen - Fallback auf Gesamtaufnahme")
+            return None
+
+        transcript = " ".join(text for text in self._texts if text).strip()
+        logger.info(f"Streaming-Transkription abgeschlossen: {self.segments_decoded} Segmente, "
+                    f"Restdekodierung nach Release {time.time() - start_time:.2f}s")
+        return transcript or None
+
+    def _run(self):
+        """Worker-Loop: Segmentierung und Dekodierung"""
+        while True:
+            frame = self._frames.get()
+            if frame is _END_OF_STREAM:
+                self._flush_segment()
+                return
+
+            try:
+                self._add_frame(frame)
+            except Exception as e:
+                logger.error(f"Fehler bei Streaming-Segmentierung: {e}")
+                self._failed = True
+
+    def _add_frame(self, frame: bytes):
+        """Fügt einen Frame an und schneidet ggf. ein abgeschlossenes Segment ab"""
+        frame_samples = len(frame) // 2
+        self._segment.append(frame)
+        self._segment_samples += frame_samples
+
+        if rms_int16(frame) < self.silence_threshold:
+            self._trailing_silence_samples += frame_samples
+        else:
+            self._trailing_silence_samples = 0
+            self._has_speech = True
+
+        segment_seconds = self._segment_samples / self.sample_rate
+        silence_seconds = self._trailing_silence_samples / self.sample_rate
+
+        # Schneide an einer Pause, sobald das Segment lang genug ist
+        if segment_seconds >= self.min_segment_seconds and silence_seconds >= self.silence_seconds:
+            self._flush_segment()
+        elif segment_seconds >= self.max_segment_seconds:
+            # Harte Obergrenze, damit auch ohne Pause inkrementell dekodiert wird
+            self._flush_segment()
+
+    def _flush_segment(self):
+        """Dekodiert das aktuelle Segment (falls es Sprache enthält) und setzt es zurück"""
+        frames, has_speech = self._segment, self._has_speech
+        self._segment = []
+        self._segment_samples = 0
+        self._trailing_silence_samples = 0
+        self._has_speech = False
+
+        if not frames or not has_speech or self._failed:
+            return
+
+        try:
+            audio = pcm16_to_float32(frames)
+            # Letzten Text als Kontext mitgeben, damit Segmentgrenzen sauber anschließen
+            prompt = " ".join(part for part in (config.get_vocabulary(), self._texts[-1] if self._texts else "") if part)
+            text = self.local_service.transcribe_array(audio, initial_prompt=prompt)
+            self.segments_decoded += 1
+            if text:
+                self._texts.append(text.strip())
+            logger.debug(f"Streaming-Segment {self.segments_decoded} dekodiert ({len(audio) / self.sample_rate:.1f}s)")
+        except Exception as e:
+            logger.error(f"Fehler bei Dekodierung eines Streaming-Segments: {e}")
+            self._failed = True
+
+
+def is_streaming_supported() -> bool:
+    """Prüft, ob die Aufnahme-Einstellungen inkrementelle Dekodierung erlauben"""
+    # faster-whisper erwartet 16 kHz Mono - kein Resampling im Streaming-Pfad
+    return is_whisper_compatible(config.SAMPLE_RATE, config.CHANNELS)
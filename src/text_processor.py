@@ -7,9 +7,9 @@ import logging
 import time
 from typing import Optional
 
-from openai import OpenAI
-
 from src.config import config
+from src.http_client import backoff_wait, get_openai_client
+from src.metrics import error_type, metrics
 
 logger = logging.getLogger(__name__)
 
@@ -17,7 +17,7 @@ class TextProcessor:
     """Service für Text-Korrektur und -Verbesserung"""
 
     def __init__(self):
-        self.client = OpenAI(api_key=config.OPENAI_API_KEY)
+        self.client = get_openai_client()
         self.max_retries = 3
         self.retry_delay = 1.0
 
@@ -60,7 +60,7 @@ class TextProcessor:
                     corrected_text = corrected_text[:-1].strip()
 
                 duration = time.time() - start_time
-                logger.info(".2f")
+                logger.info(f"Text-Korrektur erfolgreich in {duration:.2f}s")
 
                 # Validiere Ergebnis
                 if self._validate_output_text(corrected_text):
@@ -71,8 +71,11 @@ class TextProcessor:
 
             except Exception as e:
                 logger.error(f"Fehler bei Text-Verarbeitung (Versuch {attempt + 1}): {e}")
+                metrics.errors.inc(type=error_type(e))
                 if attempt < self.max_retries - 1:
-                    time.sleep(self.retry_delay * (2 ** attempt))
+                    metrics.retries.inc(operation="correction")
+                    if backoff_wait(self.retry_delay * (2 ** attempt)):
+                        return raw_text  # Anwendung wird beendet
                 else:
                     logger.error("Maximale Anzahl von Versuchen erreicht")
                     return raw_text  # Fallback
@@ -0,0 +1,201 @@
+"""
+Transcript Cache - Inhaltsadressierter Cache für Transkripte
+Wiederholte Audio-Daten (erneutes Diktat, Testphrasen, Replays) werden nicht
+erneut an Whisper geschickt. Schlüssel ist ein Hash der Audio-Daten plus der
+Einstellungen, die das Ergebnis beeinflussen. Transkripte landen nur mit
+TRANSCRIPT_CACHE_PERSIST auf der Festplatte - sonst bleiben sie im Speicher.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Optional
+
+from src.config import config
+
+logger = logging.getLogger(__name__)
+
+
+class TranscriptCache:
+    """Begrenzter LRU-Cache (Speicher, optional Festplatte) mit Größen- und Alters-Eviction"""
+
+    # Alle N Schreibvorgänge wird der Festplatten-Cache aufgeräumt
+    PRUNE_INTERVAL = 20
+
+    def __init__(self, cache_dir: Optional[Path] = None,
+                 max_entries: Optional[int] = None,
+                 max_disk_bytes: Optional[int] = None,
+                 max_age_seconds: Optional[float] = None,
+                 memory_entries: Optional[int] = None):
+        if cache_dir is None and config.TRANSCRIPT_CACHE_PERSIST:
+            from src.user_config import user_config
+            cache_dir = user_config.get_appdata_dir() / 'cache' / 'transcripts'
+
+        # None = nur In-Memory (Standard - Diktate werden nicht im Klartext gespeichert)
+        self.cache_dir: Optional[Path] = Path(cache_dir) if cache_dir is not None else None
+        self.max_entries = max_entries if max_entries is not None else config.TRANSCRIPT_CACHE_MAX_ENTRIES
+        self.max_disk_bytes = max_disk_bytes if max_disk_bytes is not None else config.TRANSCRIPT_CACHE_MAX_MB * 1024 * 1024
+        self.max_age_seconds = max_age_seconds if max_age_seconds is not None else config.TRANSCRIPT_CACHE_MAX_AGE_DAYS * 86400
+        self.memory_entries = memory_entries if memory_entries is not None else config.TRANSCRIPT_CACHE_MEMORY_ENTRIES
+
+        self._memory: "OrderedDict[str, tuple]" = OrderedDict()  # key -> (text, created)
+        self._lock = threading.Lock()
+        self._puts_since_prune = 0
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        if self.cache_dir is None:
+            return
+        try:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            self._prune_disk()
+        except Exception as e:
+            logger.warning(f"Transkript-Cache-Verzeichnis nicht nutzbar ({e}) - nur In-Memory-Cache")
+            self.cache_dir = None
+
+    @staticmethod
+    def make_key(audio: bytes, backend: str, model: str, language: str, prompt: str) -> str:
+        """Erzeugt den Cache-Schlüssel aus Audio-Hash und transkriptionsrelevanten Einstellungen"""
+        digest = hashlib.sha256()
+        digest.update(audio)
+        for part in (backend, model, language, prompt or ""):
+            digest.update(b'\0')
+            digest.update(part.encode('utf-8'))
+        return digest.hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        """Liefert ein gecachtes Transkript oder None"""
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                text, created = entry
+                if not self._is_expired(created):
+                    self._memory.move_to_end(key)
+                    self.hits += 1
+                    return text
+                del self._memory[key]
+
+            text = self._read_disk(key)
+            if text is not None:
+                self._remember(key, text, time.time())
+                self.hits += 1
+                return text
+
+            self.misses += 1
+            return None
+
+    def put(self, key: str, text: str):
+        """Speichert ein Transkript in Speicher und auf Festplatte"""
+        if not text:
+            return
+
+        with self._lock:
+            created = time.time()
+            self._remember(key, text, created)
+            self._write_disk(key, text, created)
+
+            self._puts_since_prune += 1
+            if self._puts_since_prune >= self.PRUNE_INTERVAL:
+                self._puts_since_prune = 0
+                self._prune_disk()
+
+    def clear(self):
+        """Leert den kompletten Cache"""
+        with self._lock:
+            self._memory.clear()
+            for path in self._disk_entries():
+                path.unlink(missing_ok=True)
+
+    def get_stats(self) -> dict:
+        """Gibt Trefferstatistik und Füllstand zurück"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+                "memory_entries": len(self._memory),
+                "disk_entries": len(self._disk_entries()),
+            }
+
+    def _remember(self, key: str, text: str, created: float):
+        """Fügt einen Eintrag in den In-Memory-LRU ein"""
+        self._memory[key] = (text, created)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_entries:
+            self._memory.popitem(last=False)
+
+    def _is_expired(self, created: float) -> bool:
+        return time.time() - created > self.max_age_seconds
+
+    def _entry_path(self, key: str) -> Path:
+        return self.cache_dir / f"{key}.json"
+
+    def _read_disk(self, key: str) -> Optional[str]:
+        if self.cache_dir is None:
+            return None
+        path = self._entry_path(key)
+        try:
+            if not path.exists():
+                return None
+            data = json.loads(path.read_text(encoding='utf-8'))
+            if self._is_expired(data.get('created', 0)):
+                path.unlink(missing_ok=True)
+                self.evictions += 1
+                return None
+            # mtime dient als LRU-Zeitstempel für die Festplatten-Eviction
+            os.utime(path, None)
+            return data.get('text')
+        except Exception as e:
+            logger.debug(f"Transkript-Cache-Eintrag nicht lesbar ({path.name}): {e}")
+            return None
+
+    def _write_disk(self, key: str, text: str, created: float):
+        if self.cache_dir is None:
+            return
+        path = self._entry_path(key)
+        tmp_path = path.with_suffix('.tmp')
+        try:
+            tmp_path.write_text(json.dumps({"text": text, "created": created}, ensure_ascii=False), encoding='utf-8')
+            os.replace(tmp_path, path)
+        except Exception as e:
+            logger.debug(f"Transkript-Cache-Eintrag konnte nicht geschrieben werden: {e}")
+
+    def _disk_entries(self) -> list:
+        if self.cache_dir is None:
+            return []
+        try:
+            return list(self.cache_dir.glob('*.json'))
+        except Exception:
+            return []
+
+    def _prune_disk(self):
+        """Entfernt abgelaufene Einträge und hält Anzahl- und Größenlimit ein (älteste zuerst)"""
+        now = time.time()
+        entries = []
+        for path in self._disk_entries():
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            if now - stat.st_mtime > self.max_age_seconds:
+                path.unlink(missing_ok=True)
+                self.evictions += 1
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+
+        entries.sort()  # Am längsten nicht verwendet zuerst
+        total_bytes = sum(size for _, size, _ in entries)
+        while entries and (len(entries) > self.max_entries or total_bytes > self.max_disk_bytes):
+            _, size, path = entries.pop(0)
+            path.unlink(missing_ok=True)
+            total_bytes -= size
+            self.evictions += 1
@@ -4,80 +4,220 @@ Transkribiert Audio-Dateien zu Text mittels OpenAI Whisper API.
 """
 
 import logging
+import threading
 import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 from pathlib import Path
-from typing import Optional
+from typing import TYPE_CHECKING, Callable, List, Optional
 
-from openai import OpenAI
+if TYPE_CHECKING:
+    import numpy as np
 
+from src.audio_utils import NUMPY_AVAILABLE, float32_to_pcm16, is_whisper_compatible, pcm16_to_wav_bytes
+from src.backend_router import API, LOCAL, BackendRouter
+from src.chunking import plan_chunks, stitch_transcripts
 from src.config import config
+from src.decoding_profiles import configured_profile
+from src.http_client import backoff_wait, get_openai_client, last_server_seconds
 from src.local_transcription import LocalTranscriptionService
+from src.metrics import error_type, metrics
+from src.streaming_transcription import StreamingTranscriber, is_streaming_supported
+from src.transcript_cache import TranscriptCache
+from src.transcription_worker import TranscriptionWorkerClient
+from src.upload_optimizer import UploadOptimizer
+from src.vad import find_split_points
 
 logger = logging.getLogger(__name__)
 
-# Globales Singleton für lokalen Transkriptionsservice
-_global_local_service: Optional[LocalTranscriptionService] = None
+# Globales Singleton für lokalen Transkriptionsservice (In-Process oder Worker-Prozess)
+_global_local_service: Optional[LocalTranscriptionService | TranscriptionWorkerClient] = None
 _global_local_service_model_size: Optional[str] = None
+# Verhindert, dass Warm-up und erste Anfrage das Modell parallel laden
+_global_local_service_lock = threading.Lock()
 
 class TranscriptionService:
     """Service für Audio-zu-Text Transkription"""
 
     def __init__(self):
-        self.client = OpenAI(api_key=config.OPENAI_API_KEY)
+        # Gemeinsamer Client mit Keep-Alive-Pool (auch von TextProcessor genutzt)
+        self.client = get_openai_client()
         self.max_retries = 3
         self.retry_delay = 1.0  # Sekunden
 
-    def _get_local_transcription_service(self) -> Optional[LocalTranscriptionService]:
+        # Cache für wiederholte Audio-Daten (spart API-Kosten und CPU-Zeit)
+        self.cache: Optional[TranscriptCache] = None
+        if config.TRANSCRIPT_CACHE_ENABLED:
+            try:
+                self.cache = TranscriptCache()
+            except Exception as e:
+                logger.warning(f"Transkript-Cache konnte nicht initialisiert werden: {e}")
+
+        # Adaptive Backend-Wahl anhand gleitender Latenz- und Fehlerstatistik
+        self.router = BackendRouter()
+        # Upload-Format nach gemessenem Durchsatz
+        self.upload_optimizer = UploadOptimizer()
+        # Backend, das die Anfrage tatsächlich beantwortet hat (pro Thread - Server und Batch rufen parallel)
+        self._call_state = threading.local()
+
+        # Hedged Requests: Wartezeit folgt den letzten lokalen Laufzeiten aus dem Router
+        self._hedge_executor: Optional[ThreadPoolExecutor] = None
+        self.hedge_stats = {"hedged": 0, "local_wins": 0, "api_wins": 0}
+        # Schützt hedge_stats und die Entscheidung, welches Backend den Hedge gewinnt
+        self._hedge_lock = threading.Lock()
+
+        # Warm-up Status des lokalen Modells: idle, loading, ready, failed
+        self.warmup_state = "idle"
+        self._warmup_done = threading.Event()
+        self._warmup_thread: Optional[threading.Thread] = None
+
+    def _get_local_transcription_service(self) -> Optional[LocalTranscriptionService | TranscriptionWorkerClient]:
         """Lokalen Transkriptionsservice abrufen (Singleton)"""
         global _global_local_service, _global_local_service_model_size
 
         current_model_size = config.WHISPER_MODEL_SIZE
 
-        # Prüfe ob Modellgröße sich geändert hat
-        if (_global_local_service is not None and
-            _global_local_service_model_size != current_model_size):
-            logger.info(f"Modellgröße geändert von {_global_local_service_model_size} zu {current_model_size} - Service neu initialisieren")
-            _global_local_service = None
+        with _global_local_service_lock:
+            # Prüfe ob Modellgröße sich geändert hat
+            if (_global_local_service is not None and
+                _global_local_service_model_size != current_model_size):
+                logger.info(f"Modellgröße geändert von {_global_local_service_model_size} zu {current_model_size} - Service neu initialisieren")
+                if isinstance(_global_local_service, TranscriptionWorkerClient):
+                    _global_local_service.shutdown()
+                _global_local_service = None
 
-        if _global_local_service is None and config.USE_LOCAL_TRANSCRIPTION:
-            try:
-                _global_local_service = LocalTranscriptionService()
-                _global_local_service_model_size = current_model_size
-                logger.info(f"Lokaler Transkriptionsservice initialisiert (Modell: {current_model_size})")
-            except Exception as e:
-                logger.error(f"Fehler beim Initialisieren des lokalen Services: {e}")
-                logger.info("Lokale Transkription wird deaktiviert - verwende API-Transkription")
-                # Deaktiviere lokale Transkription bei Fehlern
-                config.USE_LOCAL_TRANSCRIPTION = False
+            # Nach einem Fehlschlag erst wieder laden, wenn der Router eine neue Probe erlaubt
+            if _global_local_service is None and config.USE_LOCAL_TRANSCRIPTION and self.router.is_enabled(LOCAL):
+                try:
+                    if config.LOCAL_TRANSCRIPTION_WORKER_PROCESS:
+                        # Modell bleibt resident in eigenem Prozess (isoliert GIL und Abstürze)
+                        _global_local_service = TranscriptionWorkerClient()
+                        _global_local_service.start()
+                    else:
+                        _global_local_service = LocalTranscriptionService()
+                    _global_local_service_model_size = current_model_size
+                    logger.info(f"Lokaler Transkriptionsservice initialisiert (Modell: {current_model_size})")
+                except Exception as e:
+                    logger.error(f"Fehler beim Initialisieren des lokalen Services: {e}")
+                    logger.info("Lokale Transkription vorübergehend deaktiviert - verwende API-Transkription")
+                    self.router.mark_unavailable(LOCAL, "Initialisierung fehlgeschlagen")
+                    _global_local_service = None
+                    _global_local_service_model_size = None
+
+            return _global_local_service
+
+    def shutdown(self):
+        """Beendet einen laufenden Transkriptions-Worker-Prozess und den Hedging-Thread-Pool"""
+        global _global_local_service, _global_local_service_model_size
+
+        if self._hedge_executor is not None:
+            self._hedge_executor.shutdown(wait=False)
+            self._hedge_executor = None
+
+        with _global_local_service_lock:
+            if isinstance(_global_local_service, TranscriptionWorkerClient):
+                _global_local_service.shutdown()
                 _global_local_service = None
                 _global_local_service_model_size = None
 
-        return _global_local_service
+    def start_warmup(self) -> bool:
+        """Lädt das lokale Modell im Hintergrund und wärmt es mit einer Dummy-Inferenz auf"""
+        if not config.USE_LOCAL_TRANSCRIPTION:
+            return False
+
+        if self._warmup_thread and self._warmup_thread.is_alive():
+            return True
+
+        self.warmup_state = "loading"
+        self._warmup_done.clear()
+        self._warmup_thread = threading.Thread(target=self._warmup_local_model, name="WhisperWarmup", daemon=True)
+        self._warmup_thread.start()
+        logger.info("Warm-up des lokalen Whisper-Modells gestartet")
+        return True
+
+    def _warmup_local_model(self):
+        """Hintergrund-Thread: Modell laden (inkl. Imports) und Dummy-Inferenz ausführen"""
+        start_time = time.time()
+        try:
+            local_service = self._get_local_transcription_service()
+            if local_service and local_service.is_available() and local_service.warmup():
+                self.warmup_state = "ready"
+                logger.info(f"Lokales Whisper-Modell bereit nach {time.time() - start_time:.2f}s (Warm-up)")
+            else:
+                self.warmup_state = "failed"
+                logger.warning(f"Warm-up des lokalen Modells fehlgeschlagen nach {time.time() - start_time:.2f}s")
+        except Exception as e:
+            self.warmup_state = "failed"
+            logger.error(f"Fehler beim Warm-up des lokalen Modells: {e}")
+        finally:
+            self._warmup_done.set()
+
+    def touch_local_model(self) -> bool:
+        """Stellt beim Hotkey-Druck sicher, dass das lokale Modell bereitsteht"""
+        if not config.USE_LOCAL_TRANSCRIPTION or self.warmup_state == "loading":
+            return False
+
+        if self.warmup_state != "ready":
+            # Noch nie geladen oder fehlgeschlagen - vollständiges Warm-up im Hintergrund
+            return self.start_warmup()
+
+        # Bereit: keine Dummy-Inferenz - sie landete genau dann auf dem Modell, wenn
+        # Streaming-Session und echte Dekodierung starten, und bremste beide aus
+        local_service = self._get_local_transcription_service()
+        return bool(local_service and local_service.is_available() and local_service.touch())
+
+    def is_local_ready(self) -> bool:
+        """Gibt zurück, ob das lokale Modell geladen und aufgewärmt ist"""
+        return self.warmup_state == "ready"
+
+    def wait_for_local_ready(self, timeout: Optional[float] = None) -> bool:
+        """Wartet auf das Ende eines laufenden Warm-ups"""
+        if self.warmup_state == "idle":
+            return False
+        self._warmup_done.wait(timeout=timeout)
+        return self.is_local_ready()
+
+    def create_streaming_session(self) -> Optional[StreamingTranscriber]:
+        """Erstellt eine Streaming-Session für inkrementelle lokale Transkription (falls möglich)"""
+        if not (config.STREAMING_TRANSCRIPTION_ENABLED and config.USE_LOCAL_TRANSCRIPTION):
+            return None
+
+        if not is_streaming_supported():
+            logger.info("Streaming-Transkription benötigt numpy und 16 kHz Mono - deaktiviert")
+            return None
+
+        if not self.is_local_ready():
+            # Nicht auf dem Hotkey-Thread laden - die Aufnahme muss sofort starten
+            logger.info(f"Lokales Modell nicht bereit ({self.warmup_state}) - keine Streaming-Transkription")
+            return None
+
+        local_service = self._get_local_transcription_service()
+        if not local_service or not local_service.is_available():
+            logger.info("Lokales Modell nicht verfügbar - keine Streaming-Transkription")
+            return None
+
+        return StreamingTranscriber(local_service, sample_rate=config.SAMPLE_RATE)
 
     def transcribe(self, audio_path: str) -> Optional[str]:
         """Transkribiert Audio-Datei zu Text"""
         if not self._validate_audio_file(audio_path):
             return None
 
-        # Versuche lokale Transkription zuerst, falls aktiviert
-        if config.USE_LOCAL_TRANSCRIPTION:
-            local_service = self._get_local_transcription_service()
-            if local_service and local_service.is_available():
-                logger.info("Verwende lokale Transkription")
-                result = local_service.transcribe(audio_path)
-                if result:
-                    return result
-                else:
-                    logger.warning("Lokale Transkription fehlgeschlagen, wechsle zu API")
-            else:
-                logger.warning("Lokaler Transkriptionsservice nicht verfügbar, wechsle zu API")
+        audio_bytes = Path(audio_path).read_bytes() if self.cache else b''
+        return self._with_cache(audio_bytes, lambda: self._transcribe_file_uncached(audio_path))
 
-        # Fallback auf API-Transkription
-        return self._transcribe_with_api(audio_path)
+    def _transcribe_file_uncached(self, audio_path: str) -> Optional[str]:
+        """Transkribiert eine validierte Audio-Datei (lokal oder API, je nach Router)"""
+        return self._transcribe_local_or_api(
+            lambda local_service: local_service.transcribe(audio_path),
+            lambda cancel_event: self._transcribe_with_api(audio_path, cancel_event),
+            "Audio-Datei"
+        )
 
-    def _transcribe_with_api(self, audio_path: str) -> Optional[str]:
+    def _transcribe_with_api(self, audio_path: str, cancel_event: Optional[threading.Event] = None) -> Optional[str]:
         """Transkribiert Audio-Datei mit OpenAI API"""
         for attempt in range(self.max_retries):
+            if cancel_event is not None and cancel_event.is_set():
+                return None
             try:
                 logger.info(f"Starte API-Transkription (Versuch {attempt + 1}/{self.max_retries})")
 
@@ -85,6 +225,7 @@ class TranscriptionService:
 
                 # Vokabular (Prompt) laden
                 vocabulary = config.get_vocabulary()
+                metrics.upload_bytes.inc(Path(audio_path).stat().st_size, format=Path(audio_path).suffix.lstrip('.'))
                 
                 with open(audio_path, 'rb') as audio_file:
                     transcript = self.client.audio.transcriptions.create(
@@ -107,35 +248,256 @@ class TranscriptionService:
 
             except Exception as e:
                 logger.error(f"Fehler bei API-Transkription (Versuch {attempt + 1}): {e}")
+                metrics.errors.inc(type=error_type(e))
                 if attempt < self.max_retries - 1:
-                    time.sleep(self.retry_delay * (2 ** attempt))  # Exponential backoff
+                    metrics.retries.inc(operation="transcription")
+                    self._retry_backoff(attempt, cancel_event)
                 else:
                     logger.error("Maximale Anzahl von Versuchen erreicht")
                     return None
 
         return None
 
-    def transcribe_audio_data(self, audio_data: bytes, filename: str = "audio.mp3") -> Optional[str]:
-        """Transkribiert komprimierte Audio-Daten zu Text"""
-        # Versuche lokale Transkription zuerst, falls aktiviert
-        if config.USE_LOCAL_TRANSCRIPTION:
+    def transcribe_audio_data(self, audio_data: bytes, filename: str = "audio.mp3",
+                              audio_duration: Optional[float] = None) -> Optional[str]:
+        """Transkribiert komprimierte Audio-Daten zu Text (audio_duration verbessert die Backend-Wahl)"""
+        return self._with_cache(audio_data,
+                                lambda: self._transcribe_audio_data_uncached(audio_data, filename, audio_duration))
+
+    def _transcribe_audio_data_uncached(self, audio_data: bytes, filename: str,
+                                        audio_duration: Optional[float] = None) -> Optional[str]:
+        """Transkribiert Audio-Daten (lokal oder API, je nach Router)"""
+        return self._transcribe_local_or_api(
+            lambda local_service: local_service.transcribe_audio_data(audio_data, filename),
+            lambda cancel_event: self._transcribe_audio_data_with_api(audio_data, filename, cancel_event),
+            "Audio-Daten",
+            audio_duration
+        )
+
+    def can_transcribe_in_memory(self) -> bool:
+        """Prüft, ob PCM ohne WAV-Datei und Komprimierung direkt lokal transkribiert werden kann"""
+        if not config.USE_LOCAL_TRANSCRIPTION:
+            return False
+
+        if not is_whisper_compatible(config.SAMPLE_RATE, config.CHANNELS):
+            return False
+
+        local_service = self._get_local_transcription_service()
+        return bool(local_service and local_service.is_available())
+
+    def transcribe_pcm(self, audio: "np.ndarray") -> Optional[str]:
+        """Transkribiert float32-PCM (16 kHz, Mono) ohne Umweg über Dateien"""
+        audio_bytes = audio.tobytes() if self.cache else b''
+        return self._with_cache(audio_bytes, lambda: self._transcribe_pcm_uncached(audio))
+
+    def _transcribe_pcm_uncached(self, audio: "np.ndarray") -> Optional[str]:
+        """Transkribiert PCM (lokal oder API mit In-Memory-WAV, je nach Router)"""
+        def transcribe_with_api(cancel_event: Optional[threading.Event]) -> Optional[str]:
+            if self.should_chunk_audio(len(audio) / config.SAMPLE_RATE):
+                return self._transcribe_chunked_with_api(audio, cancel_event)
+            # WAV wird nur im Speicher erzeugt
+            wav_data = pcm16_to_wav_bytes(float32_to_pcm16(audio), config.SAMPLE_RATE, config.CHANNELS)
+            return self._transcribe_audio_data_with_api(wav_data, "audio.wav", cancel_event)
+
+        return self._transcribe_local_or_api(
+            lambda local_service: local_service.transcribe_array(audio),
+            transcribe_with_api,
+            "PCM-Daten (In-Memory)",
+            len(audio) / config.SAMPLE_RATE
+        )
+
+    def should_chunk_audio(self, audio_duration: float) -> bool:
+        """Lange Aufnahmen werden für die API in parallel transkribierte Chunks geteilt"""
+        return (config.API_CHUNKING_ENABLED and NUMPY_AVAILABLE and config.CHANNELS == 1
+                and audio_duration >= config.API_CHUNKING_MIN_SECONDS)
+
+    def _transcribe_chunked_with_api(self, audio: "np.ndarray",
+                                     cancel_event: Optional[threading.Event] = None) -> Optional[str]:
+        """Teilt PCM an Pausen in überlappende Chunks, transkribiert sie parallel und fügt sie zusammen"""
+        import numpy as np
+
+        sample_rate = config.SAMPLE_RATE
+        pcm = np.frombuffer(float32_to_pcm16(audio), dtype=np.int16)
+        split_points = find_split_points(
+            pcm, sample_rate,
+            target_seconds=config.API_CHUNK_TARGET_SECONDS,
+            max_seconds=config.API_CHUNK_MAX_SECONDS,
+            threshold=config.VAD_SILENCE_THRESHOLD,
+            min_silence_seconds=config.VAD_MIN_SILENCE_SECONDS
+        )
+        chunks = plan_chunks(len(pcm), split_points, int(config.API_CHUNK_OVERLAP_SECONDS * sample_rate))
+
+        start_time = time.time()
+        # Alle Chunks laufen gleichzeitig - Kontext über Chunk-Grenzen liefert die Überlappung, nicht der Prompt
+        vocabulary = config.get_vocabulary()
+        results: list = [None] * len(chunks)
+
+        def transcribe_chunk(index: int) -> Optional[str]:
+            start, end = chunks[index]
+            wav_data = pcm16_to_wav_bytes(pcm[start:end].tobytes(), sample_rate, 1)
+            results[index] = self._transcribe_audio_data_with_api(
+                wav_data, f"chunk_{index}.wav", cancel_event, prompt=vocabulary or None
+            )
+            return results[index]
+
+        logger.info(f"Teile Aufnahme ({len(pcm) / sample_rate:.1f}s) in {len(chunks)} Chunks für parallele API-Transkription")
+        with ThreadPoolExecutor(max_workers=config.API_CHUNK_CONCURRENCY, thread_name_prefix="ChunkUpload") as pool:
+            list(pool.map(transcribe_chunk, range(len(chunks))))
+
+        failed = [index for index, text in enumerate(results) if text is None]
+        if failed:
+            logger.error(f"API-Transkription von Chunk(s) {failed} fehlgeschlagen")
+            return None
+
+        transcript = stitch_transcripts(results)
+        logger.info(f"Chunk-Transkription abgeschlossen in {time.time() - start_time:.2f}s")
+        return transcript or None
+
+    def _transcribe_local_or_api(self, local_call: Callable, api_call: Callable, source: str,
+                                 audio_seconds: Optional[float] = None) -> Optional[str]:
+        """Wählt per Router das voraussichtlich schnellste Backend; das andere dient als Fallback"""
+        candidates = []
+        local_service = None
+        if config.USE_LOCAL_TRANSCRIPTION and self.router.is_enabled(LOCAL):
             local_service = self._get_local_transcription_service()
             if local_service and local_service.is_available():
-                logger.info("Verwende lokale Transkription für Audio-Daten")
-                result = local_service.transcribe_audio_data(audio_data, filename)
+                candidates.append(LOCAL)
+            else:
+                logger.warning("Lokaler Transkriptionsservice nicht verfügbar, wechsle zu API")
+                self.router.mark_unavailable(LOCAL)
+        candidates.append(API)
+
+        def run_local(cancel_event: Optional[threading.Event] = None) -> Optional[str]:
+            return self._call_backend(LOCAL, lambda: local_call(local_service), audio_seconds, cancel_event)
+
+        def run_api(cancel_event: Optional[threading.Event]) -> Optional[str]:
+            return self._call_backend(API, lambda: api_call(cancel_event), audio_seconds, cancel_event)
+
+        self._call_state.backend = None
+        order = self.router.order(candidates, audio_seconds)
+        if order[0] == LOCAL and config.TRANSCRIPTION_HEDGING_ENABLED and config.OPENAI_API_KEY:
+            return self._transcribe_hedged(run_local, run_api, source)
+
+        for index, backend in enumerate(order):
+            if backend == LOCAL:
+                logger.info(f"Verwende lokale Transkription für {source}")
+                result = run_local()
+            else:
+                result = run_api(None)
+
+            if result:
+                self._call_state.backend = backend
+                return result
+            if index < len(order) - 1:
+                logger.warning(f"Transkription von {source} über '{backend}' fehlgeschlagen, wechsle zu '{order[index + 1]}'")
+
+        return None
+
+    def _call_backend(self, backend: str, call: Callable, audio_seconds: Optional[float],
+                      cancel_event: Optional[threading.Event] = None) -> Optional[str]:
+        """Führt eine Backend-Anfrage aus und meldet Laufzeit bzw. Fehlschlag an den Router"""
+        start_time = time.time()
+        try:
+            result = call()
+        except Exception as e:
+            logger.error(f"Fehler bei Transkription über '{backend}': {e}")
+            result = None
+
+        if result and cancel_event is not None and not self._claim_hedge(cancel_event):
+            # Hedge schon entschieden - das späte Ergebnis des Verlierers wird verworfen
+            logger.debug(f"Verwerfe Ergebnis von '{backend}' nach entschiedenem Hedge")
+            return None
+
+        if result:
+            self.router.record_success(backend, time.time() - start_time, audio_seconds)
+            metrics.transcriptions.inc(backend=backend)
+        elif not (cancel_event is not None and cancel_event.is_set()):
+            # Abgebrochene Hedge-Verlierer zählen nicht als Fehler
+            self.router.record_failure(backend)
+            metrics.backend_failures.inc(backend=backend)
+        return result
+
+    def _claim_hedge(self, cancel_event: threading.Event) -> bool:
+        """Das erste gültige Ergebnis entscheidet den Hedge; danach sind alle weiteren Verlierer"""
+        with self._hedge_lock:
+            if cancel_event.is_set():
+                return False
+            cancel_event.set()
+            return True
+
+    def _transcribe_hedged(self, run_local: Callable, run_api: Callable, source: str) -> Optional[str]:
+        """Startet lokal; ist nach der Hedge-Schwelle kein Ergebnis da, läuft die API parallel.
+        Das erste gültige Transkript gewinnt, der Verlierer wird abgebrochen bzw. verworfen."""
+        if self._hedge_executor is None:
+            self._hedge_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="TranscriptionHedge")
+
+        cancel_event = threading.Event()
+        hedge_delay = self.get_hedge_delay()
+        logger.info(f"Verwende lokale Transkription für {source} (Hedge nach {hedge_delay:.2f}s)")
+
+        local_future = self._hedge_executor.submit(run_local, cancel_event)
+        done, _ = wait([local_future], timeout=hedge_delay)
+        if done:
+            result = self._future_result(local_future)
+            if result:
+                self._call_state.backend = LOCAL
+                return result
+            logger.warning(f"Lokale Transkription von {source} fehlgeschlagen, wechsle zu API")
+            result = run_api(cancel_event)
+            self._call_state.backend = API if result else None
+            return result
+
+        logger.info(f"Lokale Transkription nach {hedge_delay:.2f}s nicht fertig - starte parallele API-Anfrage")
+        with self._hedge_lock:
+            self.hedge_stats["hedged"] += 1
+        api_future = self._hedge_executor.submit(run_api, cancel_event)
+
+        pending = {local_future, api_future}
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                result = self._future_result(future)
                 if result:
+                    # Der Gewinner hat cancel_event gesetzt: API-Wiederholungen stoppen,
+                    # ein spätes lokales Ergebnis wird verworfen
+                    winner = LOCAL if future is local_future else API
+                    with self._hedge_lock:
+                        self.hedge_stats[f"{winner}_wins"] += 1
+                    self._call_state.backend = winner
+                    if winner == LOCAL:
+                        logger.info("Hedged Request: lokale Transkription war schneller")
+                    else:
+                        logger.info("Hedged Request: API-Transkription war schneller")
                     return result
-                else:
-                    logger.warning("Lokale Transkription von Audio-Daten fehlgeschlagen, wechsle zu API")
 
-        # Fallback auf API-Transkription
-        return self._transcribe_audio_data_with_api(audio_data, filename)
+        return None
+
+    def _future_result(self, future) -> Optional[str]:
+        """Liefert das Ergebnis eines Futures (Exceptions gelten als Fehlschlag)"""
+        try:
+            return future.result()
+        except Exception as e:
+            logger.error(f"Fehler bei paralleler Transkription: {e}")
+            return None
+
+    def get_hedge_delay(self) -> float:
+        """Wartezeit bis zur parallelen API-Anfrage (Perzentil der letzten lokalen Laufzeiten)"""
+        timings = sorted(self.router.latencies(LOCAL))
+        if len(timings) < 3:
+            return config.HEDGE_INITIAL_DELAY
+
+        index = min(len(timings) - 1, int(config.HEDGE_LATENCY_PERCENTILE * len(timings)))
+        return max(config.HEDGE_MIN_DELAY, timings[index])
 
-    def _transcribe_audio_data_with_api(self, audio_data: bytes, filename: str = "audio.mp3") -> Optional[str]:
+    def _transcribe_audio_data_with_api(self, audio_data: bytes, filename: str = "audio.mp3",
+                                        cancel_event: Optional[threading.Event] = None,
+                                        prompt: Optional[str] = None) -> Optional[str]:
         """Transkribiert Audio-Daten mit OpenAI API"""
         import io
 
         for attempt in range(self.max_retries):
+            if cancel_event is not None and cancel_event.is_set():
+                return None
             try:
                 logger.info(f"Starte API-Transkription von Audio-Daten (Versuch {attempt + 1}/{self.max_retries})")
 
@@ -145,15 +507,29 @@ class TranscriptionService:
                 audio_file = io.BytesIO(audio_data)
                 audio_file.name = filename  # OpenAI benötigt einen Dateinamen
 
+                request_args = {}
+                if prompt:
+                    request_args["prompt"] = prompt
+
+                metrics.upload_bytes.inc(len(audio_data), format=Path(filename).suffix.lstrip('.'))
                 transcript = self.client.audio.transcriptions.create(
                     model="whisper-1",
                     file=audio_file,
                     language="de",  # Deutsche Sprache priorisieren
-                    response_format="text"
+                    response_format="text",
+                    **request_args
                 )
 
                 duration = time.time() - start_time
-                logger.info(f"API-Transkription (Audio-Daten) erfolgreich in {duration:.2f}s")
+                server_seconds = last_server_seconds()
+                self.upload_optimizer.record_upload(len(audio_data), duration, server_seconds)
+                if self.upload_optimizer.throughput is not None:
+                    metrics.upload_throughput.set(self.upload_optimizer.throughput)
+                if server_seconds is not None:
+                    logger.info(f"API-Transkription (Audio-Daten) erfolgreich in {duration:.2f}s "
+                                f"(Server {server_seconds:.2f}s, {len(audio_data)} bytes)")
+                else:
+                    logger.info(f"API-Transkription (Audio-Daten) erfolgreich in {duration:.2f}s")
 
                 # Validiere Ergebnis
                 if self._validate_transcript(transcript):
@@ -164,14 +540,86 @@ class TranscriptionService:
 
             except Exception as e:
                 logger.error(f"Fehler bei API-Transkription von Audio-Daten (Versuch {attempt + 1}): {e}")
+                metrics.errors.inc(type=error_type(e))
                 if attempt < self.max_retries - 1:
-                    time.sleep(self.retry_delay * (2 ** attempt))  # Exponential backoff
+                    metrics.retries.inc(operation="transcription")
+                    self._retry_backoff(attempt, cancel_event)
                 else:
                     logger.error("Maximale Anzahl von Versuchen erreicht")
                     return None
 
         return None
 
+    def _retry_backoff(self, attempt: int, cancel_event: Optional[threading.Event]):
+        """Exponential backoff - bricht bei gewonnenem Hedged Request sofort ab"""
+        delay = self.retry_delay * (2 ** attempt)
+        if cancel_event is not None:
+            cancel_event.wait(delay)
+        else:
+            backoff_wait(delay)
+
+    def _with_cache(self, audio_bytes: bytes, transcribe_fn) -> Optional[str]:
+        """Schlägt das Transkript im Cache nach und speichert neue Ergebnisse"""
+        self._call_state.backend = None
+        if not self.cache or not audio_bytes:
+            return transcribe_fn()
+
+        # Auch Ergebnisse aus Router- oder Hedge-Fallback zählen (API antwortet trotz lokaler Konfiguration)
+        for backend in self._cache_backends():
+            cached = self.cache.get(self._cache_key(audio_bytes, backend))
+            if cached is not None:
+                logger.info(f"Transkript aus Cache ({len(audio_bytes)} bytes Audio, keine Transkription nötig)")
+                self._call_state.backend = "cache"
+                metrics.cache_requests.inc(result="hit")
+                return cached
+
+        metrics.cache_requests.inc(result="miss")
+        result = transcribe_fn()
+        backend = getattr(self._call_state, "backend", None)
+        if result and backend:
+            # Unter dem Backend speichern, das tatsächlich geantwortet hat (Fallback, Hedge-Gewinner)
+            self.cache.put(self._cache_key(audio_bytes, backend), result)
+        return result
+
+    @property
+    def last_backend(self) -> Optional[str]:
+        """Backend der letzten Transkription dieses Threads ("local", "api" oder "cache") für den Latenz-Trace"""
+        return getattr(self._call_state, "backend", None)
+
+    def _cache_backends(self) -> List[str]:
+        """Backends, die eine Anfrage beantworten können - das konfigurierte zuerst"""
+        return [LOCAL, API] if config.USE_LOCAL_TRANSCRIPTION else [API]
+
+    def _cache_key(self, audio_bytes: bytes, backend: str) -> str:
+        """Cache-Schlüssel: Audio-Hash + Backend, Modell (lokal mit Decoding-Profil), Sprache und Vokabular"""
+        if backend == LOCAL:
+            model = f"{config.WHISPER_MODEL_SIZE}/{configured_profile()}"
+        else:
+            model = "whisper-1"
+        return TranscriptCache.make_key(audio_bytes, backend, model, "de", config.get_vocabulary())
+
+    def get_cache_stats(self) -> dict:
+        """Gibt Treffer-/Fehlzähler des Transkript-Caches zurück"""
+        if not self.cache:
+            return {"enabled": False}
+        return {"enabled": True, **self.cache.get_stats()}
+
+    def choose_upload_format(self, audio_seconds: float = 10.0) -> str:
+        """Upload-Format mit der kürzesten geschätzten Kodier- plus Upload-Zeit"""
+        return self.upload_optimizer.choose(audio_seconds)
+
+    def record_encode(self, output_format: str, audio_seconds: float, encode_seconds: float, encoded_bytes: int):
+        """Meldet eine Kodierung vor dem Upload (Zeit auf dem kritischen Pfad und Größe)"""
+        self.upload_optimizer.record_encode(output_format, audio_seconds, encode_seconds, encoded_bytes)
+
+    def get_upload_stats(self) -> dict:
+        """Gibt gemessenen Durchsatz, Kodierkosten und gewähltes Upload-Format zurück"""
+        return self.upload_optimizer.get_stats()
+
+    def get_router_stats(self) -> dict:
+        """Gibt Latenz-, Fehler- und Verfügbarkeitsstatistik pro Backend zurück"""
+        return self.router.get_stats()
+
     def _validate_audio_file(self, audio_path: str) -> bool:
         """Validiert die Audio-Datei"""
         try:
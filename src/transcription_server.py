@@ -0,0 +1,429 @@
+"""
+Lokaler Transkriptions-Server: python -m src serve
+Stellt die Pipeline (TranscriptionService + TextProcessor) anderen Tools auf
+dem Rechner per HTTP oder Unix-Socket zur Verfügung - ein residentes Modell
+pro Maschine statt einer eigenen Whisper-Kopie pro Skript.
+Anfragen landen in einer begrenzten Queue; ist sie voll, antwortet der
+Server mit 429 und Retry-After. Jeder freie Dispatcher-Thread nimmt die
+nächste Anfrage, verschiedene Anfragen laufen also gleichzeitig - gebündelt
+werden sie lokal vom Inference-Scheduler (LOCAL_INFERENCE_MODE). Identisches
+Audio, das eintrifft, während dieselbe Anfrage noch wartet oder läuft, hängt
+sich an diese an und wird nur einmal transkribiert. Die Text-Korrektur läuft
+parallel zur nächsten Inferenz.
+
+Endpunkte:
+    POST /v1/transcribe     Audio-Datei (WAV, MP3, ...) oder rohes PCM als Body
+                            (Content-Type audio/L16 oder ?format=pcm16, 16 kHz Mono;
+                            abweichendes rate=/channels= ergibt 400)
+                            ?correct=0 überspringt die Text-Korrektur
+    GET  /health            Status, Backend und Queue-Tiefe
+    GET  /metrics           Prometheus-Textformat
+"""
+
+import argparse
+import hashlib
+import json
+import logging
+import os
+import queue
+import signal
+import socketserver
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlparse
+
+from src.config import config
+from src.inference_scheduler import useful_concurrency
+from src.metrics import error_type, metrics
+
+logger = logging.getLogger(__name__)
+
+# Dateiname für den Decoder anhand des Content-Types (ohne Parameter)
+CONTENT_TYPE_EXTENSIONS = {
+    "audio/wav": ".wav",
+    "audio/x-wav": ".wav",
+    "audio/wave": ".wav",
+    "audio/mpeg": ".mp3",
+    "audio/mp3": ".mp3",
+    "audio/mp4": ".m4a",
+    "audio/m4a": ".m4a",
+    "audio/x-m4a": ".m4a",
+    "audio/flac": ".flac",
+    "audio/ogg": ".ogg",
+    "audio/opus": ".opus",
+    "audio/webm": ".webm",
+}
+PCM_CONTENT_TYPES = ("audio/l16", "audio/pcm", "audio/x-pcm")
+
+
+# Threads für die Text-Korrektur (API-gebunden, läuft parallel zur Inferenz)
+CORRECTION_WORKERS = 4
+
+
+def parse_content_type(header: str) -> Tuple[str, Dict[str, str]]:
+    """Zerlegt 'audio/L16; rate=16000; channels=1' in Typ und Parameter"""
+    media_type, *parts = header.split(";")
+    params = {}
+    for part in parts:
+        key, _, value = part.partition("=")
+        if key.strip():
+            params[key.strip().lower()] = value.strip().strip('"')
+    return media_type.strip().lower(), params
+
+
+def pcm_format_errors(*sources: Dict[str, str]) -> List[str]:
+    """Prüft rate/channels aus Content-Type und Query gegen das erwartete PCM-Format"""
+    expected = {"rate": str(config.SAMPLE_RATE), "channels": "1"}
+    return [f"{key}={source[key]}" for source in sources for key in expected
+            if key in source and source[key] != expected[key]]
+
+
+class TranscriptionJob:
+    """Eine Anfrage auf dem Weg durch Queue, Inferenz und Text-Korrektur"""
+
+    def __init__(self, payload: bytes, is_pcm: bool, filename: str, correct: bool):
+        self.payload = payload
+        self.is_pcm = is_pcm
+        self.filename = filename
+        self.correct = correct
+        self.key = hashlib.sha1(payload).hexdigest() + (":pcm" if is_pcm else f":{Path(filename).suffix}")
+        self.created = time.monotonic()
+        self.result: Optional[dict] = None
+        self.error: Optional[BaseException] = None
+        self.done = threading.Event()
+        # Identische Anfragen, die auf das Ergebnis dieser warten (nur bei der ersten gefüllt)
+        self.followers: List["TranscriptionJob"] = []
+
+    def finish(self, result: Optional[dict] = None, error: Optional[BaseException] = None):
+        self.result = result
+        self.error = error
+        self.done.set()
+
+
+class _UnixHTTPServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    """HTTP über einen Unix-Socket (Rechte 0600 - nur der eigene Benutzer)"""
+
+    daemon_threads = True
+
+    def server_bind(self):
+        socketserver.UnixStreamServer.server_bind(self)
+        os.chmod(self.server_address, 0o600)
+        self.server_name = "localhost"
+        self.server_port = 0
+
+
+class TranscriptionServer:
+    """HTTP-Server mit begrenzter Queue und Deduplizierung vor dem residenten Modell"""
+
+    def __init__(self, host: Optional[str] = None, port: Optional[int] = None,
+                 unix_socket: Optional[str] = None, service=None, text_processor=None,
+                 queue_size: Optional[int] = None, workers: Optional[int] = None):
+        self.host = host if host is not None else config.SERVER_HOST
+        self.port = port if port is not None else config.SERVER_PORT
+        self.unix_socket = unix_socket if unix_socket is not None else config.SERVER_SOCKET
+        # Lokal so viele Dispatcher, wie der Inference-Scheduler bündeln kann; für die API parallele Anfragen
+        self.workers = max(1, workers or config.SERVER_WORKERS
+                           or (useful_concurrency() if config.USE_LOCAL_TRANSCRIPTION else 4))
+        self.max_upload_bytes = int(config.SERVER_MAX_UPLOAD_MB * 1024 * 1024)
+
+        self.service = service
+        self.text_processor = text_processor
+        self._owns_service = service is None
+
+        self._queue: "queue.Queue[Optional[TranscriptionJob]]" = queue.Queue(
+            maxsize=queue_size or config.SERVER_QUEUE_SIZE)
+        self._correction_pool: Optional[ThreadPoolExecutor] = None
+        self._httpd = None
+        self._threads: List[threading.Thread] = []
+        self._lock = threading.Lock()
+        # Schlüssel -> wartende oder laufende Anfrage mit identischem Audio
+        self._inflight: Dict[str, TranscriptionJob] = {}
+        self.stats = {"requests": 0, "rejected": 0, "deduplicated": 0, "errors": 0}
+
+    # --- Adresse ---
+
+    @property
+    def address(self) -> str:
+        if self.unix_socket:
+            return f"unix:{self.unix_socket}"
+        host, port = self._httpd.server_address[:2] if self._httpd else (self.host, self.port)
+        return f"http://{host}:{port}"
+
+    # --- Annahme (Handler-Threads) ---
+
+    def submit(self, job: TranscriptionJob) -> bool:
+        """Reiht eine Anfrage ein; False bei voller Queue (Rückstau -> 429)"""
+        with self._lock:
+            primary = self._inflight.get(job.key)
+            if primary is not None:
+                # Identisches Audio wartet oder läuft bereits - Ergebnis teilen, kein Queue-Platz nötig
+                job.payload = b""
+                primary.followers.append(job)
+                self.stats["requests"] += 1
+                self.stats["deduplicated"] += 1
+                return True
+            try:
+                self._queue.put_nowait(job)
+            except queue.Full:
+                self.stats["rejected"] += 1
+                return False
+            self._inflight[job.key] = job
+            self.stats["requests"] += 1
+        metrics.server_queue_depth.set(self._queue.qsize())
+        return True
+
+    # --- Inferenz (Dispatcher-Threads) ---
+
+    def _transcribe(self, job: TranscriptionJob) -> Optional[str]:
+        if job.is_pcm:
+            from src.audio_utils import pcm16_to_float32
+
+            return self.service.transcribe_pcm(pcm16_to_float32(job.payload))
+        return self.service.transcribe_audio_data(job.payload, job.filename)
+
+    def _run_job(self, primary: TranscriptionJob):
+        metrics.server_queue_depth.set(self._queue.qsize())
+        start_time = time.monotonic()
+        text, error = None, None
+        try:
+            text = self._transcribe(primary)
+        except Exception as e:
+            logger.error(f"Transkription im Server fehlgeschlagen: {e}")
+            metrics.errors.inc(type=error_type(e))
+            error = e
+
+        with self._lock:
+            # Ab hier startet identisches Audio eine neue Inferenz
+            self._inflight.pop(primary.key, None)
+            jobs = [primary] + primary.followers
+
+        if error is not None:
+            for job in jobs:
+                job.finish(error=error)
+            return
+
+        inference_ms = round((time.monotonic() - start_time) * 1000, 1)
+        for job in jobs:
+            result = {
+                "text": text or "",
+                "queue_ms": round(max(0.0, start_time - job.created) * 1000, 1),
+                "inference_ms": inference_ms,
+                "dedupe_count": len(jobs),
+            }
+            if job.correct and text:
+                # Korrektur parallel - der Dispatcher nimmt schon die nächste Anfrage
+                self._correction_pool.submit(self._correct, job, result)
+            else:
+                job.finish(result)
+
+    def _correct(self, job: TranscriptionJob, result: dict):
+        start_time = time.monotonic()
+        try:
+            corrected = self.text_processor.process_text(result["text"])
+            result.update({"raw_text": result["text"], "text": corrected or result["text"]})
+        except Exception as e:
+            # Korrektur ist optional - Rohtext ist besser als ein Fehler
+            logger.warning(f"Text-Korrektur im Server fehlgeschlagen: {e}")
+        result["correction_ms"] = round((time.monotonic() - start_time) * 1000, 1)
+        job.finish(result)
+
+    def _dispatch(self):
+        while True:
+            job = self._queue.get()
+            if job is None:
+                break
+            try:
+                self._run_job(job)
+            except Exception as e:
+                logger.error(f"Fehler im Server-Dispatcher: {e}", exc_info=True)
+
+    # --- HTTP ---
+
+    def _make_handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, format, *args):
+                logger.debug(format % args)
+
+            def _send_json(self, status: int, body: dict, headers: Optional[dict] = None):
+                data = json.dumps(body, ensure_ascii=False).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json; charset=utf-8")
+                self.send_header("Content-Length", str(len(data)))
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(data)
+                metrics.server_requests.inc(status=str(status))
+
+            def do_GET(self):
+                path = urlparse(self.path).path
+                if path == "/health":
+                    self._send_json(200, server.get_stats())
+                elif path == "/metrics":
+                    data = metrics.to_prometheus().encode("utf-8")
+                    self.send_response(200)
+                    self.send_header("Content-Type", "text/plain; version=0.0.4")
+                    self.send_header("Content-Length", str(len(data)))
+                    self.end_headers()
+                    self.wfile.write(data)
+                else:
+                    self._send_json(404, {"error": "Unbekannter Pfad"})
+
+            def do_POST(self):
+                url = urlparse(self.path)
+                if url.path != "/v1/transcribe":
+                    self._send_json(404, {"error": "Unbekannter Pfad"})
+                    return
+
+                length = int(self.headers.get("Content-Length") or 0)
+                if length <= 0:
+                    self._send_json(400, {"error": "Leerer Body (Content-Length fehlt)"})
+                    return
+                if length > server.max_upload_bytes:
+                    self._send_json(413, {"error": f"Upload zu groß (max {config.SERVER_MAX_UPLOAD_MB:g} MB)"})
+                    self.close_connection = True
+                    return
+
+                params = {key: values[-1] for key, values in parse_qs(url.query).items()}
+                content_type, type_params = parse_content_type(self.headers.get("Content-Type", ""))
+                is_pcm = params.get("format") == "pcm16" or content_type in PCM_CONTENT_TYPES
+                mismatches = pcm_format_errors(type_params, params) if is_pcm else []
+                if mismatches:
+                    self._send_json(400, {"error": f"PCM muss {config.SAMPLE_RATE} Hz Mono sein "
+                                                   f"(erhalten: {', '.join(mismatches)})"})
+                    self.close_connection = True
+                    return
+
+                filename = params.get("filename") or f"audio{CONTENT_TYPE_EXTENSIONS.get(content_type, '.wav')}"
+                job = TranscriptionJob(self.rfile.read(length), is_pcm, filename,
+                                       correct=params.get("correct", "1") not in ("0", "false"))
+                if not server.submit(job):
+                    self._send_json(429, {"error": "Warteschlange voll"}, {"Retry-After": "1"})
+                    return
+
+                if not job.done.wait(config.SERVER_REQUEST_TIMEOUT):
+                    self._send_json(504, {"error": "Zeitüberschreitung bei der Transkription"})
+                elif job.error is not None:
+                    with server._lock:
+                        server.stats["errors"] += 1
+                    self._send_json(500, {"error": f"{job.error.__class__.__name__}: {job.error}"})
+                else:
+                    self._send_json(200, job.result)
+
+        return Handler
+
+    # --- Steuerung ---
+
+    def start(self):
+        if self.service is None:
+            from src.transcription import TranscriptionService
+
+            self.service = TranscriptionService()
+            if config.USE_LOCAL_TRANSCRIPTION:
+                self.service.start_warmup()
+        if self.text_processor is None:
+            from src.text_processor import TextProcessor
+
+            self.text_processor = TextProcessor()
+
+        if self.unix_socket:
+            # Verwaisten Socket eines abgestürzten Laufs entfernen
+            if os.path.exists(self.unix_socket):
+                os.unlink(self.unix_socket)
+            self._httpd = _UnixHTTPServer(self.unix_socket, self._make_handler())
+        else:
+            self._httpd = ThreadingHTTPServer((self.host, self.port), self._make_handler())
+            self._httpd.daemon_threads = True
+
+        self._correction_pool = ThreadPoolExecutor(max_workers=CORRECTION_WORKERS,
+                                                   thread_name_prefix="ServerCorrection")
+        for i in range(self.workers):
+            thread = threading.Thread(target=self._dispatch, name=f"ServerDispatcher-{i}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        thread = threading.Thread(target=self._httpd.serve_forever, name="TranscriptionServer", daemon=True)
+        thread.start()
+        self._threads.append(thread)
+
+        logger.info(f"Transkriptions-Server auf {self.address} ({self.workers} Dispatcher, "
+                    f"Queue {self._queue.maxsize})")
+
+    def stop(self, timeout: float = 30.0):
+        """Nimmt keine Anfragen mehr an und arbeitet die Queue ab"""
+        if self._httpd:
+            self._httpd.shutdown()
+            self._httpd.server_close()
+        for _ in range(self.workers):
+            self._queue.put(None)
+
+        deadline = time.monotonic() + timeout
+        for thread in self._threads:
+            thread.join(timeout=max(0.0, deadline - time.monotonic()))
+        self._threads = []
+        if self._correction_pool:
+            self._correction_pool.shutdown(wait=True)
+            self._correction_pool = None
+        if self.unix_socket and os.path.exists(self.unix_socket):
+            os.unlink(self.unix_socket)
+        if self._owns_service and self.service:
+            self.service.shutdown()
+
+    def get_stats(self) -> dict:
+        with self._lock:
+            stats = dict(self.stats)
+        backend = "local" if config.USE_LOCAL_TRANSCRIPTION else "api"
+        stats.update({
+            "status": "ok",
+            "backend": backend,
+            "queue_depth": self._queue.qsize(),
+            "queue_size": self._queue.maxsize,
+        })
+        if backend == "local" and hasattr(self.service, "is_local_ready"):
+            stats["model_ready"] = self.service.is_local_ready()
+        return stats
+
+
+def cli(argv: Optional[List[str]] = None) -> int:
+    """python -m src serve - Transkriptions-Server bis Strg+C oder SIGTERM"""
+    parser = argparse.ArgumentParser(prog="python -m src serve",
+                                     description="Stellt die Transkription per HTTP oder Unix-Socket bereit")
+    parser.add_argument('--host', default=None, help='Adresse (Standard: SERVER_HOST, nur lokal)')
+    parser.add_argument('--port', type=int, default=None, help='Port (Standard: SERVER_PORT)')
+    parser.add_argument('--socket', default=None, help='Unix-Socket statt TCP')
+    parser.add_argument('--queue-size', type=int, default=None, help='Maximale Anzahl wartender Anfragen')
+    parser.add_argument('--workers', '-j', type=int, default=None, help='Dispatcher-Threads')
+    backend = parser.add_mutually_exclusive_group()
+    backend.add_argument('--local', dest='local', action='store_true', default=None, help='Lokales Whisper-Modell')
+    backend.add_argument('--api', dest='local', action='store_false', help='OpenAI-API')
+    args = parser.parse_args(argv)
+
+    if args.local is not None:
+        config.USE_LOCAL_TRANSCRIPTION = args.local
+
+    server = TranscriptionServer(host=args.host, port=args.port, unix_socket=args.socket,
+                                 queue_size=args.queue_size, workers=args.workers)
+    try:
+        server.start()
+    except OSError as e:
+        logger.error(f"Server konnte nicht gestartet werden: {e}")
+        return 2
+
+    shutdown = threading.Event()
+    signal.signal(signal.SIGTERM, lambda signum, frame: shutdown.set())
+    try:
+        while not shutdown.wait(1.0):
+            pass
+    except KeyboardInterrupt:
+        pass
+    finally:
+        logger.info("Beende Transkriptions-Server...")
+        server.stop()
+    return 0
@@ -0,0 +1,242 @@
+"""
+Transcription Worker - Lokale Transkription in separatem Prozess
+Hält das Whisper-Modell in einem eigenen Prozess, damit Inferenz nicht mit
+Keyboard-Hook, Tray und tkinter um den GIL konkurriert und ein Absturz in
+CTranslate2 nicht die ganze Anwendung beendet.
+"""
+
+import logging
+import multiprocessing
+import threading
+import time
+from typing import TYPE_CHECKING, Callable, Optional
+
+if TYPE_CHECKING:
+    import numpy as np
+
+from src.config import config
+
+logger = logging.getLogger(__name__)
+
+
+def _create_local_service():
+    """Standard-Factory im Worker-Prozess: echter LocalTranscriptionService"""
+    from src.local_transcription import LocalTranscriptionService
+    return LocalTranscriptionService()
+
+
+def _worker_main(conn, service_factory: Callable):
+    """Einstiegspunkt des Worker-Prozesses: Modell laden und Anfragen beantworten"""
+    try:
+        service = service_factory()
+        available = bool(service.is_available())
+        if available and hasattr(service, 'warmup'):
+            service.warmup()
+        conn.send(('ready', available))
+    except Exception as e:
+        conn.send(('ready', False))
+        logger.error(f"Worker konnte Modell nicht laden: {e}")
+        return
+
+    while True:
+        try:
+            request = conn.recv()
+        except (EOFError, OSError):
+            return  # Elternprozess beendet
+
+        op = request.get('op')
+        if op == 'shutdown':
+            return
+
+        try:
+            if op == 'transcribe_array':
+                import numpy as np
+                audio = np.frombuffer(conn.recv_bytes(), dtype=np.float32)
+                result = service.transcribe_array(audio, initial_prompt=request.get('initial_prompt'),
+                                                  profile=request.get('profile'))
+            elif op == 'transcribe_audio_data':
+                result = service.transcribe_audio_data(conn.recv_bytes(), request.get('filename', 'audio.mp3'))
+            elif op == 'transcribe':
+                result = service.transcribe(request['audio_path'])
+            elif op == 'model_info':
+                result = service.get_model_info()
+            else:
+                raise ValueError(f"Unbekannte Operation: {op}")
+            conn.send(('ok', result))
+        except Exception as e:
+            conn.send(('error', str(e)))
+
+
+class TranscriptionWorkerClient:
+    """Supervisor für den Transkriptions-Worker (gleiche Schnittstelle wie LocalTranscriptionService)"""
+
+    def __init__(self, service_factory: Callable = _create_local_service,
+                 request_timeout: Optional[float] = None,
+                 startup_timeout: Optional[float] = None,
+                 max_restarts: int = 3):
+        self.service_factory = service_factory
+        self.request_timeout = request_timeout if request_timeout is not None else config.WORKER_REQUEST_TIMEOUT
+        self.startup_timeout = startup_timeout if startup_timeout is not None else config.WORKER_STARTUP_TIMEOUT
+        self.max_restarts = max_restarts
+        self.model_size = config.WHISPER_MODEL_SIZE
+
+        self._ctx = multiprocessing.get_context('spawn')  # Kein fork: CTranslate2/OpenMP sind nicht fork-sicher
+        self._process = None
+        self._conn = None
+        self._available = False
+        self._lock = threading.Lock()  # Pipe ist nicht für parallele Anfragen ausgelegt
+        self._restart_times = []
+        self.restart_count = 0
+
+    def start(self) -> bool:
+        """Startet den Worker-Prozess und wartet, bis das Modell geladen ist"""
+        with self._lock:
+            return self._start_locked()
+
+    def _start_locked(self) -> bool:
+        self._terminate_locked()
+
+        start_time = time.time()
+        parent_conn, child_conn = self._ctx.Pipe()
+        self._process = self._ctx.Process(
+            target=_worker_main,
+            args=(child_conn, self.service_factory),
+            name="TranscriptionWorker",
+            daemon=True
+        )
+        self._process.start()
+        child_conn.close()
+        self._conn = parent_conn
+
+        try:
+            if not self._conn.poll(self.startup_timeout):
+                raise TimeoutError(f"Worker nach {self.startup_timeout:.0f}s nicht bereit")
+            status, self._available = self._conn.recv()
+        except Exception as e:
+            logger.error(f"Transkriptions-Worker konnte nicht gestartet werden: {e}")
+            self._terminate_locked()
+            return False
+
+        logger.info(f"Transkriptions-Worker gestartet (PID {self._process.pid}, "
+                    f"Modell {'bereit' if self._available else 'nicht verfügbar'}) in {time.time() - start_time:.2f}s")
+        return self._available
+
+    def _restart_locked(self) -> bool:
+        """Startet einen abgestürzten Worker neu (begrenzt pro Minute)"""
+        now = time.time()
+        self._restart_times = [t for t in self._restart_times if now - t < 60]
+        if len(self._restart_times) >= self.max_restarts:
+            logger.error("Transkriptions-Worker stürzt wiederholt ab - kein weiterer Neustart")
+            self._available = False
+            return False
+
+        self._restart_times.append(now)
+        self.restart_count += 1
+        logger.warning(f"Starte Transkriptions-Worker neu (Neustart {self.restart_count})")
+        return self._start_locked()
+
+    def _request(self, message: dict, payload: Optional[bytes] = None):
+        """Sendet eine Anfrage an den Worker; ein toter Worker wird vorher neu gestartet"""
+        with self._lock:
+            for attempt in range(2):
+                if not self._is_alive() and not self._restart_locked():
+                    return None
+
+                try:
+                    self._conn.send(message)
+                    if payload is not None:
+                        self._conn.send_bytes(payload)
+                except OSError as e:
+                    # Worker war bereits tot - neu starten und Anfrage einmal wiederholen
+                    logger.warning(f"Transkriptions-Worker nicht erreichbar (Versuch {attempt + 1}): {e}")
+                    self._terminate_locked()
+                    continue
+
+                try:
+                    if not self._conn.poll(self.request_timeout):
+                        # Hängende Inferenz: Prozess beenden, Supervisor startet ihn bei Bedarf neu
+                        logger.error(f"Transkriptions-Worker antwortet nicht ({self.request_timeout:.0f}s) - beende Prozess")
+                        self._terminate_locked()
+                        return None
+
+                    status, result = self._conn.recv()
+                except (EOFError, OSError) as e:
+                    # Absturz während der Inferenz: nicht wiederholen (Eingabe könnte die Ursache sein)
+                    logger.error(f"Transkriptions-Worker während der Anfrage abgestürzt: {e}")
+                    self._terminate_locked()
+                    return None
+
+                if status == 'error':
+                    logger.error(f"Fehler im Transkriptions-Worker: {result}")
+                    return None
+                return result
+
+            return None
+
+    def _is_alive(self) -> bool:
+        return self._process is not None and self._process.is_alive() and self._conn is not None
+
+    def _terminate_locked(self):
+        """Beendet Prozess und Pipe (falls vorhanden)"""
+        if self._conn is not None:
+            try:
+                self._conn.close()
+            except Exception:
+                pass
+            self._conn = None
+
+        if self._process is not None:
+            if self._process.is_alive():
+                self._process.terminate()
+            self._process.join(timeout=2.0)
+            self._process = None
+
+    # Schnittstelle kompatibel zu LocalTranscriptionService
+
+    def transcribe_array(self, audio: "np.ndarray", initial_prompt: Optional[str] = None,
+                         profile: Optional[str] = None) -> Optional[str]:
+        """Transkribiert float32-PCM im Worker-Prozess (profile: Decoding-Profil erzwingen)"""
+        import numpy as np
+        payload = np.ascontiguousarray(audio, dtype=np.float32).tobytes()
+        return self._request({'op': 'transcribe_array', 'initial_prompt': initial_prompt, 'profile': profile},
+                             payload)
+
+    def transcribe_audio_data(self, audio_data: bytes, filename: str = "audio.mp3") -> Optional[str]:
+        """Transkribiert komprimierte Audio-Daten im Worker-Prozess"""
+        return self._request({'op': 'transcribe_audio_data', 'filename': filename}, audio_data)
+
+    def transcribe(self, audio_path: str) -> Optional[str]:
+        """Transkribiert eine Audio-Datei im Worker-Prozess"""
+        return self._request({'op': 'transcribe', 'audio_path': audio_path})
+
+    def warmup(self) -> bool:
+        """Der Worker wärmt das Modell beim Start selbst auf"""
+        if not self._is_alive():
+            return self.start()
+        return self._available
+
+    def touch(self) -> bool:
+        """Hotkey-Druck: nur einen abgestürzten Worker neu starten, keine Inferenz"""
+        return self.warmup()
+
+    def is_available(self) -> bool:
+        """Verfügbar, solange der Worker ein geladenes Modell meldet (oder neu gestartet werden kann)"""
+        return self._available
+
+    def get_model_info(self) -> dict:
+        """Modell-Informationen aus dem Worker-Prozess"""
+        info = self._request({'op': 'model_info'}) or {"available": False}
+        info["worker_process"] = True
+        return info
+
+    def shutdown(self):
+        """Beendet den Worker-Prozess sauber"""
+        with self._lock:
+            if self._is_alive():
+                try:
+                    self._conn.send({'op': 'shutdown'})
+                except Exception:
+                    pass
+            self._terminate_locked()
+            self._available = False
+        logger.info("Transkriptions-Worker beendet")
@@ -0,0 +1,124 @@
+"""
+Upload Optimizer - Upload-Format nach gemessener Verbindung wählen
+Schätzt aus den letzten API-Anfragen den Upload-Durchsatz (Gesamtzeit minus
+gemeldeter Serverzeit) und aus den letzten Kodierungen Kodierzeit und Größe
+pro Audiosekunde. Gewählt wird das Format mit der kleinsten Summe aus
+Kodier- und Upload-Zeit: im schnellen LAN rohes WAV, bei langsamer
+Verbindung Opus.
+"""
+
+import logging
+import threading
+from typing import Dict, List, Optional
+
+from src.audio_encoder import is_native_format
+from src.config import config
+
+logger = logging.getLogger(__name__)
+
+WAV = "wav"
+
+# Startwerte bis zur ersten eigenen Messung (tools/benchmark_encoders.py, 16 kHz Mono):
+# Größe relativ zu WAV und Kodierzeit pro Audiosekunde auf dem kritischen Pfad
+DEFAULT_SIZE_RATIO = {WAV: 1.0, 'flac': 0.37, 'ogg': 0.075, 'opus': 0.07, 'mp3': 0.25}
+DEFAULT_ENCODE_SECONDS = {WAV: 0.0, 'flac': 0.0004, 'ogg': 0.005, 'opus': 0.017, 'mp3': 0.02}
+
+# Kleinere Uploads messen vor allem die Latenz, nicht den Durchsatz
+MIN_SAMPLE_BYTES = 16 * 1024
+
+
+class UploadOptimizer:
+    """Wählt zwischen WAV, FLAC und Opus anhand von Durchsatz und Kodierkosten"""
+
+    def __init__(self, smoothing: Optional[float] = None):
+        self.smoothing = smoothing if smoothing is not None else config.UPLOAD_STATS_SMOOTHING
+
+        self.throughput: Optional[float] = None  # Bytes pro Sekunde
+        self.server_seconds: Optional[float] = None
+        self.upload_samples = 0
+
+        wav_bytes_per_second = config.SAMPLE_RATE * config.CHANNELS * 2
+        self._bytes_per_second: Dict[str, float] = {
+            name: ratio * wav_bytes_per_second for name, ratio in DEFAULT_SIZE_RATIO.items()
+        }
+        self._encode_seconds: Dict[str, float] = dict(DEFAULT_ENCODE_SECONDS)
+        self._last_choice: Optional[str] = None
+        self._lock = threading.Lock()
+
+    def _smooth(self, old: Optional[float], new: float) -> float:
+        return new if old is None else old + self.smoothing * (new - old)
+
+    def record_upload(self, payload_bytes: int, elapsed: float, server_seconds: Optional[float]):
+        """Misst den Upload-Durchsatz einer Anfrage (nur mit vom Server gemeldeter Verarbeitungszeit)"""
+        if server_seconds is None or payload_bytes < MIN_SAMPLE_BYTES:
+            return
+        transfer_seconds = elapsed - server_seconds
+        if transfer_seconds <= 0.01:
+            return
+
+        with self._lock:
+            self.throughput = self._smooth(self.throughput, payload_bytes / transfer_seconds)
+            self.server_seconds = self._smooth(self.server_seconds, server_seconds)
+            self.upload_samples += 1
+
+    def record_encode(self, output_format: str, audio_seconds: float, encode_seconds: float, encoded_bytes: int):
+        """Übernimmt Kodierzeit und Größe einer tatsächlichen Kodierung"""
+        if audio_seconds <= 0:
+            return
+        output_format = output_format.lower()
+        with self._lock:
+            self._encode_seconds[output_format] = self._smooth(
+                self._encode_seconds.get(output_format), encode_seconds / audio_seconds)
+            self._bytes_per_second[output_format] = self._smooth(
+                self._bytes_per_second.get(output_format), encoded_bytes / audio_seconds)
+
+    def candidates(self) -> List[str]:
+        """WAV, die im Prozess verfügbaren Formate und das konfigurierte Format"""
+        formats = [WAV] + [name for name in ('flac', 'opus') if is_native_format(name)]
+        configured = config.AUDIO_COMPRESSION_FORMAT.lower()
+        if configured not in formats:
+            formats.append(configured)
+        return formats
+
+    def estimate(self, output_format: str, audio_seconds: float) -> Optional[float]:
+        """Geschätzte Kodier- plus Upload-Zeit in Sekunden (None ohne Durchsatz-Messung)"""
+        if self.throughput is None:
+            return None
+        output_format = output_format.lower()
+        wav_bytes = self._bytes_per_second[WAV]
+        size = self._bytes_per_second.get(output_format, wav_bytes) * audio_seconds
+        encode = self._encode_seconds.get(output_format, DEFAULT_ENCODE_SECONDS['mp3']) * audio_seconds
+        return encode + size / self.throughput
+
+    def choose(self, audio_seconds: float = 10.0) -> str:
+        """Format mit der kürzesten geschätzten Zeit; ohne Messung das konfigurierte Format"""
+        if not config.AUDIO_COMPRESSION_ENABLED:
+            return WAV
+        if not config.UPLOAD_FORMAT_ADAPTIVE or self.throughput is None:
+            return config.AUDIO_COMPRESSION_FORMAT
+
+        with self._lock:
+            estimates = {name: self.estimate(name, audio_seconds) for name in self.candidates()}
+            best = min(estimates, key=lambda name: estimates[name])
+
+            summary = ", ".join(f"{name} {seconds:.2f}s" for name, seconds in estimates.items())
+            message = (f"Upload-Format: {best} (Durchsatz {self.throughput / 1024:.0f} KB/s, "
+                       f"geschätzt für {audio_seconds:.0f}s Audio: {summary})")
+            if best != self._last_choice:
+                logger.info(message)
+            else:
+                logger.debug(message)
+            self._last_choice = best
+            return best
+
+    def get_stats(self) -> dict:
+        """Messwerte und aktuelle Wahl (für Logs und Metriken)"""
+        with self._lock:
+            return {
+                "throughput_bytes_per_second": round(self.throughput) if self.throughput else None,
+                "server_seconds": round(self.server_seconds, 3) if self.server_seconds is not None else None,
+                "upload_samples": self.upload_samples,
+                "format": self._last_choice or config.AUDIO_COMPRESSION_FORMAT,
+                "encode_seconds_per_audio_second": {k: round(v, 5) for k, v in self._encode_seconds.items()},
+                "bytes_per_audio_second": {k: round(v) for k, v in self._bytes_per_second.items()},
+            }
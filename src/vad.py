@@ -0,0 +1,148 @@
+"""
+Voice Activity Detection - Energie-basierte Stille-Erkennung
+Findet Sprechpausen in 16-bit PCM, um lange Aufnahmen an natürlichen
+Stellen zu teilen, und entfernt Stille vor Upload bzw. Dekodierung.
+Bewusst ohne zusätzliche Abhängigkeiten (nur numpy).
+"""
+
+import logging
+from typing import List, Tuple
+
+from src.audio_utils import NUMPY_AVAILABLE
+
+if NUMPY_AVAILABLE:
+    import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Analyse-Fenster für die Energieberechnung
+FRAME_MS = 30
+
+# Adaptive Schwelle beim Trimmen: leise Sprecher liegen unter der festen Schwelle,
+# heben sich aber deutlich vom Grundrauschen der eigenen Aufnahme ab
+NOISE_FLOOR_PERCENTILE = 10
+NOISE_MARGIN = 3.0
+PEAK_PERCENTILE = 95
+PEAK_RATIO = 0.1
+
+
+def frame_rms(samples: "np.ndarray", sample_rate: int, frame_ms: int = FRAME_MS) -> "np.ndarray":
+    """RMS-Pegel (int16-Skala) pro Analyse-Fenster"""
+    frame_length = max(1, sample_rate * frame_ms // 1000)
+    frame_count = len(samples) // frame_length
+    if frame_count == 0:
+        return np.zeros(0, dtype=np.float32)
+
+    frames = samples[:frame_count * frame_length].astype(np.float32).reshape(frame_count, frame_length)
+    return np.sqrt(np.mean(frames ** 2, axis=1))
+
+
+def _runs(mask: "np.ndarray") -> Tuple["np.ndarray", "np.ndarray"]:
+    """Start- und End-Index (exklusiv) aller True-Folgen einer Maske"""
+    edges = np.diff(np.concatenate(([0], mask.astype(np.int8), [0])))
+    return np.flatnonzero(edges == 1), np.flatnonzero(edges == -1)
+
+
+def find_silences(samples: "np.ndarray", sample_rate: int, threshold: float,
+                  min_silence_seconds: float, frame_ms: int = FRAME_MS) -> List[Tuple[int, int]]:
+    """Findet Stille-Abschnitte als (start, ende) in Samples"""
+    rms = frame_rms(samples, sample_rate, frame_ms)
+    frame_length = max(1, sample_rate * frame_ms // 1000)
+    min_frames = max(1, int(min_silence_seconds * 1000 / frame_ms))
+
+    starts, ends = _runs(rms < threshold)
+    return [(int(start) * frame_length, int(end) * frame_length)
+            for start, end in zip(starts, ends) if end - start >= min_frames]
+
+
+def speech_threshold(rms: "np.ndarray", threshold: float) -> float:
+    """Schwelle für eine Aufnahme: höchstens threshold, bei leisen Aufnahmen relativ zum Grundrauschen"""
+    if len(rms) == 0:
+        return threshold
+    noise_floor = float(np.percentile(rms, NOISE_FLOOR_PERCENTILE))
+    peak = float(np.percentile(rms, PEAK_PERCENTILE))
+    return min(threshold, max(noise_floor * NOISE_MARGIN, peak * PEAK_RATIO))
+
+
+def has_speech(samples: "np.ndarray", sample_rate: int, threshold: float,
+               min_speech_seconds: float, frame_ms: int = FRAME_MS) -> bool:
+    """Ob die Aufnahme mindestens min_speech_seconds Sprache enthält (gleiche Schwelle wie trim_silence)"""
+    rms = frame_rms(samples, sample_rate, frame_ms)
+    voiced = rms > speech_threshold(rms, threshold)
+    return np.count_nonzero(voiced) * frame_ms / 1000 >= min_speech_seconds
+
+
+def trim_silence(samples: "np.ndarray", sample_rate: int, threshold: float,
+                 padding_seconds: float, max_pause_seconds: float,
+                 min_speech_seconds: float, min_keep_seconds: float = 0.0,
+                 frame_ms: int = FRAME_MS) -> "np.ndarray":
+    """Entfernt Stille am Anfang und Ende und kürzt Pausen auf max_pause_seconds.
+
+    Um jede Sprache bleiben padding_seconds erhalten. Wäre das Ergebnis kürzer als
+    min_keep_seconds, bleibt die Aufnahme unverändert. Enthält sie weniger als
+    min_speech_seconds Sprache, wird ein leeres Array zurückgegeben.
+    """
+    rms = frame_rms(samples, sample_rate, frame_ms)
+    frame_length = max(1, sample_rate * frame_ms // 1000)
+    voiced = rms > speech_threshold(rms, threshold)
+    if np.count_nonzero(voiced) * frame_ms / 1000 < min_speech_seconds:
+        return samples[:0]
+
+    # Sprache um padding_seconds in beide Richtungen erweitern
+    pad_frames = int(round(padding_seconds * 1000 / frame_ms))
+    keep = voiced
+    if pad_frames > 0:
+        window = np.ones(2 * pad_frames + 1, dtype=np.int32)
+        keep = np.convolve(voiced.astype(np.int32), window, mode='same') > 0
+
+    # Innere Pausen: vom Rest nur so viel behalten, dass die Pause max_pause_seconds lang ist
+    keep = keep.copy()
+    extra_frames = max(0, int(max_pause_seconds * 1000 / frame_ms) - 2 * pad_frames)
+    starts, ends = _runs(~keep)
+    for start, end in zip(starts, ends):
+        if start > 0 and end < len(keep):
+            keep[start:start + min(extra_frames, end - start)] = True
+
+    sample_mask = np.repeat(keep, frame_length)
+    # Rest hinter dem letzten vollständigen Fenster gehört zum letzten Fenster
+    remainder = len(samples) - len(sample_mask)
+    if remainder > 0:
+        sample_mask = np.concatenate((sample_mask, np.full(remainder, keep[-1])))
+
+    trimmed = samples[sample_mask]
+    if len(trimmed) < min_keep_seconds * sample_rate:
+        # Sehr kurzes Ergebnis: eher abgeschnittene Wörter als gesparte Sekunden - nicht kürzen
+        return samples
+    return trimmed
+
+
+def find_split_points(samples: "np.ndarray", sample_rate: int, target_seconds: float,
+                      max_seconds: float, threshold: float, min_silence_seconds: float) -> List[int]:
+    """Wählt Schnittpunkte (Sample-Index) in Pausen, sodass Chunks etwa target_seconds lang sind.
+
+    Ohne Pause bis max_seconds wird hart geschnitten.
+    """
+    total = len(samples)
+    target = int(target_seconds * sample_rate)
+    maximum = int(max_seconds * sample_rate)
+    if total <= maximum:
+        return []
+
+    # Mitte jeder Pause ist ein Kandidat
+    candidates = [(start + end) // 2 for start, end in
+                  find_silences(samples, sample_rate, threshold, min_silence_seconds)]
+
+    split_points = []
+    chunk_start = 0
+    while total - chunk_start > maximum:
+        window = [point for point in candidates if chunk_start + target // 2 <= point <= chunk_start + maximum]
+        if window:
+            # Pause, die der Ziellänge am nächsten liegt
+            split = min(window, key=lambda point: abs(point - (chunk_start + target)))
+        else:
+            split = chunk_start + maximum
+            logger.debug(f"Keine Pause gefunden - harter Schnitt bei {split / sample_rate:.1f}s")
+        split_points.append(split)
+        chunk_start = split
+
+    return split_points
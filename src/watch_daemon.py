@@ -0,0 +1,366 @@
+"""
+Watch-Folder-Daemon: python -m src watch <Verzeichnis>
+Transkribiert Audio-Dateien, die in einem (geteilten) Ordner abgelegt werden,
+ohne Tray-Anwendung. Änderungen kommen über watchdog (inotify unter Linux),
+ohne watchdog per Polling. Eine Datei gilt erst als fertig geschrieben,
+wenn Größe und Änderungszeit WATCH_SETTLE_SECONDS lang gleich bleiben.
+Fertige Dateien laufen durch eine begrenzte Queue zu WATCH_WORKERS
+Worker-Threads; das Transkript landet atomar als <datei>.txt und <datei>.json
+neben der Audio-Datei (anruf.wav -> anruf.wav.txt, anruf.wav.json).
+"""
+
+import argparse
+import json
+import logging
+import os
+import queue
+import signal
+import threading
+import time
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Set, Tuple
+
+from src.batch import AUDIO_EXTENSIONS, audio_seconds, transcribe_file
+from src.config import config
+from src.metrics import error_type, metrics
+
+logger = logging.getLogger(__name__)
+
+# Optional: watchdog für Dateisystem-Ereignisse (pip install watchdog)
+WATCHDOG_AVAILABLE = False
+try:
+    from watchdog.events import FileSystemEventHandler
+    from watchdog.observers import Observer
+
+    WATCHDOG_AVAILABLE = True
+except ImportError:
+    FileSystemEventHandler = object
+    logger.debug("watchdog nicht installiert - Watch-Folder nutzt Polling")
+
+# Abstand der Statusmeldungen (Queue-Tiefe, Durchsatz)
+STATS_INTERVAL_SECONDS = 60.0
+
+
+def sidecar_paths(audio_path: Path) -> Tuple[Path, Path]:
+    """<datei>.txt und <datei>.json neben der Audio-Datei - anruf.wav und anruf.mp3 bekommen eigene Sidecars"""
+    return audio_path.with_name(audio_path.name + '.txt'), audio_path.with_name(audio_path.name + '.json')
+
+
+def write_atomic(path: Path, content: str):
+    """Schreibt über eine temporäre Datei im selben Verzeichnis - Leser sehen nie eine halbe Datei"""
+    temp_path = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    with open(temp_path, 'w', encoding='utf-8') as f:
+        f.write(content)
+    os.replace(temp_path, path)
+
+
+class _EventHandler(FileSystemEventHandler):
+    """Leitet watchdog-Ereignisse als Kandidaten an den Daemon weiter"""
+
+    def __init__(self, daemon: "WatchDaemon"):
+        super().__init__()
+        self.daemon = daemon
+
+    def on_created(self, event):
+        if not event.is_directory:
+            self.daemon.notify(Path(event.src_path))
+
+    def on_modified(self, event):
+        if not event.is_directory:
+            self.daemon.notify(Path(event.src_path))
+
+    def on_moved(self, event):
+        if not event.is_directory:
+            self.daemon.notify(Path(event.dest_path))
+
+
+class WatchDaemon:
+    """Beobachtet ein Verzeichnis und transkribiert neue, fertig geschriebene Audio-Dateien"""
+
+    def __init__(self, directory: Path, transcriber: Optional[Callable[[str, Optional[float]], Optional[str]]] = None,
+                 workers: Optional[int] = None, queue_size: Optional[int] = None,
+                 settle_seconds: Optional[float] = None, poll_interval: Optional[float] = None,
+                 recursive: bool = False, use_watchdog: Optional[bool] = None):
+        self.directory = Path(directory).resolve()
+        self.workers = max(1, workers or config.WATCH_WORKERS)
+        self.settle_seconds = settle_seconds if settle_seconds is not None else config.WATCH_SETTLE_SECONDS
+        self.poll_interval = poll_interval if poll_interval is not None else config.WATCH_POLL_INTERVAL
+        self.recursive = recursive
+        self.use_watchdog = WATCHDOG_AVAILABLE if use_watchdog is None else (use_watchdog and WATCHDOG_AVAILABLE)
+        self._transcriber = transcriber
+        self._service = None
+
+        self._queue: "queue.Queue[Optional[Path]]" = queue.Queue(maxsize=queue_size or config.WATCH_QUEUE_SIZE)
+        # Kandidat -> (Größe, Änderungszeit, seit wann unverändert)
+        self._pending: Dict[Path, Tuple[int, float, float]] = {}
+        self._queued: Set[Path] = set()
+        self._lock = threading.Lock()
+
+        self._stop_event = threading.Event()
+        self._threads: List[threading.Thread] = []
+        self._observer = None
+
+        self.stats = {"ok": 0, "empty": 0, "error": 0, "in_progress": 0, "audio_seconds": 0.0}
+        self._started_at = 0.0
+        self._last_report = 0.0
+
+    # --- Dateiauswahl ---
+
+    def _is_candidate(self, path: Path) -> bool:
+        return (path.suffix.lower() in AUDIO_EXTENSIONS and not path.name.startswith('.')
+                and not sidecar_paths(path)[1].exists())
+
+    def notify(self, path: Path):
+        """Merkt eine (möglicherweise noch wachsende) Datei vor"""
+        path = Path(path)
+        if not self._is_candidate(path):
+            return
+        with self._lock:
+            if path not in self._pending and path not in self._queued:
+                self._pending[path] = (-1, 0.0, time.monotonic())
+
+    def scan(self):
+        """Polling bzw. Start: alle vorhandenen Dateien als Kandidaten aufnehmen"""
+        pattern = self.directory.rglob('*') if self.recursive else self.directory.iterdir()
+        for path in pattern:
+            if path.is_file():
+                self.notify(path)
+
+    def _check_pending(self):
+        """Übergibt Dateien, deren Größe und Änderungszeit lange genug stabil sind, an die Queue"""
+        now = time.monotonic()
+        with self._lock:
+            candidates = list(self._pending.items())
+
+        for path, (size, mtime, since) in candidates:
+            try:
+                stat = path.stat()
+            except OSError:
+                with self._lock:
+                    self._pending.pop(path, None)
+                continue
+
+            if (stat.st_size, stat.st_mtime) != (size, mtime):
+                # Datei wird noch geschrieben - Wartezeit neu beginnen
+                with self._lock:
+                    self._pending[path] = (stat.st_size, stat.st_mtime, now)
+                continue
+            if now - since < self.settle_seconds or stat.st_size == 0:
+                continue
+
+            try:
+                self._queue.put_nowait(path)
+            except queue.Full:
+                # Rückstau: bleibt vorgemerkt und wird beim nächsten Durchlauf erneut versucht
+                break
+            with self._lock:
+                self._pending.pop(path, None)
+                self._queued.add(path)
+
+        metrics.watch_queue_depth.set(self._queue.qsize())
+
+    # --- Verarbeitung ---
+
+    def _transcribe(self, path: Path, duration: Optional[float]) -> Optional[str]:
+        if self._transcriber:
+            return self._transcriber(str(path), duration)
+        return transcribe_file(self._service, str(path), duration)
+
+    def _process(self, path: Path):
+        start_time = time.time()
+        duration = audio_seconds(path)
+        entry = {"path": str(path), "audio_seconds": duration}
+        try:
+            text = self._transcribe(path, duration)
+            entry.update({"status": "ok" if text else "empty", "text": text or ""})
+        except Exception as e:
+            logger.error(f"Transkription von {path.name} fehlgeschlagen: {e}")
+            metrics.errors.inc(type=error_type(e))
+            entry.update({"status": "error", "error": f"{e.__class__.__name__}: {e}"})
+
+        entry["seconds"] = round(time.time() - start_time, 3)
+        entry["transcribed_at"] = time.strftime('%Y-%m-%dT%H:%M:%S')
+
+        txt_path, json_path = sidecar_paths(path)
+        if entry["status"] == "ok":
+            write_atomic(txt_path, entry["text"] + "\n")
+        # JSON zuletzt: markiert die Datei als erledigt (auch bei Fehlern, kein Endlos-Retry)
+        write_atomic(json_path, json.dumps(entry, ensure_ascii=False, indent=2) + "\n")
+
+        with self._lock:
+            self.stats[entry["status"]] += 1
+            if entry["status"] == "ok" and duration:
+                self.stats["audio_seconds"] += duration
+        metrics.watch_files.inc(status=entry["status"])
+        logger.info(f"{path.name}: {entry['status']} in {entry['seconds']:.1f}s")
+
+    def _worker(self):
+        while True:
+            path = self._queue.get()
+            if path is None:
+                break
+            with self._lock:
+                self.stats["in_progress"] += 1
+            try:
+                self._process(path)
+            except Exception as e:
+                logger.error(f"Fehler bei {path}: {e}", exc_info=True)
+            finally:
+                with self._lock:
+                    self.stats["in_progress"] -= 1
+                    self._queued.discard(path)
+
+    def _loop(self):
+        while not self._stop_event.wait(self.poll_interval):
+            try:
+                if not self.use_watchdog:
+                    self.scan()
+                self._check_pending()
+                if time.monotonic() - self._last_report >= STATS_INTERVAL_SECONDS:
+                    self.report()
+            except Exception as e:
+                logger.error(f"Fehler im Watch-Loop: {e}", exc_info=True)
+
+    # --- Steuerung ---
+
+    def start(self):
+        if not self.directory.is_dir():
+            raise FileNotFoundError(f"Verzeichnis nicht gefunden: {self.directory}")
+        if self._transcriber is None and self._service is None:
+            from src.transcription import TranscriptionService
+
+            self._service = TranscriptionService()
+            if config.USE_LOCAL_TRANSCRIPTION:
+                self._service.start_warmup()
+
+        self._started_at = self._last_report = time.monotonic()
+        self._stop_event.clear()
+        self.scan()
+
+        if self.use_watchdog:
+            self._observer = Observer()
+            self._observer.schedule(_EventHandler(self), str(self.directory), recursive=self.recursive)
+            self._observer.start()
+
+        for i in range(self.workers):
+            thread = threading.Thread(target=self._worker, name=f"WatchWorker-{i}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        loop = threading.Thread(target=self._loop, name="WatchLoop", daemon=True)
+        loop.start()
+        self._threads.append(loop)
+
+        mode = "inotify/watchdog" if self.use_watchdog else f"Polling alle {self.poll_interval:.1f}s"
+        logger.info(f"Beobachte {self.directory} ({mode}, {self.workers} Worker, "
+                    f"Queue {self._queue.maxsize}, Wartezeit {self.settle_seconds:.1f}s)")
+
+    def stop(self, timeout: float = 30.0):
+        """Beendet Beobachtung und Worker; laufende Transkriptionen werden abgeschlossen"""
+        self._stop_event.set()
+        if self._observer:
+            self._observer.stop()
+            self._observer.join(timeout=5.0)
+            self._observer = None
+
+        # Noch nicht begonnene Dateien bleiben ohne Sidecar und werden beim nächsten Start erneut gefunden
+        while True:
+            try:
+                path = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            with self._lock:
+                self._queued.discard(path)
+        for _ in range(self.workers):
+            self._queue.put(None)
+
+        deadline = time.monotonic() + timeout
+        for thread in self._threads:
+            thread.join(timeout=max(0.0, deadline - time.monotonic()))
+        self._threads = []
+        if self._service:
+            self._service.shutdown()
+        self.report()
+
+    def wait_idle(self, timeout: float) -> bool:
+        """Wartet, bis keine Datei mehr vorgemerkt, eingereiht oder in Arbeit ist (für Tests/Skripte)"""
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            with self._lock:
+                if not self._pending and not self._queued and self.stats["in_progress"] == 0:
+                    return True
+            time.sleep(0.05)
+        return False
+
+    def get_stats(self) -> dict:
+        """Queue-Tiefe, Zähler und Durchsatz seit dem Start"""
+        elapsed = max(1e-6, time.monotonic() - self._started_at) if self._started_at else 0.0
+        with self._lock:
+            done = self.stats["ok"] + self.stats["empty"] + self.stats["error"]
+            stats = dict(self.stats)
+            stats.update({
+                "pending": len(self._pending),
+                "queue_depth": self._queue.qsize(),
+                "done": done,
+                "files_per_minute": round(done / elapsed * 60, 2) if elapsed else 0.0,
+                "realtime_factor": round(stats["audio_seconds"] / elapsed, 2) if elapsed else 0.0,
+            })
+        return stats
+
+    def report(self):
+        self._last_report = time.monotonic()
+        stats = self.get_stats()
+        logger.info(f"Watch-Folder: {stats['queue_depth']} in Queue, {stats['pending']} wartend, "
+                    f"{stats['in_progress']} in Arbeit, {stats['ok']} ok, {stats['error']} Fehler "
+                    f"({stats['files_per_minute']} Dateien/min, Echtzeitfaktor {stats['realtime_factor']})")
+
+
+def cli(argv: Optional[List[str]] = None) -> int:
+    """python -m src watch - Verzeichnis beobachten, bis Strg+C"""
+    parser = argparse.ArgumentParser(prog="python -m src watch",
+                                     description="Transkribiert neue Audio-Dateien in einem Verzeichnis")
+    parser.add_argument('directory', type=Path, help='Zu beobachtendes Verzeichnis')
+    parser.add_argument('--recursive', '-r', action='store_true', help='Unterverzeichnisse einbeziehen')
+    parser.add_argument('--workers', '-j', type=int, default=None, help='Parallele Transkriptionen')
+    parser.add_argument('--queue-size', type=int, default=None, help='Maximale Länge der Arbeits-Queue')
+    parser.add_argument('--settle', type=float, default=None,
+                        help='Sekunden ohne Änderung, bevor eine Datei als fertig gilt')
+    parser.add_argument('--poll', action='store_true', help='Polling statt watchdog/inotify')
+    parser.add_argument('--interval', type=float, default=None, help='Prüfintervall in Sekunden')
+    backend = parser.add_mutually_exclusive_group()
+    backend.add_argument('--local', dest='local', action='store_true', default=None, help='Lokales Whisper-Modell')
+    backend.add_argument('--api', dest='local', action='store_false', help='OpenAI-API')
+    args = parser.parse_args(argv)
+
+    if args.local is not None:
+        config.USE_LOCAL_TRANSCRIPTION = args.local
+
+    daemon = WatchDaemon(args.directory, workers=args.workers, queue_size=args.queue_size,
+                         settle_seconds=args.settle, poll_interval=args.interval,
+                         recursive=args.recursive, use_watchdog=False if args.poll else None)
+    try:
+        daemon.start()
+    except FileNotFoundError as e:
+        logger.error(str(e))
+        return 2
+
+    exporter = None
+    if config.METRICS_EXPORT_ENABLED:
+        from src.metrics import MetricsExporter
+
+        exporter = MetricsExporter(metrics)
+        exporter.start()
+
+    # Strg+C oder SIGTERM (systemd, docker stop) beenden sauber
+    shutdown = threading.Event()
+    signal.signal(signal.SIGTERM, lambda signum, frame: shutdown.set())
+    try:
+        while not shutdown.wait(1.0):
+            pass
+    except KeyboardInterrupt:
+        pass
+    finally:
+        logger.info("Beende Watch-Folder-Daemon...")
+        daemon.stop()
+        if exporter:
+            exporter.stop()
+    return 0
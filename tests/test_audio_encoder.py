@@ -0,0 +1,97 @@
+"""
+Tests für audio_encoder.py - In-Process-Kodierung (FLAC/Opus)
+"""
+
+import io
+
+import numpy as np
+import pytest
+
+from src import audio_encoder
+from src.audio_encoder import StreamingEncoder, encode_pcm, file_extension, is_native_format
+
+SAMPLE_RATE = 16000
+
+
+def _tone(seconds: float = 1.0) -> np.ndarray:
+    t = np.arange(int(seconds * SAMPLE_RATE)) / SAMPLE_RATE
+    return (np.sin(2 * np.pi * 440 * t) * 8000).astype(np.int16)
+
+
+class TestFormatSelection:
+    """Tests für die Formatauswahl (unabhängig von soundfile)"""
+
+    def test_file_extension(self):
+        """Opus wird im Ogg-Container hochgeladen"""
+        assert file_extension('opus') == 'ogg'
+        assert file_extension('flac') == 'flac'
+        assert file_extension('mp3') == 'mp3'
+
+    def test_mp3_is_not_native(self):
+        """MP3 bleibt beim pydub/ffmpeg-Pfad"""
+        assert is_native_format('mp3') is False
+
+    def test_not_native_without_soundfile(self, monkeypatch):
+        monkeypatch.setattr(audio_encoder, 'SOUNDFILE_AVAILABLE', False)
+        assert is_native_format('flac') is False
+
+
+@pytest.mark.skipif(not audio_encoder.SOUNDFILE_AVAILABLE, reason="soundfile nicht installiert")
+class TestNativeEncoding:
+    """Tests für die Kodierung direkt aus dem PCM-Puffer"""
+
+    def test_flac_roundtrip_is_lossless(self):
+        """FLAC ist verlustfrei und kleiner als das rohe PCM"""
+        import soundfile as sf
+
+        samples = _tone()
+        data = encode_pcm(samples, SAMPLE_RATE, 1, 'flac')
+
+        assert len(data) < samples.nbytes
+        decoded, rate = sf.read(io.BytesIO(data), dtype='int16')
+        assert rate == SAMPLE_RATE
+        assert np.array_equal(decoded, samples)
+
+    def test_accepts_bytes(self):
+        """Frame-Liste (bytes) aus dem Polling-Modus wird ebenfalls kodiert"""
+        samples = _tone(0.5)
+        assert encode_pcm(samples.tobytes(), SAMPLE_RATE, 1, 'flac') == encode_pcm(samples, SAMPLE_RATE, 1, 'flac')
+
+    def test_opus_is_ogg(self):
+        """Opus landet in einem Ogg-Container"""
+        if not is_native_format('opus'):
+            pytest.skip("libsndfile ohne Opus-Unterstützung")
+
+        data = encode_pcm(_tone(), SAMPLE_RATE, 1, 'opus')
+        assert data[:4] == b'OggS'
+        assert len(data) < _tone().nbytes // 4
+
+
+@pytest.mark.skipif(not audio_encoder.SOUNDFILE_AVAILABLE, reason="soundfile nicht installiert")
+class TestStreamingEncoder:
+    """Tests für die Kodierung während der Aufnahme"""
+
+    def test_matches_encoding_after_recording(self):
+        """Inkrementell kodiertes FLAC enthält dieselben Samples wie die Kodierung am Ende"""
+        import soundfile as sf
+
+        samples = _tone(2.0)
+        encoder = StreamingEncoder(SAMPLE_RATE, 1, 'flac')
+        for start in range(0, len(samples), 1024):
+            encoder.feed(samples[start:start + 1024].tobytes())
+        data = encoder.finish(timeout=5)
+
+        assert data is not None
+        assert encoder.samples_written == len(samples)
+        decoded, _ = sf.read(io.BytesIO(data), dtype='int16')
+        assert np.array_equal(decoded, samples)
+
+    def test_overflow_discards_result(self):
+        """Läuft die Queue über, wird nicht blockiert, sondern das Ergebnis verworfen"""
+        encoder = StreamingEncoder(SAMPLE_RATE, 1, 'flac', queue_size=1)
+        block = _tone(0.1).tobytes()
+        for _ in range(200):
+            encoder.feed(block)
+
+        assert encoder.overflowed is True
+        assert encoder.finish(timeout=5) is None
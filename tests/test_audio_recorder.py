@@ -158,4 +158,214 @@ class TestAudioCompression:
         if PYDUB_AVAILABLE and bitrate == '256k':
             # Vergleiche mit 64k Version
             compressed_64k = recorder.compress_audio(test_wav_file, output_format=output_format, bitrate='64k')
-            assert len(compressed_data) > len(compressed_64k)
\ No newline at end of file
+            assert len(compressed_data) > len(compressed_64k)
+
+class TestCallbackCapture:
+    """Tests für die Callback-Aufnahme in den Ringpuffer"""
+
+    @pytest.fixture
+    def recorder(self):
+        recorder = AudioRecorder()
+        recorder.use_callback_capture = True
+        yield recorder
+        recorder.cleanup()
+
+    @patch('src.config.config.SAMPLE_RATE', 16000)
+    @patch('src.config.config.CHANNELS', 1)
+    @patch('src.config.config.MAX_RECORDING_DURATION', 1)
+    def test_callback_fills_ring_buffer(self, recorder):
+        """Blöcke landen ohne Frame-Liste im Ringpuffer"""
+        import numpy as np
+        import pyaudio
+
+        recorder._prepare_ring_buffer()
+        recorder.is_recording = True
+        block = np.full(1024, 1000, dtype=np.int16).tobytes()
+
+        assert recorder._audio_callback(block, 1024, None, 0) == (None, pyaudio.paContinue)
+        recorder._finish_capture()
+
+        assert recorder.frames == []
+        assert recorder.last_recording_duration == pytest.approx(1024 / 16000)
+        pcm = recorder._captured_pcm()
+        assert pcm.dtype == np.int16 and len(pcm) == 1024
+
+    @patch('src.config.config.SAMPLE_RATE', 16000)
+    @patch('src.config.config.CHANNELS', 1)
+    @patch('src.config.config.MAX_RECORDING_DURATION', 1)
+    def test_callback_stops_at_max_duration(self, recorder):
+        """Bei erreichter Maximaldauer beendet der Callback den Stream"""
+        import pyaudio
+
+        recorder._prepare_ring_buffer()
+        recorder.is_recording = True
+        block = b'\x00\x01' * 1024
+
+        results = [recorder._audio_callback(block, 1024, None, 0)[1] for _ in range(16)]
+
+        assert results[-1] == pyaudio.paComplete
+        assert recorder.is_recording is False
+
+
+class TestPreRoll:
+    """Tests für den dauerhaft offenen Stream mit Pre-Roll-Puffer"""
+
+    @pytest.fixture
+    def recorder(self):
+        recorder = AudioRecorder()
+        recorder.use_callback_capture = True
+        yield recorder
+        recorder.cleanup()
+
+    @patch('src.config.config.SAMPLE_RATE', 16000)
+    @patch('src.config.config.CHANNELS', 1)
+    @patch('src.config.config.MAX_RECORDING_DURATION', 1)
+    @patch('src.config.config.AUDIO_PREROLL_MS', 100)
+    def test_preroll_is_prepended(self, recorder):
+        """Die letzten Millisekunden vor dem Start landen am Anfang der Aufnahme"""
+        import numpy as np
+        import pyaudio
+
+        stream = MagicMock()
+        stream.is_active.return_value = True
+        with patch.object(recorder, '_open_stream', return_value=stream):
+            assert recorder.start_monitoring() is True
+
+        # 3 Blöcke vor dem Hotkey - nur die letzten 1600 Samples (100 ms) bleiben
+        for value in (1, 2, 3):
+            block = np.full(1024, value, dtype=np.int16).tobytes()
+            assert recorder._audio_callback(block, 1024, None, 0) == (None, pyaudio.paContinue)
+
+        received = []
+        recorder.add_frame_listener(received.append)
+        assert recorder.start_recording()
+        recorder._audio_callback(np.full(1024, 9, dtype=np.int16).tobytes(), 1024, None, 0)
+        recorder._finish_capture()
+
+        pcm = recorder._captured_pcm()
+        assert len(pcm) == 1600 + 1024
+        assert pcm[0] == 2 and pcm[1599] == 3 and pcm[1600] == 9
+        assert len(received) == 2
+        # Stream bleibt für die nächste Aufnahme offen
+        assert recorder.stream is stream
+        stream.close.assert_not_called()
+
+    @patch('src.config.config.SAMPLE_RATE', 16000)
+    @patch('src.config.config.CHANNELS', 1)
+    @patch('src.config.config.MAX_RECORDING_DURATION', 1)
+    def test_max_duration_keeps_stream_running(self, recorder):
+        """Im Pre-Roll-Modus beendet die Maximaldauer nur die Aufnahme, nicht den Stream"""
+        import pyaudio
+
+        stream = MagicMock()
+        stream.is_active.return_value = True
+        with patch.object(recorder, '_open_stream', return_value=stream):
+            recorder.start_monitoring()
+        recorder.start_recording()
+
+        results = [recorder._audio_callback(b'\x00\x01' * 1024, 1024, None, 0)[1] for _ in range(16)]
+
+        assert recorder.is_recording is False
+        assert results[-1] == pyaudio.paContinue
+
+
+class TestSilenceTrimming:
+    """Tests für die VAD-Stufe zwischen Aufnahme und Transkription"""
+
+    @pytest.fixture
+    def recorder(self):
+        recorder = AudioRecorder()
+        recorder.use_callback_capture = True
+        yield recorder
+        recorder.cleanup()
+
+    def _record(self, recorder, samples):
+        recorder._prepare_ring_buffer()
+        recorder.is_recording = True
+        recorder._audio_callback(samples.tobytes(), len(samples), None, 0)
+
+    @patch('src.config.config.SAMPLE_RATE', 16000)
+    @patch('src.config.config.CHANNELS', 1)
+    @patch('src.config.config.MAX_RECORDING_DURATION', 10)
+    def test_silence_only_is_rejected(self, recorder):
+        """Reine Stille wird auch ohne Trimmen verworfen, bevor eine Datei geschrieben wird"""
+        import numpy as np
+
+        self._record(recorder, np.zeros(32000, dtype=np.int16))
+
+        assert recorder.stop_recording_in_memory() is None
+        assert recorder.last_recording_duration == 0.0
+
+    @patch('src.config.config.SAMPLE_RATE', 16000)
+    @patch('src.config.config.CHANNELS', 1)
+    @patch('src.config.config.MAX_RECORDING_DURATION', 10)
+    def test_speech_is_not_trimmed_by_default(self, recorder):
+        """Ohne VAD_TRIM_ENABLED bleibt die Stille um die Sprache erhalten"""
+        import numpy as np
+
+        speech = np.random.default_rng(0).integers(-8000, 8000, 16000).astype(np.int16)
+        self._record(recorder, np.concatenate([np.zeros(48000, dtype=np.int16), speech]))
+
+        audio = recorder.stop_recording_in_memory()
+
+        assert audio is not None
+        assert len(audio) == 64000
+
+    @patch('src.config.config.SAMPLE_RATE', 16000)
+    @patch('src.config.config.CHANNELS', 1)
+    @patch('src.config.config.MAX_RECORDING_DURATION', 10)
+    @patch('src.config.config.VAD_TRIM_ENABLED', True)
+    def test_leading_silence_is_trimmed(self, recorder):
+        """Stille vor dem Sprechbeginn wird nicht weitergegeben"""
+        import numpy as np
+
+        speech = np.random.default_rng(0).integers(-8000, 8000, 16000).astype(np.int16)
+        self._record(recorder, np.concatenate([np.zeros(48000, dtype=np.int16), speech]))
+
+        audio = recorder.stop_recording_in_memory()
+
+        assert audio is not None
+        # 1s Sprache plus Padding davor
+        assert recorder.last_recording_duration < 1.6
+        assert len(audio) == len(recorder._captured_pcm())
+
+
+class TestStreamingEncoding:
+    """Tests für die Kodierung parallel zur Aufnahme"""
+
+    @pytest.fixture
+    def recorder(self):
+        recorder = AudioRecorder()
+        recorder.use_callback_capture = True
+        yield recorder
+        recorder.cleanup()
+
+    @patch('src.config.config.SAMPLE_RATE', 16000)
+    @patch('src.config.config.CHANNELS', 1)
+    @patch('src.config.config.MAX_RECORDING_DURATION', 10)
+    @patch('src.config.config.AUDIO_COMPRESSION_ENABLED', True)
+    @patch('src.config.config.AUDIO_COMPRESSION_FORMAT', 'flac')
+    @patch('src.config.config.USE_LOCAL_TRANSCRIPTION', False)
+    @patch('src.config.config.STREAMING_ENCODER_ENABLED', True)
+    def test_compress_uses_bytes_encoded_during_recording(self, recorder):
+        """Nach dem Stoppen liegt das komprimierte Audio bereits vor"""
+        import numpy as np
+
+        from src.audio_encoder import is_native_format
+
+        if not is_native_format('flac'):
+            pytest.skip("soundfile nicht installiert")
+
+        with patch.object(recorder, '_open_stream', return_value=MagicMock()):
+            wav_path = recorder.start_recording()
+
+        speech = np.random.default_rng(0).integers(-8000, 8000, 1024).astype(np.int16).tobytes()
+        for _ in range(16):
+            recorder._audio_callback(speech, 1024, None, 0)
+        assert recorder.stop_recording() == wav_path
+
+        with patch('src.audio_recorder.encode_pcm') as mock_encode:
+            data = recorder.compress_audio(wav_path)
+
+        mock_encode.assert_not_called()
+        assert data[:4] == b'fLaC'
@@ -0,0 +1,64 @@
+"""
+Tests für backend_router.py - Adaptive Backend-Wahl
+"""
+
+import time
+
+import pytest
+
+from src.backend_router import API, LOCAL, BackendRouter
+
+
+class TestBackendRouter:
+    """Test-Klasse für BackendRouter"""
+
+    @pytest.fixture
+    def router(self):
+        return BackendRouter(window_size=10, reprobe_seconds=0.1, max_error_rate=0.5, min_samples=3)
+
+    def test_preference_kept_without_statistics(self, router):
+        """Ohne Messwerte bleibt die Reihenfolge der Kandidaten erhalten"""
+        assert router.order([LOCAL, API], audio_seconds=5.0) == [LOCAL, API]
+
+    def test_orders_by_expected_latency(self, router):
+        """Das Backend mit der geringeren Laufzeit pro Audio-Sekunde kommt zuerst"""
+        for _ in range(3):
+            router.record_success(LOCAL, 3.0, audio_seconds=10.0)  # 0.3 s pro Audio-Sekunde
+            router.record_success(API, 1.0, audio_seconds=2.0)     # 0.5 s pro Audio-Sekunde
+
+        assert router.order([LOCAL, API], audio_seconds=4.0) == [LOCAL, API]
+        assert router.expected_latency(LOCAL, 10.0) == pytest.approx(3.0)
+
+    def test_error_rate_penalises_backend(self, router):
+        """Fehlschläge erhöhen die erwartete Laufzeit"""
+        for _ in range(3):
+            router.record_success(LOCAL, 1.0, audio_seconds=2.0)
+            router.record_success(API, 1.2, audio_seconds=2.0)
+        router.record_failure(LOCAL)
+        router.record_failure(LOCAL)
+
+        assert router.order([LOCAL, API], audio_seconds=2.0) == [API, LOCAL]
+
+    def test_high_error_rate_disables_and_reprobes(self, router):
+        """Zu viele Fehler sperren ein Backend - nach Ablauf der Sperre wird erneut geprüft"""
+        for _ in range(3):
+            router.record_failure(LOCAL)
+
+        assert router.is_enabled(LOCAL) is False
+        # Gesperrte Backends bleiben letzte Option
+        assert router.order([LOCAL, API]) == [API, LOCAL]
+
+        time.sleep(0.15)
+        assert router.is_enabled(LOCAL) is True
+
+        router.record_success(LOCAL, 1.0, audio_seconds=2.0)
+        assert router.get_stats()[LOCAL]["enabled"] is True
+
+    def test_repeated_failed_probes_back_off(self, router):
+        """Scheitert die Probe erneut, verlängert sich die Sperrzeit"""
+        router.mark_unavailable(LOCAL)
+        first_delay = router.get_stats()[LOCAL]["reprobe_in"]
+
+        time.sleep(0.15)
+        router.mark_unavailable(LOCAL)
+        assert router.get_stats()[LOCAL]["reprobe_in"] > first_delay
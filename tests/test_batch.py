@@ -0,0 +1,107 @@
+"""
+Tests für batch.py - Batch-Transkription ohne GUI
+"""
+
+import json
+import wave
+from unittest.mock import patch
+
+import pytest
+
+from src.batch import audio_seconds, cli, collect_files, load_completed
+
+
+def _write_wav(path, seconds=1.0, sample_rate=16000):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with wave.open(str(path), 'wb') as wf:
+        wf.setnchannels(1)
+        wf.setsampwidth(2)
+        wf.setframerate(sample_rate)
+        wf.writeframes(b'\x00\x00' * int(seconds * sample_rate))
+    return path
+
+
+@pytest.fixture
+def audio_dir(tmp_path):
+    _write_wav(tmp_path / "a.wav")
+    _write_wav(tmp_path / "meetings" / "b.wav", seconds=2.0)
+    (tmp_path / "notes.txt").write_text("keine Audio-Datei")
+    return tmp_path
+
+
+class TestCollectFiles:
+    """Tests für die Auswahl der Dateien"""
+
+    def test_directory_is_searched_recursively(self, audio_dir):
+        files = collect_files([str(audio_dir)])
+        assert [f.name for f in files] == ["a.wav", "b.wav"]
+
+    def test_glob_and_duplicates(self, audio_dir):
+        files = collect_files([str(audio_dir / "**" / "*.wav"), str(audio_dir / "a.wav")])
+        assert len(files) == 2
+
+    def test_audio_seconds(self, audio_dir):
+        assert audio_seconds(audio_dir / "meetings" / "b.wav") == 2.0
+
+
+class TestResume:
+    """Tests für das Überspringen bereits transkribierter Dateien"""
+
+    def test_only_successful_entries_count(self, tmp_path):
+        output = tmp_path / "out.jsonl"
+        output.write_text(
+            json.dumps({"path": "/a.wav", "size": 10, "status": "ok"}) + "\n"
+            + json.dumps({"path": "/b.wav", "size": 10, "status": "error"}) + "\n"
+            + "kaputte Zeile\n"
+        )
+        assert load_completed(output) == {"/a.wav|10"}
+
+    def test_missing_output_file(self, tmp_path):
+        assert load_completed(tmp_path / "fehlt.jsonl") == set()
+
+
+class TestBatchCli:
+    """Tests für python -m src batch über die API (TranscriptionService gemockt)"""
+
+    @pytest.fixture
+    def service(self):
+        with patch('src.transcription.TranscriptionService') as service_class, \
+                patch('src.config.config.OPENAI_API_KEY', 'sk-test'), \
+                patch('src.config.config.USE_LOCAL_TRANSCRIPTION', False):
+            service = service_class.return_value
+            service.should_chunk_audio.return_value = False
+            service.transcribe.side_effect = lambda path: f"Text {path[-5:]}"
+            yield service
+
+    def test_results_streamed_as_jsonl(self, audio_dir, service, tmp_path):
+        output = tmp_path / "out.jsonl"
+
+        assert cli([str(audio_dir), "--api", "-j", "2", "-o", str(output)]) == 0
+
+        entries = [json.loads(line) for line in output.read_text(encoding='utf-8').splitlines()]
+        assert {e["status"] for e in entries} == {"ok"}
+        assert sorted(e["text"] for e in entries) == ["Text a.wav", "Text b.wav"]
+        assert all(e["backend"] == "api" for e in entries)
+
+    def test_resume_skips_done_files(self, audio_dir, service, tmp_path):
+        output = tmp_path / "out.jsonl"
+        cli([str(audio_dir), "--api", "-o", str(output)])
+        service.transcribe.reset_mock()
+
+        _write_wav(audio_dir / "c.wav")
+        assert cli([str(audio_dir), "--api", "-o", str(output), "--resume"]) == 0
+
+        assert service.transcribe.call_count == 1
+        assert len(output.read_text(encoding='utf-8').splitlines()) == 3
+
+    def test_failures_reported(self, audio_dir, service, tmp_path):
+        service.transcribe.side_effect = RuntimeError("API nicht erreichbar")
+        output = tmp_path / "out.jsonl"
+
+        assert cli([str(audio_dir), "--api", "-o", str(output)]) == 1
+        entries = [json.loads(line) for line in output.read_text(encoding='utf-8').splitlines()]
+        assert all(e["status"] == "error" and "RuntimeError" in e["error"] for e in entries)
+
+    def test_resume_requires_output(self, audio_dir):
+        with pytest.raises(SystemExit):
+            cli([str(audio_dir), "--resume"])
@@ -0,0 +1,131 @@
+"""
+Tests für vad.py und chunking.py - Aufteilen langer Aufnahmen
+"""
+
+import numpy as np
+
+from src.chunking import plan_chunks, stitch_transcripts
+from src.vad import find_silences, find_split_points, trim_silence
+
+SAMPLE_RATE = 16000
+
+
+def _speech(seconds: float) -> np.ndarray:
+    """Lautes Rauschen als Sprach-Ersatz"""
+    rng = np.random.default_rng(0)
+    return rng.integers(-8000, 8000, int(seconds * SAMPLE_RATE)).astype(np.int16)
+
+
+def _silence(seconds: float) -> np.ndarray:
+    return np.zeros(int(seconds * SAMPLE_RATE), dtype=np.int16)
+
+
+class TestVad:
+    """Tests für die Energie-basierte Pausenerkennung"""
+
+    def test_find_silences(self):
+        """Pausen ab Mindestlänge werden erkannt"""
+        audio = np.concatenate([_speech(1.0), _silence(0.5), _speech(1.0), _silence(0.1), _speech(0.5)])
+        silences = find_silences(audio, SAMPLE_RATE, threshold=300, min_silence_seconds=0.3)
+
+        assert len(silences) == 1
+        start, end = silences[0]
+        assert abs(start / SAMPLE_RATE - 1.0) < 0.05
+        assert abs(end / SAMPLE_RATE - 1.5) < 0.05
+
+    def test_split_points_in_pauses(self):
+        """Schnitte liegen in der Pause, die der Ziellänge am nächsten ist"""
+        audio = np.concatenate([_speech(9.0), _silence(0.6), _speech(5.0), _silence(0.6), _speech(9.0)])
+        splits = find_split_points(audio, SAMPLE_RATE, target_seconds=10, max_seconds=15,
+                                   threshold=300, min_silence_seconds=0.3)
+
+        assert len(splits) == 1
+        assert 9.0 <= splits[0] / SAMPLE_RATE <= 9.6
+
+    def test_hard_split_without_pause(self):
+        """Ohne Pausen wird spätestens nach max_seconds geschnitten"""
+        splits = find_split_points(_speech(40.0), SAMPLE_RATE, target_seconds=10, max_seconds=15,
+                                   threshold=300, min_silence_seconds=0.3)
+        assert [split / SAMPLE_RATE for split in splits] == [15.0, 30.0]
+
+    def test_short_audio_not_split(self):
+        """Kurze Aufnahmen bleiben ein Chunk"""
+        assert find_split_points(_speech(5.0), SAMPLE_RATE, 10, 15, 300, 0.3) == []
+
+
+class TestTrimSilence:
+    """Tests für das Entfernen von Stille vor Upload/Dekodierung"""
+
+    @staticmethod
+    def _trim(audio):
+        return trim_silence(audio, SAMPLE_RATE, threshold=300, padding_seconds=0.2,
+                            max_pause_seconds=1.0, min_speech_seconds=0.1)
+
+    def test_trims_leading_and_trailing_silence(self):
+        """Stille am Rand fällt weg, das Padding um die Sprache bleibt"""
+        audio = np.concatenate([_silence(2.0), _speech(1.0), _silence(3.0)])
+        trimmed = self._trim(audio)
+
+        assert abs(len(trimmed) / SAMPLE_RATE - 1.4) < 0.07
+        assert np.count_nonzero(trimmed) == np.count_nonzero(audio)
+
+    def test_collapses_long_pauses(self):
+        """Lange Pausen werden auf max_pause_seconds gekürzt, kurze bleiben unverändert"""
+        audio = np.concatenate([_speech(1.0), _silence(5.0), _speech(1.0), _silence(0.5), _speech(1.0)])
+        trimmed = self._trim(audio)
+
+        assert abs(len(trimmed) / SAMPLE_RATE - 4.5) < 0.07
+        silences = find_silences(trimmed, SAMPLE_RATE, threshold=300, min_silence_seconds=0.3)
+        assert len(silences) == 2
+        assert max(end - start for start, end in silences) / SAMPLE_RATE <= 1.0
+
+    def test_all_silence_is_rejected(self):
+        """Reine Stille (auch leises Rauschen) ergibt ein leeres Array"""
+        noise = np.random.default_rng(1).integers(-50, 50, 3 * SAMPLE_RATE).astype(np.int16)
+        assert len(self._trim(noise)) == 0
+        assert len(self._trim(_silence(0.01))) == 0
+
+    def test_low_amplitude_speech_is_kept(self):
+        """Leise Sprecher unter der festen Schwelle verlieren weder Anfang noch Ende"""
+        quiet = (_speech(1.0) // 30).astype(np.int16)  # RMS ~150, Schwelle 300
+        noise = np.random.default_rng(2).integers(-20, 20, 2 * SAMPLE_RATE).astype(np.int16)
+        audio = np.concatenate([noise, quiet, noise])
+        trimmed = self._trim(audio)
+
+        assert abs(len(trimmed) / SAMPLE_RATE - 1.4) < 0.07
+        # Die gesamte Sprache ist enthalten
+        assert quiet.tobytes() in trimmed.tobytes()
+
+    def test_short_result_is_not_trimmed(self):
+        """Unter min_keep_seconds bleibt die Aufnahme unverändert"""
+        audio = np.concatenate([_silence(1.0), _speech(0.3), _silence(1.0)])
+        trimmed = trim_silence(audio, SAMPLE_RATE, threshold=300, padding_seconds=0.2,
+                               max_pause_seconds=1.0, min_speech_seconds=0.1, min_keep_seconds=1.0)
+        assert np.array_equal(trimmed, audio)
+
+    def test_speech_only_unchanged(self):
+        """Durchgehende Sprache bleibt vollständig erhalten"""
+        audio = _speech(2.0)
+        assert np.array_equal(self._trim(audio), audio)
+
+
+class TestChunking:
+    """Tests für Chunk-Planung und Zusammenfügen"""
+
+    def test_plan_chunks_with_overlap(self):
+        """Jeder Folge-Chunk beginnt um die Überlappung früher"""
+        assert plan_chunks(100, [40, 70], 5) == [(0, 40), (35, 70), (65, 100)]
+        assert plan_chunks(100, [], 5) == [(0, 100)]
+
+    def test_stitch_removes_overlap(self):
+        """Durch die Überlappung doppelte Wörter werden entfernt"""
+        texts = ["Das ist ein langer Satz mit", "Satz mit vielen Wörtern.", "Ende."]
+        assert stitch_transcripts(texts) == "Das ist ein langer Satz mit vielen Wörtern. Ende."
+
+    def test_stitch_ignores_case_and_punctuation(self):
+        """Groß-/Kleinschreibung und Satzzeichen verhindern die Erkennung nicht"""
+        assert stitch_transcripts(["Wir treffen uns morgen.", "Morgen um zehn."]) == "Wir treffen uns morgen. um zehn."
+
+    def test_stitch_without_overlap(self):
+        """Ohne gemeinsame Wörter werden die Texte einfach verbunden"""
+        assert stitch_transcripts(["Hallo", "", "Welt"]) == "Hallo Welt"
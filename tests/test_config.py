@@ -37,6 +37,17 @@ class TestConfig:
             config = Config()
             assert config.validate() == False
 
+    def test_long_recordings_only_with_api_chunking(self):
+        """Über 60s nur mit API-Chunking - der lokale Pfad teilt nicht auf"""
+        config = Config()
+        config.MAX_RECORDING_DURATION = 300
+        config.API_CHUNKING_ENABLED = True
+
+        config.USE_LOCAL_TRANSCRIPTION = False
+        assert config.validate() == True
+        config.USE_LOCAL_TRANSCRIPTION = True
+        assert config.validate() == False
+
     def test_get_temp_dir(self):
         """Test temporäres Verzeichnis"""
         config = Config()
@@ -0,0 +1,78 @@
+"""
+Tests für decoding_profiles.py - Parametersätze und automatische Profilwahl
+"""
+
+import pytest
+
+from src.config import config
+from src.decoding_profiles import PROFILES, ProfileSelector, decoding_options
+
+
+@pytest.fixture
+def auto_profile(monkeypatch):
+    monkeypatch.setattr(config, "DECODING_PROFILE", "auto")
+
+
+class TestDecodingOptions:
+    """Tests für die Parametersätze"""
+
+    def test_accurate_matches_previous_defaults(self):
+        options = decoding_options("accurate")
+        assert options["beam_size"] == 5
+        assert options["patience"] == 1.0
+
+    def test_instant_is_greedy_without_fallback(self):
+        options = decoding_options("instant")
+        assert options["beam_size"] == 1
+        assert options["temperature"] == 0.0
+
+    def test_options_are_copies(self):
+        decoding_options("balanced")["beam_size"] = 99
+        assert PROFILES["balanced"]["beam_size"] == 3
+
+
+class TestProfileSelector:
+    """Tests für Messung und Auswahl"""
+
+    def test_unmeasured_starts_balanced(self, auto_profile):
+        assert ProfileSelector(target_latency=1.5).choose(5.0) == "balanced"
+
+    def test_picks_most_accurate_within_target(self, auto_profile):
+        selector = ProfileSelector(target_latency=1.5)
+        selector.record("balanced", 10.0, 1.8)  # RTF 0.18 -> accurate geschätzt 0.3
+
+        assert selector.choose(3.0) == "accurate"   # 0.9s
+        assert selector.choose(8.0) == "balanced"   # accurate 2.4s, balanced 1.44s
+        assert selector.choose(20.0) == "instant"
+
+    def test_measured_rtf_overrides_estimate(self, auto_profile):
+        selector = ProfileSelector(target_latency=1.5)
+        selector.record("balanced", 10.0, 1.8)
+        selector.record("accurate", 10.0, 1.0)
+
+        assert selector.estimate_rtf("accurate") == pytest.approx(0.1)
+        assert selector.choose(12.0) == "accurate"
+
+    def test_short_recordings_are_not_measured(self, auto_profile):
+        selector = ProfileSelector()
+        selector.record("instant", 0.5, 0.4)
+        assert selector.get_stats() == {}
+
+    def test_moving_average(self, auto_profile):
+        selector = ProfileSelector()
+        selector.record("instant", 10.0, 1.0)
+        selector.record("instant", 10.0, 2.0)
+        assert selector.estimate_rtf("instant") == pytest.approx(0.13)
+
+    def test_fixed_profile_from_config(self, monkeypatch):
+        monkeypatch.setattr(config, "DECODING_PROFILE", "instant")
+        assert ProfileSelector(target_latency=100).choose(1.0) == "instant"
+
+    def test_unknown_profile_falls_back_to_accurate(self, monkeypatch):
+        monkeypatch.setattr(config, "DECODING_PROFILE", "turbo")
+        assert ProfileSelector().choose(1.0) == "accurate"
+
+    def test_default_keeps_previous_decoding(self):
+        from src.config import Config
+
+        assert Config().DECODING_PROFILE == "accurate"
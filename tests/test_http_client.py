@@ -0,0 +1,123 @@
+"""
+Tests für http_client.py - Gemeinsamer Verbindungspool
+"""
+
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest.mock import patch
+
+import pytest
+
+from src import http_client
+from src.http_client import PooledHttpClient
+
+pytestmark = pytest.mark.skipif(not http_client.HTTPX_AVAILABLE, reason="httpx nicht installiert")
+
+
+class _StandInHandler(BaseHTTPRequestHandler):
+    """Ersatz für die OpenAI-API: zählt Anfragen und TCP-Verbindungen"""
+
+    protocol_version = "HTTP/1.1"  # Keep-Alive
+
+    def _respond(self):
+        self.server.requests.append(self.command)
+        self.server.connections.add(self.client_address)
+        self.send_response(200)
+        self.send_header("Content-Length", "2")
+        self.send_header("openai-processing-ms", "250")
+        self.end_headers()
+        if self.command != "HEAD":
+            self.wfile.write(b"ok")
+
+    do_HEAD = _respond
+    do_GET = _respond
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def stand_in_server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _StandInHandler)
+    server.requests = []
+    server.connections = set()
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+class TestPooledHttpClient:
+    """Test-Klasse für PooledHttpClient"""
+
+    @pytest.fixture
+    def client(self, stand_in_server):
+        host, port = stand_in_server.server_address
+        client = PooledHttpClient(base_url=f"http://{host}:{port}/v1", http2=False, timeout=5,
+                                  connect_timeout=2, keepalive_expiry=30, max_connections=4)
+        yield client
+        client.close()
+
+    def test_prewarm_opens_reusable_connection(self, client, stand_in_server):
+        """Die vorgewärmte Verbindung wird von der nächsten Anfrage wiederverwendet"""
+        assert client.prewarm(wait=True) is True
+        assert stand_in_server.requests == ["HEAD"]
+
+        client.client.get(client.base_url)
+        assert stand_in_server.requests == ["HEAD", "GET"]
+        assert len(stand_in_server.connections) == 1
+
+    def test_server_time_from_response_header(self, client):
+        """Die gemeldete Serverzeit steht dem aufrufenden Thread zur Verfügung"""
+        client.client.get(client.base_url)
+        assert http_client.last_server_seconds() == pytest.approx(0.25)
+
+    def test_prewarm_skipped_while_warm(self, client):
+        """Solange die Verbindung warm ist, wird nicht erneut vorgewärmt"""
+        client.prewarm(wait=True)
+        assert client.is_warm()
+        assert client.prewarm() is False
+        assert client.prewarm_count == 1
+
+    def test_prewarm_failure_is_silent(self):
+        """Ohne erreichbaren Server schlägt das Vorwärmen still fehl"""
+        client = PooledHttpClient(base_url="http://127.0.0.1:1/v1", http2=False, timeout=1,
+                                  connect_timeout=0.5, keepalive_expiry=30, max_connections=1)
+        try:
+            assert client.prewarm(wait=True) is True
+            assert client.prewarm_count == 0
+        finally:
+            client.close()
+
+
+class TestSharedClients:
+    """Tests für die gemeinsamen Client-Instanzen"""
+
+    @pytest.fixture(autouse=True)
+    def fresh_shared_state(self):
+        http_client.close_shared_clients()
+        yield
+        http_client.close_shared_clients()
+
+    @patch('src.config.config.OPENAI_API_KEY', 'sk-test')
+    def test_openai_client_shared_and_rebuilt_on_key_change(self):
+        """Beide Services erhalten denselben Client, bis sich der API-Key ändert"""
+        with patch('src.http_client.OpenAI', side_effect=lambda **kwargs: object()) as mock_openai:
+            first = http_client.get_openai_client()
+            assert http_client.get_openai_client() is first
+
+            with patch('src.config.config.OPENAI_API_KEY', 'sk-neu'):
+                assert http_client.get_openai_client() is not first
+
+        assert mock_openai.call_args[1]["http_client"] is http_client.get_http_client().client
+
+    def test_backoff_interrupted_on_shutdown(self):
+        """Beim Beenden wartet kein Retry-Loop die volle Backoff-Zeit"""
+        http_client.get_http_client()
+        threading.Timer(0.1, http_client.close_shared_clients).start()
+
+        start_time = time.time()
+        assert http_client.backoff_wait(5.0) is True
+        assert time.time() - start_time < 2.0
@@ -0,0 +1,124 @@
+"""
+Tests für inference_scheduler.py - Batch-Fenster, parallele Worker und Batched-Dekodierung
+"""
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from src.inference_scheduler import InferenceScheduler, assign_segments, concatenate_clips, supports_batched_clips
+
+
+@pytest.fixture
+def scheduler_factory():
+    schedulers = []
+
+    def create(*args, **kwargs):
+        scheduler = InferenceScheduler(*args, **kwargs)
+        schedulers.append(scheduler)
+        return scheduler
+
+    yield create
+    for scheduler in schedulers:
+        scheduler.shutdown()
+
+
+class TestInferenceScheduler:
+    """Tests für die Ausführungsmodi"""
+
+    def test_parallel_limits_concurrency_to_workers(self, scheduler_factory):
+        active, peak = [0], [0]
+        lock = threading.Lock()
+
+        def decode(audio, initial_prompt=None, profile=None):
+            with lock:
+                active[0] += 1
+                peak[0] = max(peak[0], active[0])
+            time.sleep(0.05)
+            with lock:
+                active[0] -= 1
+            return f"Text {audio}"
+
+        scheduler = scheduler_factory(decode, mode="parallel", workers=2, window_ms=10, max_batch=8)
+        futures = [scheduler.submit(i) for i in range(6)]
+
+        assert [future.result(timeout=5) for future in futures] == [f"Text {i}" for i in range(6)]
+        assert peak[0] == 2
+        assert scheduler.get_stats()["requests"] == 6
+
+    def test_batched_groups_requests_in_window(self, scheduler_factory):
+        batches = []
+
+        def batched_decode(audios, prompt, profile=None):
+            batches.append((len(audios), prompt))
+            return [f"{len(audio)} Samples" for audio in audios]
+
+        scheduler = scheduler_factory(lambda audio, initial_prompt=None, profile=None: "einzeln", mode="batched",
+                                      batched_decode=batched_decode, workers=1, window_ms=100, max_batch=8)
+        with ThreadPoolExecutor(max_workers=3) as pool:
+            results = list(pool.map(lambda n: scheduler.transcribe(np.zeros(n, dtype=np.float32), "Vokabular"),
+                                    [100, 200, 300]))
+
+        assert results == ["100 Samples", "200 Samples", "300 Samples"]
+        assert batches == [(3, "Vokabular")]
+        assert scheduler.get_stats()["mean_batch_size"] == 3.0
+
+    def test_batched_splits_groups_by_profile(self, scheduler_factory):
+        batches = []
+
+        def batched_decode(audios, prompt, profile=None):
+            batches.append((len(audios), profile))
+            return ["ok"] * len(audios)
+
+        scheduler = scheduler_factory(lambda audio, initial_prompt=None, profile=None: "einzeln", mode="batched",
+                                      batched_decode=batched_decode, workers=1, window_ms=100, max_batch=8)
+        with ThreadPoolExecutor(max_workers=3) as pool:
+            list(pool.map(lambda profile: scheduler.transcribe(np.zeros(10), None, profile),
+                          ["instant", "accurate", "instant"]))
+
+        assert sorted(batches) == [(1, "accurate"), (2, "instant")]
+
+    def test_batched_without_pipeline_falls_back_to_parallel(self, scheduler_factory):
+        scheduler = scheduler_factory(lambda audio, initial_prompt=None, profile=None: "ok", mode="batched", workers=1)
+        assert scheduler.mode == "parallel"
+        assert scheduler.transcribe(np.zeros(10)) == "ok"
+
+    def test_decode_errors_reach_caller(self, scheduler_factory):
+        def decode(audio, initial_prompt=None, profile=None):
+            raise RuntimeError("Modell abgestürzt")
+
+        scheduler = scheduler_factory(decode, mode="parallel", workers=1, window_ms=0)
+        with pytest.raises(RuntimeError, match="abgestürzt"):
+            scheduler.transcribe(np.zeros(10))
+        # Worker-Slot wurde freigegeben
+        assert scheduler.submit(np.zeros(10)).exception(timeout=5) is not None
+
+
+class TestBatchHelpers:
+    """Tests für Clip-Grenzen und Segment-Zuordnung"""
+
+    def test_concatenate_clips_splits_long_audio(self):
+        audio, clips, bounds = concatenate_clips([np.zeros(16000 * 2), np.zeros(16000 * 40)])
+
+        assert len(audio) == 16000 * 42
+        assert bounds == [(0.0, 2.0), (2.0, 42.0)]
+        assert clips == [{"start": 0.0, "end": 2.0}, {"start": 2.0, "end": 32.0}, {"start": 32.0, "end": 42.0}]
+
+    def test_assign_segments_by_midpoint(self):
+        segments = [SimpleNamespace(start=0.0, end=2.0, text=" Erster"),
+                    SimpleNamespace(start=2.0, end=32.0, text=" Zweiter"),
+                    SimpleNamespace(start=32.0, end=42.0, text=" Teil")]
+
+        assert assign_segments(segments, [(0.0, 2.0), (2.0, 42.0), (42.0, 43.0)]) == \
+            ["Erster", "Zweiter Teil", None]
+
+    @pytest.mark.parametrize("version, supported", [
+        ("1.2.0", True), ("1.10.1", True), ("2.0.0rc1", True),
+        ("1.1.1", False), ("1.0.3", False), ("", False), ("dev", False),
+    ])
+    def test_batched_requires_seconds_clip_timestamps(self, version, supported):
+        assert supports_batched_clips(version) is supported
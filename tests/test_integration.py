@@ -27,7 +27,7 @@ class TestAudioToTextWorkflow:
     @pytest.fixture
     def mock_openai_client(self):
         """Mock für OpenAI Client"""
-        with patch('src.transcription.OpenAI') as mock_openai:
+        with patch('src.transcription.get_openai_client') as mock_openai:
             mock_client = MagicMock()
             mock_openai.return_value = mock_client
 
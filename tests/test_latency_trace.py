@@ -0,0 +1,119 @@
+"""
+Tests für latency_trace.py - Zeitmessung pro Stufe der Diktier-Pipeline
+"""
+
+import json
+
+import pytest
+
+from src.latency_trace import LatencyTracker, cli, percentile, read_trace_file, summarize
+
+
+@pytest.fixture
+def tracker(tmp_path):
+    return LatencyTracker(history=10, trace_file=tmp_path / "traces.jsonl")
+
+
+class TestPercentile:
+    """Tests für die Perzentil-Berechnung (Nearest-Rank)"""
+
+    def test_nearest_rank(self):
+        values = list(range(1, 101))
+        assert percentile(values, 50) == 50
+        assert percentile(values, 95) == 95
+        assert percentile(values, 99) == 99
+
+    def test_unsorted_and_single_value(self):
+        assert percentile([30, 10, 20], 50) == 20
+        assert percentile([7.5], 99) == 7.5
+
+
+class TestLatencyTrace:
+    """Tests für Zeitpunkte und Schritte einer Session"""
+
+    def test_marks_spans_and_totals(self, tracker):
+        trace = tracker.start()
+        trace.mark("release")
+        trace.mark_once("first_frame")
+        first_frame = trace.marks["first_frame"]
+        trace.mark_once("first_frame")
+        trace.add_span("encode", 0.010)
+        trace.add_span("encode", 0.005)
+        with trace.span("transcribe"):
+            pass
+        trace.set("backend", "api")
+
+        record = trace.finish("ok")
+
+        assert record["marks"]["first_frame"] == first_frame
+        assert record["spans"]["encode"] == pytest.approx(15.0)
+        assert "transcribe" in record["spans"]
+        assert record["release_to_inject"] <= record["total"]
+        assert record["backend"] == "api"
+        assert record["outcome"] == "ok"
+
+    def test_finish_only_once(self, tracker):
+        trace = tracker.start()
+        assert trace.finish("ok") is not None
+        assert trace.finish("error") is None
+        assert len(tracker.records()) == 1
+
+
+class TestLatencyTracker:
+    """Tests für Speicherung und Auswertung abgeschlossener Sessions"""
+
+    def test_records_written_as_jsonl(self, tracker):
+        for _ in range(3):
+            trace = tracker.start()
+            trace.mark("release")
+            trace.finish()
+
+        lines = tracker.trace_file.read_text(encoding="utf-8").splitlines()
+        assert len(lines) == 3
+        assert all("release_to_inject" in json.loads(line) for line in lines)
+
+    def test_summary_per_stage(self, tracker):
+        for value in (100.0, 200.0, 300.0, 400.0):
+            tracker.record({"spans": {"transcribe": value}, "total": value + 50})
+
+        summary = tracker.summary()
+        assert summary["transcribe"]["count"] == 4
+        assert summary["transcribe"]["p50"] == 200.0
+        assert summary["transcribe"]["p99"] == 400.0
+        assert summary["total"]["p95"] == 450.0
+        assert "transcribe" in tracker.format_summary()
+
+    def test_history_loaded_from_file(self, tmp_path):
+        trace_file = tmp_path / "traces.jsonl"
+        LatencyTracker(trace_file=trace_file).record({"total": 123.0})
+
+        assert LatencyTracker(trace_file=trace_file).summary()["total"]["count"] == 1
+
+    def test_history_is_bounded(self, tracker):
+        for i in range(15):
+            tracker.record({"total": float(i)})
+        assert len(tracker.records()) == 10
+
+    def test_non_serializable_attributes(self, tracker):
+        """Unbekannte Werte (z.B. Objekte) brechen das Schreiben nicht ab"""
+        trace = tracker.start()
+        trace.set("backend", object())
+        trace.finish()
+        assert len(read_trace_file(tracker.trace_file)) == 1
+
+
+class TestCli:
+    """Tests für python -m src stats"""
+
+    def test_prints_percentiles(self, tracker, capsys):
+        tracker.record({"spans": {"transcribe": 250.0}, "total": 400.0})
+
+        assert cli(["--file", str(tracker.trace_file), "--json"]) == 0
+        summary = json.loads(capsys.readouterr().out)
+        assert summary["transcribe"]["p50"] == 250.0
+
+    def test_missing_file(self, tmp_path, capsys):
+        assert cli(["--file", str(tmp_path / "fehlt.jsonl")]) == 1
+
+    def test_summarize_ignores_empty_records(self):
+        assert summarize([{}]) == {}
@@ -0,0 +1,133 @@
+"""
+Tests für live_captions.py - gleitendes Dekodierfenster mit partial- und final-Ereignissen
+"""
+
+import threading
+import time
+
+import numpy as np
+
+from src.live_captions import LiveCaptioner
+
+SAMPLE_RATE = 16000
+
+
+class FakeLocalService:
+    """Liefert die Fensterlänge als Text und merkt sich die Prompts"""
+
+    def __init__(self, delay: float = 0.0):
+        self.delay = delay
+        self.prompts = []
+        self.profiles = []
+        self.lengths = []
+
+    def transcribe_array(self, audio, initial_prompt=None, profile=None):
+        if self.delay:
+            threading.Event().wait(self.delay)
+        self.prompts.append(initial_prompt)
+        self.profiles.append(profile)
+        self.lengths.append(len(audio))
+        return f"{len(audio) / SAMPLE_RATE:.1f} Sekunden"
+
+
+def _speech(seconds):
+    return (np.ones(int(seconds * SAMPLE_RATE), dtype=np.int16) * 3000).tobytes()
+
+
+def _silence(seconds):
+    return np.zeros(int(seconds * SAMPLE_RATE), dtype=np.int16).tobytes()
+
+
+def _feed(captioner, pcm, frame_seconds=0.1, speed=4.0):
+    """Speist Frames im Takt des Streams ein (speed-fach beschleunigt, None = ohne Pause)"""
+    frame_bytes = int(frame_seconds * SAMPLE_RATE) * 2
+    for offset in range(0, len(pcm), frame_bytes):
+        captioner.feed(pcm[offset:offset + frame_bytes])
+        if speed:
+            time.sleep(frame_seconds / speed)
+
+
+def _captioner(service, events, **kwargs):
+    options = dict(step_seconds=0.5, max_window_seconds=5.0, silence_threshold=300, silence_seconds=0.3)
+    options.update(kwargs)
+    return LiveCaptioner(service, events.append, **options)
+
+
+class TestLiveCaptioner:
+    """Tests für Zwischenstände, Festschreiben an Pausen und Statistik"""
+
+    def test_partials_then_final_at_pause(self, monkeypatch):
+        from src.config import config
+
+        monkeypatch.setattr(config, "DECODING_PROFILE", "auto")
+        events = []
+        captioner = _captioner(FakeLocalService(), events)
+
+        _feed(captioner, _speech(1.5))
+        _feed(captioner, _silence(0.4))
+        stats = captioner.finish(timeout=5)
+
+        partials = [e for e in events if e["type"] == "partial"]
+        finals = [e for e in events if e["type"] == "final"]
+        assert partials
+        assert len(finals) == 1
+        assert finals[0]["start"] == 0.0
+        assert finals[0]["end"] >= 1.8
+        assert stats["finals"] == 1
+        assert stats["realtime_factor"] is not None
+        # Im Modus auto: Zwischenstände greedy, festgeschriebener Text mit automatisch gewähltem Profil
+        assert "instant" in captioner.local_service.profiles
+        assert captioner.local_service.profiles[-1] is None
+        assert all(e["lag"] >= 0 for e in events)
+
+    def test_silence_is_not_decoded(self):
+        service = FakeLocalService()
+        events = []
+        captioner = _captioner(service, events)
+
+        _feed(captioner, _silence(2.0), speed=None)
+        captioner.finish(timeout=5)
+
+        assert events == []
+        assert service.lengths == []
+
+    def test_window_starts_after_last_final_and_uses_context(self, monkeypatch):
+        from src.config import config
+
+        monkeypatch.setattr(config, "get_vocabulary", lambda: "Kubernetes")
+        service = FakeLocalService()
+        events = []
+        captioner = _captioner(service, events)
+
+        _feed(captioner, _speech(1.0) + _silence(0.4))
+        _feed(captioner, _speech(1.0))
+        captioner.finish(timeout=5)
+
+        finals = [e for e in events if e["type"] == "final"]
+        assert len(finals) == 2
+        assert finals[1]["start"] == finals[0]["end"]
+        # Zweites Fenster enthält nur das Audio nach dem ersten Festschreiben
+        assert service.lengths[-1] <= 1.0 * SAMPLE_RATE + 1600
+        assert service.prompts[-1] == f"Kubernetes {finals[0]['text']}"
+
+    def test_max_window_forces_final(self):
+        events = []
+        captioner = _captioner(FakeLocalService(), events, max_window_seconds=1.0)
+
+        _feed(captioner, _speech(2.5), speed=None)
+        captioner.finish(timeout=5)
+
+        finals = [e for e in events if e["type"] == "final"]
+        assert [(e["start"], e["end"]) for e in finals] == [(0.0, 1.0), (1.0, 2.0), (2.0, 2.5)]
+
+    def test_slow_decoder_skips_intermediate_partials(self):
+        service = FakeLocalService(delay=0.2)
+        events = []
+        captioner = _captioner(service, events, step_seconds=0.1)
+
+        # Schneller als Echtzeit eingespeist - der Decoder kommt nicht hinterher
+        _feed(captioner, _speech(3.0), speed=None)
+        captioner.finish(timeout=10)
+
+        assert service.lengths[-1] == 3 * SAMPLE_RATE
+        assert len(service.lengths) < 30
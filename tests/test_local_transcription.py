@@ -88,35 +88,56 @@ class TestLocalTranscriptionService:
             result = service.transcribe("large_file.wav")
             assert result is None
 
-    def test_transcribe_audio_data_success(self, mock_whisper_model, tmp_path):
-        """Test erfolgreiche Transkription von Audio-Daten"""
+    def test_transcribe_audio_data_success(self, mock_whisper_model):
+        """Test erfolgreiche Transkription von Audio-Daten (ohne Temp-Datei)"""
         service = LocalTranscriptionService()
 
-        test_data = b'dummy_audio_data'
+        with patch('tempfile.NamedTemporaryFile') as mock_temp_file:
+            result = service.transcribe_audio_data(b'dummy_audio_data', "audio.mp3")
 
-        # Erstelle eine echte temporäre Datei für den Test
-        temp_file = tmp_path / "temp_audio.mp3"
-        temp_file.write_bytes(test_data)
+            mock_temp_file.assert_not_called()
 
-        with patch('tempfile.NamedTemporaryFile') as mock_temp_file:
-            mock_file = MagicMock()
-            mock_file.name = str(temp_file)
-            mock_temp_file.return_value.__enter__.return_value = mock_file
+        assert isinstance(result, str)
+        assert "Das ist ein Test." in result
+        assert "Wie geht es dir?" in result
+
+        # faster-whisper erhält ein file-like Objekt mit passendem Namen
+        audio_arg = mock_whisper_model.transcribe.call_args[0][0]
+        assert audio_arg.name == "audio.mp3"
+        assert audio_arg.read() == b'dummy_audio_data'
+
+    def test_transcribe_audio_data_validation(self, mock_whisper_model):
+        """Zu große oder unbekannte Audio-Daten erreichen den Decoder nicht"""
+        service = LocalTranscriptionService()
 
-            result = service.transcribe_audio_data(test_data, "audio.mp3")
+        with patch('src.local_transcription.MAX_AUDIO_MB', 1):
+            assert service.transcribe_audio_data(b'\x00' * (2 * 1024 * 1024), "audio.mp3") is None
+        assert service.transcribe_audio_data(b'dummy', "audio.exe") is None
+        assert service.transcribe_audio_data(b'dummy', "audio") is None
 
-            assert isinstance(result, str)
-            assert "Das ist ein Test." in result
-            assert "Wie geht es dir?" in result
+        mock_whisper_model.transcribe.assert_not_called()
 
     def test_transcribe_audio_data_error(self, mock_whisper_model):
         """Test Fehlerbehandlung bei Audio-Daten-Transkription"""
         service = LocalTranscriptionService()
 
-        # Mock tempfile Fehler
-        with patch('tempfile.NamedTemporaryFile', side_effect=Exception("Temp file error")):
-            result = service.transcribe_audio_data(b'dummy', "audio.mp3")
-            assert result is None
+        mock_whisper_model.transcribe.side_effect = Exception("Decode error")
+        result = service.transcribe_audio_data(b'dummy', "audio.mp3")
+        assert result is None
+
+    def test_transcribe_array(self, mock_whisper_model):
+        """Test In-Memory-Transkription eines float32-Arrays"""
+        import numpy as np
+
+        service = LocalTranscriptionService()
+        audio = np.zeros(16000, dtype=np.float32)
+
+        result = service.transcribe_array(audio, initial_prompt="Kontext")
+
+        assert "Das ist ein Test." in result
+        call = mock_whisper_model.transcribe.call_args
+        assert call[0][0] is audio
+        assert call[1]['initial_prompt'] == "Kontext"
 
     def test_get_model_info(self, mock_whisper_model):
         """Test Modell-Info Abruf"""
@@ -0,0 +1,104 @@
+"""
+Tests für metrics.py - Zähler, Histogramme und Datei-Export
+"""
+
+import json
+
+import pytest
+
+from src.exceptions import AudioRecordingError
+from src.metrics import AppMetrics, MetricsExporter, MetricsRegistry, error_type
+
+
+@pytest.fixture
+def registry():
+    return MetricsRegistry()
+
+
+class TestMetrics:
+    """Tests für Counter, Gauge und Histogram"""
+
+    def test_counter_with_labels(self, registry):
+        counter = registry.counter("recordings_total", "Aufnahmen", ("outcome",))
+        counter.inc(outcome="ok")
+        counter.inc(2, outcome="ok")
+        counter.inc(outcome="error")
+
+        assert counter.value(outcome="ok") == 3
+        text = registry.to_prometheus()
+        assert "# TYPE voice_transcriber_recordings_total counter" in text
+        assert 'voice_transcriber_recordings_total{outcome="ok"} 3' in text
+
+    def test_wrong_labels_rejected(self, registry):
+        counter = registry.counter("errors_total", "Fehler", ("type",))
+        with pytest.raises(ValueError):
+            counter.inc(kind="APIError")
+
+    def test_histogram_buckets_are_cumulative(self, registry):
+        histogram = registry.histogram("stage_latency_seconds", "Latenz", ("stage",), buckets=(0.1, 1.0))
+        for value in (0.05, 0.5, 0.7, 3.0):
+            histogram.observe(value, stage="transcribe")
+
+        text = registry.to_prometheus()
+        assert 'voice_transcriber_stage_latency_seconds_bucket{stage="transcribe",le="0.1"} 1' in text
+        assert 'voice_transcriber_stage_latency_seconds_bucket{stage="transcribe",le="1"} 3' in text
+        assert 'voice_transcriber_stage_latency_seconds_bucket{stage="transcribe",le="+Inf"} 4' in text
+        assert 'voice_transcriber_stage_latency_seconds_count{stage="transcribe"} 4' in text
+        assert histogram.count(stage="transcribe") == 4
+
+    def test_label_values_escaped(self, registry):
+        gauge = registry.gauge("info", "Info", ("model",))
+        gauge.set(1, model='a"b')
+        assert 'model="a\\"b"' in registry.to_prometheus()
+
+    def test_session_record_observed_in_seconds(self):
+        app_metrics = AppMetrics()
+        app_metrics.observe_session({"spans": {"encode": 20.0}, "release_to_inject": 800.0, "total": 2500.0})
+
+        snapshot = app_metrics.to_dict()["metrics"]["voice_transcriber_stage_latency_seconds"]
+        samples = {s["labels"]["stage"]: s for s in snapshot["samples"]}
+        assert samples["encode"]["sum"] == pytest.approx(0.02)
+        assert samples["total"]["buckets"]["5"] == 1
+
+
+class TestErrorType:
+    """Tests für die Zuordnung zu Klassen aus src/exceptions.py"""
+
+    def test_repo_exceptions_keep_their_class(self):
+        assert error_type(AudioRecordingError("x")) == "AudioRecordingError"
+
+    def test_connection_errors_are_network_errors(self):
+        assert error_type(ConnectionError()) == "NetworkError"
+
+    def test_unknown_errors_use_base_class(self):
+        assert error_type(KeyError("x")) == "VoiceTranscriberError"
+
+
+class TestExport:
+    """Tests für den atomaren Export"""
+
+    def test_prometheus_textfile(self, registry, tmp_path):
+        registry.counter("cache_requests_total", "Cache", ("result",)).inc(result="hit")
+        path = tmp_path / "metrics.prom"
+
+        assert MetricsExporter(registry, path=path, output_format="prometheus", interval=60).flush()
+        assert 'voice_transcriber_cache_requests_total{result="hit"} 1' in path.read_text()
+        assert list(tmp_path.iterdir()) == [path]
+
+    def test_json_snapshot(self, registry, tmp_path):
+        registry.counter("retries_total", "Retries", ("operation",)).inc(operation="transcription")
+        path = tmp_path / "metrics.json"
+
+        MetricsExporter(registry, path=path, output_format="json", interval=60).flush()
+        snapshot = json.loads(path.read_text())
+        samples = snapshot["metrics"]["voice_transcriber_retries_total"]["samples"]
+        assert samples == [{"labels": {"operation": "transcription"}, "value": 1.0}]
+
+    def test_stop_writes_final_state(self, registry, tmp_path):
+        path = tmp_path / "metrics.prom"
+        exporter = MetricsExporter(registry, path=path, output_format="prometheus", interval=60)
+        exporter.start()
+        registry.counter("recordings_total", "Aufnahmen", ("outcome",)).inc(outcome="ok")
+        exporter.stop()
+
+        assert "recordings_total" in path.read_text()
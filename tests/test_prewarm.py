@@ -0,0 +1,76 @@
+"""
+Tests für prewarm.py - Vorwärmen beim Hotkey-Druck
+"""
+
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from src.prewarm import PipelinePrewarmer
+
+
+class TestPipelinePrewarmer:
+    """Test-Klasse für PipelinePrewarmer"""
+
+    @pytest.fixture
+    def components(self):
+        transcription_service = MagicMock()
+        audio_recorder = MagicMock()
+        return transcription_service, audio_recorder
+
+    @pytest.fixture(autouse=True)
+    def no_network(self):
+        with patch('src.prewarm.prewarm_connection', return_value=True) as mock_prewarm:
+            yield mock_prewarm
+
+    @patch('src.config.config.USE_LOCAL_TRANSCRIPTION', True)
+    def test_local_mode_touches_model(self, components):
+        """Im lokalen Modus werden Verbindung und Modell vorgewärmt"""
+        transcription_service, audio_recorder = components
+        prewarmer = PipelinePrewarmer(transcription_service, audio_recorder, cooldown_seconds=60)
+
+        assert prewarmer.on_hotkey_press() == ["http", "model"]
+        prewarmer.wait(timeout=5)
+
+        transcription_service.touch_local_model.assert_called_once()
+        audio_recorder.warmup_encoder.assert_not_called()
+
+    @patch('src.config.config.USE_LOCAL_TRANSCRIPTION', False)
+    def test_api_mode_warms_encoder(self, components):
+        """Im API-Modus wird der Encoder für die Komprimierung vorgewärmt"""
+        transcription_service, audio_recorder = components
+        prewarmer = PipelinePrewarmer(transcription_service, audio_recorder, cooldown_seconds=60)
+
+        assert prewarmer.on_hotkey_press() == ["http", "encoder"]
+        prewarmer.wait(timeout=5)
+
+        audio_recorder.warmup_encoder.assert_called_once()
+
+    @patch('src.config.config.USE_LOCAL_TRANSCRIPTION', False)
+    def test_cooldown_prevents_repeated_work(self, components, no_network):
+        """Schnell aufeinanderfolgende Hotkey-Drücke wärmen nicht erneut vor"""
+        no_network.return_value = False
+        transcription_service, audio_recorder = components
+        prewarmer = PipelinePrewarmer(transcription_service, audio_recorder, cooldown_seconds=60)
+
+        prewarmer.on_hotkey_press()
+        prewarmer.wait(timeout=5)
+        assert prewarmer.on_hotkey_press() == []
+        audio_recorder.warmup_encoder.assert_called_once()
+
+    @patch('src.config.config.PRESS_PREWARM_ENABLED', False)
+    def test_disabled(self, components, no_network):
+        """Deaktiviertes Vorwärmen startet nichts"""
+        prewarmer = PipelinePrewarmer(*components)
+        assert prewarmer.on_hotkey_press() == []
+        no_network.assert_not_called()
+
+    def test_failing_task_is_logged(self, components):
+        """Fehler beim Vorwärmen beeinträchtigen die Aufnahme nicht"""
+        transcription_service, audio_recorder = components
+        audio_recorder.warmup_encoder.side_effect = RuntimeError("ffmpeg fehlt")
+        prewarmer = PipelinePrewarmer(transcription_service, audio_recorder, cooldown_seconds=0)
+
+        with patch('src.config.config.USE_LOCAL_TRANSCRIPTION', False):
+            prewarmer.on_hotkey_press()
+        prewarmer.wait(timeout=5)
@@ -0,0 +1,61 @@
+"""
+Tests für ring_buffer.py - Vorallokierter PCM-Ringpuffer
+"""
+
+import numpy as np
+
+from src.ring_buffer import PcmRingBuffer
+
+
+def _block(values):
+    return np.asarray(values, dtype=np.int16).tobytes()
+
+
+class TestPcmRingBuffer:
+    """Test-Klasse für PcmRingBuffer"""
+
+    def test_write_and_read(self):
+        """Geschriebene Samples werden in Reihenfolge zurückgegeben"""
+        buffer = PcmRingBuffer(8)
+        buffer.write(_block([1, 2, 3]))
+        buffer.write(_block([4, 5]))
+
+        assert len(buffer) == 5
+        assert buffer.read_all().tolist() == [1, 2, 3, 4, 5]
+
+    def test_wraparound_keeps_newest_samples(self):
+        """Bei Überlauf bleiben die neuesten Samples erhalten"""
+        buffer = PcmRingBuffer(4)
+        buffer.write(_block([1, 2, 3]))
+        buffer.write(_block([4, 5, 6]))
+
+        assert len(buffer) == 4
+        assert buffer.total_written == 6
+        assert buffer.read_all().tolist() == [3, 4, 5, 6]
+
+    def test_block_larger_than_capacity(self):
+        """Ein Block größer als der Puffer behält nur sein Ende"""
+        buffer = PcmRingBuffer(3)
+        buffer.write(_block([1, 2, 3, 4, 5]))
+        assert buffer.read_all().tolist() == [3, 4, 5]
+
+    def test_clear_reuses_memory(self):
+        """clear() setzt zurück, ohne den Speicher neu anzulegen"""
+        buffer = PcmRingBuffer(4)
+        storage = buffer._buffer
+        buffer.write(_block([1, 2]))
+        buffer.clear()
+
+        assert len(buffer) == 0
+        assert buffer._buffer is storage
+        buffer.write(_block([7]))
+        assert buffer.read_all().tolist() == [7]
+
+    def test_read_returns_copy(self):
+        """Spätere Aufnahmen verändern bereits gelesene Daten nicht"""
+        buffer = PcmRingBuffer(4)
+        buffer.write(_block([1, 2]))
+        snapshot = buffer.read_all()
+        buffer.clear()
+        buffer.write(_block([9, 9]))
+        assert snapshot.tolist() == [1, 2]
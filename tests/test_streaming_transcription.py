@@ -0,0 +1,112 @@
+"""
+Tests für streaming_transcription.py - Inkrementelle Segment-Dekodierung
+"""
+
+import time
+from unittest.mock import MagicMock
+
+import numpy as np
+import pytest
+
+from src.streaming_transcription import StreamingTranscriber
+
+SAMPLE_RATE = 16000
+FRAME_SAMPLES = 1024
+
+
+def _frames(seconds: float, amplitude: float) -> list:
+    """Erzeugt 1024-Sample-Frames (Ton oder Stille) wie vom AudioRecorder"""
+    num_frames = int(seconds * SAMPLE_RATE / FRAME_SAMPLES)
+    t = np.arange(FRAME_SAMPLES) / SAMPLE_RATE
+    tone = (amplitude * 32767 * np.sin(2 * np.pi * 440 * t)).astype(np.int16)
+    return [tone.tobytes() for _ in range(num_frames)]
+
+
+class TestStreamingTranscriber:
+    """Test-Klasse für StreamingTranscriber"""
+
+    @pytest.fixture
+    def local_service(self):
+        """Mock für LocalTranscriptionService mit fortlaufenden Segment-Texten"""
+        service = MagicMock()
+        service.transcribe_array.side_effect = lambda audio, initial_prompt=None: f"Teil{service.transcribe_array.call_count}"
+        return service
+
+    def _create(self, service):
+        return StreamingTranscriber(
+            service,
+            sample_rate=SAMPLE_RATE,
+            silence_threshold=300,
+            silence_seconds=0.3,
+            min_segment_seconds=1.0,
+            max_segment_seconds=5.0,
+        )
+
+    def test_segments_decoded_before_finish(self, local_service):
+        """Segmente werden bereits an Pausen dekodiert, bevor finish() aufgerufen wird"""
+        streamer = self._create(local_service)
+
+        for frame in _frames(1.5, 0.5) + _frames(0.5, 0.0) + _frames(1.5, 0.5) + _frames(0.5, 0.0):
+            streamer.feed(frame)
+
+        # Beide Segmente enden mit einer Pause und werden ohne finish() dekodiert
+        deadline = time.time() + 5
+        while local_service.transcribe_array.call_count < 2 and time.time() < deadline:
+            time.sleep(0.01)
+        assert local_service.transcribe_array.call_count == 2
+
+        text = streamer.finish(timeout=5)
+
+        assert text == "Teil1 Teil2"
+        assert streamer.segments_decoded == 2
+
+    def test_final_partial_segment_decoded_on_finish(self, local_service):
+        """Das letzte Teilsegment ohne Pause wird erst bei finish() dekodiert"""
+        streamer = self._create(local_service)
+
+        for frame in _frames(0.8, 0.5):
+            streamer.feed(frame)
+
+        assert streamer.finish(timeout=5) == "Teil1"
+        local_service.transcribe_array.assert_called_once()
+
+    def test_max_segment_length_forces_cut(self, local_service):
+        """Ohne Pausen wird spätestens nach max_segment_seconds geschnitten"""
+        streamer = self._create(local_service)
+
+        for frame in _frames(11.0, 0.5):
+            streamer.feed(frame)
+
+        streamer.finish(timeout=5)
+        assert local_service.transcribe_array.call_count == 3
+
+    def test_silence_only_not_decoded(self, local_service):
+        """Reine Stille wird nicht an das Modell gegeben"""
+        streamer = self._create(local_service)
+
+        for frame in _frames(2.0, 0.0):
+            streamer.feed(frame)
+
+        assert streamer.finish(timeout=5) is None
+        local_service.transcribe_array.assert_not_called()
+
+    def test_previous_text_used_as_prompt(self, local_service):
+        """Der Text des vorherigen Segments wird als Kontext übergeben"""
+        streamer = self._create(local_service)
+
+        for frame in _frames(1.5, 0.5) + _frames(0.5, 0.0) + _frames(1.0, 0.5):
+            streamer.feed(frame)
+        streamer.finish(timeout=5)
+
+        last_prompt = local_service.transcribe_array.call_args.kwargs['initial_prompt']
+        assert "Teil1" in last_prompt
+
+    def test_decode_error_returns_none(self, local_service):
+        """Bei Dekodierfehlern liefert finish() None (Fallback auf Gesamtaufnahme)"""
+        local_service.transcribe_array.side_effect = RuntimeError("CTranslate2 error")
+        streamer = self._create(local_service)
+
+        for frame in _frames(1.5, 0.5):
+            streamer.feed(frame)
+
+        assert streamer.finish(timeout=5) is None
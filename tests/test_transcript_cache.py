@@ -0,0 +1,106 @@
+"""
+Tests für transcript_cache.py - Inhaltsadressierter Transkript-Cache
+"""
+
+import os
+import time
+
+import pytest
+
+from src.transcript_cache import TranscriptCache
+
+
+class TestTranscriptCache:
+    """Test-Klasse für TranscriptCache"""
+
+    @pytest.fixture
+    def cache(self, tmp_path):
+        return TranscriptCache(cache_dir=tmp_path, max_entries=3, max_disk_bytes=1024 * 1024,
+                               max_age_seconds=3600, memory_entries=2)
+
+    def test_key_depends_on_settings(self):
+        """Audio und jede relevante Einstellung verändern den Schlüssel"""
+        base = TranscriptCache.make_key(b"audio", "api", "whisper-1", "de", "Vokabular")
+        assert base == TranscriptCache.make_key(b"audio", "api", "whisper-1", "de", "Vokabular")
+        assert base != TranscriptCache.make_key(b"audio2", "api", "whisper-1", "de", "Vokabular")
+        assert base != TranscriptCache.make_key(b"audio", "local", "whisper-1", "de", "Vokabular")
+        assert base != TranscriptCache.make_key(b"audio", "api", "base", "de", "Vokabular")
+        assert base != TranscriptCache.make_key(b"audio", "api", "whisper-1", "en", "Vokabular")
+        assert base != TranscriptCache.make_key(b"audio", "api", "whisper-1", "de", "")
+
+    def test_hit_and_miss_counters(self, cache):
+        """Treffer und Fehlzugriffe werden gezählt"""
+        assert cache.get("a") is None
+        cache.put("a", "Hallo Welt")
+        assert cache.get("a") == "Hallo Welt"
+
+        stats = cache.get_stats()
+        assert stats["hits"] == 1
+        assert stats["misses"] == 1
+        assert stats["hit_rate"] == 0.5
+
+    def test_persists_across_instances(self, cache, tmp_path):
+        """Einträge überleben einen Neustart über den Festplatten-Cache"""
+        cache.put("a", "Persistent")
+        reopened = TranscriptCache(cache_dir=tmp_path, max_entries=3, max_disk_bytes=1024 * 1024,
+                                   max_age_seconds=3600, memory_entries=2)
+        assert reopened.get("a") == "Persistent"
+
+    def test_memory_lru_is_bounded(self, cache):
+        """Der In-Memory-LRU hält nur memory_entries Einträge"""
+        for key in ("a", "b", "c"):
+            cache.put(key, key.upper())
+        assert cache.get_stats()["memory_entries"] == 2
+        # Verdrängter Eintrag wird von der Festplatte nachgeladen
+        assert cache.get("a") == "A"
+
+    def test_expired_entries_are_ignored(self, tmp_path):
+        """Abgelaufene Einträge gelten als Fehlzugriff"""
+        cache = TranscriptCache(cache_dir=tmp_path, max_entries=10, max_disk_bytes=1024 * 1024,
+                                max_age_seconds=0.05, memory_entries=2)
+        cache.put("a", "Alt")
+        time.sleep(0.1)
+        assert cache.get("a") is None
+
+    def test_disk_eviction_oldest_first(self, cache, tmp_path):
+        """Überschreitet der Cache max_entries, werden die ältesten Einträge entfernt"""
+        for index, key in enumerate(("a", "b", "c", "d")):
+            cache.put(key, key.upper())
+            # mtime explizit staffeln, damit die Reihenfolge unabhängig von der Dateisystem-Auflösung ist
+            os.utime(tmp_path / f"{key}.json", (1000 + index, time.time() - 100 + index))
+
+        cache._prune_disk()
+
+        remaining = sorted(path.stem for path in tmp_path.glob('*.json'))
+        assert remaining == ["b", "c", "d"]
+        assert cache.get_stats()["evictions"] == 1
+
+    def test_disk_size_limit(self, tmp_path):
+        """Das Byte-Limit begrenzt den Festplatten-Cache"""
+        cache = TranscriptCache(cache_dir=tmp_path, max_entries=100, max_disk_bytes=200,
+                                max_age_seconds=3600, memory_entries=2)
+        for key in ("a", "b", "c"):
+            cache.put(key, "x" * 80)
+        cache._prune_disk()
+
+        total = sum(path.stat().st_size for path in tmp_path.glob('*.json'))
+        assert total <= 200
+
+    def test_clear(self, cache):
+        """clear() leert Speicher und Festplatte"""
+        cache.put("a", "A")
+        cache.clear()
+        assert cache.get("a") is None
+        assert cache.get_stats()["disk_entries"] == 0
+
+    def test_memory_only_without_persist(self, monkeypatch):
+        """Ohne TRANSCRIPT_CACHE_PERSIST wird nichts auf die Festplatte geschrieben"""
+        from src.config import config
+
+        monkeypatch.setattr(config, "TRANSCRIPT_CACHE_PERSIST", False)
+        cache = TranscriptCache(max_entries=10, max_disk_bytes=1024, max_age_seconds=3600, memory_entries=2)
+        cache.put("a", "Diktat")
+
+        assert cache.cache_dir is None
+        assert cache.get("a") == "Diktat"
+        assert cache.get_stats()["disk_entries"] == 0
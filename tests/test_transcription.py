@@ -0,0 +1,450 @@
+"""
+Tests für transcription.py - Routing zwischen lokaler und API-Transkription
+"""
+
+import io
+import threading
+import time
+import wave
+from unittest.mock import MagicMock, patch
+
+import numpy as np
+import pytest
+
+from src.backend_router import API, LOCAL
+from src.config import config
+from src.transcript_cache import TranscriptCache
+from src.transcription import TranscriptionService
+
+
+@pytest.fixture(autouse=True)
+def no_persistent_cache():
+    """Tests sollen nicht auf den Cache im AppData-Verzeichnis zugreifen"""
+    with patch('src.config.config.TRANSCRIPT_CACHE_ENABLED', False):
+        yield
+
+
+class TestTranscriptionService:
+    """Test-Klasse für TranscriptionService"""
+
+    @pytest.fixture
+    def mock_openai_client(self):
+        """Mock für OpenAI Client"""
+        with patch('src.transcription.get_openai_client') as mock_openai:
+            mock_client = MagicMock()
+            mock_openai.return_value = mock_client
+            mock_client.audio.transcriptions.create.return_value = "API-Transkript"
+            yield mock_client
+
+    @pytest.fixture
+    def local_service(self):
+        """Mock für den lokalen Service"""
+        service = MagicMock()
+        service.is_available.return_value = True
+        service.transcribe_array.return_value = "Lokales Transkript"
+        return service
+
+    @pytest.fixture
+    def pcm_audio(self):
+        """1 Sekunde float32-PCM"""
+        return np.zeros(16000, dtype=np.float32)
+
+    @patch('src.config.config.USE_LOCAL_TRANSCRIPTION', True)
+    def test_transcribe_pcm_local(self, mock_openai_client, local_service, pcm_audio):
+        """PCM geht direkt an das lokale Modell, ohne API-Aufruf"""
+        service = TranscriptionService()
+
+        with patch.object(service, '_get_local_transcription_service', return_value=local_service):
+            result = service.transcribe_pcm(pcm_audio)
+
+        assert result == "Lokales Transkript"
+        local_service.transcribe_array.assert_called_once_with(pcm_audio)
+        mock_openai_client.audio.transcriptions.create.assert_not_called()
+
+    @patch('src.config.config.USE_LOCAL_TRANSCRIPTION', True)
+    def test_transcribe_pcm_falls_back_to_api_with_wav(self, mock_openai_client, local_service, pcm_audio):
+        """Schlägt lokal fehl, wird ein im Speicher erzeugtes WAV hochgeladen"""
+        local_service.transcribe_array.return_value = None
+        service = TranscriptionService()
+
+        with patch.object(service, '_get_local_transcription_service', return_value=local_service):
+            result = service.transcribe_pcm(pcm_audio)
+
+        assert result == "API-Transkript"
+        uploaded = mock_openai_client.audio.transcriptions.create.call_args[1]['file']
+        assert uploaded.name == "audio.wav"
+        with wave.open(io.BytesIO(uploaded.getvalue()), 'rb') as wf:
+            assert wf.getframerate() == config.SAMPLE_RATE
+            assert wf.getnframes() == len(pcm_audio)
+
+    @patch('src.config.config.USE_LOCAL_TRANSCRIPTION', False)
+    def test_can_transcribe_in_memory_requires_local(self, mock_openai_client):
+        """Ohne lokale Transkription wird der Datei-/Upload-Pfad verwendet"""
+        service = TranscriptionService()
+        assert service.can_transcribe_in_memory() is False
+
+    @patch('src.config.config.USE_LOCAL_TRANSCRIPTION', True)
+    def test_can_transcribe_in_memory_with_local_model(self, mock_openai_client, local_service):
+        """Mit verfügbarem lokalem Modell und 16 kHz Mono bleibt Audio im Speicher"""
+        service = TranscriptionService()
+
+        with patch.object(service, '_get_local_transcription_service', return_value=local_service), \
+             patch('src.config.config.SAMPLE_RATE', 16000), \
+             patch('src.config.config.CHANNELS', 1):
+            assert service.can_transcribe_in_memory() is True
+
+        with patch.object(service, '_get_local_transcription_service', return_value=local_service), \
+             patch('src.config.config.SAMPLE_RATE', 44100):
+            assert service.can_transcribe_in_memory() is False
+
+
+class TestLocalModelWarmup:
+    """Tests für das Vorladen des lokalen Modells beim Start"""
+
+    @pytest.fixture
+    def service(self):
+        with patch('src.transcription.get_openai_client'):
+            yield TranscriptionService()
+
+    @patch('src.config.config.USE_LOCAL_TRANSCRIPTION', True)
+    def test_warmup_sets_ready_state(self, service):
+        """Erfolgreiches Warm-up meldet den Status 'ready'"""
+        local_service = MagicMock()
+        local_service.is_available.return_value = True
+        local_service.warmup.return_value = True
+
+        with patch.object(service, '_get_local_transcription_service', return_value=local_service):
+            assert service.start_warmup() is True
+            assert service.wait_for_local_ready(timeout=5) is True
+
+        assert service.warmup_state == "ready"
+        assert service.is_local_ready()
+        local_service.warmup.assert_called_once()
+
+    @patch('src.config.config.USE_LOCAL_TRANSCRIPTION', True)
+    def test_warmup_failure_state(self, service):
+        """Fehlendes Modell führt zum Status 'failed'"""
+        with patch.object(service, '_get_local_transcription_service', return_value=None):
+            service.start_warmup()
+            assert service.wait_for_local_ready(timeout=5) is False
+
+        assert service.warmup_state == "failed"
+
+    @patch('src.config.config.USE_LOCAL_TRANSCRIPTION', True)
+    def test_touch_local_model_reuses_loaded_model(self, service):
+        """Beim Hotkey-Druck läuft auf einem bereiten Modell keine Dummy-Inferenz"""
+        local_service = MagicMock()
+        local_service.is_available.return_value = True
+        local_service.touch.return_value = True
+        service.warmup_state = "ready"
+
+        with patch.object(service, '_get_local_transcription_service', return_value=local_service), \
+             patch.object(service, 'start_warmup') as mock_start_warmup:
+            assert service.touch_local_model() is True
+
+        local_service.touch.assert_called_once()
+        local_service.warmup.assert_not_called()
+        mock_start_warmup.assert_not_called()
+
+    @patch('src.config.config.USE_LOCAL_TRANSCRIPTION', True)
+    @patch('src.config.config.STREAMING_TRANSCRIPTION_ENABLED', True)
+    def test_streaming_session_requires_ready_model(self, service):
+        """Ohne aufgewärmtes Modell wird beim Hotkey-Druck nichts synchron geladen"""
+        with patch.object(service, '_get_local_transcription_service') as mock_get_service, \
+             patch('src.transcription.is_streaming_supported', return_value=True):
+            for state in ("idle", "loading", "failed"):
+                service.warmup_state = state
+                assert service.create_streaming_session() is None
+
+        mock_get_service.assert_not_called()
+
+    @patch('src.config.config.USE_LOCAL_TRANSCRIPTION', False)
+    def test_no_warmup_in_api_mode(self, service):
+        """Im API-Modus wird kein Modell geladen"""
+        assert service.start_warmup() is False
+        assert service.warmup_state == "idle"
+
+
+class TestTranscriptCaching:
+    """Tests für den Transkript-Cache im TranscriptionService"""
+
+    @pytest.fixture
+    def service(self, tmp_path):
+        with patch('src.transcription.get_openai_client') as mock_openai:
+            mock_openai.return_value.audio.transcriptions.create.return_value = "API-Transkript"
+            service = TranscriptionService()
+            service.cache = TranscriptCache(cache_dir=tmp_path, max_entries=10,
+                                            max_disk_bytes=1024 * 1024, max_age_seconds=3600,
+                                            memory_entries=10)
+            yield service
+
+    @patch('src.config.config.USE_LOCAL_TRANSCRIPTION', False)
+    def test_repeated_audio_served_from_cache(self, service):
+        """Gleiche Audio-Daten werden nur einmal an die API geschickt"""
+        assert service.transcribe_audio_data(b"audio" * 100, "audio.mp3") == "API-Transkript"
+        assert service.transcribe_audio_data(b"audio" * 100, "audio.mp3") == "API-Transkript"
+
+        assert service.client.audio.transcriptions.create.call_count == 1
+        stats = service.get_cache_stats()
+        assert stats["hits"] == 1
+        assert stats["misses"] == 1
+
+    @patch('src.config.config.USE_LOCAL_TRANSCRIPTION', False)
+    def test_last_backend_reports_cache_hit(self, service):
+        """Der Latenz-Trace sieht, ob das Transkript aus API oder Cache kam"""
+        service.transcribe_audio_data(b"audio" * 100, "audio.mp3")
+        assert service.last_backend == "api"
+
+        service.transcribe_audio_data(b"audio" * 100, "audio.mp3")
+        assert service.last_backend == "cache"
+
+    @patch('src.config.config.USE_LOCAL_TRANSCRIPTION', False)
+    def test_vocabulary_change_invalidates_cache(self, service):
+        """Geändertes Vokabular führt zu einem neuen Schlüssel"""
+        with patch.object(config, 'get_vocabulary', return_value="Alpha"):
+            service.transcribe_audio_data(b"audio", "audio.mp3")
+        with patch.object(config, 'get_vocabulary', return_value="Beta"):
+            service.transcribe_audio_data(b"audio", "audio.mp3")
+
+        assert service.client.audio.transcriptions.create.call_count == 2
+
+    @patch('src.config.config.USE_LOCAL_TRANSCRIPTION', True)
+    def test_fallback_result_cached_under_actual_backend(self, service):
+        """Antwortet nach lokalem Fehlschlag die API, landet das Ergebnis unter dem API-Schlüssel"""
+        local_service = MagicMock()
+        local_service.is_available.return_value = True
+        local_service.transcribe_audio_data.return_value = None
+
+        with patch.object(service, '_get_local_transcription_service', return_value=local_service):
+            assert service.transcribe_audio_data(b"audio", "audio.mp3") == "API-Transkript"
+            assert service.last_backend == API
+            assert service.transcribe_audio_data(b"audio", "audio.mp3") == "API-Transkript"
+
+        assert service.cache.get(service._cache_key(b"audio", LOCAL)) is None
+        assert service.cache.get(service._cache_key(b"audio", API)) == "API-Transkript"
+        # Zweiter Aufruf kommt aus dem Cache statt erneut lokal zu scheitern
+        assert local_service.transcribe_audio_data.call_count == 1
+        assert service.last_backend == "cache"
+
+    @patch('src.config.config.USE_LOCAL_TRANSCRIPTION', False)
+    def test_last_backend_is_per_thread(self, service):
+        """Parallele Aufrufe (Server, Batch) überschreiben sich das Backend nicht gegenseitig"""
+        service.transcribe_audio_data(b"audio", "audio.mp3")
+
+        seen = []
+        worker = threading.Thread(target=lambda: seen.append(
+            (service.transcribe_audio_data(b"audio", "audio.mp3"), service.last_backend)))
+        worker.start()
+        worker.join()
+
+        assert seen == [("API-Transkript", "cache")]
+        assert service.last_backend == API
+
+    @patch('src.config.config.USE_LOCAL_TRANSCRIPTION', True)
+    def test_decoding_profile_change_invalidates_cache(self, service):
+        """Ein greedy-Ergebnis wird nicht ausgeliefert, wenn 'accurate' konfiguriert ist"""
+        local_service = MagicMock()
+        local_service.is_available.return_value = True
+        local_service.transcribe_audio_data.return_value = "Lokales Transkript"
+
+        with patch.object(service, '_get_local_transcription_service', return_value=local_service):
+            for profile in ("instant", "accurate", "accurate"):
+                with patch.object(config, 'DECODING_PROFILE', profile):
+                    service.transcribe_audio_data(b"audio", "audio.mp3")
+
+        assert local_service.transcribe_audio_data.call_count == 2
+
+    @patch('src.config.config.USE_LOCAL_TRANSCRIPTION', False)
+    def test_failed_transcription_not_cached(self, service):
+        """Fehlgeschlagene Transkriptionen werden nicht gespeichert"""
+        with patch.object(service, '_transcribe_audio_data_uncached', return_value=None):
+            assert service.transcribe_audio_data(b"audio", "audio.mp3") is None
+        assert service.get_cache_stats()["disk_entries"] == 0
+
+
+class TestHedgedRequests:
+    """Tests für parallele lokale/API-Transkription (Hedged Requests)"""
+
+    @pytest.fixture(autouse=True)
+    def hedging_config(self):
+        with patch('src.config.config.USE_LOCAL_TRANSCRIPTION', True), \
+             patch('src.config.config.TRANSCRIPTION_HEDGING_ENABLED', True), \
+             patch('src.config.config.OPENAI_API_KEY', 'sk-test'), \
+             patch('src.config.config.HEDGE_INITIAL_DELAY', 0.05):
+            yield
+
+    @pytest.fixture
+    def service(self):
+        with patch('src.transcription.get_openai_client') as mock_openai:
+            mock_openai.return_value.audio.transcriptions.create.return_value = "API-Transkript"
+            service = TranscriptionService()
+            yield service
+            service.shutdown()
+
+    @staticmethod
+    def _local_service(delay: float, result="Lokales Transkript"):
+        local_service = MagicMock()
+        local_service.is_available.return_value = True
+
+        def slow_transcribe(audio_data, filename):
+            time.sleep(delay)
+            return result
+
+        local_service.transcribe_audio_data.side_effect = slow_transcribe
+        return local_service
+
+    def test_fast_local_result_without_api_call(self, service):
+        """Ist das lokale Modell vor der Schwelle fertig, wird keine API-Anfrage gestellt"""
+        with patch.object(service, '_get_local_transcription_service', return_value=self._local_service(0.0)):
+            assert service.transcribe_audio_data(b"audio", "audio.wav") == "Lokales Transkript"
+
+        service.client.audio.transcriptions.create.assert_not_called()
+        assert service.hedge_stats["hedged"] == 0
+
+    def test_slow_local_loses_against_api(self, service):
+        """Nach der Schwelle läuft die API parallel und das schnellere Ergebnis gewinnt"""
+        with patch.object(service, '_get_local_transcription_service', return_value=self._local_service(1.0)):
+            start_time = time.time()
+            assert service.transcribe_audio_data(b"audio", "audio.wav") == "API-Transkript"
+            assert time.time() - start_time < 0.9
+
+        assert service.hedge_stats == {"hedged": 1, "local_wins": 0, "api_wins": 1}
+
+    def test_late_local_loser_is_discarded(self, service):
+        """Ein lokales Ergebnis nach entschiedenem Hedge zählt weder im Router noch als Backend"""
+        local_service = self._local_service(0.3)
+        with patch.object(service, '_get_local_transcription_service', return_value=local_service):
+            assert service.transcribe_audio_data(b"audio", "audio.wav") == "API-Transkript"
+            service._hedge_executor.shutdown(wait=True)
+            service._hedge_executor = None
+
+        assert local_service.transcribe_audio_data.call_count == 1
+        assert service.router.latencies(LOCAL) == []
+        assert service.last_backend == API
+
+    def test_local_wins_when_api_fails(self, service):
+        """Scheitert die API, wird das (langsamere) lokale Ergebnis verwendet"""
+        service.client.audio.transcriptions.create.side_effect = Exception("Netzwerkfehler")
+        service.retry_delay = 0.01
+
+        with patch.object(service, '_get_local_transcription_service', return_value=self._local_service(0.3)):
+            assert service.transcribe_audio_data(b"audio", "audio.wav") == "Lokales Transkript"
+
+        assert service.hedge_stats["local_wins"] == 1
+
+    def test_hedge_delay_from_recent_local_timings(self, service):
+        """Die Schwelle folgt dem Perzentil der letzten lokalen Laufzeiten"""
+        assert service.get_hedge_delay() == 0.05
+
+        for latency in (1.0, 1.2, 1.1, 3.0, 0.9):
+            service.router.record_success(LOCAL, latency, audio_seconds=5.0)
+        with patch('src.config.config.HEDGE_MIN_DELAY', 0.5):
+            assert service.get_hedge_delay() == 3.0
+        with patch('src.config.config.HEDGE_MIN_DELAY', 5.0):
+            assert service.get_hedge_delay() == 5.0
+
+
+class TestBackendRouting:
+    """Tests für die adaptive Wahl zwischen lokalem Modell und API"""
+
+    @pytest.fixture
+    def service(self):
+        with patch('src.transcription.get_openai_client') as mock_openai:
+            mock_openai.return_value.audio.transcriptions.create.return_value = "API-Transkript"
+            yield TranscriptionService()
+
+    @pytest.fixture
+    def local_service(self):
+        service = MagicMock()
+        service.is_available.return_value = True
+        service.transcribe_audio_data.return_value = "Lokales Transkript"
+        return service
+
+    @patch('src.config.config.USE_LOCAL_TRANSCRIPTION', True)
+    def test_faster_api_is_preferred(self, service, local_service):
+        """Ist die API laut Statistik schneller, wird sie zuerst verwendet"""
+        for _ in range(3):
+            service.router.record_success(LOCAL, 4.0, audio_seconds=2.0)
+            service.router.record_success(API, 1.0, audio_seconds=2.0)
+
+        with patch.object(service, '_get_local_transcription_service', return_value=local_service):
+            assert service.transcribe_audio_data(b"audio", "audio.wav", audio_duration=2.0) == "API-Transkript"
+
+        local_service.transcribe_audio_data.assert_not_called()
+
+    @patch('src.config.config.USE_LOCAL_TRANSCRIPTION', True)
+    def test_failed_init_does_not_disable_local_permanently(self, service):
+        """Ein fehlgeschlagenes Laden sperrt das lokale Modell nur bis zur nächsten Probe"""
+        with patch('src.transcription._global_local_service', None), \
+             patch('src.transcription.LocalTranscriptionService', side_effect=RuntimeError("kein Modell")), \
+             patch('src.config.config.LOCAL_TRANSCRIPTION_WORKER_PROCESS', False):
+            assert service.transcribe_audio_data(b"audio", "audio.wav") == "API-Transkript"
+
+        assert config.USE_LOCAL_TRANSCRIPTION is True
+        assert service.router.is_enabled(LOCAL) is False
+        assert service.get_router_stats()[LOCAL]["reprobe_in"] > 0
+
+
+class TestChunkedApiTranscription:
+    """Tests für die parallele Chunk-Transkription langer Aufnahmen"""
+
+    @pytest.fixture
+    def service(self):
+        with patch('src.transcription.get_openai_client'):
+            yield TranscriptionService()
+
+    @patch('src.config.config.USE_LOCAL_TRANSCRIPTION', False)
+    @patch('src.config.config.SAMPLE_RATE', 16000)
+    @patch('src.config.config.CHANNELS', 1)
+    @patch('src.config.config.API_CHUNKING_MIN_SECONDS', 30)
+    @patch('src.config.config.API_CHUNK_MAX_SECONDS', 15)
+    @patch('src.config.config.API_CHUNK_TARGET_SECONDS', 10)
+    def test_long_audio_transcribed_in_chunks(self, service):
+        """Lange Aufnahmen werden in Chunks hochgeladen und zusammengefügt"""
+        texts = {"chunk_0.wav": "erster Teil", "chunk_1.wav": "Teil zwei", "chunk_2.wav": "dritter Teil"}
+
+        def create(**kwargs):
+            return texts[kwargs["file"].name]
+
+        service.client.audio.transcriptions.create.side_effect = create
+        audio = np.full(16000 * 40, 0.3, dtype=np.float32)
+
+        with patch.object(config, 'get_vocabulary', return_value="Vokabular"):
+            result = service.transcribe_pcm(audio)
+
+        assert result == "erster Teil zwei dritter Teil"
+        calls = service.client.audio.transcriptions.create.call_args_list
+        assert len(calls) == 3
+        assert all(call[1]["prompt"] == "Vokabular" for call in calls)
+
+    @patch('src.config.config.USE_LOCAL_TRANSCRIPTION', False)
+    @patch('src.config.config.CHANNELS', 1)
+    def test_short_audio_single_upload(self, service):
+        """Kurze Aufnahmen werden wie bisher in einem Stück hochgeladen"""
+        service.client.audio.transcriptions.create.return_value = "Kurz"
+
+        assert service.transcribe_pcm(np.zeros(16000 * 5, dtype=np.float32)) == "Kurz"
+        assert service.client.audio.transcriptions.create.call_args[1]["file"].name == "audio.wav"
+
+
+class TestUploadFormatSelection:
+    """Tests für die Messung des Upload-Durchsatzes"""
+
+    @pytest.fixture
+    def service(self):
+        with patch('src.transcription.get_openai_client'):
+            yield TranscriptionService()
+
+    @patch('src.config.config.USE_LOCAL_TRANSCRIPTION', False)
+    def test_api_upload_feeds_throughput(self, service):
+        """Gesamtzeit minus gemeldeter Serverzeit ergibt den Upload-Durchsatz"""
+        service.client.audio.transcriptions.create.return_value = "Text"
+
+        with patch('src.transcription.last_server_seconds', return_value=0.0), \
+                patch('src.transcription.time') as mock_time:
+            mock_time.time.side_effect = [100.0, 102.0]
+            assert service._transcribe_audio_data_with_api(b"x" * 200_000, "audio.wav") == "Text"
+
+        stats = service.get_upload_stats()
+        assert stats["upload_samples"] == 1
+        assert stats["throughput_bytes_per_second"] == 100_000
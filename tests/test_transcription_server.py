@@ -0,0 +1,219 @@
+"""
+Tests für transcription_server.py - HTTP-Server mit begrenzter Queue und Deduplizierung
+"""
+
+import http.client
+import json
+import socket
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pytest
+
+from src.transcription_server import TranscriptionServer
+
+
+class FakeService:
+    """Ersetzt den TranscriptionService; gate hält die Inferenz an"""
+
+    def __init__(self, delay=0.0):
+        self.calls = []
+        self.delay = delay
+        self.gate = threading.Event()
+        self.gate.set()
+
+    def transcribe_audio_data(self, audio_data, filename="audio.mp3"):
+        self.gate.wait(5)
+        if self.delay:
+            time.sleep(self.delay)
+        self.calls.append(("file", filename, len(audio_data)))
+        return "Hallo Welt"
+
+    def transcribe_pcm(self, audio):
+        self.gate.wait(5)
+        self.calls.append(("pcm", audio.dtype.name, len(audio)))
+        return "Hallo PCM"
+
+    def shutdown(self):
+        pass
+
+
+class FakeTextProcessor:
+    def process_text(self, raw_text):
+        return raw_text + "."
+
+
+class UnixHTTPConnection(http.client.HTTPConnection):
+    def __init__(self, path):
+        super().__init__("localhost")
+        self.socket_path = path
+
+    def connect(self):
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.connect(self.socket_path)
+
+
+@pytest.fixture
+def service():
+    return FakeService()
+
+
+@pytest.fixture
+def server(service):
+    instance = TranscriptionServer(host="127.0.0.1", port=0, unix_socket="", service=service,
+                                   text_processor=FakeTextProcessor(), queue_size=2, workers=1)
+    instance.start()
+    yield instance
+    service.gate.set()
+    instance.stop(timeout=5)
+
+
+def _request(server, method, path, body=None, headers=None):
+    host, port = server._httpd.server_address[:2]
+    connection = http.client.HTTPConnection(host, port, timeout=10)
+    try:
+        connection.request(method, path, body=body, headers=headers or {})
+        response = connection.getresponse()
+        return response.status, dict(response.getheaders()), response.read()
+    finally:
+        connection.close()
+
+
+class TestTranscriptionServer:
+    """Tests für Endpunkte, Rückstau und Deduplizierung"""
+
+    def test_audio_upload_is_transcribed_and_corrected(self, server, service):
+        status, _, body = _request(server, "POST", "/v1/transcribe", b"RIFF" + b"\x00" * 100,
+                                   {"Content-Type": "audio/wav"})
+
+        result = json.loads(body)
+        assert status == 200
+        assert result["text"] == "Hallo Welt."
+        assert result["raw_text"] == "Hallo Welt"
+        assert service.calls == [("file", "audio.wav", 104)]
+
+    def test_raw_pcm_without_correction(self, server, service):
+        pcm = (np.ones(1600, dtype=np.int16) * 1000).tobytes()
+        status, _, body = _request(server, "POST", "/v1/transcribe?correct=0", pcm,
+                                   {"Content-Type": "audio/L16; rate=16000"})
+
+        assert status == 200
+        assert json.loads(body)["text"] == "Hallo PCM"
+        assert service.calls == [("pcm", "float32", 1600)]
+
+    def test_wrong_pcm_rate_is_rejected(self, server):
+        status, _, _ = _request(server, "POST", "/v1/transcribe?format=pcm16&rate=44100", b"\x00\x00" * 10)
+        assert status == 400
+
+    @pytest.mark.parametrize("content_type", ["audio/L16;rate=8000", "audio/L16; rate=16000; channels=2"])
+    def test_wrong_pcm_content_type_params_are_rejected(self, server, service, content_type):
+        status, _, body = _request(server, "POST", "/v1/transcribe", b"\x00\x00" * 10,
+                                   {"Content-Type": content_type})
+        assert status == 400
+        assert "erhalten" in json.loads(body)["error"]
+        assert service.calls == []
+
+    def test_pcm_content_type_params_are_accepted(self, server, service):
+        status, _, _ = _request(server, "POST", "/v1/transcribe?correct=0", b"\x00\x00" * 10,
+                                {"Content-Type": 'audio/L16; rate="16000"; channels=1'})
+        assert status == 200
+        assert service.calls == [("pcm", "float32", 10)]
+
+    def test_full_queue_answers_429(self, server, service):
+        service.gate.clear()
+        pool = ThreadPoolExecutor(max_workers=4)
+        pause = threading.Event()
+
+        def wait_for(requests, queue_depth, timeout=5.0):
+            deadline = time.monotonic() + timeout
+            while time.monotonic() < deadline:
+                stats = server.get_stats()
+                if stats["requests"] == requests and stats["queue_depth"] == queue_depth:
+                    return True
+                pause.wait(0.02)
+            return False
+
+        def send(i):
+            return pool.submit(_request, server, "POST", f"/v1/transcribe?filename=a{i}.wav", b"x" * (i + 1))
+
+        # Erste Anfrage blockiert im Dispatcher (am Gate), erst danach füllen zwei die Queue
+        pending = [send(0)]
+        assert wait_for(requests=1, queue_depth=0)
+        pending += [send(1), send(2)]
+        assert wait_for(requests=3, queue_depth=2)
+
+        status, headers, _ = _request(server, "POST", "/v1/transcribe", b"zu viel")
+        service.gate.set()
+
+        assert status == 429
+        assert headers["Retry-After"] == "1"
+        assert [future.result()[0] for future in pending] == [200, 200, 200]
+        assert server.get_stats()["rejected"] == 1
+        pool.shutdown()
+
+    def test_identical_audio_in_flight_is_transcribed_once(self, server, service):
+        service.gate.clear()
+        with ThreadPoolExecutor(max_workers=2) as pool:
+            futures = [pool.submit(_request, server, "POST", "/v1/transcribe", b"gleich" * 10,
+                                   {"Content-Type": "audio/mpeg"}) for _ in range(2)]
+            deadline = threading.Event()
+            while server.get_stats()["requests"] < 2 and not deadline.wait(0.02):
+                pass
+            service.gate.set()
+            results = [json.loads(future.result()[2]) for future in futures]
+
+        assert len(service.calls) == 1
+        assert all(result["dedupe_count"] == 2 for result in results)
+        assert server.get_stats()["deduplicated"] == 1
+
+    def test_health_and_unknown_path(self, server):
+        status, _, body = _request(server, "GET", "/health")
+        assert status == 200
+        assert json.loads(body)["queue_size"] == 2
+
+        status, _, _ = _request(server, "GET", "/unbekannt")
+        assert status == 404
+
+
+def test_distinct_requests_run_in_parallel():
+    service = FakeService(delay=0.3)
+    server = TranscriptionServer(host="127.0.0.1", port=0, unix_socket="", service=service,
+                                 text_processor=FakeTextProcessor(), queue_size=16, workers=4)
+    server.start()
+    try:
+        start_time = time.monotonic()
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            futures = [pool.submit(_request, server, "POST", f"/v1/transcribe?correct=0&filename=a{i}.wav",
+                                   b"x" * (i + 1)) for i in range(8)]
+            statuses = [future.result()[0] for future in futures]
+        elapsed = time.monotonic() - start_time
+    finally:
+        server.stop(timeout=5)
+
+    # Seriell wären es 8 x 0.3s = 2.4s, mit 4 Dispatchern etwa 0.6s
+    assert statuses == [200] * 8
+    assert len(service.calls) == 8
+    assert elapsed < 1.2
+
+
+@pytest.mark.skipif(sys.platform == "win32", reason="Unix-Sockets nur unter Linux/macOS")
+def test_unix_socket(tmp_path, service):
+    socket_path = str(tmp_path / "transcriber.sock")
+    server = TranscriptionServer(unix_socket=socket_path, service=service,
+                                 text_processor=FakeTextProcessor(), workers=1)
+    server.start()
+    try:
+        connection = UnixHTTPConnection(socket_path)
+        connection.request("POST", "/v1/transcribe?correct=0", body=b"audio",
+                           headers={"Content-Type": "audio/ogg"})
+        response = connection.getresponse()
+        assert response.status == 200
+        assert json.loads(response.read())["text"] == "Hallo Welt"
+        assert service.calls == [("file", "audio.ogg", 5)]
+        connection.close()
+    finally:
+        server.stop(timeout=5)
+    assert not (tmp_path / "transcriber.sock").exists()
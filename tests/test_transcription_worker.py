@@ -0,0 +1,79 @@
+"""
+Tests für transcription_worker.py - Worker-Prozess mit Supervisor
+"""
+
+import os
+
+import numpy as np
+import pytest
+
+from src.transcription_worker import TranscriptionWorkerClient
+
+
+class FakeLocalService:
+    """Ersatz für LocalTranscriptionService im Worker-Prozess (muss picklebar/importierbar sein)"""
+
+    def is_available(self):
+        return True
+
+    def warmup(self):
+        return True
+
+    def transcribe_array(self, audio, initial_prompt=None, profile=None):
+        # Negativer erster Wert simuliert einen harten Absturz in CTranslate2
+        if len(audio) and audio[0] < 0:
+            os._exit(1)
+        if profile:
+            return f"{len(audio)} Samples, Profil={profile}"
+        return f"{len(audio)} Samples, Prompt={initial_prompt}"
+
+    def transcribe_audio_data(self, audio_data, filename="audio.mp3"):
+        return f"{filename}:{len(audio_data)}"
+
+    def get_model_info(self):
+        return {"available": True, "model_size": "fake"}
+
+
+@pytest.mark.slow
+class TestTranscriptionWorkerClient:
+    """Test-Klasse für TranscriptionWorkerClient"""
+
+    @pytest.fixture
+    def client(self):
+        client = TranscriptionWorkerClient(
+            service_factory=FakeLocalService,
+            request_timeout=10,
+            startup_timeout=30
+        )
+        assert client.start() is True
+        yield client
+        client.shutdown()
+
+    def test_transcribe_array_roundtrip(self, client):
+        """PCM wird über die Pipe übertragen und transkribiert"""
+        audio = np.zeros(16000, dtype=np.float32)
+        assert client.transcribe_array(audio, initial_prompt="Vokabular") == "16000 Samples, Prompt=Vokabular"
+
+    def test_transcribe_array_forwards_profile(self, client):
+        """Ein erzwungenes Decoding-Profil (live_captions) erreicht den Worker"""
+        audio = np.zeros(100, dtype=np.float32)
+        assert client.transcribe_array(audio, profile="instant") == "100 Samples, Profil=instant"
+
+    def test_transcribe_audio_data_roundtrip(self, client):
+        """Komprimierte Daten werden unverändert an den Worker übergeben"""
+        assert client.transcribe_audio_data(b"x" * 42, "audio.wav") == "audio.wav:42"
+
+    def test_model_info(self, client):
+        """Modell-Infos stammen aus dem Worker-Prozess"""
+        info = client.get_model_info()
+        assert info["model_size"] == "fake"
+        assert info["worker_process"] is True
+
+    def test_worker_restarted_after_crash(self, client):
+        """Nach einem Absturz startet der Supervisor den Worker neu"""
+        crashing = np.full(100, -1.0, dtype=np.float32)
+        assert client.transcribe_array(crashing) is None
+
+        # Nächste Anfrage wird vom neu gestarteten Worker beantwortet
+        assert client.transcribe_array(np.zeros(10, dtype=np.float32)) == "10 Samples, Prompt=None"
+        assert client.restart_count == 1
@@ -0,0 +1,66 @@
+"""
+Tests für upload_optimizer.py - Upload-Format nach gemessener Verbindung
+"""
+
+from unittest.mock import patch
+
+import pytest
+
+from src.upload_optimizer import MIN_SAMPLE_BYTES, UploadOptimizer
+
+
+@pytest.fixture
+def optimizer():
+    with patch('src.config.config.SAMPLE_RATE', 16000), \
+            patch('src.config.config.CHANNELS', 1), \
+            patch('src.config.config.AUDIO_COMPRESSION_ENABLED', True), \
+            patch('src.config.config.UPLOAD_FORMAT_ADAPTIVE', True), \
+            patch('src.config.config.AUDIO_COMPRESSION_FORMAT', 'mp3'), \
+            patch('src.upload_optimizer.is_native_format', return_value=True):
+        yield UploadOptimizer(smoothing=1.0)
+
+
+class TestUploadOptimizer:
+    """Test-Klasse für die adaptive Formatwahl"""
+
+    def test_configured_format_without_measurement(self, optimizer):
+        """Ohne Durchsatz-Messung bleibt es beim konfigurierten Format"""
+        assert optimizer.choose() == 'mp3'
+
+    def test_fast_link_prefers_wav(self, optimizer):
+        """Im schnellen LAN kostet Kodieren mehr als der größere Upload"""
+        # 10 MB in 0.1 s Übertragung = 100 MB/s
+        optimizer.record_upload(10_000_000, elapsed=0.6, server_seconds=0.5)
+        assert optimizer.choose() == 'wav'
+
+    def test_slow_link_prefers_opus(self, optimizer):
+        """Bei langsamer Verbindung gewinnt das kleinste Format"""
+        # 320 KB in 4 s Übertragung = 80 KB/s
+        optimizer.record_upload(320_000, elapsed=4.5, server_seconds=0.5)
+        assert optimizer.choose() == 'opus'
+
+    def test_measured_encode_cost_changes_choice(self, optimizer):
+        """Eigene Kodier-Messungen ersetzen die Startwerte"""
+        optimizer.record_upload(320_000, elapsed=4.5, server_seconds=0.5)
+        # Opus extrem langsam gemessen (z.B. schwache CPU)
+        optimizer.record_encode('opus', audio_seconds=10, encode_seconds=20, encoded_bytes=22_000)
+        assert optimizer.choose() != 'opus'
+
+    def test_ignores_uploads_without_server_time(self, optimizer):
+        """Ohne Serverzeit lässt sich Upload nicht von Verarbeitung trennen"""
+        optimizer.record_upload(1_000_000, elapsed=2.0, server_seconds=None)
+        optimizer.record_upload(MIN_SAMPLE_BYTES - 1, elapsed=2.0, server_seconds=0.5)
+        assert optimizer.throughput is None
+
+    def test_compression_disabled_uses_wav(self, optimizer):
+        with patch('src.config.config.AUDIO_COMPRESSION_ENABLED', False):
+            assert optimizer.choose() == 'wav'
+
+    def test_stats_expose_decision(self, optimizer):
+        optimizer.record_upload(320_000, elapsed=4.5, server_seconds=0.5)
+        optimizer.choose()
+        stats = optimizer.get_stats()
+
+        assert stats['format'] == 'opus'
+        assert stats['throughput_bytes_per_second'] == 80_000
+        assert stats['upload_samples'] == 1
@@ -0,0 +1,147 @@
+"""
+Tests für watch_daemon.py - Watch-Folder mit Entprellung und begrenzter Queue
+"""
+
+import json
+import threading
+import time
+import wave
+
+import pytest
+
+from src.watch_daemon import WatchDaemon, sidecar_paths
+
+
+def _write_wav(path, seconds=0.5):
+    with wave.open(str(path), 'wb') as wf:
+        wf.setnchannels(1)
+        wf.setsampwidth(2)
+        wf.setframerate(16000)
+        wf.writeframes(b'\x00\x00' * int(seconds * 16000))
+    return path
+
+
+def _daemon(directory, transcriber, **kwargs):
+    options = dict(workers=2, queue_size=4, settle_seconds=0.2, poll_interval=0.05, use_watchdog=False)
+    options.update(kwargs)
+    return WatchDaemon(directory, transcriber=transcriber, **options)
+
+
+@pytest.fixture
+def calls():
+    return []
+
+
+@pytest.fixture
+def transcriber(calls):
+    def transcribe(path, duration):
+        calls.append(path)
+        return f"Transkript {len(calls)}"
+    return transcribe
+
+
+class TestWatchDaemon:
+    """Tests für Erkennung, Verarbeitung und Sidecar-Dateien"""
+
+    def test_existing_and_new_files_get_sidecars(self, tmp_path, transcriber, calls):
+        _write_wav(tmp_path / "vorher.wav")
+        daemon = _daemon(tmp_path, transcriber)
+        daemon.start()
+        try:
+            _write_wav(tmp_path / "neu.wav")
+            time.sleep(0.1)
+            assert daemon.wait_idle(timeout=5)
+        finally:
+            daemon.stop()
+
+        assert len(calls) == 2
+        txt_path, json_path = sidecar_paths(tmp_path / "neu.wav")
+        assert txt_path.read_text(encoding='utf-8').startswith("Transkript")
+        entry = json.loads(json_path.read_text(encoding='utf-8'))
+        assert entry["status"] == "ok"
+        assert entry["audio_seconds"] == 0.5
+        assert daemon.get_stats()["ok"] == 2
+
+    def test_growing_file_waits_until_stable(self, tmp_path, transcriber, calls):
+        daemon = _daemon(tmp_path, transcriber, settle_seconds=0.5)
+        daemon.start()
+        try:
+            path = tmp_path / "anruf.wav"
+            for _ in range(5):
+                with open(path, 'ab') as f:
+                    f.write(b'\x00' * 1000)
+                time.sleep(0.15)
+                assert calls == []
+            assert daemon.wait_idle(timeout=5)
+        finally:
+            daemon.stop()
+        assert calls == [str(path)]
+
+    def test_same_stem_files_get_separate_sidecars(self, tmp_path, transcriber, calls):
+        _write_wav(tmp_path / "anruf.wav")
+        _write_wav(tmp_path / "anruf.mp3")
+
+        daemon = _daemon(tmp_path, transcriber)
+        daemon.start()
+        try:
+            assert daemon.wait_idle(timeout=5)
+        finally:
+            daemon.stop()
+
+        assert sorted(calls) == [str(tmp_path / "anruf.mp3"), str(tmp_path / "anruf.wav")]
+        for name in ("anruf.wav", "anruf.mp3"):
+            txt_path, json_path = sidecar_paths(tmp_path / name)
+            assert txt_path.name == f"{name}.txt"
+            assert json.loads(json_path.read_text(encoding='utf-8'))["status"] == "ok"
+
+    def test_done_files_not_processed_again(self, tmp_path, transcriber, calls):
+        _write_wav(tmp_path / "alt.wav")
+        sidecar_paths(tmp_path / "alt.wav")[1].write_text("{}")
+
+        daemon = _daemon(tmp_path, transcriber)
+        daemon.start()
+        try:
+            assert daemon.wait_idle(timeout=2)
+        finally:
+            daemon.stop()
+        assert calls == []
+
+    def test_failure_written_as_json(self, tmp_path):
+        def failing(path, duration):
+            raise RuntimeError("Modell fehlt")
+
+        _write_wav(tmp_path / "kaputt.wav")
+        daemon = _daemon(tmp_path, failing)
+        daemon.start()
+        try:
+            assert daemon.wait_idle(timeout=5)
+        finally:
+            daemon.stop()
+
+        txt_path, json_path = sidecar_paths(tmp_path / "kaputt.wav")
+        assert not txt_path.exists()
+        assert json.loads(json_path.read_text(encoding='utf-8'))["status"] == "error"
+
+    def test_bounded_queue_applies_backpressure(self, tmp_path):
+        release = threading.Event()
+        processed = []
+
+        def slow(path, duration):
+            release.wait(timeout=5)
+            processed.append(path)
+            return "Text"
+
+        for i in range(6):
+            _write_wav(tmp_path / f"datei{i}.wav")
+        daemon = _daemon(tmp_path, slow, workers=1, queue_size=2)
+        daemon.start()
+        try:
+            time.sleep(0.5)
+            stats = daemon.get_stats()
+            assert stats["queue_depth"] <= 2
+            assert stats["pending"] >= 3
+            release.set()
+            assert daemon.wait_idle(timeout=10)
+        finally:
+            daemon.stop()
+        assert len(processed) == 6
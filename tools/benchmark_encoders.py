@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Encoder-Benchmark: pydub/ffmpeg (Subprozess) gegen In-Process-Kodierung
+Misst Kodierzeit und Dateigröße pro Format für eine WAV-Datei oder ein
+synthetisches Signal.
+
+Verwendung:
+    python tools/benchmark_encoders.py [aufnahme.wav] [--runs 5] [--seconds 10]
+"""
+
+import argparse
+import io
+import statistics
+import sys
+import tempfile
+import time
+import wave
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.audio_encoder import NATIVE_FORMATS, encode_pcm, is_native_format  # noqa: E402
+
+SAMPLE_RATE = 16000
+
+
+def synthetic_speech(seconds: float) -> np.ndarray:
+    """Amplitudenmoduliertes Rauschen mit Pausen als grober Sprach-Ersatz"""
+    rng = np.random.default_rng(0)
+    t = np.arange(int(seconds * SAMPLE_RATE)) / SAMPLE_RATE
+    envelope = np.clip(np.sin(2 * np.pi * 0.7 * t), 0, None) ** 2
+    voiced = np.sin(2 * np.pi * 180 * t) + 0.5 * np.sin(2 * np.pi * 720 * t)
+    signal = (voiced + 0.3 * rng.standard_normal(len(t))) * envelope * 6000
+    return signal.astype(np.int16)
+
+
+def read_wav(path: str):
+    with wave.open(path, 'rb') as wf:
+        if wf.getnchannels() != 1 or wf.getsampwidth() != 2:
+            raise ValueError("Nur 16-bit Mono-WAV wird unterstützt")
+        return np.frombuffer(wf.readframes(wf.getnframes()), dtype=np.int16), wf.getframerate()
+
+
+def write_wav(path: str, samples: np.ndarray, sample_rate: int):
+    with wave.open(path, 'wb') as wf:
+        wf.setnchannels(1)
+        wf.setsampwidth(2)
+        wf.setframerate(sample_rate)
+        wf.writeframes(samples.tobytes())
+
+
+def measure(encode, runs: int):
+    """Median der Laufzeit in ms und Größe des Ergebnisses"""
+    timings = []
+    data = b''
+    for _ in range(runs):
+        start = time.perf_counter()
+        data = encode()
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings), len(data)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Vergleicht pydub/ffmpeg mit In-Process-Encodern')
+    parser.add_argument('wav', nargs='?', help='16-bit Mono-WAV (Standard: synthetisches Signal)')
+    parser.add_argument('--runs', type=int, default=5, help='Wiederholungen pro Encoder')
+    parser.add_argument('--seconds', type=float, default=10.0, help='Länge des synthetischen Signals')
+    parser.add_argument('--bitrate', default='64k', help='Bitrate für pydub/ffmpeg')
+    args = parser.parse_args()
+
+    if args.wav:
+        samples, sample_rate = read_wav(args.wav)
+    else:
+        samples = synthetic_speech(args.seconds)
+        sample_rate = SAMPLE_RATE
+
+    print(f"Eingabe: {len(samples) / sample_rate:.1f}s, {samples.nbytes} bytes PCM, {args.runs} Läufe\n")
+    print(f"{'Encoder':<24} {'Zeit (ms)':>10} {'Größe (bytes)':>14} {'Anteil':>8}")
+
+    # pydub: WAV-Datei schreiben wie in der Anwendung, dann ffmpeg-Export
+    try:
+        from pydub import AudioSegment
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            wav_path = str(Path(temp_dir) / 'benchmark.wav')
+            write_wav(wav_path, samples, sample_rate)
+
+            for output_format in ('mp3', 'opus'):
+                def encode_pydub(output_format=output_format):
+                    buffer = io.BytesIO()
+                    AudioSegment.from_wav(wav_path).export(buffer, format=output_format, bitrate=args.bitrate)
+                    return buffer.getvalue()
+
+                try:
+                    elapsed, size = measure(encode_pydub, args.runs)
+                    print(f"{'pydub/ffmpeg ' + output_format:<24} {elapsed:>10.1f} {size:>14} {size / samples.nbytes:>8.1%}")
+                except Exception as e:
+                    print(f"{'pydub/ffmpeg ' + output_format:<24} nicht verfügbar ({e.__class__.__name__})")
+    except ImportError:
+        print("pydub nicht installiert - übersprungen")
+
+    for output_format in NATIVE_FORMATS:
+        if not is_native_format(output_format):
+            print(f"{'soundfile ' + output_format:<24} nicht verfügbar")
+            continue
+        elapsed, size = measure(lambda: encode_pcm(samples, sample_rate, 1, output_format), args.runs)
+        print(f"{'soundfile ' + output_format:<24} {elapsed:>10.1f} {size:>14} {size / samples.nbytes:>8.1%}")
+
+
+if __name__ == "__main__":
+    main()